@@ -11,8 +11,8 @@ setup(name='tweet_parser',
       long_description=open('README.rst', 'r').read(),
       author_email='fpigott@twitter.com',
       license='MIT',
-      version='1.13.2',
+      version='1.38.0',
       packages=find_packages(),
-      scripts=["tools/parse_tweets.py"],
+      scripts=["tools/parse_tweets.py", "tools/parse_daemon.py"],
       install_requires=[],
      )
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Benchmarks for the streaming summaries in tweet_parser.aggregation, fed
+batches of plain dicts.
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import load_payloads
+from tweet_parser.aggregation.heavy_hitters import HeavyHitters
+from tweet_parser.aggregation.distinct_counts import DistinctCounts
+from tweet_parser.aggregation.histograms import EngagementHistograms
+from tweet_parser.aggregation.quantiles import QuantileSketches
+from tweet_parser.aggregation.reply_graph import ReplyGraph
+from tweet_parser.aggregation.interaction_network import InteractionNetwork
+
+COPIES = 100
+BATCH_SIZE = 1000
+
+
+def batches(payloads):
+    return [payloads[start:start + BATCH_SIZE] for start in range(0, len(payloads), BATCH_SIZE)]
+
+
+@pytest.mark.parametrize("capacity", [10, 1000])
+def test_heavy_hitters(benchmark, payload_format, capacity):
+    benchmark.group = "HeavyHitters " + payload_format
+    payloads = load_payloads(payload_format) * COPIES
+    benchmark.extra_info["payloads"] = len(payloads)
+
+    def aggregate():
+        heavy_hitters = HeavyHitters(capacity=capacity)
+        for batch in batches(payloads):
+            heavy_hitters.add_batch(batch)
+        return heavy_hitters
+
+    benchmark(aggregate)
+
+
+@pytest.mark.parametrize("bucket", ["minute", "day"])
+def test_distinct_counts(benchmark, payload_format, bucket):
+    benchmark.group = "DistinctCounts " + payload_format
+    payloads = load_payloads(payload_format) * COPIES
+    benchmark.extra_info["payloads"] = len(payloads)
+
+    def aggregate():
+        distinct = DistinctCounts(bucket=bucket)
+        for batch in batches(payloads):
+            distinct.add_batch(batch)
+        return distinct
+
+    benchmark(aggregate)
+
+
+@pytest.mark.parametrize("group_by", ["lang", "rule"])
+def test_engagement_histograms(benchmark, payload_format, group_by):
+    benchmark.group = "EngagementHistograms " + payload_format
+    payloads = load_payloads(payload_format) * COPIES
+    benchmark.extra_info["payloads"] = len(payloads)
+
+    def aggregate():
+        histograms = EngagementHistograms(bucket="minute", group_by=group_by)
+        for batch in batches(payloads):
+            histograms.add_batch(batch)
+        return histograms.rows()
+
+    benchmark(aggregate)
+
+
+@pytest.mark.parametrize("group_by", ["lang", "rule"])
+def test_quantile_sketches(benchmark, payload_format, group_by):
+    benchmark.group = "QuantileSketches " + payload_format
+    payloads = load_payloads(payload_format) * COPIES
+    benchmark.extra_info["payloads"] = len(payloads)
+
+    def aggregate():
+        sketches = QuantileSketches(bucket="hour", group_by=group_by)
+        for batch in batches(payloads):
+            sketches.add_batch(batch)
+        return sketches.rows()
+
+    benchmark(aggregate)
+
+
+def test_reply_graph(benchmark, payload_format):
+    benchmark.group = "ReplyGraph " + payload_format
+    payloads = load_payloads(payload_format) * COPIES
+    benchmark.extra_info["payloads"] = len(payloads)
+
+    def aggregate():
+        graph = ReplyGraph()
+        for batch in batches(payloads):
+            graph.add_batch(batch)
+        return list(graph.threads())
+
+    benchmark(aggregate)
+
+
+@pytest.mark.parametrize("max_edges", [1000, 1000000])
+def test_interaction_network(benchmark, payload_format, max_edges):
+    benchmark.group = "InteractionNetwork " + payload_format
+    payloads = load_payloads(payload_format) * COPIES
+    benchmark.extra_info["payloads"] = len(payloads)
+
+    def aggregate():
+        with InteractionNetwork(max_edges=max_edges) as network:
+            for batch in batches(payloads):
+                network.add_batch(batch)
+            return network.csr()
+
+    benchmark(aggregate)
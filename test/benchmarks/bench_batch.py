@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Benchmarks for the batch getters in tweet_parser.getter_methods.batch,
+each next to a Python loop over the scalar getter it replaces, on lists of
+plain dicts.
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import load_payloads
+from tweet_parser.tweet_parser_errors import NotAvailableError
+from tweet_parser.getter_methods import batch
+from tweet_parser.getter_methods import (gnip_fields, tweet_counts, tweet_entities,
+                                         tweet_reply, tweet_text, tweet_user)
+
+COPIES = 400
+SCALAR_MODULES = [gnip_fields, tweet_counts, tweet_entities, tweet_reply, tweet_text, tweet_user]
+BATCH_GETTERS = sorted(name for name in vars(batch)
+                       if name.startswith("get_") and name.endswith("_batch"))
+
+
+def scalar_getter(batch_name):
+    name = batch_name[:-len("_batch")]
+    for module in SCALAR_MODULES:
+        if name in vars(module):
+            return getattr(module, name)
+
+
+@pytest.fixture(scope="module", params=["original_format", "activity_streams", "mixed"])
+def batch_payloads(request):
+    if request.param == "mixed":
+        pairs = zip(load_payloads("original_format"), load_payloads("activity_streams"))
+        payloads = [payload for pair in pairs for payload in pair]
+    else:
+        payloads = load_payloads(request.param)
+    return request.param, payloads * COPIES
+
+
+def scalar_loop(getter, payloads):
+    return [getter(payload) for payload in payloads]
+
+
+@pytest.mark.parametrize("mode", ["scalar", "batch"])
+@pytest.mark.parametrize("name", BATCH_GETTERS)
+def test_batch_getter(benchmark, batch_payloads, name, mode):
+    payload_format, payloads = batch_payloads
+    if name == "get_quote_count_batch" and payload_format != "original_format":
+        pytest.skip("quote counts are only available in original format")
+    benchmark.group = "{} {}".format(name, payload_format)
+    benchmark.extra_info["payloads"] = len(payloads)
+    if mode == "batch":
+        benchmark(getattr(batch, name), payloads)
+    else:
+        benchmark(scalar_loop, scalar_getter(name), payloads)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Benchmarks for the getter functions in tweet_parser.getter_methods.
+
+Every public function whose first argument is a Tweet is benchmarked over
+the example Tweets of each payload format.
+"""
+import inspect
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from tweet_parser.tweet import Tweet
+from tweet_parser.tweet_parser_errors import NotAvailableError
+from tweet_parser.getter_methods import gnip_fields, tweet_counts, tweet_date
+from tweet_parser.getter_methods import tweet_embeds, tweet_entities, tweet_generator
+from tweet_parser.getter_methods import tweet_geo, tweet_links, tweet_reply
+from tweet_parser.getter_methods import tweet_text, tweet_user
+
+GETTER_MODULES = [gnip_fields, tweet_counts, tweet_embeds, tweet_entities,
+                  tweet_generator, tweet_geo, tweet_links, tweet_reply,
+                  tweet_text, tweet_user]
+
+
+def _tweet_getters():
+    getters = []
+    for module in GETTER_MODULES:
+        for name, func in sorted(vars(module).items()):
+            if name.startswith("_") or not inspect.isfunction(func):
+                continue
+            if func.__module__ != module.__name__:
+                continue
+            params = list(inspect.signature(func).parameters)
+            if params[:1] == ["tweet"]:
+                getters.append((module.__name__.split(".")[-1], name, func))
+    return getters
+
+
+TWEET_GETTERS = _tweet_getters()
+
+
+def call_all(func, tweets):
+    for tweet in tweets:
+        try:
+            func(tweet)
+        except NotAvailableError:
+            pass
+
+
+@pytest.mark.parametrize("module_name,name,func", TWEET_GETTERS,
+                         ids=["{}.{}".format(m, n) for m, n, _ in TWEET_GETTERS])
+def test_getter(benchmark, payloads, payload_format, module_name, name, func):
+    benchmark.group = "{}.{}".format(module_name, name)
+    benchmark.extra_info["format"] = payload_format
+    # some getters need Tweet objects; fresh ones are made for every round so
+    # that no cached Tweet attribute is reused
+    benchmark.pedantic(call_all, setup=lambda: ((func, [Tweet(p) for p in payloads]), {}),
+                       rounds=200)
+
+
+def test_snowflake2utc(benchmark, payloads, payload_format):
+    benchmark.group = "tweet_date.snowflake2utc"
+    benchmark.extra_info["format"] = payload_format
+    ids = [Tweet(payload).id for payload in payloads]
+    benchmark(lambda: [tweet_date.snowflake2utc(tweet_id) for tweet_id in ids])
+
+
+def test_remove_links(benchmark, payloads, payload_format):
+    benchmark.group = "tweet_text.remove_links"
+    benchmark.extra_info["format"] = payload_format
+    texts = [Tweet(payload).all_text for payload in payloads]
+    benchmark(lambda: [tweet_text.remove_links(text) for text in texts])
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Benchmarks for matching Tweets against many rules or terms at once, in
+tweet_parser.matching.
+"""
+import copy
+import json
+import os
+import random
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import load_payloads
+from tweet_parser.matching.near_duplicates import NearDuplicateDetector
+from tweet_parser.matching.rules import RuleSet
+from tweet_parser.matching.terms import TermMatcher
+from tweet_parser.getter_methods.batch import apply_getter
+from tweet_parser.getter_methods.tweet_text import get_all_text
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir, os.pardir, "tools"))
+from generate_corpus import CorpusGenerator  # noqa: E402
+
+COPIES = 20
+CORPUS_SIZE = 5000
+
+
+def words(payloads):
+    return sorted(set(word for payload in payloads
+                      for word in (payload.get("text") or payload.get("body") or "").lower().split()
+                      if word.isalpha()))
+
+
+@pytest.mark.parametrize("rules", [10, 1000])
+def test_rule_set(benchmark, payload_format, rules):
+    benchmark.group = "RuleSet " + payload_format
+    payloads = load_payloads(payload_format) * COPIES
+    rng = random.Random(0)
+    vocabulary = words(payloads)
+    rule_set = RuleSet(['{} {} OR "{} {}" OR (#{} -is:retweet)'.format(
+        *[rng.choice(vocabulary) for _ in range(5)]) for _ in range(rules)])
+    benchmark.extra_info["payloads"] = len(payloads)
+    benchmark(rule_set.match_batch, payloads)
+
+
+@pytest.mark.parametrize("terms", [10, 1000])
+@pytest.mark.parametrize("method", ["TermMatcher", "in"])
+def test_terms(benchmark, payload_format, terms, method):
+    benchmark.group = "terms {} {}".format(payload_format, terms)
+    payloads = load_payloads(payload_format) * COPIES
+    vocabulary = words(payloads)
+    rng = random.Random(0)
+    term_list = [rng.choice(vocabulary) for _ in range(terms)]
+    benchmark.extra_info["payloads"] = len(payloads)
+    if method == "TermMatcher":
+        benchmark(TermMatcher(term_list).match_batch, payloads)
+    else:
+        # the loop TermMatcher replaces (without word boundaries)
+        def match_batch():
+            return [[term for term in term_list if term in text.lower()]
+                    for text in apply_getter(get_all_text, payloads)]
+        benchmark(match_batch)
+
+
+def corpus_with_copies(payload_format, fraction=0.2):
+    # a synthetic corpus where a fraction of the Tweets repost the text of
+    # an earlier Tweet (under the id of the Tweet they replace)
+    lines = CorpusGenerator(seed=0, mix={"malformed": 0}).generate(CORPUS_SIZE, payload_format)
+    payloads = [json.loads(line) for line in lines]
+    rng = random.Random(0)
+    for index in range(1, len(payloads)):
+        if rng.random() < fraction:
+            payload = copy.deepcopy(payloads[rng.randrange(index)])
+            if payload_format == "original_format":
+                payload["id_str"] = payloads[index]["id_str"]
+            else:
+                payload["id"] = payloads[index]["id"]
+            payloads[index] = payload
+    return payloads
+
+
+@pytest.mark.parametrize("method", ["add_batch", "add"])
+def test_near_duplicates(benchmark, payload_format, method):
+    benchmark.group = "NearDuplicateDetector " + payload_format
+    payloads = corpus_with_copies(payload_format)
+    benchmark.extra_info["payloads"] = len(payloads)
+
+    def detect():
+        detector = NearDuplicateDetector(window="day")
+        original_format = payload_format == "original_format"
+        if method == "add_batch":
+            for start in range(0, len(payloads), 1000):
+                detector.add_batch(payloads[start:start + 1000], original_format)
+        else:
+            for payload in payloads:
+                detector.add(payload, original_format)
+        return detector
+
+    detector = benchmark.pedantic(detect, rounds=3)
+    benchmark.extra_info["clusters"] = len(detector.clusters())
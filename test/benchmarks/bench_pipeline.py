@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Benchmarks for the whole tools/parse_tweets.py pipeline
+(reading, JSON decoding, Tweet creation, projection and output),
+run in-process so that interpreter startup is not included.
+"""
+import os
+import runpy
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import example_path
+
+PARSE_TWEETS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, os.pardir, "tools", "parse_tweets.py")
+ATTRIBUTES = "id,created_at_string,user_id,screen_name,all_text,hashtags,user_mentions,most_unrolled_urls,lang"
+COPIES = 40
+
+
+@pytest.fixture
+def input_file(tmp_path, payload_format):
+    with open(example_path(payload_format), "rb") as f:
+        payloads = f.read()
+    path = tmp_path / "input.json"
+    path.write_bytes(payloads * COPIES)
+    return str(path)
+
+
+def run_parse_tweets(args):
+    argv = sys.argv
+    sys.argv = [PARSE_TWEETS] + args
+    try:
+        runpy.run_path(PARSE_TWEETS, run_name="__main__")
+    finally:
+        sys.argv = argv
+
+
+@pytest.mark.parametrize("output_format", ["csv", "ndjson"])
+def test_parse_tweets(benchmark, input_file, tmp_path, payload_format, output_format):
+    benchmark.group = "parse_tweets.py"
+    benchmark.extra_info["format"] = payload_format
+    benchmark.extra_info["lines"] = 25 * COPIES
+    args = ["-f", input_file, "-c", ATTRIBUTES, "-o", output_format, "-a",
+            "--outfile", str(tmp_path / "output")]
+    benchmark.pedantic(run_parse_tweets, args=(args,), rounds=10)
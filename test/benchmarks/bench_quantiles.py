@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Throughput and accuracy of the quantile sketches in
+tweet_parser.aggregation, next to sorting the whole stream. Each benchmark
+records the largest rank error of the 1st to 99th percentiles, and the
+number of values (or bins) the sketch keeps, in ``extra_info``.
+"""
+import bisect
+import random
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from tweet_parser.aggregation.histograms import LogHistogram
+from tweet_parser.aggregation.quantiles import KLLSketch
+
+N_VALUES = 200000
+BATCH_SIZE = 1000
+QS = [q / 100.0 for q in range(1, 100)]
+
+
+@pytest.fixture(scope="module")
+def values():
+    # heavy tailed, like follower counts
+    rng = random.Random(0)
+    return [int(rng.lognormvariate(6, 2)) for _ in range(N_VALUES)]
+
+
+@pytest.fixture(scope="module")
+def ordered(values):
+    return sorted(values)
+
+
+def max_rank_error(ordered, quantiles):
+    n = float(len(ordered))
+    return max(min(abs(bisect.bisect_left(ordered, value) / n - q),
+                   abs(bisect.bisect_right(ordered, value) / n - q))
+               for q, value in zip(QS, quantiles))
+
+
+def feed(sketch, values):
+    for start in range(0, len(values), BATCH_SIZE):
+        sketch.add_many(values[start:start + BATCH_SIZE])
+    return sketch
+
+
+def test_sort(benchmark, values, ordered):
+    benchmark.group = "quantiles"
+    benchmark(sorted, values)
+    benchmark.extra_info["max_rank_error"] = 0.0
+    benchmark.extra_info["size"] = len(values)
+
+
+@pytest.mark.parametrize("k", [100, 200, 400])
+def test_kll(benchmark, values, ordered, k):
+    benchmark.group = "quantiles"
+    sketch = benchmark(lambda: feed(KLLSketch(k, seed=1), values))
+    benchmark.extra_info["max_rank_error"] = max_rank_error(ordered, sketch.quantiles(QS))
+    benchmark.extra_info["size"] = sum(len(compactor) for compactor in sketch.compactors)
+
+
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.05])
+def test_log_histogram(benchmark, values, ordered, relative_accuracy):
+    benchmark.group = "quantiles"
+    histogram = benchmark(lambda: feed(LogHistogram(relative_accuracy), values))
+    benchmark.extra_info["max_rank_error"] = max_rank_error(
+        ordered, [histogram.quantile(q) for q in QS])
+    benchmark.extra_info["size"] = len(histogram.bins)
+
+
+@pytest.mark.parametrize("k", [100, 200])
+def test_kll_merge(benchmark, values, ordered, k):
+    benchmark.group = "quantiles merge"
+    parts = [feed(KLLSketch(k, seed=part), values[part::16]) for part in range(16)]
+
+    def merge():
+        merged = KLLSketch(k)
+        for part in parts:
+            merged.merge(part)
+        return merged
+
+    merged = benchmark(merge)
+    benchmark.extra_info["max_rank_error"] = max_rank_error(ordered, merged.quantiles(QS))
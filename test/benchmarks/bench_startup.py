@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Benchmarks for interpreter startup plus import time, and for a whole
+short run of tools/parse_tweets.py on one small file, each in a fresh
+process. The empty interpreter is timed as well, as a baseline.
+
+test_import_budget fails if importing tweet_parser.tweet (timed inside
+the fresh process) takes longer than IMPORT_BUDGET_SECONDS.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import example_path
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+PARSE_TWEETS = os.path.join(ROOT, "tools", "parse_tweets.py")
+
+# generous, to allow for slow machines; importing everything eagerly took about 3x this
+IMPORT_BUDGET_SECONDS = 0.05
+IMPORT_SECONDS = ("import time\n"
+                  "start = time.time()\n"
+                  "import tweet_parser.tweet\n"
+                  "print(time.time() - start)")
+
+COMMANDS = {"python": ["-c", "pass"],
+            "import tweet_parser.tweet": ["-c", "import tweet_parser.tweet"],
+            "parse_tweets.py": [PARSE_TWEETS, "-f", example_path("original_format"), "-c", "id"]}
+
+
+def run(args):
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(ROOT))
+    with open(os.devnull, "wb") as devnull:
+        subprocess.check_call([sys.executable] + args, stdout=devnull, env=env)
+
+
+def import_seconds():
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(ROOT))
+    return float(subprocess.check_output([sys.executable, "-c", IMPORT_SECONDS], env=env))
+
+
+@pytest.mark.parametrize("command", sorted(COMMANDS))
+def test_startup(benchmark, command):
+    benchmark.group = "startup"
+    benchmark.pedantic(run, args=(COMMANDS[command],), rounds=20, warmup_rounds=2)
+
+
+def test_import_budget(benchmark):
+    benchmark.group = "import budget"
+    timings = []
+    benchmark.pedantic(lambda: timings.append(import_seconds()), rounds=5, warmup_rounds=1)
+    benchmark.extra_info["import_seconds"] = min(timings)
+    assert min(timings) < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Benchmarks for parsing in threads: how `ThreadPoolParser` scales as
+threads are added, and the cost of `lazy_property.enable_thread_safety`
+on Tweets shared by several threads. On a standard (GIL) CPython build
+expect no speedup from more threads; compare the groups on a
+free-threaded build.
+"""
+import threading
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import TWEET_ATTRIBUTES, example_path, load_payloads
+from tweet_parser import lazy_property
+from tweet_parser.thread_pool import ThreadPoolParser
+from tweet_parser.tweet import Tweet
+
+COPIES = 40
+THREAD_COUNTS = [1, 2, 4, 8]
+
+
+@pytest.fixture
+def lines(payload_format):
+    with open(example_path(payload_format), "rb") as f:
+        return f.read().splitlines() * COPIES
+
+
+@pytest.mark.parametrize("threads", THREAD_COUNTS)
+def test_thread_pool_parser(benchmark, lines, payload_format, threads):
+    benchmark.group = "ThreadPoolParser " + payload_format
+    benchmark.extra_info["threads"] = threads
+    benchmark.extra_info["lines"] = len(lines)
+    attributes = ["id", "created_at_seconds", "user_id", "all_text", "hashtags",
+                  "most_unrolled_urls"]
+
+    def parse():
+        with ThreadPoolParser(max_workers=threads, attributes=attributes) as parser:
+            return sum(1 for _ in parser.parse(lines))
+
+    assert benchmark(parse) == len(lines)
+
+
+def read_all(tweets):
+    for tweet in tweets:
+        for attribute in TWEET_ATTRIBUTES:
+            try:
+                getattr(tweet, attribute)
+            except Exception:
+                pass
+
+
+@pytest.mark.parametrize("thread_safe", [False, True], ids=["plain", "thread_safe"])
+@pytest.mark.parametrize("threads", THREAD_COUNTS)
+def test_shared_tweets(benchmark, payload_format, threads, thread_safe):
+    benchmark.group = "shared Tweets " + payload_format
+    benchmark.extra_info["threads"] = threads
+    payloads = load_payloads(payload_format) * 4
+    if thread_safe:
+        lazy_property.enable_thread_safety()
+
+    def setup():
+        return ([Tweet(payload) for payload in payloads],), {}
+
+    def read_shared(tweets):
+        workers = [threading.Thread(target=read_all, args=(tweets,))
+                   for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    try:
+        benchmark.pedantic(read_shared, setup=setup, rounds=20)
+    finally:
+        lazy_property.disable_thread_safety()
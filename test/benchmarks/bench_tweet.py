@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Benchmarks for creating Tweets and computing their attributes.
+
+Each benchmark processes all of the example Tweets of one payload format.
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from tweet_parser.tweet import Tweet
+from tweet_parser.tweet_parser_errors import NotAvailableError, UnexpectedFormatError
+from conftest import TWEET_ATTRIBUTES
+
+
+@pytest.mark.parametrize("do_format_validation", [False, True])
+def test_tweet_construction(benchmark, payloads, payload_format, do_format_validation):
+    benchmark.group = "Tweet construction"
+    benchmark.extra_info["format"] = payload_format
+
+    def construct():
+        for payload in payloads:
+            try:
+                Tweet(payload, do_format_validation=do_format_validation)
+            except UnexpectedFormatError:
+                # a few of the examples have keys that the validation rejects
+                pass
+    benchmark(construct)
+
+
+def get_all(tweets, attribute):
+    for tweet in tweets:
+        try:
+            getattr(tweet, attribute)
+        except NotAvailableError:
+            pass
+
+
+@pytest.mark.parametrize("attribute", TWEET_ATTRIBUTES)
+def test_attribute_cold(benchmark, payloads, payload_format, attribute):
+    """
+    The first (uncached) access of an attribute on freshly created Tweets
+    """
+    benchmark.group = "Tweet.{} (cold)".format(attribute)
+    benchmark.extra_info["format"] = payload_format
+
+    def fresh_tweets():
+        return ([Tweet(payload) for payload in payloads], attribute), {}
+    benchmark.pedantic(get_all, setup=fresh_tweets, rounds=200)
+
+
+@pytest.mark.parametrize("attribute", TWEET_ATTRIBUTES)
+def test_attribute_cached(benchmark, payloads, payload_format, attribute):
+    """
+    Repeated access of an attribute that has already been computed
+    """
+    benchmark.group = "Tweet.{} (cached)".format(attribute)
+    benchmark.extra_info["format"] = payload_format
+    tweets = [Tweet(payload) for payload in payloads]
+    get_all(tweets, attribute)
+    benchmark(get_all, tweets, attribute)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Shared fixtures for the benchmark suite (see bench_*.py)."""
+import json
+import os
+import warnings
+
+import pytest
+
+from tweet_parser.tweet import Tweet
+from tweet_parser.deprecator import FieldDeprecationWarning
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, "tweet_payload_examples")
+EXAMPLE_FILES = {"original_format": "original_format_examples.json",
+                 "activity_streams": "activity_streams_examples.json"}
+FORMATS = sorted(EXAMPLE_FILES)
+TWEET_ATTRIBUTES = sorted([x for x in list(set(dir(Tweet)) - set(dir(dict))) if x[0] != "_"])
+
+
+def example_path(payload_format):
+    return os.path.join(EXAMPLES_DIR, EXAMPLE_FILES[payload_format])
+
+
+def load_payloads(payload_format):
+    with open(example_path(payload_format), "rb") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture(params=FORMATS)
+def payload_format(request):
+    return request.param
+
+
+@pytest.fixture
+def payloads(payload_format):
+    return load_payloads(payload_format)
+
+
+@pytest.fixture(autouse=True)
+def ignore_deprecation_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FieldDeprecationWarning)
+        yield
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import sys
+
+# tweet_parser.async_stream (and its test) use async/await and asyncio.run
+collect_ignore = ["test_async_stream.py"] if sys.version_info < (3, 7) else []
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from tweet_parser.tweet import Tweet
+from tweet_parser.async_stream import TweetStream, iter_tweets
+
+
+def read_examples():
+    lines = []
+    for filename in ["original_format_examples.json", "activity_streams_examples.json"]:
+        with open(os.path.join("tweet_payload_examples", filename), "rb") as f:
+            lines += [line.rstrip(b"\n") for line in f]
+    return lines
+
+
+async def serve(lines, keep_alive_every=5, pause=0.0, copies=1):
+    """
+    A local stand-in for a streaming endpoint: payloads separated by \\r\\n,
+    with keep-alive blank lines in between
+    """
+    async def handle(reader, writer):
+        try:
+            for _ in range(copies):
+                for i, line in enumerate(lines):
+                    writer.write(line + b"\r\n")
+                    if i % keep_alive_every == 0:
+                        writer.write(b"\r\n")
+                        await writer.drain()
+                        if pause:
+                            await asyncio.sleep(pause)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+class TestTweetStream(unittest.TestCase):
+
+    def setUp(self):
+        self.lines = read_examples()
+
+    def test_tweets(self):
+        lines = self.lines + [b"{not json", b'{"info": "not a Tweet"}', b"null"]
+
+        async def consume():
+            server, port = await serve(lines, pause=0.01)
+            reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=2 ** 20)
+            stream = TweetStream(reader, batch_size=8, flush_interval=0.005)
+            batches = []
+            async for batch in stream:
+                batches.append(batch)
+            writer.close()
+            server.close()
+            return stream, batches
+
+        stream, batches = asyncio.run(consume())
+        tweets = [tweet for batch in batches for tweet in batch]
+        self.assertTrue(all(isinstance(tweet, Tweet) for tweet in tweets))
+        self.assertEqual([tweet.id for tweet in tweets],
+                         [Tweet(json.loads(line)).id for line in self.lines])
+        # partial batches are sent when the stream pauses
+        self.assertGreater(len(batches), -(-len(lines) // 8))
+        self.assertEqual(stream.keep_alives, -(-len(lines) // 5))
+        self.assertEqual(stream.metrics.tweets, len(self.lines))
+        self.assertEqual(stream.metrics.bad_json, 1)
+        self.assertEqual(stream.metrics.non_tweets, 2)
+
+    def test_process_pool_projection(self):
+        async def consume():
+            server, port = await serve(self.lines)
+            reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=2 ** 20)
+            with ProcessPoolExecutor(1) as executor:
+                rows = [row async for row in iter_tweets(reader, executor=executor,
+                                                         attributes=["id", "poll_options"])]
+            writer.close()
+            server.close()
+            return rows
+
+        rows = asyncio.run(consume())
+        self.assertEqual([row["id"] for row in rows],
+                         [Tweet(json.loads(line)).id for line in self.lines])
+        self.assertEqual(sum(row["poll_options"] is None for row in rows), len(self.lines) // 2)
+
+    def test_backpressure(self):
+        async def consume():
+            server, port = await serve(self.lines, copies=200)
+            reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=2 ** 20)
+            async with TweetStream(reader, batch_size=10, max_pending=2) as stream:
+                first = await stream.__anext__()
+                # a slow consumer: reading stops once max_pending batches are waiting
+                await asyncio.sleep(0.2)
+                lines_read = stream.lines_read
+            writer.close()
+            server.close()
+            return first, lines_read
+
+        first, lines_read = asyncio.run(consume())
+        self.assertEqual(len(first), 10)
+        self.assertLessEqual(lines_read, 10 * 5)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import json
+import warnings
+from tweet_parser.tweet import Tweet
+from tweet_parser.tweet_parser_errors import NotATweetError, NotAvailableError
+from tweet_parser.deprecator import FieldDeprecationWarning
+from tweet_parser.getter_methods import batch
+from tweet_parser.getter_methods import (gnip_fields, tweet_counts, tweet_entities,
+                                         tweet_links, tweet_reply, tweet_text, tweet_user)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SCALAR_MODULES = [gnip_fields, tweet_counts, tweet_entities, tweet_reply, tweet_text, tweet_user]
+BATCH_GETTERS = sorted(name for name in vars(batch)
+                       if name.startswith("get_") and name.endswith("_batch"))
+
+
+def scalar_getter(batch_name):
+    name = batch_name[:-len("_batch")]
+    for module in SCALAR_MODULES:
+        if name in vars(module):
+            return getattr(module, name)
+    raise LookupError(name)
+
+
+def scalar_values(getter, payloads):
+    values = []
+    for payload in payloads:
+        try:
+            values.append(getter(payload))
+        except NotAvailableError:
+            return NotAvailableError
+    return values
+
+
+def batch_values(getter, payloads, **kwargs):
+    try:
+        return getter(payloads, **kwargs)
+    except NotAvailableError:
+        return NotAvailableError
+
+
+class TestBatchGetters(unittest.TestCase):
+
+    def setUp(self):
+        self.payloads = {}
+        for payload_format in ["original_format", "activity_streams"]:
+            with open("tweet_payload_examples/{}_examples.json".format(payload_format), "r") as f:
+                self.payloads[payload_format] = [json.loads(line) for line in f]
+        # the two formats interleaved
+        self.mixed = [payload for pair in zip(self.payloads["original_format"],
+                                              self.payloads["activity_streams"])
+                      for payload in pair]
+
+    def test_batch_getters_match_scalar(self):
+        self.assertGreater(len(BATCH_GETTERS), 10)
+        for name in BATCH_GETTERS:
+            getter = getattr(batch, name)
+            scalar = scalar_getter(name)
+            self.assertEqual(batch_values(getter, self.mixed),
+                             scalar_values(scalar, self.mixed), name)
+            for payload_format, original_format in [("original_format", True),
+                                                    ("activity_streams", False)]:
+                payloads = self.payloads[payload_format]
+                expected = scalar_values(scalar, payloads)
+                self.assertEqual(batch_values(getter, payloads), expected, name)
+                self.assertEqual(batch_values(getter, payloads, original_format=original_format),
+                                 expected, name)
+                # Tweets, and any iterable, work too
+                self.assertEqual(batch_values(getter, (Tweet(p) for p in payloads)),
+                                 expected, name)
+        self.assertEqual(batch.get_quote_count_batch(self.payloads["original_format"]),
+                         [tweet_counts.get_quote_count(p) for p in self.payloads["original_format"]])
+
+    def test_apply_getter(self):
+        getters = [tweet_text.get_all_text, tweet_links.get_most_unrolled_urls,
+                   tweet_entities.get_user_mentions, tweet_user.get_klout_topics]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FieldDeprecationWarning)
+            for getter in getters:
+                self.assertEqual(batch.apply_getter(getter, self.mixed),
+                                 [getter(payload) for payload in self.mixed])
+                self.assertEqual(batch.apply_getter(getter, self.payloads["activity_streams"],
+                                                    original_format=False),
+                                 [getter(payload) for payload in self.payloads["activity_streams"]])
+
+    def test_errors(self):
+        with self.assertRaises(NotATweetError):
+            batch.get_user_id_batch(self.mixed + [{"info": "not a Tweet"}])
+        with self.assertRaises(NotAvailableError):
+            batch.get_quote_count_batch(self.mixed)
+        self.assertEqual(batch.get_lang_batch([]), [])
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_arrays(self):
+        counts = batch.get_retweet_count_batch(self.mixed, as_array=True)
+        self.assertEqual(counts.dtype, numpy.int64)
+        self.assertEqual(counts.tolist(), batch.get_retweet_count_batch(self.mixed))
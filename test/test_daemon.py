@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import errno
+import json
+import os
+import shutil
+import socket
+import itertools
+import tempfile
+import threading
+import time
+from tweet_parser.tweet import Tweet
+from tweet_parser.tweet_parser_errors import NotAvailableError
+from tweet_parser.daemon import ParseDaemon, parse_with_daemon, daemon_stats
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tweet_payload_examples")
+ATTRIBUTES = ["id", "screen_name", "hashtags", "poll_options"]
+
+
+def project(line):
+    tweet = Tweet(json.loads(line))
+    record = {}
+    for attribute in ATTRIBUTES:
+        try:
+            record[attribute] = getattr(tweet, attribute)
+        except NotAvailableError:
+            record[attribute] = None
+    return record
+
+
+class TestParseDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.lines = []
+        for filename in ["original_format_examples.json", "activity_streams_examples.json"]:
+            with open(os.path.join(EXAMPLES_DIR, filename), "rb") as f:
+                self.lines += [line.rstrip(b"\n") for line in f]
+        # cleanups run even if setUp fails later on, so a started server
+        # thread is always stopped
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.socket_path = os.path.join(self.tmp_dir, "tweet_parser.sock")
+        self.daemon = ParseDaemon(self.socket_path, processes=1, batch_size=7, max_pending=2)
+        self.addCleanup(self.close_daemon)
+        self.thread = threading.Thread(target=self.daemon.serve_forever, args=(0.05,))
+        self.thread.start()
+        self.addCleanup(self.stop_daemon)
+
+    def stop_daemon(self):
+        self.daemon.shutdown()
+        self.thread.join()
+
+    def close_daemon(self):
+        self.daemon.close()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_stream(self):
+        lines = self.lines * 8 + [b"", b"{not json", b'{"info": "keep-alive"}']
+        rows = list(parse_with_daemon(self.socket_path, lines, ATTRIBUTES))
+        expected = [project(line) for line in self.lines * 8]
+        self.assertEqual(rows[:-2], expected)
+        self.assertEqual([row["error"] for row in rows[-2:]], ["bad_json", "non_tweet"])
+
+        stats = daemon_stats(self.socket_path)
+        self.assertEqual(len(stats["connections"]), 1)
+        connection = stats["connections"][0]
+        self.assertFalse(connection["active"])
+        self.assertEqual(connection["attributes"], ATTRIBUTES)
+        self.assertEqual(connection["lines"], len(lines) - 1)
+        self.assertEqual(connection["tweets"], len(expected))
+        self.assertEqual(connection["activity_streams"], len(expected) // 2)
+        self.assertEqual(connection["bad_json"], 1)
+        self.assertEqual(connection["not_available"], len(expected) // 2)
+        # the blank line ends a partial batch
+        self.assertEqual(connection["batches"], -(-len(self.lines * 8) // 7) + 1)
+
+    def test_json_that_is_not_an_object(self):
+        lines = [self.lines[0], b"null", b"1", b'"x"', b"[]", self.lines[1]]
+        rows = list(parse_with_daemon(self.socket_path, lines, ATTRIBUTES))
+        self.assertEqual(rows[0], project(self.lines[0]))
+        self.assertEqual([row["error"] for row in rows[1:5]], ["non_tweet"] * 4)
+        self.assertEqual(rows[5], project(self.lines[1]))
+
+    def test_stop_reading_early(self):
+        # the daemon stops reading an endless stream when its rows aren't read
+        def read_one_row():
+            rows = parse_with_daemon(self.socket_path, itertools.cycle(self.lines), ATTRIBUTES)
+            for row in rows:
+                time.sleep(0.5)
+                break
+            rows.close()
+        reader = threading.Thread(target=read_one_row)
+        reader.daemon = True
+        reader.start()
+        reader.join(30)
+        self.assertFalse(reader.is_alive())
+
+    def test_request_response(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.socket_path)
+        responses = sock.makefile("rb")
+        sock.sendall(b'{"attributes": ["id", "screen_name", "hashtags", "poll_options"]}\n')
+        # a blank line asks for the rows of everything sent so far
+        for batch in [self.lines[:3], self.lines[30:31]]:
+            sock.sendall(b"\n".join(batch) + b"\n\n")
+            rows = [json.loads(responses.readline()) for _ in batch]
+            self.assertEqual(rows, [project(line) for line in batch])
+        sock.shutdown(socket.SHUT_WR)
+        self.assertEqual(responses.read(), b"")
+        responses.close()
+        sock.close()
+
+    def test_socket_path_in_use(self):
+        # the socket of a running daemon, or a file that isn't a socket, is kept
+        file_path = os.path.join(self.tmp_dir, "not_a_socket")
+        with open(file_path, "w") as f:
+            f.write("keep me")
+        for path in [self.socket_path, file_path]:
+            with self.assertRaises(OSError) as context:
+                ParseDaemon(path, processes=1)
+            self.assertEqual(context.exception.errno, errno.EADDRINUSE)
+        with open(file_path) as f:
+            self.assertEqual(f.read(), "keep me")
+        rows = list(parse_with_daemon(self.socket_path, self.lines[:3], ATTRIBUTES))
+        self.assertEqual(rows, [project(line) for line in self.lines[:3]])
+        # but a socket no daemon listens on is replaced
+        stale_path = os.path.join(self.tmp_dir, "stale.sock")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(stale_path)
+        sock.close()
+        ParseDaemon(stale_path, processes=1).close()
+        self.assertFalse(os.path.exists(stale_path))
+
+    def test_bad_spec(self):
+        rows = list(parse_with_daemon(self.socket_path, self.lines, ["id", "not_an_attribute"]))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["error"], "bad_spec")
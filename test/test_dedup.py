@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from tweet_parser import dedup
+from tweet_parser.dedup import BloomIdSet, ExactIdSet, open_id_set
+from tweet_parser.readers import iter_lines
+from tweet_parser.tweet import Tweet
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools"))
+from generate_corpus import CorpusGenerator  # noqa: E402
+
+
+class TestIdSets(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        rng = random.Random(0)
+        # mostly increasing snowflake ids, with repeats and some out of order
+        ids = sorted(rng.randrange(850000000000000000, 870000000000000000) for _ in range(5000))
+        self.ids = []
+        for tweet_id in ids:
+            self.ids.append(tweet_id)
+            if rng.random() < 0.2:
+                self.ids.append(rng.choice(self.ids))
+        self.ids += rng.sample(ids, 500) + [rng.randrange(1, 1 << 62) for _ in range(1000)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_exact(self):
+        old_size = dedup._SORT_MERGE_SIZE
+        try:
+            # merge big runs with heapq.merge too
+            for merge_size in [old_size, 100]:
+                dedup._SORT_MERGE_SIZE = merge_size
+                seen = ExactIdSet(buffer_size=64)
+                expected = set()
+                for tweet_id in self.ids:
+                    self.assertEqual(seen.add(tweet_id), tweet_id not in expected)
+                    expected.add(tweet_id)
+                self.assertEqual(len(seen), len(expected))
+                self.assertLess(len(seen._runs), 12)
+                for run in seen._runs:
+                    self.assertEqual(list(run), sorted(set(run)))
+                self.assertNotIn(1, seen)
+        finally:
+            dedup._SORT_MERGE_SIZE = old_size
+        path = os.path.join(self.tmp_dir, "exact.ids")
+        seen.save(path)
+        loaded = open_id_set(path, mode="bloom")
+        self.assertIsInstance(loaded, ExactIdSet)
+        self.assertEqual(len(loaded), len(seen))
+        self.assertTrue(all(str(tweet_id) in loaded for tweet_id in self.ids))
+        self.assertTrue(loaded.add(2))
+
+    def test_bloom(self):
+        seen = BloomIdSet(capacity=len(self.ids), error_rate=0.01)
+        expected = set()
+        false_positives = 0
+        for tweet_id in self.ids:
+            new = seen.add(tweet_id)
+            if tweet_id in expected:
+                self.assertFalse(new)
+            else:
+                false_positives += not new
+            expected.add(tweet_id)
+        self.assertLess(false_positives, 0.03 * len(expected))
+        self.assertEqual(len(seen), len(expected) - false_positives)
+        rng = random.Random(1)
+        others = [rng.randrange(1, 1 << 62) for _ in range(10000)]
+        rate = sum(tweet_id in seen for tweet_id in others) / float(len(others))
+        self.assertLess(rate, 0.02)
+        path = os.path.join(self.tmp_dir, "bloom.ids")
+        seen.save(path)
+        loaded = open_id_set(path)
+        self.assertIsInstance(loaded, BloomIdSet)
+        self.assertEqual((loaded.capacity, loaded.error_rate, len(loaded)),
+                         (seen.capacity, seen.error_rate, len(seen)))
+        self.assertEqual([tweet_id in loaded for tweet_id in others],
+                         [tweet_id in seen for tweet_id in others])
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 1)
+        with self.assertRaises(ValueError):
+            open_id_set(path)
+        with self.assertRaises(ValueError):
+            open_id_set(mode="cuckoo")
+
+    def test_payloads_and_lines(self):
+        pairs = list(CorpusGenerator(seed=13, mix={"malformed": 0}).generate(300, "both"))
+        for payload_format in ["original_format", "activity_streams"]:
+            lines = [pair[payload_format] + "\n" for pair in pairs]
+            path = os.path.join(self.tmp_dir, payload_format + ".json")
+            with open(path, "w") as f:
+                f.write("".join(lines[:200] + ['{"limit": {"track": 1}}\n'] + lines[100:]))
+            for seen in [ExactIdSet(), BloomIdSet(capacity=1000)]:
+                read = [line.decode("utf-8") for line, _ in iter_lines(path, dedup=seen)]
+                self.assertEqual(read, lines[:200] + ['{"limit": {"track": 1}}\n'] + lines[200:])
+                self.assertEqual(len(seen), 300)
+            payloads = [json.loads(line) for line in lines]
+            seen = ExactIdSet()
+            self.assertEqual(seen.filter(payloads[:200]), payloads[:200])
+            self.assertEqual(seen.add_batch([Tweet(payload) for payload in payloads[150:]]),
+                             [False] * 50 + [True] * 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import collections
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+from tweet_parser.tweet import Tweet
+from tweet_parser.aggregation.distinct_counts import HyperLogLog, DistinctCounts
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools"))
+from generate_corpus import CorpusGenerator  # noqa: E402
+
+
+class TestHyperLogLog(unittest.TestCase):
+
+    def test_accuracy(self):
+        for precision in [4, 10, 14]:
+            for n in [0, 1, 100, 5000, 60000]:
+                sketch = HyperLogLog(precision)
+                sketch.add_many(range(n))
+                # the same values again don't change the count
+                sketch.add_many(str(value) for value in range(0, n, 3))
+                tolerance = max(2, 4 * sketch.relative_error * n)
+                self.assertLessEqual(abs(sketch.count() - n), tolerance, (precision, n))
+
+    def test_merge(self):
+        first, second, union = HyperLogLog(12), HyperLogLog(12), HyperLogLog(12)
+        first.add_many(range(0, 3000))
+        second.add_many(range(2000, 5000))
+        union.add_many(range(0, 5000))
+        first.merge(second)
+        self.assertEqual(first.registers, union.registers)
+        with self.assertRaises(ValueError):
+            first.merge(HyperLogLog(10))
+
+    def test_serialization(self):
+        sketch = HyperLogLog(8)
+        sketch.add_many([u"https://twitter.com/", b"bytes", 42, "42"])
+        self.assertEqual(sketch.count(), 3)
+        for copy in [HyperLogLog.from_bytes(sketch.to_bytes()), pickle.loads(pickle.dumps(sketch))]:
+            self.assertEqual(copy.precision, 8)
+            self.assertEqual(copy.registers, sketch.registers)
+        with self.assertRaises(ValueError):
+            HyperLogLog.from_bytes(sketch.to_bytes()[:-1])
+        with self.assertRaises(ValueError):
+            HyperLogLog(precision=3)
+
+
+class TestDistinctCounts(unittest.TestCase):
+
+    def setUp(self):
+        pairs = CorpusGenerator(seed=4, mix={"malformed": 0, "poll": 0},
+                                tweets_per_second=5.0).generate(1500, "both")
+        self.payloads = {"original_format": [], "activity_streams": []}
+        for pair in pairs:
+            for payload_format, payloads in self.payloads.items():
+                payloads.append(json.loads(pair[payload_format]))
+        # overlapping files: the same Tweets more than once
+        self.payloads["original_format"] += self.payloads["original_format"][:500]
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def exact_counts(self, payloads, bucket_seconds):
+        sets = collections.defaultdict(lambda: collections.defaultdict(set))
+        for payload in payloads:
+            tweet = Tweet(payload)
+            start = tweet.created_at_seconds - tweet.created_at_seconds % bucket_seconds
+            sets[start]["user_ids"].add(tweet.user_id)
+            sets[start]["tweet_ids"].add(tweet.id)
+            sets[start]["urls"].update(tweet.most_unrolled_urls)
+        return {start: {dimension: len(values) for dimension, values in bucket.items()}
+                for start, bucket in sets.items()}
+
+    def assertClose(self, counts, exact, relative_error):
+        self.assertEqual(sorted(counts), sorted(exact))
+        for start, bucket in exact.items():
+            for dimension, n in bucket.items():
+                self.assertLessEqual(abs(counts[start][dimension] - n),
+                                     max(2, 4 * relative_error * n), (start, dimension))
+
+    def test_counts_per_bucket(self):
+        payloads = self.payloads["original_format"]
+        distinct = DistinctCounts(bucket=60, precision=12)
+        distinct.add_batch(payloads)
+        relative_error = HyperLogLog(12).relative_error
+        self.assertGreater(len(distinct.sketches), 1)
+        self.assertClose(distinct.counts(), self.exact_counts(payloads, 60), relative_error)
+        # both formats, and Tweets one at a time, give the same sketches
+        activity_streams = DistinctCounts(bucket=60, precision=12)
+        activity_streams.add_batch(self.payloads["activity_streams"])
+        tweets = DistinctCounts(bucket=60, precision=12)
+        for payload in self.payloads["activity_streams"]:
+            tweets.add(Tweet(payload))
+        self.assertEqual(activity_streams.to_dict(), distinct.to_dict())
+        self.assertEqual(tweets.to_dict(), distinct.to_dict())
+        n_tweets = len(set(Tweet(payload).id for payload in payloads))
+        self.assertLessEqual(abs(distinct.total("tweet_ids") - n_tweets),
+                             4 * relative_error * n_tweets)
+        report = distinct.report()
+        self.assertEqual([row["bucket"] for row in report], sorted(distinct.sketches))
+        self.assertTrue(report[0]["time"].endswith(":00Z"))
+
+    def test_merge_rollup_and_save(self):
+        payloads = self.payloads["activity_streams"]
+        whole = DistinctCounts(bucket="minute", precision=10)
+        whole.add_batch(payloads)
+        merged = DistinctCounts(bucket="minute", precision=10)
+        for start in range(0, len(payloads), 400):
+            part = DistinctCounts(bucket="minute", precision=10)
+            part.add_batch(payloads[start:start + 400])
+            path = os.path.join(self.tmpdir, "part.json")
+            part.save(path)
+            merged.merge(DistinctCounts.load(path))
+        self.assertEqual(merged.to_dict(), whole.to_dict())
+        self.assertEqual(pickle.loads(pickle.dumps(merged)).to_dict(), whole.to_dict())
+        # rolling minutes up into days is the same as counting by day
+        by_day = DistinctCounts(bucket="day", precision=10)
+        by_day.add_batch(payloads)
+        self.assertEqual(whole.rollup("day").to_dict(), by_day.to_dict())
+        with self.assertRaises(ValueError):
+            whole.rollup(90)
+        with self.assertRaises(ValueError):
+            merged.merge(by_day)
+        with self.assertRaises(ValueError):
+            DistinctCounts(dimensions=["hashtags"])
+        users = DistinctCounts(bucket="hour", dimensions=["user_ids"])
+        users.add_batch(payloads)
+        self.assertEqual(set(users.report()[0]), {"bucket", "time", "user_ids"})
+
+
+if __name__ == "__main__":
+    unittest.main()
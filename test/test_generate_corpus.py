@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import json
+import os
+import sys
+from tweet_parser.tweet import Tweet
+from tweet_parser.tweet_parser_errors import NotATweetError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools"))
+from generate_corpus import CorpusGenerator  # noqa: E402
+
+
+class TestCorpusGenerator(unittest.TestCase):
+
+    def generate(self, n=300, **kwargs):
+        return list(CorpusGenerator(**kwargs).generate(n, "both"))
+
+    def test_seeded_output_is_deterministic(self):
+        self.assertEqual(self.generate(seed=5), self.generate(seed=5))
+        self.assertNotEqual(self.generate(seed=5), self.generate(seed=6))
+        single = list(CorpusGenerator(seed=5).generate(300, "activity_streams"))
+        self.assertEqual(single, [pair["activity_streams"] for pair in self.generate(seed=5)])
+
+    def test_same_tweets_in_both_formats(self):
+        previous_id = 0
+        kinds = set()
+        for pair in self.generate(seed=1, mix={"malformed": 0, "poll": 0}):
+            original = Tweet(json.loads(pair["original_format"]))
+            activity = Tweet(json.loads(pair["activity_streams"]))
+            self.assertGreater(int(original.id), previous_id)
+            previous_id = int(original.id)
+            for attribute in ["id", "created_at_seconds", "user_id", "screen_name",
+                              "all_text", "hashtags", "user_mentions", "tweet_links",
+                              "most_unrolled_urls", "tweet_type", "in_reply_to_status_id",
+                              "gnip_matching_rules", "media_urls", "lang"]:
+                self.assertEqual(getattr(original, attribute), getattr(activity, attribute))
+            kinds.add(original.tweet_type)
+        self.assertEqual(kinds, {"tweet", "retweet", "quote"})
+
+    def test_mix(self):
+        pairs = self.generate(n=200, seed=2, mix={"malformed": 0.5, "retweet": 0,
+                                                  "quote": 0, "poll": 1})
+        malformed = 0
+        for pair in pairs:
+            try:
+                tweet = Tweet(json.loads(pair["original_format"]))
+            except (ValueError, NotATweetError):
+                malformed += 1
+                continue
+            self.assertEqual(tweet.tweet_type, "tweet")
+            self.assertIn("polls", tweet["entities"])
+        self.assertTrue(60 < malformed < 140)
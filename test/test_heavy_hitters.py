@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import collections
+import json
+import os
+import pickle
+import random
+import sys
+from tweet_parser.tweet import Tweet
+from tweet_parser.aggregation.heavy_hitters import SpaceSaving, HeavyHitters
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools"))
+from generate_corpus import CorpusGenerator  # noqa: E402
+
+
+def zipf_stream(n, seed=0):
+    rng = random.Random(seed)
+    return ["item{}".format(int(rng.paretovariate(1.0))) for _ in range(n)]
+
+
+class TestSpaceSaving(unittest.TestCase):
+
+    def check_bounds(self, summary, exact):
+        total = sum(exact.values())
+        self.assertEqual(summary.total, total)
+        bound = total / float(summary.capacity)
+        for item, count in summary.top():
+            # never too low, and too high by at most the recorded error
+            self.assertGreaterEqual(count, exact[item])
+            self.assertLessEqual(count - summary.error(item), exact[item])
+            self.assertLessEqual(summary.error(item), bound)
+        # every item more frequent than total / capacity is kept
+        for item, count in exact.items():
+            if count > bound:
+                self.assertIn(item, summary)
+
+    def test_exact_below_capacity(self):
+        stream = zipf_stream(2000)
+        summary = SpaceSaving(capacity=10000)
+        summary.update_many(stream)
+        exact = collections.Counter(stream)
+        self.assertEqual(dict(summary.top()), dict(exact))
+        self.assertEqual(summary.min_count(), 0)
+
+    def test_error_bounds(self):
+        stream = zipf_stream(20000)
+        for capacity in [1, 5, 50]:
+            summary = SpaceSaving(capacity=capacity)
+            summary.update_many(stream)
+            self.assertEqual(len(summary), min(capacity, len(set(stream))))
+            self.check_bounds(summary, collections.Counter(stream))
+        weighted = SpaceSaving(capacity=20)
+        for item in stream[:1000]:
+            weighted.update(item, 3)
+        self.check_bounds(weighted, collections.Counter(stream[:1000] * 3))
+
+    def test_merge(self):
+        stream = zipf_stream(20000, seed=1)
+        parts = [stream[:5000], stream[5000:12000], stream[12000:]]
+        merged = SpaceSaving(capacity=50)
+        for part in parts:
+            summary = SpaceSaving(capacity=50)
+            summary.update_many(part)
+            merged.merge(summary)
+        self.check_bounds(merged, collections.Counter(stream))
+        whole = SpaceSaving(capacity=50)
+        whole.update_many(stream)
+        self.assertEqual([item for item, _ in merged.top(5)],
+                         [item for item, _ in whole.top(5)])
+
+    def test_serialization(self):
+        summary = SpaceSaving(capacity=30)
+        summary.update_many(zipf_stream(3000))
+        for copy in [SpaceSaving.from_dict(json.loads(json.dumps(summary.to_dict()))),
+                     pickle.loads(pickle.dumps(summary))]:
+            self.assertEqual(copy.top(), summary.top())
+            self.assertEqual(copy.to_dict(), summary.to_dict())
+            # and the copy keeps counting like the original
+            copy.update_many(["new"] * 200)
+            summary_copy = pickle.loads(pickle.dumps(summary))
+            summary_copy.update_many(["new"] * 200)
+            self.assertEqual(copy.top(), summary_copy.top())
+        with self.assertRaises(ValueError):
+            SpaceSaving(capacity=0)
+
+
+class TestHeavyHitters(unittest.TestCase):
+
+    def setUp(self):
+        pairs = CorpusGenerator(seed=3, mix={"malformed": 0, "poll": 0}).generate(600, "both")
+        self.payloads = {"original_format": [], "activity_streams": []}
+        for pair in pairs:
+            for payload_format, payloads in self.payloads.items():
+                payloads.append(json.loads(pair[payload_format]))
+
+    def exact_counts(self, tweets):
+        counts = collections.defaultdict(collections.Counter)
+        for tweet in tweets:
+            counts["hashtags"].update(tag.lower() for tag in tweet.hashtags)
+            counts["mentions"].update(mention["screen_name"] for mention in tweet.user_mentions)
+            counts["url_domains"].update(url.split("/")[2].split(":")[0].lower()
+                                         for url in tweet.most_unrolled_urls)
+            counts["screen_names"][tweet.screen_name] += 1
+        return counts
+
+    def test_counts_match_tweet_attributes(self):
+        tweets = [Tweet(payload) for payload in self.payloads["original_format"]]
+        exact = self.exact_counts(tweets)
+        for payloads in [self.payloads["original_format"], self.payloads["activity_streams"],
+                         tweets]:
+            heavy_hitters = HeavyHitters(capacity=10000)
+            heavy_hitters.add_batch(payloads)
+            for dimension in HeavyHitters.DIMENSIONS:
+                self.assertEqual(dict(heavy_hitters.top(dimension, k=None)),
+                                 dict(exact[dimension]), dimension)
+        one_at_a_time = HeavyHitters(capacity=10000)
+        for tweet in tweets:
+            one_at_a_time.add(tweet)
+        self.assertEqual(one_at_a_time.to_dict(), heavy_hitters.to_dict())
+
+    def test_merge_and_report(self):
+        payloads = self.payloads["activity_streams"]
+        merged = HeavyHitters(capacity=20, dimensions=["hashtags", "screen_names"])
+        for start in range(0, len(payloads), 100):
+            part = HeavyHitters(capacity=20, dimensions=["hashtags", "screen_names"])
+            part.add_batch(payloads[start:start + 100])
+            merged.merge(pickle.loads(pickle.dumps(part)))
+        exact = self.exact_counts(Tweet(payload) for payload in payloads)
+        report = merged.report(k=3)
+        self.assertEqual(sorted(report), ["hashtags", "screen_names"])
+        for dimension, rows in report.items():
+            self.assertEqual(len(rows), 3)
+            for row in rows:
+                self.assertLessEqual(row["count"] - row["error"], exact[dimension][row["item"]])
+                self.assertGreaterEqual(row["count"], exact[dimension][row["item"]])
+        copy = HeavyHitters.from_dict(json.loads(json.dumps(merged.to_dict())))
+        self.assertEqual(copy.report(k=3), report)
+        with self.assertRaises(ValueError):
+            HeavyHitters(dimensions=["emoji"])
+
+
+if __name__ == "__main__":
+    unittest.main()
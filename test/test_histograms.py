@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import collections
+import csv
+import io
+import json
+import os
+import pickle
+import random
+import shutil
+import sys
+import tempfile
+from tweet_parser.tweet import Tweet
+from tweet_parser.aggregation.histograms import LogHistogram, EngagementHistograms
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools"))
+from generate_corpus import CorpusGenerator  # noqa: E402
+
+
+def exact_quantile(values, q):
+    return sorted(values)[int(q * (len(values) - 1))]
+
+
+class TestLogHistogram(unittest.TestCase):
+
+    def test_quantiles(self):
+        rng = random.Random(0)
+        values = [int(rng.lognormvariate(5, 2)) for _ in range(20000)] + [0] * 500
+        for accuracy in [0.01, 0.05]:
+            histogram = LogHistogram(accuracy)
+            histogram.add_many(values)
+            self.assertEqual(histogram.count, len(values))
+            for q in [0, 0.01, 0.5, 0.9, 0.99, 1]:
+                exact = exact_quantile(values, q)
+                self.assertLessEqual(abs(histogram.quantile(q) - exact), accuracy * exact + 1e-9)
+        self.assertIsNone(LogHistogram().quantile(0.5))
+
+    def test_merge(self):
+        first, second, whole = LogHistogram(), LogHistogram(), LogHistogram()
+        first.add_many(range(0, 500))
+        second.add_many(range(500, 1000))
+        whole.add_many(range(0, 1000))
+        first.merge(second)
+        self.assertEqual(first.to_dict(), whole.to_dict())
+        self.assertEqual(LogHistogram.from_dict(first.to_dict()).quantile(0.9), whole.quantile(0.9))
+        with self.assertRaises(ValueError):
+            first.merge(LogHistogram(0.02))
+
+
+class TestEngagementHistograms(unittest.TestCase):
+
+    def setUp(self):
+        pairs = CorpusGenerator(seed=6, mix={"malformed": 0, "poll": 0},
+                                tweets_per_second=5.0).generate(1200, "both")
+        self.payloads = {"original_format": [], "activity_streams": []}
+        for pair in pairs:
+            for payload_format, payloads in self.payloads.items():
+                payloads.append(json.loads(pair[payload_format]))
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def exact_rows(self, group_by):
+        cells = collections.defaultdict(list)
+        for payload in self.payloads["original_format"]:
+            tweet = Tweet(payload)
+            start = tweet.created_at_seconds - tweet.created_at_seconds % 60
+            if group_by == "lang":
+                groups = [tweet.lang or ""]
+            else:
+                tags = set(rule["tag"] or "" for rule in tweet.gnip_matching_rules or [])
+                groups = sorted(tags) or [""]
+            for group in groups:
+                cells[(start, group)].append(tweet)
+        rows = {}
+        for key, tweets in cells.items():
+            rows[key] = {"tweets": len(tweets),
+                         "retweets": sum(t.tweet_type == "retweet" for t in tweets),
+                         "quotes": sum(t.tweet_type == "quote" for t in tweets),
+                         "replies": sum(t.in_reply_to_status_id is not None for t in tweets),
+                         "retweet_count": sum(t.retweet_count for t in tweets),
+                         "favorite_count": sum(t.favorite_count for t in tweets),
+                         "followers": [t.follower_count for t in tweets]}
+        return rows
+
+    def test_rows_match_tweet_attributes(self):
+        for group_by in ["lang", "rule"]:
+            exact = self.exact_rows(group_by)
+            histograms = EngagementHistograms(bucket="minute", group_by=group_by)
+            for start in range(0, 1200, 250):
+                histograms.add_batch(self.payloads["original_format"][start:start + 250])
+            rows = histograms.rows()
+            self.assertEqual(len(rows), len(exact))
+            self.assertGreater(len(set(row["bucket"] for row in rows)), 1)
+            for row in rows:
+                expected = exact[(row["bucket"], row["group"])]
+                for column in EngagementHistograms.COUNTS:
+                    self.assertEqual(row[column], expected[column], column)
+                for percentile in [50, 90, 99]:
+                    value = exact_quantile(expected["followers"], percentile / 100.0)
+                    self.assertLessEqual(abs(row["follower_count_p{}".format(percentile)] - value),
+                                         0.01 * value + 1)
+            # the same rows from activity streams, and from Tweets
+            activity_streams = EngagementHistograms(bucket="minute", group_by=group_by)
+            activity_streams.add_batch(self.payloads["activity_streams"])
+            self.assertEqual(activity_streams.rows(), rows)
+            tweets = EngagementHistograms(bucket="minute", group_by=group_by)
+            for payload in self.payloads["activity_streams"][:100]:
+                tweets.add(Tweet(payload))
+            partial = EngagementHistograms(bucket="minute", group_by=group_by)
+            partial.add_batch(self.payloads["original_format"][:100])
+            self.assertEqual(tweets.rows(), partial.rows())
+
+    def test_merge_and_serialization(self):
+        payloads = self.payloads["activity_streams"]
+        whole = EngagementHistograms(bucket="hour", group_by="rule")
+        whole.add_batch(payloads)
+        merged = EngagementHistograms(bucket="hour", group_by="rule")
+        for start in range(0, len(payloads), 300):
+            part = EngagementHistograms(bucket="hour", group_by="rule")
+            part.add_batch(payloads[start:start + 300])
+            merged.merge(pickle.loads(pickle.dumps(part)))
+        self.assertEqual(merged.to_dict(), whole.to_dict())
+        copy = EngagementHistograms.from_dict(json.loads(json.dumps(whole.to_dict())))
+        self.assertEqual(copy.rows(), whole.rows())
+        with self.assertRaises(ValueError):
+            merged.merge(EngagementHistograms(bucket="hour", group_by="lang"))
+        with self.assertRaises(ValueError):
+            EngagementHistograms(group_by="user")
+        # one group
+        total = EngagementHistograms(bucket="day", group_by=None)
+        total.add_batch(payloads)
+        self.assertEqual([(row["group"], row["tweets"]) for row in total.rows()],
+                         [("", len(payloads))])
+
+    def test_csv(self):
+        histograms = EngagementHistograms(group_by="lang", percentiles=[50, 95])
+        histograms.add_batch(self.payloads["original_format"])
+        text = io.StringIO()
+        histograms.write_csv(text)
+        lines = list(csv.reader(io.StringIO(text.getvalue())))
+        self.assertEqual(lines[0], histograms.columns)
+        self.assertEqual(lines[0][-1], "follower_count_p95")
+        self.assertEqual(lines[1:], [[str(row[column]) for column in histograms.columns]
+                                     for row in histograms.rows()])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet(self):
+        histograms = EngagementHistograms()
+        histograms.add_batch(self.payloads["original_format"])
+        path = os.path.join(self.tmpdir, "histograms.parquet")
+        histograms.write_parquet(path)
+        self.assertEqual(pyarrow.parquet.read_table(path).to_pylist(), histograms.rows())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+# modules that should only be imported once they are needed
+DEFERRED_MODULES = ["tweet_parser.tweet_keys", "tweet_parser.getter_methods.tweet_user",
+                    "tweet_parser.getter_methods.tweet_generator", "html.parser",
+                    "inspect", "multiprocessing", "bz2"]
+
+
+def run_python(code):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.check_output([sys.executable, "-c", code], env=env).decode("utf-8")
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_deferred_imports(self):
+        loaded = json.loads(run_python(
+            "import json, sys\n"
+            "import tweet_parser.tweet, tweet_parser.readers, tweet_parser.checkpoint\n"
+            "print(json.dumps(sorted(sys.modules)))"))
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, loaded)
+
+    def test_getter_modules_load_on_use(self):
+        loaded = json.loads(run_python(
+            "import json, sys\n"
+            "from tweet_parser.tweet import Tweet\n"
+            "tweet = Tweet(json.loads(open('{}').readline()))\n"
+            "tweet.generator, tweet.bio\n"
+            "print(json.dumps(sorted(sys.modules)))".format(
+                os.path.join(ROOT, "test", "tweet_payload_examples",
+                             "original_format_examples.json").replace("\\", "/"))))
+        self.assertIn("tweet_parser.getter_methods.tweet_generator", loaded)
+        self.assertIn("tweet_parser.getter_methods.tweet_user", loaded)
+        self.assertNotIn("tweet_parser.tweet_keys", loaded)
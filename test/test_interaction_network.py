@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import collections
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+from tweet_parser.tweet import Tweet
+from tweet_parser.aggregation.interaction_network import InteractionNetwork, read_csr
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools"))
+from generate_corpus import CorpusGenerator  # noqa: E402
+
+
+class TestInteractionNetwork(unittest.TestCase):
+
+    def setUp(self):
+        pairs = CorpusGenerator(seed=8, mix={"malformed": 0, "poll": 0}).generate(1200, "both")
+        self.payloads = {"original_format": [], "activity_streams": []}
+        for pair in pairs:
+            for payload_format, payloads in self.payloads.items():
+                payloads.append(json.loads(pair[payload_format]))
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def exact_edges(self):
+        edges = collections.Counter()
+        for payload in self.payloads["original_format"]:
+            tweet = Tweet(payload)
+            source = int(tweet.user_id)
+            if tweet.retweeted_tweet is not None:
+                edges[(source, int(tweet.retweeted_tweet.user_id), "retweet")] += 1
+                continue
+            if tweet.quoted_tweet is not None:
+                edges[(source, int(tweet.quoted_tweet.user_id), "quote")] += 1
+            for mention in tweet.user_mentions:
+                edges[(source, int(mention["id_str"]), "mention")] += 1
+        return edges
+
+    def test_edges_match_tweet_attributes(self):
+        exact = self.exact_edges()
+        self.assertEqual(set(edge_type for _, _, edge_type in exact),
+                         set(["retweet", "quote", "mention"]))
+        # small enough to spill many runs, and to merge them
+        with InteractionNetwork(max_edges=50, max_runs=4, spill_dir=self.tmpdir) as network:
+            for start in range(0, 1200, 100):
+                network.add_batch(self.payloads["original_format"][start:start + 100])
+            self.assertGreater(network._run_count, 4)
+            self.assertLess(len(network._runs), 4)
+            edges = list(network.edges(user_ids=True))
+            self.assertEqual(dict(((s, t, e), w) for s, t, e, w in edges), dict(exact))
+            self.assertEqual(len(edges), len(exact))
+            dense_edges = list(network.edges())
+            self.assertEqual(dense_edges, sorted(dense_edges))
+            # the same edges from activity streams, and from Tweets
+            with InteractionNetwork() as activity_streams:
+                activity_streams.add_batch(self.payloads["activity_streams"])
+                self.assertEqual(sorted(activity_streams.edges(user_ids=True)), sorted(edges))
+            with InteractionNetwork() as tweets:
+                for payload in self.payloads["activity_streams"]:
+                    tweets.add(Tweet(payload))
+                self.assertEqual(list(tweets.edges()), list(activity_streams.edges()))
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_csr_and_edge_list(self):
+        exact = self.exact_edges()
+        network = InteractionNetwork(max_edges=200, spill_dir=self.tmpdir)
+        network.add_batch(self.payloads["activity_streams"])
+        user_ids = network.user_ids
+        for edge_type in [None, "mention"]:
+            indptr, indices, weights = network.csr(edge_type)
+            self.assertEqual(len(indptr), len(user_ids) + 1)
+            matrix = collections.Counter()
+            for source in range(len(user_ids)):
+                targets = indices[indptr[source]:indptr[source + 1]]
+                self.assertEqual(list(targets), sorted(set(targets)))
+                for target, weight in zip(targets, weights[indptr[source]:indptr[source + 1]]):
+                    matrix[(user_ids[source], user_ids[target])] += weight
+            expected = collections.Counter()
+            for (source, target, kind), weight in exact.items():
+                if edge_type in [None, kind]:
+                    expected[(source, target)] += weight
+            self.assertEqual(matrix, expected)
+        path = os.path.join(self.tmpdir, "mentions.csr")
+        network.write_csr(path, "mention")
+        self.assertEqual(read_csr(path), (user_ids,) + network.csr("mention"))
+        with self.assertRaises(ValueError):
+            network.csr("reply")
+        text = io.StringIO()
+        network.write_edge_list(text)
+        rows = list(csv.reader(io.StringIO(text.getvalue())))
+        self.assertEqual(rows[0], ["source", "target", "type", "weight"])
+        self.assertEqual(dict(((int(s), int(t), e), int(w)) for s, t, e, w in rows[1:]),
+                         dict(exact))
+        network.close()
+
+    def test_merge(self):
+        payloads = self.payloads["original_format"]
+        whole = InteractionNetwork()
+        whole.add_batch(payloads)
+        merged = InteractionNetwork(max_edges=100, spill_dir=self.tmpdir)
+        for start in range(0, len(payloads), 300):
+            part = InteractionNetwork(max_edges=100, spill_dir=self.tmpdir)
+            part.add_batch(payloads[start:start + 300])
+            merged.merge(part)
+            part.close()
+        self.assertEqual(sorted(merged.edges(user_ids=True)), sorted(whole.edges(user_ids=True)))
+        merged.close()
+        with self.assertRaises(ValueError):
+            InteractionNetwork(max_runs=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import json
+from tweet_parser.tweet import Tweet
+from tweet_parser.tweet_parser_errors import NotAvailableError
+from tweet_parser import lazy_property
+
+
+class TestLazyPropertyProfiling(unittest.TestCase):
+
+    def setUp(self):
+        with open("tweet_payload_examples/activity_streams_examples.json", "r") as f:
+            self.tweets = [json.loads(line) for line in f]
+        lazy_property.reset_profiling()
+
+    def tearDown(self):
+        lazy_property.disable_profiling()
+        lazy_property.reset_profiling()
+
+    def test_counters(self):
+        plain = vars(Tweet)["all_text"]
+        lazy_property.enable_profiling()
+        self.assertTrue(lazy_property.profiling_enabled())
+        self.assertIsNot(vars(Tweet)["all_text"], plain)
+        for tweet_dict in self.tweets:
+            tweet = Tweet(tweet_dict)
+            self.assertEqual(tweet.all_text, tweet.all_text)
+            with self.assertRaises(NotAvailableError):
+                tweet.poll_options
+        lazy_property.disable_profiling()
+        self.assertIs(vars(Tweet)["all_text"], plain)
+        Tweet(self.tweets[0]).all_text
+
+        snapshot = lazy_property.profiling_snapshot()
+        n_tweets = len(self.tweets)
+        self.assertEqual(snapshot["all_text"]["calls"], n_tweets)
+        self.assertEqual(snapshot["all_text"]["hits"], n_tweets)
+        self.assertGreater(snapshot["all_text"]["total_time"], 0)
+        self.assertLessEqual(snapshot["all_text"]["max_time"], snapshot["all_text"]["total_time"])
+        # poll_options raises in activity-streams format, so it isn't cached
+        self.assertEqual(snapshot["poll_options"]["calls"], n_tweets)
+        self.assertEqual(snapshot["poll_options"]["hits"], 0)
+        self.assertEqual(snapshot["poll_options"]["exceptions"], {"NotAvailableError": n_tweets})
+        self.assertNotIn("bio", snapshot)
+
+        merged = lazy_property.merge_snapshots([snapshot, snapshot])
+        self.assertEqual(merged["all_text"]["calls"], 2 * n_tweets)
+        self.assertEqual(merged["all_text"]["max_time"], snapshot["all_text"]["max_time"])
+        table = lazy_property.format_profile_table(merged).splitlines()
+        self.assertTrue(table[0].startswith("attribute"))
+        self.assertEqual(len(table), len(merged) + 1)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from tweet_parser.tweet import Tweet
+from tweet_parser.readers import peek_tweet_id
+from tweet_parser.line_index import IndexedTweetFile, LineIndex, ASCENDING, DESCENDING, UNSORTED
+
+
+class TestIndexedTweetFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        with open("tweet_payload_examples/original_format_examples.json", "rb") as f:
+            lines = f.readlines()
+        with open("tweet_payload_examples/activity_streams_examples.json", "rb") as f:
+            lines += f.readlines()
+        # descending by id (the example files are newest first), with a non-Tweet line
+        lines.sort(key=lambda line: -int(Tweet(json.loads(line)).id))
+        lines.insert(7, b'{"info": {"message": "Replay Request Completed"}}\n')
+        self.lines = lines
+        self.times = [Tweet(json.loads(line)).created_at_seconds if b"info" not in line else None
+                      for line in lines]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, lines, name="tweets.json"):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, "wb") as f:
+            f.writelines(lines)
+        return path
+
+    def check_lookups(self, path, lines, times):
+        for sample_every in [1, 4]:
+            with IndexedTweetFile(path, sample_every=sample_every) as tweets:
+                self.assertEqual(len(tweets), len(lines))
+                self.assertEqual(list(tweets.iter_lines()), lines)
+                self.assertEqual(tweets[-1], lines[-1])
+                for line_number, line in enumerate(lines):
+                    if times[line_number] is None:
+                        continue
+                    tweet_id = Tweet(json.loads(line)).id
+                    # each Tweet is in the examples in both formats
+                    found = tweets.get_by_id(tweet_id)
+                    self.assertEqual(Tweet(json.loads(found)).id, tweet_id)
+                self.assertIsNone(tweets.find_id(123))
+                start, end = sorted(t for t in times if t is not None)[10:12]
+                expected = [line for line, t in zip(lines, times)
+                            if t is not None and start <= t < end]
+                self.assertEqual(list(tweets.time_range(start, end)), expected)
+
+    def test_sorted_and_unsorted(self):
+        path = self.write(self.lines)
+        self.check_lookups(path, self.lines, self.times)
+        self.assertEqual(LineIndex.load(path + ".idx").order, DESCENDING)
+        path = self.write(self.lines[::-1], name="ascending.json")
+        self.check_lookups(path, self.lines[::-1], self.times[::-1])
+        self.assertEqual(LineIndex.load(path + ".idx").order, ASCENDING)
+        shuffled = self.lines[1::2] + self.lines[::2]
+        path = self.write(shuffled, name="unsorted.json")
+        self.check_lookups(path, shuffled, self.times[1::2] + self.times[::2])
+        self.assertEqual(LineIndex.load(path + ".idx").order, UNSORTED)
+
+    def test_find_id_unsorted(self):
+        shuffled = self.lines[1::2] + self.lines[::2]
+        path = self.write(shuffled, name="unsorted.json")
+        first_lines = {}
+        for line_number, line in enumerate(shuffled):
+            tweet_id = peek_tweet_id(line)
+            if tweet_id is not None:
+                first_lines.setdefault(tweet_id, line_number)
+        with IndexedTweetFile(path) as tweets:
+            for tweet_id, line_number in first_lines.items():
+                self.assertEqual(tweets.find_id(tweet_id), line_number)
+                self.assertIsNone(tweets.find_id(tweet_id + 1))
+            self.assertIsNone(tweets.find_id(1 << 62))
+
+    def test_rebuild_when_changed(self):
+        path = self.write(self.lines[:10])
+        with IndexedTweetFile(path) as tweets:
+            self.assertEqual(len(tweets), 10)
+        path = self.write(self.lines)
+        with IndexedTweetFile(path) as tweets:
+            self.assertEqual(len(tweets), len(self.lines))
+        index = LineIndex.load(path + ".idx")
+        self.assertTrue(index.is_current(path))
+        self.assertEqual(len(index.sample_ids), len(self.lines) - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import io
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from tweet_parser.tweet import Tweet
+from tweet_parser.metrics import (ParseMetrics, MetricsReporter, PrometheusTextfile,
+                                  JSONLinesFile, ProgressLine)
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.metrics = ParseMetrics()
+        for filename in ["original_format_examples.json", "activity_streams_examples.json"]:
+            with open(os.path.join("tweet_payload_examples", filename), "rb") as f:
+                for line in f:
+                    self.metrics.lines += 1
+                    self.metrics.bytes += len(line)
+                    self.metrics.count_tweet(Tweet(json.loads(line)))
+        self.metrics.bad_json += 2
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_counts(self):
+        counts = self.metrics.counts()
+        self.assertEqual(counts["tweets"], counts["original_format"] + counts["activity_streams"])
+        self.assertEqual(counts["original_format"], counts["activity_streams"])
+        self.assertEqual(counts["bad_json"], 2)
+        copy = pickle.loads(pickle.dumps(self.metrics))
+        copy.add(counts)
+        self.assertEqual(copy.lines, 2 * counts["lines"])
+
+    def test_reporter(self):
+        records = io.StringIO()
+        progress = io.StringIO()
+        prometheus_path = os.path.join(self.tmp_dir, "tweet_parser.prom")
+        metrics = ParseMetrics()
+        reporter = MetricsReporter(metrics, [JSONLinesFile(records), ProgressLine(progress),
+                                             PrometheusTextfile(prometheus_path)],
+                                   interval=3600, check_every=2)
+        metrics.add(self.metrics.counts())
+        for _ in range(10):
+            reporter.tick()
+        self.assertEqual(records.getvalue(), "")
+        reporter.interval = 0
+        reporter.tick()
+        reporter.tick()
+        snapshot = json.loads(records.getvalue())
+        self.assertEqual(snapshot["lines"], self.metrics.lines)
+        self.assertGreater(snapshot["lines_per_second"], 0)
+        self.assertIn("bad JSON 2", progress.getvalue())
+        with open(prometheus_path) as f:
+            exposition = f.read()
+        self.assertIn('tweet_parser_errors_total{error="bad_json"} 2\n', exposition)
+        self.assertIn("tweet_parser_lines_total {}\n".format(self.metrics.lines), exposition)
+        # rates are over the interval since the last report
+        self.assertEqual(reporter.report()["lines_per_second"], 0)
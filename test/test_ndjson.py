@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import fileinput
+import io
+import json
+from tweet_parser.tweet import Tweet
+from tweet_parser.ndjson import NDJSONWriter
+
+
+class TestNDJSONWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tweets = []
+        for line in fileinput.FileInput("tweet_payload_examples/original_format_examples.json"):
+            self.tweets.append(Tweet(json.loads(line)))
+
+    def test_structure_is_preserved(self):
+        attrs = ["id", "hashtags", "user_mentions", "tweet_links", "geo_coordinates"]
+        out = io.BytesIO()
+        writer = NDJSONWriter(out, batch_size=7)
+        for tweet in self.tweets:
+            writer.write({attr: getattr(tweet, attr) for attr in attrs})
+        writer.flush()
+        lines = out.getvalue().decode("utf-8").splitlines()
+        self.assertEqual(len(lines), len(self.tweets))
+        for line, tweet in zip(lines, self.tweets):
+            record = json.loads(line)
+            for attr in attrs:
+                self.assertEqual(record[attr], getattr(tweet, attr))
+
+    def test_drop_none(self):
+        out = io.BytesIO()
+        writer = NDJSONWriter(out, drop_none=True)
+        writer.write({"id": "1", "lang": None, "hashtags": []})
+        writer.flush()
+        self.assertEqual(json.loads(out.getvalue().decode("utf-8")),
+                         {"id": "1", "hashtags": []})
+
+
+if __name__ == '__main__':
+    unittest.main()
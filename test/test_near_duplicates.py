@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import json
+import os
+import random
+import sys
+from tweet_parser.tweet import Tweet
+from tweet_parser.matching.near_duplicates import (MinHasher, NearDuplicateDetector,
+                                                   get_text_without_links)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools"))
+from generate_corpus import CorpusGenerator  # noqa: E402
+
+
+def jaccard(first, second):
+    return len(first & second) / float(len(first | second))
+
+
+def copy_text(text, rng):
+    # a copy that only differs in case, punctuation, mentions, and a word
+    words = text.split()
+    edit = rng.randint(0, 3)
+    if edit == 0:
+        words = [word.upper() if rng.random() < 0.3 else word for word in words]
+    elif edit == 1:
+        words[rng.randrange(len(words))] += rng.choice(["!", ",", "..."])
+    elif edit == 2:
+        words.append(rng.choice(words))
+    return "@user{} {}".format(rng.randint(0, 999), " ".join(words))
+
+
+class TestNearDuplicates(unittest.TestCase):
+
+    def setUp(self):
+        generator = CorpusGenerator(seed=12, mix={"malformed": 0, "poll": 0})
+        pairs = generator.generate(300, "both")
+        self.payloads = {"original_format": [], "activity_streams": []}
+        for pair in pairs:
+            for payload_format, payloads in self.payloads.items():
+                payloads.append(json.loads(pair[payload_format]))
+        self.words = generator.words
+
+    def random_text(self, rng):
+        return " ".join(rng.choice(self.words) for _ in range(rng.randint(8, 25)))
+
+    def test_text_without_links(self):
+        stripped = 0
+        for tweet_of, tweet_as in zip(self.payloads["original_format"],
+                                      self.payloads["activity_streams"]):
+            text = get_text_without_links(tweet_of)
+            self.assertEqual(get_text_without_links(tweet_as), text)
+            self.assertEqual(get_text_without_links(Tweet(tweet_as)), text)
+            self.assertNotIn("https://t.co/", text)
+            if Tweet(tweet_of).tweet_type == "retweet":
+                self.assertEqual(text, "")
+            elif "https://t.co/" in Tweet(tweet_of).user_entered_text:
+                stripped += 1
+        self.assertGreater(stripped, 10)
+        # a link whose indices are off is still removed
+        tweet = {"created_at": "Wed May 24 20:17:19 +0000 2017", "truncated": False,
+                 "text": "pie https://t.co/abc",
+                 "entities": {"urls": [{"url": "https://t.co/abc", "indices": [0, 16]}]}}
+        self.assertEqual(get_text_without_links(tweet).strip(), "pie")
+
+    def test_similarity_estimates(self):
+        rng = random.Random(3)
+        hasher = MinHasher(num_perm=256)
+        errors = []
+        for _ in range(100):
+            text = self.random_text(rng)
+            words = text.split()
+            other = " ".join(words[:rng.randint(1, len(words))] +
+                             self.random_text(rng).split()[:rng.randint(0, 10)])
+            first, second = hasher.signatures([text, other])
+            errors.append(hasher.similarity(first, second) -
+                          jaccard(hasher.shingles(text), hasher.shingles(other)))
+        self.assertLess(max(map(abs, errors)), 0.2)
+        self.assertLess(abs(sum(errors) / len(errors)), 0.02)
+        self.assertEqual(hasher.signatures(["", "@fiona", "pie"])[:2], [None, None])
+        self.assertEqual(hasher.signatures([text, "pie"]),
+                         [hasher.signature(text), hasher.signature("pie")])
+
+    def test_finds_copies(self):
+        rng = random.Random(4)
+        templates = [self.random_text(rng) for _ in range(30)]
+        stream = [(rng.choice(templates), True) for _ in range(300)]
+        stream += [(self.random_text(rng), False) for _ in range(700)]
+        rng.shuffle(stream)
+        detector = NearDuplicateDetector()
+        first = {}
+        found, missed, joined = 0, 0, 0
+        for tweet_id, (text, copied) in enumerate(stream, 1):
+            if copied:
+                text = copy_text(text, rng) if text in first else text
+                expected = first.setdefault(stream[tweet_id - 1][0], tweet_id)
+            result = detector.add_text(tweet_id, text, seconds=tweet_id)
+            joined += result is not None
+            if copied and expected != tweet_id:
+                found += result == expected
+                missed += result != expected
+            else:
+                self.assertIsNone(result)
+        self.assertGreater(found, 250)
+        self.assertLess(missed, found / 50.0)
+        # a missed copy may start a cluster of later copies of its own
+        clusters = detector.clusters()
+        self.assertLessEqual(set(first.values()), set(cluster["id"] for cluster in clusters))
+        self.assertEqual(sum(cluster["size"] for cluster in clusters), joined + len(clusters))
+        self.assertEqual(len(detector.clusters(min_size=1)), 1000 - joined)
+
+    def test_bounded_memory(self):
+        rng = random.Random(5)
+        text = self.random_text(rng)
+        detector = NearDuplicateDetector(window=100, max_entries=50)
+        self.assertIsNone(detector.add_text(1, text, seconds=0, user_id="a"))
+        self.assertEqual(detector.add_text(2, text + "!", seconds=50, user_id="b"), 1)
+        self.assertEqual(detector.clusters(), [{"id": 1, "size": 2, "users": 2,
+                                                "first": 0, "last": 50}])
+        # the first Tweet is forgotten, but its cluster lives on
+        self.assertEqual(detector.add_text(3, "pie", seconds=120), None)
+        self.assertEqual(detector.add_text(4, text, seconds=121), 1)
+        self.assertEqual(detector.clusters()[0]["size"], 3)
+        self.assertEqual(len(detector), 3)
+        # and then all of the cluster
+        self.assertIsNone(detector.add_text(5, text, seconds=500))
+        self.assertEqual(len(detector), 1)
+        for tweet_id in range(6, 200):
+            detector.add_text(tweet_id, self.random_text(rng), seconds=500)
+        self.assertEqual(len(detector), 50)
+        self.assertLessEqual(sum(len(bucket) for buckets in detector._buckets
+                                 for bucket in buckets.values()), 50 * detector.bands)
+        with self.assertRaises(ValueError):
+            NearDuplicateDetector(num_perm=100, bands=16)
+
+    def test_out_of_order_and_many_users(self):
+        rng = random.Random(6)
+        texts = [self.random_text(rng) for _ in range(3)]
+        detector = NearDuplicateDetector(window=100, max_users=10)
+        # a late Tweet doesn't keep the ones after it from expiring
+        detector.add_text(1, texts[0], seconds=200)
+        detector.add_text(2, texts[1], seconds=50)
+        detector.add_text(3, texts[2], seconds=210)
+        self.assertEqual(len(detector), 2)
+        self.assertIsNone(detector.add_text(4, texts[1], seconds=220))
+        self.assertEqual(len(detector), 3)
+        detector.add_text(5, "pie", seconds=305)
+        self.assertEqual(sorted(detector._entries), [3, 4, 5])
+        # a Tweet that is too old to keep is still matched
+        self.assertEqual(detector.add_text(6, texts[2], seconds=100), 3)
+        self.assertEqual(sorted(detector._entries), [3, 4, 5])
+        for tweet_id in range(7, 1007):
+            self.assertEqual(detector.add_text(tweet_id, texts[2], seconds=306,
+                                               user_id=str(tweet_id % 500)), 3)
+        cluster = [cluster for cluster in detector.clusters() if cluster["id"] == 3][0]
+        self.assertEqual(cluster["size"], 1002)
+        self.assertLess(abs(cluster["users"] - 500), 50)
+        self.assertNotIsInstance(detector._clusters[3][4], set)
+
+    def test_add_batch(self):
+        results = {}
+        for payload_format, payloads in self.payloads.items():
+            detector = NearDuplicateDetector(threshold=0.5, window="day")
+            results[payload_format] = detector.add_batch(payloads)
+            one_at_a_time = NearDuplicateDetector(threshold=0.5, window="day")
+            self.assertEqual([one_at_a_time.add(Tweet(payload)) for payload in payloads],
+                             results[payload_format])
+        self.assertEqual(results["original_format"], results["activity_streams"])
+        tweets = [Tweet(payload) for payload in self.payloads["original_format"]]
+        self.assertTrue(all(result is None
+                            for tweet, result in zip(tweets, results["original_format"])
+                            if tweet.tweet_type == "retweet"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import bisect
+import collections
+import json
+import os
+import pickle
+import random
+import sys
+from tweet_parser.tweet import Tweet
+from tweet_parser.aggregation.quantiles import KLLSketch, QuantileSketches
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools"))
+from generate_corpus import CorpusGenerator  # noqa: E402
+
+QS = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def max_rank_error(sketch, values):
+    ordered = sorted(values)
+    return max(abs(bisect.bisect_right(ordered, value) / float(len(ordered)) - q)
+               for q, value in zip(QS, sketch.quantiles(QS)))
+
+
+class TestKLLSketch(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.values = [int(rng.lognormvariate(6, 2)) for _ in range(100000)]
+
+    def test_accuracy_and_size(self):
+        for k in [50, 200]:
+            sketch = KLLSketch(k, seed=1)
+            for start in range(0, len(self.values), 1000):
+                sketch.add_many(self.values[start:start + 1000])
+            self.assertEqual(sketch.count, len(self.values))
+            self.assertEqual((sketch.min, sketch.max), (min(self.values), max(self.values)))
+            self.assertLess(max_rank_error(sketch, self.values), 3.0 / k)
+            self.assertLess(sum(len(compactor) for compactor in sketch.compactors), 4 * k)
+            self.assertAlmostEqual(sketch.rank(sketch.quantile(0.5)), 0.5, delta=3.0 / k)
+        # small streams are exact
+        small = KLLSketch(200)
+        small.add_many([5, 1, 4, 2, 3])
+        self.assertEqual(small.quantiles([0, 0.2, 0.5, 1]), [1, 1, 3, 5])
+        self.assertEqual(KLLSketch().quantile(0.5), None)
+        with self.assertRaises(ValueError):
+            KLLSketch(k=4)
+
+    def test_merge_and_serialization(self):
+        parts = [KLLSketch(100, seed=seed) for seed in range(8)]
+        for i, part in enumerate(parts):
+            part.add_many(self.values[i::8])
+        merged = KLLSketch(100)
+        for part in parts:
+            merged.merge(pickle.loads(pickle.dumps(part)))
+        self.assertEqual(merged.count, len(self.values))
+        self.assertLess(max_rank_error(merged, self.values), 3.0 / 100)
+        self.assertLess(sum(len(compactor) for compactor in merged.compactors), 400)
+        copy = KLLSketch.from_dict(json.loads(json.dumps(merged.to_dict())))
+        self.assertEqual(copy.quantiles(QS), merged.quantiles(QS))
+        copy.add_many(range(1000))
+        self.assertEqual(copy.count, len(self.values) + 1000)
+        with self.assertRaises(ValueError):
+            merged.merge(KLLSketch(200))
+
+
+class TestQuantileSketches(unittest.TestCase):
+
+    def setUp(self):
+        pairs = CorpusGenerator(seed=8, mix={"malformed": 0, "poll": 0},
+                                tweets_per_second=0.2).generate(1500, "both")
+        self.payloads = {"original_format": [], "activity_streams": []}
+        for pair in pairs:
+            for payload_format, payloads in self.payloads.items():
+                payloads.append(json.loads(pair[payload_format]))
+
+    def test_rows(self):
+        payloads = self.payloads["original_format"]
+        exact = collections.defaultdict(lambda: collections.defaultdict(list))
+        for payload in payloads:
+            tweet = Tweet(payload)
+            start = tweet.created_at_seconds - tweet.created_at_seconds % 3600
+            for tag in set(rule["tag"] or "" for rule in tweet.gnip_matching_rules or []) or [""]:
+                for field in ["follower_count", "following_count", "retweet_count"]:
+                    exact[(start, tag)][field].append(getattr(tweet, field))
+        sketches = QuantileSketches(bucket="hour", group_by="rule", k=100)
+        sketches.add_batch(payloads)
+        rows = sketches.rows()
+        self.assertEqual(len(rows), len(exact))
+        self.assertGreater(len(set(row["bucket"] for row in rows)), 1)
+        for row in rows:
+            fields = exact[(row["bucket"], row["group"])]
+            self.assertEqual(row["count"], len(fields["follower_count"]))
+            for field, values in fields.items():
+                ordered = sorted(values)
+                for percentile in [50, 90, 99]:
+                    rank = bisect.bisect_right(ordered, row["{}_p{}".format(field, percentile)])
+                    # within the rank error, allowing for ties
+                    low = bisect.bisect_left(ordered, row["{}_p{}".format(field, percentile)])
+                    target = percentile / 100.0 * len(ordered)
+                    self.assertTrue(low - 0.03 * len(ordered) - 1 <= target <=
+                                    rank + 0.03 * len(ordered) + 1, (row, field))
+        # the same values from activity streams, in batches or one Tweet at a
+        # time (with no compactions, so the quantiles are exact)
+        activity_streams = QuantileSketches(bucket="hour", group_by="rule", k=1000)
+        for start in range(0, 300, 100):
+            activity_streams.add_batch(self.payloads["activity_streams"][start:start + 100])
+        tweets = QuantileSketches(bucket="hour", group_by="rule", k=1000)
+        for payload in payloads[:300]:
+            tweets.add(Tweet(payload))
+        self.assertEqual(activity_streams.rows(), tweets.rows())
+
+    def test_merge_and_serialization(self):
+        payloads = self.payloads["activity_streams"]
+        whole = QuantileSketches(bucket="day", group_by=None, fields=["favorite_count"])
+        merged = QuantileSketches(bucket="day", group_by=None, fields=["favorite_count"])
+        for start in range(0, len(payloads), 500):
+            part = QuantileSketches(bucket="day", group_by=None, fields=["favorite_count"])
+            part.add_batch(payloads[start:start + 500])
+            merged.merge(pickle.loads(pickle.dumps(part)))
+            whole.add_batch(payloads[start:start + 500])
+        self.assertEqual([row["count"] for row in merged.rows()], [len(payloads)])
+        self.assertEqual(set(merged.rows()[0]),
+                         {"bucket", "time", "group", "count", "favorite_count_p50",
+                          "favorite_count_p90", "favorite_count_p99"})
+        copy = QuantileSketches.from_dict(json.loads(json.dumps(merged.to_dict())))
+        self.assertEqual(copy.rows(), merged.rows())
+        with self.assertRaises(ValueError):
+            merged.merge(QuantileSketches(bucket="day", group_by="lang", fields=["favorite_count"]))
+        with self.assertRaises(ValueError):
+            QuantileSketches(fields=["quote_count"])
+        with self.assertRaises(ValueError):
+            QuantileSketches(group_by="user")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from tweet_parser.readers import iter_lines, split_byte_ranges, iter_byte_range
+from tweet_parser.readers import iter_time_range, peek_tweet_id
+from tweet_parser.tweet import Tweet
+from tweet_parser.checkpoint import Checkpoint
+
+EXAMPLES = "tweet_payload_examples/original_format_examples.json"
+
+
+class TestReaders(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        with open(EXAMPLES, "rb") as f:
+            self.lines = f.readlines()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_plain_offsets_resume(self):
+        read = list(iter_lines(EXAMPLES))
+        self.assertEqual([line for line, _ in read], self.lines)
+        self.assertEqual(read[-1][1], os.path.getsize(EXAMPLES))
+        offset = read[9][1]
+        self.assertEqual([line for line, _ in iter_lines(EXAMPLES, start_offset=offset)],
+                         self.lines[10:])
+
+    def test_gzip_member_boundaries(self):
+        path = os.path.join(self.tmp_dir, "multi.json.gz")
+        # three gzip members, 5 + 10 + 10 lines
+        for chunk in [self.lines[:5], self.lines[5:15], self.lines[15:]]:
+            with open(path, "ab") as f:
+                f.write(gzip.compress(b"".join(chunk)))
+        read = list(iter_lines(path, compressed=True))
+        self.assertEqual([line for line, _ in read], self.lines)
+        boundaries = [(i, offset) for i, (_, offset) in enumerate(read) if offset is not None]
+        self.assertEqual([i for i, _ in boundaries], [4, 14, 24])
+        self.assertEqual(boundaries[-1][1], os.path.getsize(path))
+        resumed = [line for line, _ in iter_lines(path, compressed=True,
+                                                  start_offset=boundaries[0][1])]
+        self.assertEqual(resumed, self.lines[5:])
+        # a cut off last member is an error, after the lines before it
+        with open(path, "ab") as f:
+            f.write(gzip.compress(b"".join(self.lines[:5]))[:-30])
+        read = []
+        with self.assertRaises(EOFError):
+            for line, offset in iter_lines(path, compressed=True, start_offset=boundaries[1][1]):
+                read.append((line, offset))
+        self.assertEqual([line for line, _ in read[:10]], self.lines[15:])
+        self.assertEqual([offset for _, offset in read[10:]], [None] * (len(read) - 10))
+
+    def test_byte_ranges(self):
+        for n_ranges in [1, 2, 3, 7, 25, 100]:
+            ranges = split_byte_ranges(EXAMPLES, n_ranges)
+            self.assertLessEqual(len(ranges), min(n_ranges, len(self.lines)))
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], os.path.getsize(EXAMPLES))
+            lines = []
+            for (start, end), (next_start, _) in zip(ranges, ranges[1:] + [(None, None)]):
+                if next_start is not None:
+                    self.assertEqual(end, next_start)
+                lines.extend(line for line, _ in iter_byte_range(EXAMPLES, start, end))
+            self.assertEqual(lines, self.lines)
+        # split from a resumed position
+        offset = list(iter_lines(EXAMPLES))[4][1]
+        ranges = split_byte_ranges(EXAMPLES, 4, start_offset=offset)
+        self.assertEqual(ranges[0][0], offset)
+        lines = [line for start, end in ranges
+                 for line, _ in iter_lines(EXAMPLES, start_offset=start, end_offset=end)]
+        self.assertEqual(lines, self.lines[5:])
+
+    def test_byte_ranges_of_tiny_files(self):
+        path = os.path.join(self.tmp_dir, "tiny.json")
+        for content, expected in [(b"", []), (b"{}\n", [(0, 3)]),
+                                  (b"{}\n[]\n", [(0, 3), (3, 6)])]:
+            with open(path, "wb") as f:
+                f.write(content)
+            for n_ranges in [2, 8, 100]:
+                self.assertEqual(split_byte_ranges(path, n_ranges), expected)
+
+    def test_peek_tweet_id(self):
+        for line in self.lines:
+            self.assertEqual(str(peek_tweet_id(line)), Tweet(json.loads(line)).id)
+
+    def test_time_range(self):
+        # the examples are newest first
+        path = os.path.join(self.tmp_dir, "sorted.json")
+        times = [Tweet(json.loads(line)).created_at_seconds for line in self.lines]
+        for lines, times in [(self.lines, times), (self.lines[::-1], times[::-1])]:
+            with open(path, "wb") as f:
+                f.writelines(lines[:12] + [b"\n"] + lines[12:])
+            for start, end in [(0, 1), (0, 2 ** 40), (min(times), max(times)),
+                               (sorted(times)[3], sorted(times)[17]), (times[5], times[5] + 1)]:
+                expected = [line for line, t in zip(lines, times) if start <= t < end]
+                found = [line for line, _ in iter_time_range(path, start, end)]
+                self.assertEqual(found, expected)
+
+    def test_checkpoint_round_trip(self):
+        path = os.path.join(self.tmp_dir, "run.checkpoint")
+        self.assertIsNone(Checkpoint.load(path))
+        Checkpoint(EXAMPLES, offset=10, output_offset=20, lines=2).save(path)
+        Checkpoint(EXAMPLES, offset=30, output_offset=40, lines=4).save(path)
+        saved = Checkpoint.load(path)
+        self.assertEqual(saved.to_dict(), {"file": EXAMPLES, "offset": 30,
+                                           "output_offset": 40, "lines": 4})
+        self.assertEqual(os.listdir(self.tmp_dir), ["run.checkpoint"])
+
+
+if __name__ == '__main__':
+    unittest.main()
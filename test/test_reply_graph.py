@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import json
+import os
+import pickle
+import random
+import shutil
+import sys
+import tempfile
+from tweet_parser.tweet import Tweet
+from tweet_parser.aggregation import reply_graph
+from tweet_parser.aggregation.reply_graph import ReplyGraph
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools"))
+from generate_corpus import CorpusGenerator  # noqa: E402
+
+
+class TestReplyGraph(unittest.TestCase):
+
+    def setUp(self):
+        pairs = CorpusGenerator(seed=7, mix={"malformed": 0, "poll": 0, "reply": 0.4}
+                                ).generate(1500, "both")
+        self.payloads = {"original_format": [], "activity_streams": []}
+        for pair in pairs:
+            for payload_format, payloads in self.payloads.items():
+                payloads.append(json.loads(pair[payload_format]))
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def exact_threads(self):
+        parents = {}
+        for payload in self.payloads["original_format"]:
+            tweet = Tweet(payload)
+            parents[int(tweet.id)] = tweet.in_reply_to_status_id and int(tweet.in_reply_to_status_id)
+        roots, depths = {}, {}
+        for status_id in parents:
+            node, depth = status_id, 0
+            while parents.get(node):
+                node, depth = parents[node], depth + 1
+            roots[status_id], depths[status_id] = node, depth
+        return parents, roots, depths
+
+    def test_threads_match_tweet_attributes(self):
+        parents, roots, depths = self.exact_threads()
+        graph = ReplyGraph()
+        for start in range(0, 1500, 400):
+            graph.add_batch(self.payloads["original_format"][start:start + 400])
+            # queries in between appends see every row so far
+            self.assertGreaterEqual(graph.thread_size(graph.status_ids[0]), 1)
+        self.assertEqual(len(graph), 1500)
+        self.assertGreater(max(depths.values()), 2)
+        sizes, max_depths = {}, {}
+        for status_id, root in roots.items():
+            sizes[root] = sizes.get(root, 0) + 1
+            max_depths[root] = max(max_depths.get(root, 0), depths[status_id])
+        for status_id in parents:
+            self.assertEqual(graph.root(status_id), roots[status_id])
+            self.assertEqual(graph.depth(status_id), depths[status_id])
+            self.assertEqual(graph.thread_size(status_id), sizes[roots[status_id]])
+            self.assertEqual(graph.thread_depth(str(status_id)), max_depths[roots[status_id]])
+            self.assertEqual(graph.replies(status_id),
+                             sorted(reply for reply, parent in parents.items()
+                                    if parent == status_id))
+        self.assertEqual([(root, size) for root, size, _ in graph.threads(min_size=2)],
+                         sorted((root, size) for root, size in sizes.items() if size >= 2))
+        with self.assertRaises(KeyError):
+            graph.root(1)
+        # the same graph from activity streams, and from Tweets
+        activity_streams = ReplyGraph()
+        activity_streams.add_batch(self.payloads["activity_streams"])
+        self.assertEqual(activity_streams.__getstate__(), graph.__getstate__())
+        tweets = ReplyGraph()
+        for payload in self.payloads["activity_streams"][:100]:
+            tweets.add(Tweet(payload))
+        self.assertEqual(list(tweets.in_reply_to_status_ids),
+                         list(graph.in_reply_to_status_ids[:100]))
+
+    def test_csr(self):
+        graph = ReplyGraph()
+        graph.add_batch(self.payloads["original_format"])
+        node_ids, indptr, indices = graph.csr()
+        self.assertEqual(list(node_ids), sorted(node_ids))
+        self.assertEqual(len(indptr), len(node_ids) + 1)
+        self.assertEqual(len(indices), sum(parent >= 0 for parent in graph.in_reply_to_status_ids))
+        for node, status_id in enumerate(node_ids):
+            self.assertEqual([node_ids[reply] for reply in indices[indptr[node]:indptr[node + 1]]],
+                             graph.replies(status_id))
+
+    def test_out_of_order_and_missing_parents(self):
+        graph = ReplyGraph()
+        graph.append(50, in_reply_to_status_id=60)
+        graph.append(60, in_reply_to_status_id=10, user_id="3")
+        graph.append(70, in_reply_to_status_id=50)
+        self.assertEqual([graph.root(status_id) for status_id in [10, 50, 60, 70]], [10] * 4)
+        self.assertEqual([graph.depth(status_id) for status_id in [10, 50, 60, 70]], [0, 2, 1, 3])
+        self.assertEqual(list(graph.threads()), [(10, 4, 3)])
+        self.assertEqual(list(graph.user_ids), [-1, 3, -1])
+        # a row that gives an indexed Tweet its parent, with no new ids
+        graph = ReplyGraph()
+        graph.append(10)
+        graph.append(50, in_reply_to_status_id=60)
+        self.assertEqual(graph.root(50), 60)
+        graph.append(60, in_reply_to_status_id=10)
+        self.assertEqual((graph.root(50), graph.depth(50), graph.thread_size(10)), (10, 2, 3))
+
+    def test_incremental_index(self):
+        payloads = self.payloads["original_format"]
+        whole = ReplyGraph()
+        whole.add_batch(payloads)
+        old_chunk = reply_graph._SORT_CHUNK
+        try:
+            # sort and merge the new ids in several chunks too
+            reply_graph._SORT_CHUNK = 100
+            rows = sorted(zip(whole.status_ids, whole.in_reply_to_status_ids))
+            graph = ReplyGraph()
+            for status_id, parent_id in rows:
+                graph.append(status_id, parent_id if parent_id >= 0 else None)
+                if len(graph) == 700:
+                    node_ids = graph.csr()[0]
+            # later ids only add nodes
+            self.assertIs(graph.csr()[0], node_ids)
+            self.assertEqual(list(graph.threads()), list(whole.threads()))
+            # earlier ids, replies to earlier Tweets and repeats are merged in
+            random.Random(8).shuffle(rows)
+            graph = ReplyGraph()
+            for start in range(0, len(rows), 300):
+                for status_id, parent_id in rows[start:start + 300] + rows[:20]:
+                    graph.append(status_id, parent_id if parent_id >= 0 else None)
+                self.assertGreaterEqual(graph.thread_size(status_id), 1)
+        finally:
+            reply_graph._SORT_CHUNK = old_chunk
+        self.assertEqual(list(graph.threads()), list(whole.threads()))
+        self.assertEqual(graph.csr(), whole.csr())
+        for status_id in whole.status_ids:
+            self.assertEqual((graph.root(status_id), graph.depth(status_id)),
+                             (whole.root(status_id), whole.depth(status_id)))
+
+    def test_merge_and_serialization(self):
+        payloads = self.payloads["original_format"]
+        whole = ReplyGraph()
+        whole.add_batch(payloads)
+        merged = ReplyGraph()
+        for start in range(0, len(payloads), 500):
+            part = ReplyGraph()
+            part.add_batch(payloads[start:start + 500])
+            merged.merge(pickle.loads(pickle.dumps(part)))
+        self.assertEqual(list(merged.threads()), list(whole.threads()))
+        path = os.path.join(self.tmpdir, "replies.graph")
+        whole.save(path)
+        loaded = ReplyGraph.load(path)
+        self.assertEqual(loaded.__getstate__(), whole.__getstate__())
+        self.assertEqual(list(loaded.threads()), list(whole.threads()))
+        self.assertFalse(os.path.exists(path + ".tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
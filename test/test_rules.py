@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import json
+import os
+import random
+import re
+import sys
+from tweet_parser.tweet import Tweet
+from tweet_parser.matching.aho_corasick import Automaton
+from tweet_parser.matching.rules import RuleSet, parse_rule
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools"))
+from generate_corpus import CorpusGenerator  # noqa: E402
+
+
+def term_matches(term, tweet):
+    kind, argument = term
+    if kind == "text":
+        return re.search(r"(?<!\w)" + re.escape(argument) + r"(?!\w)",
+                         tweet.all_text.lower(), re.UNICODE) is not None
+    if kind == "hashtag":
+        return argument in [hashtag.lower() for hashtag in tweet.hashtags]
+    if kind == "mention":
+        return argument in [mention["screen_name"].lower() for mention in tweet.user_mentions]
+    if kind == "from":
+        return argument in [tweet.user_id, tweet.screen_name.lower()]
+    if kind == "lang":
+        return tweet.lang == argument
+    return {"has:links": bool(tweet.tweet_links),
+            "has:media": bool(tweet.media_urls),
+            "has:hashtags": bool(tweet.hashtags),
+            "has:mentions": bool(tweet.user_mentions),
+            "is:retweet": tweet.tweet_type == "retweet",
+            "is:quote": tweet.tweet_type == "quote",
+            "is:reply": tweet.in_reply_to_status_id is not None}[argument]
+
+
+def tree_matches(tree, terms):
+    # terms: whether each term matches the Tweet
+    if tree[0] == "and":
+        return all(tree_matches(child, terms) for child in tree[1])
+    if tree[0] == "or":
+        return any(tree_matches(child, terms) for child in tree[1])
+    if tree[0] == "not":
+        return not terms[tree[1]]
+    return terms[tree]
+
+
+def tree_terms(tree):
+    if tree[0] in ["and", "or"]:
+        return [term for child in tree[1] for term in tree_terms(child)]
+    return [tree[1]] if tree[0] == "not" else [tree]
+
+
+class TestAutomaton(unittest.TestCase):
+
+    def test_matches_every_occurrence(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            patterns = set("".join(rng.choice("abc") for _ in range(rng.randint(1, 4)))
+                           for _ in range(rng.randint(1, 10)))
+            text = "".join(rng.choice("abc") for _ in range(40))
+            automaton = Automaton()
+            for pattern in patterns:
+                automaton.add(pattern)
+                # searching between adds rebuilds the links
+                list(automaton.iter_matches(text[:10]))
+            expected = sorted((match.start(), match.start() + len(pattern), pattern)
+                              for pattern in patterns
+                              for match in re.finditer("(?={})".format(pattern), text))
+            self.assertEqual(sorted(automaton.iter_matches(text)), expected)
+        with self.assertRaises(ValueError):
+            automaton.add("")
+
+
+class TestRuleSet(unittest.TestCase):
+
+    def test_parse(self):
+        self.assertEqual(parse_rule("a b OR c"),
+                         ("or", [("and", [("text", "a"), ("text", "b")]), ("text", "c")]))
+        self.assertEqual(parse_rule("a (b OR c)"),
+                         ("and", [("text", "a"), ("or", [("text", "b"), ("text", "c")])]))
+        self.assertEqual(parse_rule('-"Big Apple" #NYC @Fiona from:@Shrek lang:en is:retweet'),
+                         ("and", [("not", ("text", "big apple")), ("hashtag", "nyc"),
+                                  ("mention", "fiona"), ("from", "shrek"), ("lang", "en"),
+                                  ("flag", "is:retweet")]))
+        self.assertEqual(parse_rule("-(a -b)"), ("or", [("not", ("text", "a")), ("text", "b")]))
+        self.assertEqual(parse_rule("is has"), ("and", [("text", "is"), ("text", "has")]))
+        for value in ["", "(a", "a)", "a OR", "has:cats", '""']:
+            with self.assertRaises(ValueError):
+                parse_rule(value)
+        for value in ["-a", "a OR -b", "-(a b)"]:
+            with self.assertRaises(ValueError):
+                RuleSet([value])
+
+    def test_word_boundaries(self):
+        rules = RuleSet(["apple", '"pie crust"', "c++", "#pie", "@fiona"])
+        payload = {"created_at": "Wed May 24 20:17:19 +0000 2017", "truncated": False,
+                   "user": {"id_str": "1", "screen_name": "shrek"},
+                   "entities": {"hashtags": [], "user_mentions": []}}
+        for text, values in [("Apples and pineapple", []),
+                             ("APPLE, pie crusts", ["apple"]),
+                             ("apple_pie crust", []),
+                             ("apple-pie crust", ["apple", '"pie crust"']),
+                             ("c++11 #pie", ["c++", "#pie"])]:
+            payload["text"] = text
+            payload["entities"]["hashtags"] = [{"text": "Pie"}] if "#" in text else []
+            self.assertEqual([rule["value"] for rule in rules.match(payload)], values)
+
+
+class TestRuleSetOnCorpus(unittest.TestCase):
+
+    def setUp(self):
+        generator = CorpusGenerator(seed=9, mix={"malformed": 0, "poll": 0})
+        pairs = generator.generate(400, "both")
+        self.payloads = {"original_format": [], "activity_streams": []}
+        for pair in pairs:
+            for payload_format, payloads in self.payloads.items():
+                payloads.append(json.loads(pair[payload_format]))
+        tweets = [Tweet(payload) for payload in self.payloads["original_format"]]
+        rng = random.Random(1)
+        terms = (generator.words[:300] + ["#" + hashtag for hashtag in generator.hashtags[:50]] +
+                 ["@" + tweet.screen_name for tweet in tweets[:20]] +
+                 ["from:" + tweet.screen_name for tweet in tweets[:20]] +
+                 ["from:" + tweet.user_id for tweet in tweets[20:30]] +
+                 ['"{} {}"'.format(*tweet.all_text.split()[2:4]) for tweet in tweets[:30]] +
+                 ["lang:en", "lang:es", "has:links", "has:media", "has:hashtags",
+                  "has:mentions", "is:retweet", "is:quote", "is:reply"])
+
+        def rule():
+            clauses = []
+            for _ in range(rng.randint(1, 3)):
+                clause = " ".join(rng.choice(["", "", "-"]) + rng.choice(terms)
+                                  for _ in range(rng.randint(1, 3)))
+                clauses.append("({})".format(clause) if rng.random() < 0.3 else clause)
+            return " OR ".join(clauses)
+
+        self.rules = []
+        while len(self.rules) < 500:
+            value = rule()
+            try:
+                RuleSet([value])
+            except ValueError:
+                continue
+            self.rules.append({"value": value, "tag": "rule{}".format(len(self.rules))})
+        self.tweets = tweets
+
+    def test_matches_like_a_rule_at_a_time(self):
+        rules = RuleSet(self.rules)
+        self.assertEqual(len(rules), 500)
+        matches = rules.match_batch(self.payloads["original_format"])
+        trees = [parse_rule(rule["value"]) for rule in self.rules]
+        terms = set(term for tree in trees for term in tree_terms(tree))
+        for tweet, tweet_matches in zip(self.tweets, matches):
+            tweet_terms = dict((term, term_matches(term, tweet)) for term in terms)
+            self.assertEqual(tweet_matches, [rule for rule, tree in zip(self.rules, trees)
+                                             if tree_matches(tree, tweet_terms)])
+        self.assertGreater(sum(map(len, matches)), len(self.tweets))
+        # the same matches from activity streams, and from Tweets
+        self.assertEqual(rules.match_batch(self.payloads["activity_streams"]), matches)
+        for payload, tweet_matches in zip(self.payloads["activity_streams"][:50], matches):
+            self.assertEqual(rules.match(Tweet(payload)), tweet_matches)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import io
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+from tweet_parser.tweet import Tweet
+from tweet_parser.matching.terms import TermMatcher
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools"))
+from generate_corpus import CorpusGenerator  # noqa: E402
+
+
+def term_pattern(term, whole_words=True, match_entities=True):
+    start, end = "", ""
+    if whole_words:
+        if term[0] in "#@":
+            start = r"(?<![\w#@])"
+        elif re.match(r"\w", term[0], re.UNICODE):
+            start = r"(?<!\w)"
+        if re.match(r"\w", term[-1], re.UNICODE):
+            end = r"(?!\w)"
+    if not match_entities and term[0] not in "#@":
+        start += r"(?<![#@])"
+    return re.compile(start + re.escape(term.lower()) + end, re.UNICODE)
+
+
+class TestTermMatcher(unittest.TestCase):
+
+    def setUp(self):
+        generator = CorpusGenerator(seed=10, mix={"malformed": 0, "poll": 0})
+        pairs = generator.generate(400, "both")
+        self.payloads = {"original_format": [], "activity_streams": []}
+        for pair in pairs:
+            for payload_format, payloads in self.payloads.items():
+                payloads.append(json.loads(pair[payload_format]))
+        self.texts = [Tweet(payload).all_text for payload in self.payloads["original_format"]]
+        rng = random.Random(2)
+        words = sorted(set(word for text in self.texts for word in text.split()))
+        self.terms = ([word.upper() if rng.random() < 0.2 else word
+                       for word in rng.sample(words, 300)] +
+                      [word.lstrip("#@")[:4] for word in rng.sample(words, 50)] +
+                      ["{} {}".format(*text.split()[3:5]) for text in self.texts[:30]] +
+                      ["#" + word.lstrip("#@") for word in rng.sample(words, 30)])
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_matches_like_a_term_at_a_time(self):
+        for options in [{}, {"whole_words": False}, {"match_entities": False}]:
+            matcher = TermMatcher(self.terms, **options)
+            patterns = [term_pattern(term, **options) for term in self.terms]
+            found = 0
+            for text in self.texts:
+                expected = [term for term, pattern in zip(self.terms, patterns)
+                            if pattern.search(text.lower())]
+                self.assertEqual(matcher.matches(text), expected)
+                found += len(expected)
+            self.assertGreater(found, len(self.texts))
+        # the same matches from activity streams, and from Tweets
+        matcher = TermMatcher(self.terms)
+        matches = matcher.match_batch(self.payloads["original_format"])
+        self.assertEqual(matches, [matcher.matches(text) for text in self.texts])
+        self.assertEqual(matcher.match_batch(self.payloads["activity_streams"]), matches)
+        for payload, expected in zip(self.payloads["activity_streams"][:50], matches):
+            self.assertEqual(matcher.match(Tweet(payload)), expected)
+
+    def test_options(self):
+        text = u"Straße C++ c#, mail@fiona.com #Pie @Fiona pineapple_pie"
+        self.assertEqual(TermMatcher([u"STRASSE", "c++", "c#", "fiona", "@fiona", "#pie", "pie",
+                                      "apple"]).matches(text),
+                         [u"STRASSE", "c++", "c#", "fiona", "@fiona", "#pie", "pie"])
+        self.assertEqual(TermMatcher(["fiona", "pie", "c"], match_entities=False).matches(text),
+                         ["c"])
+        self.assertEqual(TermMatcher(["pie", "Pie", "apple"], case_sensitive=True,
+                                     whole_words=False).matches(text), ["pie", "Pie", "apple"])
+        self.assertEqual(TermMatcher(["apple"]).matches(""), [])
+        with self.assertRaises(ValueError):
+            TermMatcher(["apple", ""])
+
+    def test_from_file(self):
+        path = os.path.join(self.tmpdir, "terms.txt")
+        with io.open(path, "w", encoding="utf-8") as f:
+            f.write(u"apple\n\n  #pie \nStraße\n")
+        matcher = TermMatcher.from_file(path, case_sensitive=True)
+        self.assertEqual(matcher.terms, [u"apple", u"#pie", u"Straße"])
+        self.assertTrue(matcher.case_sensitive)
+
+
+if __name__ == "__main__":
+    unittest.main()
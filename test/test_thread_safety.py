@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+import unittest
+import copy
+import json
+import pickle
+import sys
+import threading
+import time
+import warnings
+from tweet_parser.tweet import Tweet
+from tweet_parser.deprecator import FieldDeprecationWarning
+from tweet_parser.thread_pool import ThreadPoolParser, parse_lines
+from tweet_parser import lazy_property
+
+ATTRIBUTES = sorted(name for name, value in vars(Tweet).items()
+                    if isinstance(value, property) and not name.startswith("_"))
+THREADS = 8
+
+
+def read_attributes(tweet):
+    values = {}
+    for attribute in ATTRIBUTES:
+        try:
+            values[attribute] = getattr(tweet, attribute)
+        except Exception as error:
+            values[attribute] = type(error).__name__
+    return values
+
+
+def run_threads(target, n):
+    """
+    Start `n` threads running `target(i)` at the same moment and wait
+    for all of them
+    """
+    start = threading.Event()
+    errors = []
+
+    def run(i):
+        try:
+            start.wait()
+            target(i)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    start.set()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+class Slow(object):
+    """
+    An object with a lazy property slow enough for threads to race on
+    """
+    def __init__(self):
+        self.calls = 0
+
+    @lazy_property.lazy_property
+    def value(self):
+        self.calls += 1
+        time.sleep(0.01)
+        return object()
+
+
+class TestLazyPropertyThreads(unittest.TestCase):
+
+    def tearDown(self):
+        lazy_property.disable_thread_safety()
+
+    def read_value(self):
+        slow = Slow()
+        values = [None] * THREADS
+
+        def read(i):
+            values[i] = slow.value
+
+        run_threads(read, THREADS)
+        return slow, values
+
+    def test_same_value(self):
+        slow, values = self.read_value()
+        # several threads computed the value, but all of them got the one stored
+        self.assertGreater(slow.calls, 1)
+        self.assertTrue(all(value is slow.value for value in values))
+
+    def test_computed_once(self):
+        lazy_property.enable_thread_safety([Slow])
+        self.assertTrue(lazy_property.thread_safety_enabled())
+        slow, values = self.read_value()
+        self.assertEqual(slow.calls, 1)
+        self.assertTrue(all(value is slow.value for value in values))
+        lazy_property.disable_thread_safety()
+        self.assertFalse(lazy_property.thread_safety_enabled())
+        self.assertGreater(self.read_value()[0].calls, 1)
+
+
+class TestSharedTweets(unittest.TestCase):
+
+    def setUp(self):
+        self.lines = []
+        for filename in ["original_format_examples.json", "activity_streams_examples.json"]:
+            with open("tweet_payload_examples/" + filename, "rb") as f:
+                self.lines += [line.rstrip(b"\n") for line in f]
+        self.payloads = [json.loads(line.decode("utf-8")) for line in self.lines]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FieldDeprecationWarning)
+            self.expected = [read_attributes(Tweet(copy.deepcopy(payload)))
+                             for payload in self.payloads]
+        # switch threads as often as possible, to make races likely
+        if hasattr(sys, "setswitchinterval"):
+            self.switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+        lazy_property.reset_profiling()
+
+    def tearDown(self):
+        if hasattr(sys, "setswitchinterval"):
+            sys.setswitchinterval(self.switch_interval)
+        lazy_property.disable_thread_safety()
+        lazy_property.disable_profiling()
+        lazy_property.reset_profiling()
+
+    def read_shared(self, rounds=3):
+        """
+        Read every attribute of shared Tweets from several threads at once
+        """
+        for _ in range(rounds):
+            tweets = [Tweet(payload) for payload in self.payloads]
+            results = [None] * THREADS
+
+            def read(i):
+                # each thread starts at a different Tweet
+                order = list(range(len(tweets)))
+                order = order[i:] + order[:i]
+                values = [None] * len(tweets)
+                for n in order:
+                    values[n] = read_attributes(tweets[n])
+                results[i] = values
+
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", FieldDeprecationWarning)
+                run_threads(read, THREADS)
+            for values in results:
+                self.assertEqual(values, self.expected)
+                # every thread got the same (cached) objects
+                for n, tweet_values in enumerate(values):
+                    for attribute, value in tweet_values.items():
+                        if isinstance(value, (list, dict)):
+                            self.assertIs(value, results[0][n][attribute])
+        return tweets
+
+    def test_shared_reads(self):
+        payloads = copy.deepcopy(self.payloads)
+        self.read_shared()
+        # reading attributes never changes the payload
+        self.assertEqual(self.payloads, payloads)
+
+    def test_thread_safety_computes_once(self):
+        plain = vars(Tweet)["id"]
+        lazy_property.enable_thread_safety()
+        lazy_property.enable_profiling()
+        self.assertTrue(lazy_property.thread_safety_enabled())
+        tweets = self.read_shared(rounds=2)
+        stats = lazy_property.profiling_snapshot()
+        # each attribute of each Tweet was computed exactly once
+        self.assertEqual(stats["id"]["calls"], 2 * len(tweets))
+        self.assertEqual(stats["all_text"]["calls"], 2 * len(tweets))
+        lazy_property.disable_profiling()
+        self.assertTrue(lazy_property.thread_safety_enabled())
+        self.read_shared(rounds=1)
+        lazy_property.disable_thread_safety()
+        self.assertIs(vars(Tweet)["id"], plain)
+        # the locks aren't pickled
+        tweet = pickle.loads(pickle.dumps(tweets[0]))
+        self.assertEqual(tweet, tweets[0])
+        self.assertEqual(tweet.all_text, tweets[0].all_text)
+        self.assertNotIn(lazy_property.LOCK_ATTRIBUTE, vars(tweet))
+
+    def test_thread_pool_parser(self):
+        lines = self.lines * 10 + [b"", b"{not json", b'{"info": "not a Tweet"}', b"null", b"1"]
+        attributes = ["id", "screen_name", "hashtags", "most_unrolled_urls", "poll_options"]
+        expected, counts = parse_lines(lines, attributes)
+        with ThreadPoolParser(max_workers=4, batch_size=7, max_pending=3,
+                              attributes=attributes) as parser:
+            self.assertEqual(list(parser.parse(lines)), expected)
+        self.assertEqual(parser.metrics.counts(), counts)
+        self.assertEqual(parser.metrics.tweets, len(self.lines) * 10)
+        self.assertEqual(parser.metrics.bad_json, 1)
+        self.assertEqual(parser.metrics.non_tweets, 3)
+
+        with ThreadPoolParser(max_workers=2, batch_size=5) as parser:
+            tweets = list(parser.parse(line.decode("utf-8") for line in self.lines))
+        self.assertEqual([tweet.id for tweet in tweets],
+                         [Tweet(payload).id for payload in self.payloads])
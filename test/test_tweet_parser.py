@@ -3,6 +3,7 @@
 # Licensed under the MIT License
 # https://opensource.org/licenses/MIT
 import unittest
+import copy
 import fileinput
 import json
 import warnings
@@ -10,6 +11,9 @@ from tweet_parser.tweet import Tweet
 from tweet_parser import tweet_checking
 from tweet_parser.tweet_parser_errors import NotATweetError, NotAvailableError, UnexpectedFormatError
 from tweet_parser.deprecator import FieldDeprecationWarning
+from tweet_parser.getter_methods import (gnip_fields, tweet_counts, tweet_embeds,
+                                         tweet_entities, tweet_generator, tweet_geo,
+                                         tweet_links, tweet_reply, tweet_text, tweet_user)
 
 def make_a_string(data):
     if type(data) == str:
@@ -64,6 +68,37 @@ class TestTweetMethods(unittest.TestCase):
                     if attr not in ["poll_options","in_reply_to_user_id","quote_count"]:  # will raise an error in activity streams
                         self.assertEqual(orig, acti)
 
+    def test_getters_on_dicts(self):
+        getter_modules = [tweet_counts, tweet_embeds, tweet_entities, tweet_generator,
+                          tweet_geo, tweet_links, tweet_reply, tweet_text, tweet_user,
+                          gnip_fields]
+        getters = [getattr(module, name) for module in getter_modules
+                   for name in sorted(vars(module)) if name.startswith("get_")]
+        # Tweet attributes and the getters that they cache
+        properties = {"tweet_links": tweet_links.get_tweet_links,
+                      "all_text": tweet_text.get_all_text,
+                      "user_entered_text": tweet_text.get_user_entered_text,
+                      "embedded_tweet": tweet_embeds.get_embedded_tweet}
+        for payload_format in ["original_format", "activity_streams"]:
+            for tweet in self.tweet_payloads[payload_format].values():
+                payload = copy.deepcopy(dict(tweet))
+                for getter in getters:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore", FieldDeprecationWarning)
+                        try:
+                            expected = getter(tweet)
+                        except NotAvailableError:
+                            with self.assertRaises(NotAvailableError):
+                                getter(payload, original_format=tweet.original_format)
+                            continue
+                        self.assertEqual(getter(payload), expected)
+                        self.assertEqual(getter(payload, original_format=tweet.original_format),
+                                         expected)
+                for attribute, getter in properties.items():
+                    self.assertEqual(getattr(tweet, attribute), getter(payload))
+                # getters don't change the payload
+                self.assertEqual(payload, dict(tweet))
+
     def test_bad_payloads(self):
         # missing the user field, raises a "NotATweetError"
         with self.assertRaises(NotATweetError):
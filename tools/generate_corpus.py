@@ -0,0 +1,628 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+
+#!/usr/bin/env python
+"""Generate large synthetic corpora of Tweet payloads for load and scaling tests.
+
+Payloads are built from the example Tweets in test/tweet_payload_examples,
+which serve as templates for each kind of Tweet (original Tweets, Retweets
+and quote Tweets) in both original format and activity-streams format.
+Each generated Tweet is first described independently of its format
+(its id, author, text, entities, enrichments, ...) and then written in the
+requested format(s), so a corpus generated in both formats with the same
+seed contains the same Tweets in each file.
+
+Tweet ids are snowflake ids that increase monotonically from --start_time,
+and everything is drawn from a seeded random number generator, so the same
+arguments always produce exactly the same corpus.
+
+Example:
+    python tools/generate_corpus.py -n 1000000 --format both -o corpus --seed 7
+"""
+import argparse
+import bisect
+import datetime
+import errno
+import gzip
+import json
+import os
+import random
+import sys
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, "test", "tweet_payload_examples")
+EXAMPLE_FILES = {"original_format": "original_format_examples.json",
+                 "activity_streams": "activity_streams_examples.json"}
+FORMATS = sorted(EXAMPLE_FILES)
+TWITTER_EPOCH_MS = 1288834974657
+
+DEFAULT_MIX = {"retweet": 0.3,
+               "quote": 0.1,
+               "reply": 0.1,
+               "extended": 0.2,
+               "poll": 0.01,
+               "media": 0.15,
+               "link": 0.3,
+               "url_enrichment": 0.8,
+               "matching_rules": 0.9,
+               "malformed": 0.001}
+
+LANGS = [("en", 0.6), ("es", 0.1), ("ja", 0.1), ("pt", 0.06), ("ar", 0.05),
+         ("fr", 0.04), ("und", 0.05)]
+MALFORMED_KINDS = ["truncated", "not_a_tweet", "blank", "missing_user"]
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "shi", "pa", "den",
+             "gor", "bel", "tri", "sun", "mar", "qui", "zo", "fen", "lux", "ost"]
+
+
+def snowflake_to_ms(tweet_id):
+    return (tweet_id >> 22) + TWITTER_EPOCH_MS
+
+
+def original_format_time(ms):
+    when = datetime.datetime.utcfromtimestamp(ms // 1000)
+    return when.strftime("%a %b %d %H:%M:%S +0000 %Y")
+
+
+def activity_streams_time(ms):
+    when = datetime.datetime.utcfromtimestamp(ms // 1000)
+    return when.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class ZipfSampler(object):
+    """
+    Draw ranks 0..n-1 with probability proportional to 1 / (rank + 1) ** exponent,
+    so that a few users, hashtags and domains are very common (like real data)
+    """
+    def __init__(self, n, exponent=1.1):
+        self.cumulative = []
+        total = 0.0
+        for rank in range(n):
+            total += 1.0 / (rank + 1) ** exponent
+            self.cumulative.append(total)
+
+    def sample(self, rng):
+        return bisect.bisect(self.cumulative, rng.random() * self.cumulative[-1])
+
+
+class Templates(object):
+    """
+    The example payloads, grouped by kind of Tweet, as JSON strings
+    (parsing a template is a cheap deep copy)
+    """
+    def __init__(self, examples_dir=EXAMPLES_DIR):
+        lines = {}
+        for payload_format, filename in EXAMPLE_FILES.items():
+            with open(os.path.join(examples_dir, filename), "r") as f:
+                lines[payload_format] = [line.strip() for line in f if line.strip()]
+        originals = [json.loads(line) for line in lines["original_format"]]
+        self.by_kind = {"tweet": [], "retweet": [], "quote": []}
+        self.with_media = []
+        for i, payload in enumerate(originals):
+            if "retweeted_status" in payload:
+                kind = "retweet"
+            elif "quoted_status" in payload:
+                kind = "quote"
+            else:
+                kind = "tweet"
+            pair = {payload_format: lines[payload_format][i] for payload_format in FORMATS}
+            self.by_kind[kind].append(pair)
+            if "extended_entities" in payload:
+                self.with_media.append(pair)
+
+
+class CorpusGenerator(object):
+    """
+    Generate synthetic Tweet payloads
+
+    Args:
+        seed (int): seed for the random number generator
+        mix (dict): rates of the different kinds of Tweets and features
+            (see DEFAULT_MIX); "url_enrichment" is the rate among Tweets with a link
+        start_time (datetime.datetime): posting time of the first Tweet (UTC)
+        tweets_per_second (float): average posting rate, which sets the gaps
+            between ids
+        n_users, n_hashtags, n_domains, n_rules (int): sizes of the pools that
+            authors, hashtags, link domains and matching rule tags are drawn from
+    """
+    def __init__(self, seed=0, mix=None, start_time=datetime.datetime(2017, 5, 24),
+                 tweets_per_second=50.0, n_users=10000, n_hashtags=2000,
+                 n_domains=500, n_rules=50, templates=None):
+        self.rng = random.Random(seed)
+        self.mix = dict(DEFAULT_MIX)
+        self.mix.update(mix or {})
+        self.templates = templates or Templates()
+        epoch = datetime.datetime(1970, 1, 1)
+        self.ms = int((start_time - epoch).total_seconds() * 1000)
+        self.sequence = 0
+        self.tweets_per_second = tweets_per_second
+        rng = random.Random(seed + 1)
+        self.words = [self._word(rng) for _ in range(5000)]
+        self.users = [self._user(rng, i) for i in range(n_users)]
+        self.hashtags = [self._word(rng) + self._word(rng) for _ in range(n_hashtags)]
+        self.domains = ["{}.{}".format(self._word(rng), rng.choice(["com", "org", "net", "co.uk"]))
+                        for _ in range(n_domains)]
+        self.rules = ["rule_{}".format(self._word(rng)) for _ in range(n_rules)]
+        self.user_sampler = ZipfSampler(n_users)
+        self.word_sampler = ZipfSampler(len(self.words))
+        self.hashtag_sampler = ZipfSampler(n_hashtags)
+        self.domain_sampler = ZipfSampler(n_domains)
+        self.rule_sampler = ZipfSampler(n_rules)
+        self.recent = []
+
+    @staticmethod
+    def _word(rng):
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+
+    def _user(self, rng, i):
+        screen_name = "{}{}".format(self._word(rng), i)
+        return {"id": 100000000 + 7919 * i,
+                "screen_name": screen_name,
+                "name": screen_name.capitalize(),
+                "description": " ".join(self._word(rng) for _ in range(rng.randint(0, 8))),
+                "followers_count": int(rng.lognormvariate(5, 2)),
+                "friends_count": int(rng.lognormvariate(5, 1.2))}
+
+    def _chance(self, feature):
+        return self.rng.random() < self.mix[feature]
+
+    def _next_id(self):
+        gap_ms = int(self.rng.expovariate(self.tweets_per_second / 1000.0))
+        if gap_ms == 0:
+            self.sequence += 1
+        else:
+            self.ms += gap_ms
+            self.sequence = 0
+        return ((self.ms - TWITTER_EPOCH_MS) << 22) | (self.sequence & 0xfff)
+
+    def _earlier_id(self, before_ms):
+        ms = before_ms - self.rng.randint(1000, 30 * 24 * 3600 * 1000)
+        return ((ms - TWITTER_EPOCH_MS) << 22) | self.rng.randint(0, 0xfff)
+
+    def _mention(self, user_index, start):
+        user = self.users[user_index]
+        return {"screen_name": user["screen_name"], "name": user["name"],
+                "id": user["id"], "id_str": str(user["id"]),
+                "indices": [start, start + len(user["screen_name"]) + 1]}
+
+    def _link(self, start):
+        domain = self.domains[self.domain_sampler.sample(self.rng)]
+        path = "/".join(self.words[self.word_sampler.sample(self.rng)]
+                        for _ in range(self.rng.randint(1, 3)))
+        code = "".join(self.rng.choice("abcdefghijkmnopqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ23456789")
+                       for _ in range(10))
+        url = "https://t.co/" + code
+        final_url = "https://{}/{}".format(domain, path)
+        return {"url": url,
+                "expanded_url": "http://bit.ly/" + code[:7],
+                "display_url": "bit.ly/" + code[:7],
+                "indices": [start, start + len(url)],
+                "unwound": {"url": final_url, "status": 200,
+                            "title": " ".join(path.split("/")).capitalize(),
+                            "description": "All about {} at {}".format(path.split("/")[0], domain)}}
+
+    def _post(self, tweet_id, extended=False, link=False):
+        """
+        A Tweet's own content: author, text and entities (the same in both formats)
+        """
+        rng = self.rng
+        parts = []
+        entities = {"hashtags": [], "user_mentions": [], "urls": [], "symbols": []}
+        length = 0
+
+        def add(text):
+            parts.append(text)
+            return length + len(text) + 1
+
+        for _ in range(rng.choice([0, 0, 0, 1, 2])):
+            mention = self._mention(self.user_sampler.sample(rng), length)
+            entities["user_mentions"].append(mention)
+            length = add("@" + mention["screen_name"])
+        n_words = rng.randint(25, 50) if extended else rng.randint(3, 14)
+        for _ in range(n_words):
+            length = add(self.words[self.word_sampler.sample(rng)])
+        for _ in range(rng.choice([0, 0, 1, 1, 2, 3])):
+            hashtag = self.hashtags[self.hashtag_sampler.sample(rng)]
+            entities["hashtags"].append({"text": hashtag,
+                                         "indices": [length, length + len(hashtag) + 1]})
+            length = add("#" + hashtag)
+        if link:
+            url = self._link(length)
+            entities["urls"].append(url)
+            length = add(url["url"])
+        return {"id": tweet_id,
+                "ms": snowflake_to_ms(tweet_id),
+                "user": self.users[self.user_sampler.sample(rng)],
+                "text": " ".join(parts),
+                "entities": entities,
+                "lang": self._lang(),
+                "extended": extended}
+
+    def _lang(self):
+        r = self.rng.random()
+        for lang, rate in LANGS:
+            r -= rate
+            if r < 0:
+                return lang
+        return LANGS[-1][0]
+
+    def next_spec(self):
+        """
+        Draw the description of the next Tweet (or malformed line)
+        """
+        rng = self.rng
+        tweet_id = self._next_id()
+        if self._chance("malformed"):
+            return {"kind": "malformed", "id": tweet_id,
+                    "malformed": rng.choice(MALFORMED_KINDS),
+                    "template": rng.random()}
+        r = rng.random()
+        if r < self.mix["retweet"]:
+            kind = "retweet"
+        elif r < self.mix["retweet"] + self.mix["quote"]:
+            kind = "quote"
+        else:
+            kind = "tweet"
+        link = self._chance("link")
+        spec = {"kind": kind,
+                "template": rng.random(),
+                "post": self._post(tweet_id, extended=(kind != "retweet" and
+                                                       self._chance("extended")),
+                                   link=(kind != "retweet" and link)),
+                "enriched": self._chance("url_enrichment"),
+                "counts": [int(rng.expovariate(0.1)), int(rng.expovariate(0.05)),
+                           int(rng.expovariate(0.5))],
+                "media": rng.random() if self._chance("media") else None,
+                "poll": None,
+                "rules": None,
+                "reply_to": None,
+                "embedded": None}
+        if kind == "tweet" and self._chance("poll"):
+            spec["poll"] = [self.words[self.word_sampler.sample(rng)]
+                            for _ in range(rng.randint(2, 4))]
+        if self._chance("matching_rules"):
+            spec["rules"] = sorted(set(self.rules[self.rule_sampler.sample(rng)]
+                                       for _ in range(rng.randint(1, 3))))
+        if kind != "retweet" and self._chance("reply") and self.recent:
+            reply_id, reply_user = rng.choice(self.recent)
+            spec["reply_to"] = {"id": reply_id, "user": reply_user}
+        if kind != "tweet":
+            spec["embedded"] = self._post(self._earlier_id(spec["post"]["ms"]),
+                                          link=(kind == "retweet" and link))
+        self.recent.append((tweet_id, spec["post"]["user"]))
+        if len(self.recent) > 1000:
+            del self.recent[:500]
+        return spec
+
+    def render(self, spec, payload_format):
+        """
+        Write a Tweet description as a JSON line in one format
+        """
+        if spec["kind"] == "malformed":
+            return self._render_malformed(spec, payload_format)
+        candidates = self.templates.by_kind[spec["kind"]]
+        template = candidates[int(spec["template"] * len(candidates))]
+        payload = json.loads(template[payload_format])
+        if payload_format == "original_format":
+            _render_original(payload, spec, self.templates)
+        else:
+            _render_activity(payload, spec, self.templates)
+        return json.dumps(payload, ensure_ascii=False)
+
+    def _render_malformed(self, spec, payload_format):
+        if spec["malformed"] == "blank":
+            return ""
+        if spec["malformed"] == "not_a_tweet":
+            return json.dumps({"info": {"message": "Replay Request Completed",
+                                        "sent": activity_streams_time(snowflake_to_ms(spec["id"]))}})
+        candidates = self.templates.by_kind["tweet"]
+        payload = json.loads(candidates[int(spec["template"] * len(candidates))][payload_format])
+        if spec["malformed"] == "missing_user":
+            payload.pop("user" if payload_format == "original_format" else "actor")
+            return json.dumps(payload, ensure_ascii=False)
+        line = json.dumps(payload, ensure_ascii=False)
+        return line[:len(line) // 2]
+
+    def generate(self, n, payload_format):
+        """
+        Generate `n` JSON lines in one format (or, with payload_format="both",
+        `n` dicts of {format: line} with the same Tweet in each format)
+        """
+        formats = FORMATS if payload_format == "both" else [payload_format]
+        for _ in range(n):
+            spec = self.next_spec()
+            lines = {f: self.render(spec, f) for f in formats}
+            yield lines if payload_format == "both" else lines[payload_format]
+
+
+def _original_user(user, template_user):
+    template_user.update({"id": user["id"], "id_str": str(user["id"]),
+                          "screen_name": user["screen_name"], "name": user["name"],
+                          "description": user["description"],
+                          "followers_count": user["followers_count"],
+                          "friends_count": user["friends_count"]})
+    template_user.pop("derived", None)
+    return template_user
+
+
+def _activity_user(user, template_actor):
+    template_actor.update({"id": "id:twitter.com:{}".format(user["id"]),
+                           "preferredUsername": user["screen_name"],
+                           "displayName": user["name"],
+                           "summary": user["description"],
+                           "followersCount": user["followers_count"],
+                           "friendsCount": user["friends_count"],
+                           "link": "http://www.twitter.com/" + user["screen_name"]})
+    return template_actor
+
+
+def _entities(post, enriched):
+    entities = {key: [dict(value) for value in values]
+                for key, values in post["entities"].items()}
+    for url in entities["urls"]:
+        unwound = url.pop("unwound")
+        if enriched:
+            url["unwound"] = dict(unwound)
+    return entities
+
+
+def _truncated_text(text):
+    return text if len(text) <= 140 else text[:139] + u"…"
+
+
+def _apply_original_post(payload, post, enriched=True):
+    payload["id"] = post["id"]
+    payload["id_str"] = str(post["id"])
+    payload["created_at"] = original_format_time(post["ms"])
+    payload["user"] = _original_user(post["user"], payload["user"])
+    payload["lang"] = post["lang"]
+    entities = _entities(post, enriched)
+    payload["entities"] = entities
+    payload.pop("extended_tweet", None)
+    payload["truncated"] = post["extended"]
+    if post["extended"]:
+        payload["text"] = _truncated_text(post["text"])
+        payload["extended_tweet"] = {"full_text": post["text"],
+                                     "display_text_range": [0, len(post["text"])],
+                                     "entities": entities}
+    else:
+        payload["text"] = post["text"]
+
+
+def _render_original(payload, spec, templates):
+    post = spec["post"]
+    _apply_original_post(payload, post, spec["enriched"])
+    payload["retweet_count"], payload["favorite_count"], payload["quote_count"] = spec["counts"]
+    embedded = spec["embedded"]
+    if spec["kind"] == "retweet":
+        retweeted = payload["retweeted_status"]
+        _apply_original_post(retweeted, embedded, spec["enriched"])
+        author = embedded["user"]
+        payload["text"] = _truncated_text(u"RT @{}: {}".format(author["screen_name"], embedded["text"]))
+        entities = _entities(embedded, spec["enriched"])
+        entities["user_mentions"].insert(0, {"screen_name": author["screen_name"],
+                                             "name": author["name"], "id": author["id"],
+                                             "id_str": str(author["id"]),
+                                             "indices": [3, 4 + len(author["screen_name"])]})
+        payload["entities"] = entities
+        payload["lang"] = embedded["lang"]
+    elif spec["kind"] == "quote":
+        _apply_original_post(payload["quoted_status"], embedded)
+        payload["quoted_status_id"] = embedded["id"]
+        payload["quoted_status_id_str"] = str(embedded["id"])
+    if spec["media"] is not None:
+        media = json.loads(templates.with_media[int(spec["media"] * len(templates.with_media))]
+                           ["original_format"])
+        payload["extended_entities"] = media["extended_entities"]
+        payload["entities"]["media"] = media["entities"].get("media", [])
+    else:
+        payload.pop("extended_entities", None)
+    if spec["poll"] is not None:
+        payload["entities"]["polls"] = [{"options": [{"position": i + 1, "text": option}
+                                                     for i, option in enumerate(spec["poll"])],
+                                         "duration_minutes": 1440,
+                                         "end_datetime": original_format_time(post["ms"] + 86400000)}]
+    reply_to = spec["reply_to"]
+    payload["in_reply_to_status_id"] = reply_to and reply_to["id"]
+    payload["in_reply_to_status_id_str"] = reply_to and str(reply_to["id"])
+    payload["in_reply_to_user_id"] = reply_to and reply_to["user"]["id"]
+    payload["in_reply_to_user_id_str"] = reply_to and str(reply_to["user"]["id"])
+    payload["in_reply_to_screen_name"] = reply_to and reply_to["user"]["screen_name"]
+    if spec["rules"] is not None:
+        payload["matching_rules"] = [{"tag": tag, "id": 800000000000000000 + len(tag)}
+                                     for tag in spec["rules"]]
+    else:
+        payload.pop("matching_rules", None)
+
+
+def _activity_entities(entities):
+    return {key: [{k: v for k, v in value.items() if k != "unwound"} for value in values]
+            for key, values in entities.items()}
+
+
+def _gnip_urls(entities):
+    return [{"url": url["url"], "expanded_url": url["unwound"]["url"],
+             "expanded_status": url["unwound"]["status"],
+             "expanded_url_title": url["unwound"]["title"],
+             "expanded_url_description": url["unwound"]["description"]}
+            for url in entities["urls"] if "unwound" in url]
+
+
+def _apply_activity_post(payload, post, enriched=True):
+    user = post["user"]
+    link = "http://twitter.com/{}/statuses/{}".format(user["screen_name"], post["id"])
+    payload["id"] = "tag:search.twitter.com,2005:{}".format(post["id"])
+    payload["postedTime"] = activity_streams_time(post["ms"])
+    payload["link"] = link
+    payload["actor"] = _activity_user(user, payload["actor"])
+    payload["twitter_lang"] = post["lang"]
+    entities = _entities(post, enriched)
+    payload["twitter_entities"] = _activity_entities(entities)
+    payload.pop("long_object", None)
+    if post["extended"]:
+        payload["body"] = _truncated_text(post["text"])
+        payload["long_object"] = {"body": post["text"],
+                                  "display_text_range": [0, len(post["text"])],
+                                  "twitter_entities": payload["twitter_entities"]}
+    else:
+        payload["body"] = post["text"]
+    if payload.get("verb") != "share" and isinstance(payload.get("object"), dict):
+        payload["object"].update({"id": "object:search.twitter.com,2005:{}".format(post["id"]),
+                                  "summary": payload["body"],
+                                  "postedTime": payload["postedTime"],
+                                  "link": link})
+    return entities
+
+
+def _render_activity(payload, spec, templates):
+    post = spec["post"]
+    entities = _apply_activity_post(payload, post, spec["enriched"])
+    payload["retweetCount"], payload["favoritesCount"], _ = spec["counts"]
+    gnip = payload.setdefault("gnip", {})
+    embedded = spec["embedded"]
+    if spec["kind"] == "retweet":
+        entities = _apply_activity_post(payload["object"], embedded, spec["enriched"])
+        author = embedded["user"]
+        payload["body"] = _truncated_text(u"RT @{}: {}".format(author["screen_name"], embedded["text"]))
+        top_entities = _activity_entities(entities)
+        top_entities["user_mentions"].insert(0, {"screen_name": author["screen_name"],
+                                                 "name": author["name"], "id": author["id"],
+                                                 "id_str": str(author["id"]),
+                                                 "indices": [3, 4 + len(author["screen_name"])]})
+        payload["twitter_entities"] = top_entities
+        payload["twitter_lang"] = embedded["lang"]
+    elif spec["kind"] == "quote":
+        _apply_activity_post(payload["twitter_quoted_status"], embedded)
+    urls = _gnip_urls(entities)
+    if urls:
+        gnip["urls"] = urls
+    else:
+        gnip.pop("urls", None)
+    if spec["media"] is not None:
+        media = json.loads(templates.with_media[int(spec["media"] * len(templates.with_media))]
+                           ["activity_streams"])
+        payload["twitter_extended_entities"] = media["twitter_extended_entities"]
+        payload["twitter_entities"]["media"] = media["twitter_entities"].get("media", [])
+    else:
+        payload.pop("twitter_extended_entities", None)
+    reply_to = spec["reply_to"]
+    if reply_to is not None:
+        payload["inReplyTo"] = {"link": "http://twitter.com/{}/statuses/{}".format(
+            reply_to["user"]["screen_name"], reply_to["id"])}
+    else:
+        payload.pop("inReplyTo", None)
+    if spec["rules"] is not None:
+        gnip["matching_rules"] = [{"tag": tag, "id": 800000000000000000 + len(tag)}
+                                  for tag in spec["rules"]]
+    else:
+        gnip.pop("matching_rules", None)
+
+
+def parse_size(size):
+    """
+    Parse a size like "500M" or "2G" into a number of bytes
+    """
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    size = size.strip().upper().rstrip("B")
+    if size and size[-1] in units:
+        return int(float(size[:-1]) * units[size[-1]])
+    return int(size)
+
+
+def open_output(filename, compress):
+    if filename == "-":
+        return getattr(sys.stdout, "buffer", sys.stdout)
+    if compress:
+        return gzip.open(filename, "wb")
+    return open(filename, "wb")
+
+
+def write_corpus(generator, formats, outputs, count, max_bytes):
+    written = 0
+    lines = 0
+    while (count is None or lines < count) and (max_bytes is None or written < max_bytes):
+        spec = generator.next_spec()
+        for payload_format in formats:
+            line = (generator.render(spec, payload_format) + "\n").encode("utf-8")
+            outputs[payload_format].write(line)
+            if payload_format == formats[0]:
+                written += len(line)
+        lines += 1
+    for output in outputs.values():
+        output.flush()
+        if output is not getattr(sys.stdout, "buffer", sys.stdout):
+            output.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic corpus of Tweet payloads (one JSON payload per line).",
+        formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("-n", "--count", dest="count", type=int, default=None,
+                        help="number of lines to generate, defaults to 1000 (unless --size is given)")
+    parser.add_argument("-s", "--size", dest="size", default=None,
+                        help="stop once about this much output has been written (per format),\n"
+                             "e.g. 500M or 2G")
+    parser.add_argument("--format", dest="payload_format", default="original_format",
+                        choices=FORMATS + ["both"],
+                        help="payload format, defaults to original_format. With 'both', the same\n"
+                             "Tweets are written to <outfile>.original_format.json and\n"
+                             "<outfile>.activity_streams.json")
+    parser.add_argument("-o", "--outfile", dest="outfile", default="-",
+                        help="file to write to, defaults to stdout (a prefix with --format both)")
+    parser.add_argument("-z", "--compress", action="store_true", dest="compress", default=False,
+                        help="gzip the output")
+    parser.add_argument("--seed", dest="seed", type=int, default=0,
+                        help="random seed, defaults to 0")
+    parser.add_argument("--start_time", dest="start_time", default="2017-05-24T00:00:00",
+                        help="posting time of the first Tweet (UTC), defaults to 2017-05-24T00:00:00")
+    parser.add_argument("--tweets_per_second", dest="tweets_per_second", type=float, default=50.0,
+                        help="average posting rate, defaults to 50")
+    parser.add_argument("--users", dest="n_users", type=int, default=10000,
+                        help="number of distinct authors, defaults to 10000")
+    parser.add_argument("--hashtags", dest="n_hashtags", type=int, default=2000,
+                        help="number of distinct hashtags, defaults to 2000")
+    parser.add_argument("--domains", dest="n_domains", type=int, default=500,
+                        help="number of distinct link domains, defaults to 500")
+    parser.add_argument("--rules", dest="n_rules", type=int, default=50,
+                        help="number of distinct matching rule tags, defaults to 50")
+    for feature, rate in sorted(DEFAULT_MIX.items()):
+        parser.add_argument("--{}_rate".format(feature), dest=feature, type=float, default=rate,
+                            help="rate of {} Tweets, defaults to {}".format(feature.replace("_", " "), rate))
+    options = parser.parse_args()
+    if options.payload_format == "both" and options.outfile == "-":
+        parser.error("--format both requires --outfile")
+    count = options.count
+    max_bytes = parse_size(options.size) if options.size else None
+    if count is None and max_bytes is None:
+        count = 1000
+
+    generator = CorpusGenerator(
+        seed=options.seed,
+        mix={feature: getattr(options, feature) for feature in DEFAULT_MIX},
+        start_time=datetime.datetime.strptime(options.start_time, "%Y-%m-%dT%H:%M:%S"),
+        tweets_per_second=options.tweets_per_second, n_users=options.n_users,
+        n_hashtags=options.n_hashtags, n_domains=options.n_domains, n_rules=options.n_rules)
+    formats = FORMATS if options.payload_format == "both" else [options.payload_format]
+    if options.payload_format == "both":
+        outputs = {f: open_output("{}.{}.json{}".format(options.outfile, f,
+                                                        ".gz" if options.compress else ""),
+                                  options.compress)
+                   for f in formats}
+    else:
+        outputs = {formats[0]: open_output(options.outfile, options.compress)}
+    try:
+        write_corpus(generator, formats, outputs, count, max_bytes)
+    except IOError as error:
+        if error.errno != errno.EPIPE:
+            raise
+        # the reader went away (e.g. piped into head): stop quietly, and
+        # keep the interpreter's own flush of stdout at exit from failing
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
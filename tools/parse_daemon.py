@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+
+from tweet_parser.daemon import ParseDaemon
+import argparse
+import signal
+import sys
+
+parser = argparse.ArgumentParser(
+    description="Serve Tweet projections to clients over a Unix domain socket "
+                "(see tweet_parser.daemon for the protocol).",
+    formatter_class=argparse.RawTextHelpFormatter)
+parser.add_argument("-s", "--socket", dest="socket_path", required=True,
+                    help="path of the Unix socket to listen on")
+parser.add_argument("-p", "--processes", dest="processes", type=int,
+                    default=None,
+                    help="number of worker processes, defaults to the cpu count")
+parser.add_argument("--batch_size", dest="batch_size", type=int,
+                    default=500,
+                    help="number of payloads parsed per batch, defaults to 500")
+parser.add_argument("--max_pending", dest="max_pending", type=int,
+                    default=4,
+                    help="batches per connection in progress at once before the daemon\n"
+                         "stops reading from that connection, defaults to 4")
+
+
+def main():
+    options = parser.parse_args()
+    try:
+        daemon = ParseDaemon(options.socket_path, processes=options.processes,
+                             batch_size=options.batch_size,
+                             max_pending=options.max_pending)
+    except OSError as error:
+        parser.error(error.strerror)
+    with daemon:
+        # stop cleanly (removing the socket) on SIGTERM as well as Ctrl-C
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        sys.stderr.write("listening on {} with {} worker processes\n".format(
+            options.socket_path, daemon.processes))
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
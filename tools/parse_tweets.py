@@ -7,8 +7,13 @@
 
 from tweet_parser.tweet import Tweet
 from tweet_parser.tweet_parser_errors import NotATweetError, NotAvailableError
+from tweet_parser.readers import iter_lines, iter_byte_range, imap_byte_ranges, peek_tweet_id
+from tweet_parser.checkpoint import Checkpoint, Checkpointer
+from tweet_parser import lazy_property
 import argparse
-import fileinput
+import functools
+import io
+import os
 import sys
 try:
     import ujson as json
@@ -20,15 +25,102 @@ except ImportError:
     else:
         JSONDecodeError = ValueError
 
+
+class AttributeListHelpFormatter(argparse.RawTextHelpFormatter):
+    """
+    Help formatter that lists the Tweet attributes in the help for -c,
+    only when the help is actually shown
+    """
+    def _get_help_string(self, action):
+        if action.dest == "func_list":
+            list_of_attrs = sorted([x for x in list(set(dir(Tweet)) - set(dir(dict))) if x[0] != "_"])
+            return action.help.format(" \n -> ".join(list_of_attrs))
+        return action.help
+
+
 parser = argparse.ArgumentParser(
-    description="Parse seqeunce of JSON formated activities.", formatter_class=argparse.RawTextHelpFormatter)
-parser.add_argument("-f", "--file", dest="data_files",
-                    default="-",
-                    help="Name of the file to read from, defaults to stdin")
-list_of_attrs = sorted([x for x in list(set(dir(Tweet)) - set(dir(dict))) if x[0] != "_"])
+    description="Parse seqeunce of JSON formated activities.", formatter_class=AttributeListHelpFormatter)
+parser.add_argument("-f", "--file", dest="data_files", nargs="+",
+                    default=["-"],
+                    help="Name of the file(s) to read from, defaults to stdin")
 parser.add_argument("-c", "--csv", dest="func_list",
                     default="id",
-                    help="comma separated list of attibutes to get \n possible functions include: \n -> {}".format(" \n -> ".join(list_of_attrs)))
+                    help="comma separated list of attibutes to get \n possible functions include: \n -> {}")
+parser.add_argument("-o", "--output_format", dest="output_format",
+                    default="csv",
+                    choices=["csv", "ndjson", "heavy_hitters", "distinct_counts", "histograms",
+                             "quantiles"],
+                    help="output format: delimited text (csv) or one JSON object per\n"
+                         "Tweet (ndjson), keeping list and dict attributes structured.\n"
+                         "Unavailable attributes are written as null in ndjson.\n"
+                         "heavy_hitters writes one JSON object with the --top most\n"
+                         "frequent hashtags, mentions, URL domains and screen names;\n"
+                         "distinct_counts writes a JSON line per --bucket with the\n"
+                         "estimated numbers of distinct users, Tweets and URLs;\n"
+                         "histograms writes a CSV row per --bucket and --group_by group\n"
+                         "with counts of Tweets, Retweets, quotes and replies, summed\n"
+                         "retweet and favorite counts and follower count percentiles;\n"
+                         "quantiles writes a JSON line per --bucket and --group_by group\n"
+                         "with the 50th, 90th and 99th percentiles of the follower,\n"
+                         "following and retweet counts")
+parser.add_argument("--drop_none", action="store_true", dest="drop_none",
+                    default=False,
+                    help="omit attributes with a None (null) value from ndjson output")
+parser.add_argument("--batch_size", dest="batch_size", type=int,
+                    default=1000,
+                    help="number of ndjson records to encode per write (or of Tweets\n"
+                         "per aggregator update), defaults to 1000")
+parser.add_argument("--top", dest="top", type=int,
+                    default=10,
+                    help="number of items per kind in heavy_hitters output, defaults to 10")
+parser.add_argument("--capacity", dest="capacity", type=int,
+                    default=1000,
+                    help="number of items per kind that heavy_hitters keeps counts for;\n"
+                         "larger is more accurate and uses more memory, defaults to 1000")
+parser.add_argument("--bucket", dest="bucket", default=None,
+                    choices=["minute", "hour", "day"],
+                    help="time bucket of distinct_counts and quantiles output (defaults\n"
+                         "to hour) and histograms output (defaults to minute)")
+parser.add_argument("--group_by", dest="group_by", default=None,
+                    choices=["lang", "rule", "none"],
+                    help="group histograms and quantiles rows by language, matching rule\n"
+                         "tag or not at all; defaults to lang for histograms and rule for\n"
+                         "quantiles")
+parser.add_argument("--parquet", action="store_true", dest="parquet",
+                    default=False,
+                    help="write histograms output as Parquet instead of CSV (needs pyarrow)")
+parser.add_argument("--precision", dest="precision", type=int,
+                    default=14,
+                    help="HyperLogLog precision for distinct_counts (4 to 18): the\n"
+                         "error is about 1.04 / sqrt(2 ** precision), defaults to 14")
+parser.add_argument("--state_file", dest="state_file", default=None,
+                    help="for the aggregate output formats (heavy_hitters, distinct_counts,\n"
+                         "histograms and quantiles): merge the summary saved in this file\n"
+                         "(if it exists) into this run's, and save the result back to it,\n"
+                         "for incremental rollups. The run must use the same --bucket,\n"
+                         "--precision and --group_by as the run that saved it")
+parser.add_argument("--match-terms", dest="match_terms", default=None, metavar="FILE",
+                    help="only output (or aggregate) Tweets whose text (all_text) contains\n"
+                         "one of the terms in this UTF-8 file, one term per line. Terms\n"
+                         "match whole words regardless of case; #hashtag and @mention terms\n"
+                         "only match hashtags and mentions")
+parser.add_argument("--dedup", dest="dedup", default=None, choices=["exact", "bloom"],
+                    help="drop Tweets whose id has been seen before (in any input file):\n"
+                         "'exact' keeps every id (8 bytes each), 'bloom' keeps a Bloom\n"
+                         "filter that also drops about --dedup_error_rate of the new\n"
+                         "Tweets. Files are read in one process (-p is ignored)")
+parser.add_argument("--dedup_file", dest="dedup_file", default=None,
+                    help="load the ids seen by earlier runs from this file (if it exists),\n"
+                         "and save them back to it, for incremental runs. With --checkpoint\n"
+                         "it is saved along with each checkpoint")
+parser.add_argument("--dedup_capacity", dest="dedup_capacity", type=int,
+                    default=100000000,
+                    help="for --dedup bloom: the number of distinct Tweets expected (over\n"
+                         "all runs), defaults to 100000000")
+parser.add_argument("--dedup_error_rate", dest="dedup_error_rate", type=float,
+                    default=0.001,
+                    help="for --dedup bloom: the fraction of new Tweets dropped at\n"
+                         "--dedup_capacity Tweets, defaults to 0.001")
 parser.add_argument("-d", "--delim", dest="delim",
                     default="|",
                     help="delimiter for the output csv, defaults to pipe")
@@ -44,38 +136,59 @@ parser.add_argument("-t", "--pass_non_tweet", action="store_true", dest="pass_no
 parser.add_argument("-a", "--pass_not_available", action="store_true", dest="pass_not_available",
                     default=False,
                     help="use this flag to silently pass on non-tweet payloads")
+parser.add_argument("--outfile", dest="outfile",
+                    default="-",
+                    help="Name of the file to write to, defaults to stdout")
+parser.add_argument("--checkpoint", dest="checkpoint",
+                    default=None,
+                    help="periodically record the input position of the last line fully\n"
+                         "written to --outfile in this file, so the run can be resumed")
+parser.add_argument("--checkpoint_every", dest="checkpoint_every", type=int,
+                    default=100000,
+                    help="number of input lines between checkpoints, defaults to 100000.\n"
+                         "gzip input can only be checkpointed at gzip member boundaries")
+parser.add_argument("--resume", action="store_true", dest="resume",
+                    default=False,
+                    help="resume from the position saved in --checkpoint (if it exists),\n"
+                         "truncating --outfile to the output written at that point")
+parser.add_argument("-p", "--processes", dest="processes", type=int,
+                    default=1,
+                    help="number of worker processes. Uncompressed input files are split\n"
+                         "into line-aligned byte ranges that are parsed in parallel")
+parser.add_argument("--range_size", dest="range_size", type=int,
+                    default=64 * 1024 * 1024,
+                    help="approximate size in bytes of the ranges parsed by each worker\n"
+                         "process, defaults to 64MB")
+parser.add_argument("--profile_attributes", action="store_true", dest="profile_attributes",
+                    default=False,
+                    help="time every Tweet attribute and print a table of the cost of each\n"
+                         "attribute to stderr at the end of the run")
+parser.add_argument("--metrics", dest="metrics_format", default=None,
+                    choices=["progress", "jsonl", "prometheus"],
+                    help="periodically report lines, Tweets and bytes per second and error\n"
+                         "counts: as a progress line on stderr, as JSON lines appended to\n"
+                         "--metrics_file, or as a Prometheus textfile (--metrics_file)")
+parser.add_argument("--metrics_file", dest="metrics_file", default=None,
+                    help="file for --metrics jsonl or prometheus")
+parser.add_argument("--metrics_interval", dest="metrics_interval", type=float,
+                    default=10.0,
+                    help="seconds between metrics reports, defaults to 10")
 parser.add_argument("--do_format_validation", action="store_true", dest="do_format_validation",
                     default=False,
                     help="debug formatting")
-options = parser.parse_args()
-
-# get the functions that we need to use:
-functions = options.func_list.split(",")
-
-# get the compression
-if options.compressed:
-    openhook = fileinput.hook_compressed
-else:
-    openhook = None
-# parse some tweets
-for line in fileinput.FileInput(options.data_files, openhook=openhook):
+
+
+# overwrites the destination on Windows too (Python 3.3+)
+_replace = getattr(os, "replace", os.rename)
+
+
+def write_error(message, line):
+    sys.stderr.write(message + line.decode("utf-8", "replace"))
+
+
+def format_csv_row(tweet_obj, line, options):
     csv = []
-    # load the JSON
-    try:
-        tweet_dict = json.loads(line)
-    except JSONDecodeError as json_error:
-        if not options.pass_bad_json:
-            sys.stderr.write("{}. Use the flag '-j' to pass silently next time.\nBad JSON payload: {}".format(json_error, line))
-        continue
-    # load a Tweet
-    try:
-        tweet_obj = Tweet(tweet_dict, do_format_validation=options.do_format_validation)
-    except NotATweetError as nate:
-        if not options.pass_non_tweet:
-            sys.stderr.write("{}. Use the flag '-t' to pass silently next time.\nNon Tweet payload: {}".format(nate, line))
-        continue
-    # get the relevant fields
-    for func in functions:
+    for func in options.functions:
         try:
             attribute = getattr(tweet_obj, func)
             if sys.version_info[0] == 3:
@@ -86,7 +199,393 @@ for line in fileinput.FileInput(options.data_files, openhook=openhook):
                 else:
                     csv.append(str(attribute))
         except NotAvailableError as nae:
+            if options.metrics is not None:
+                options.metrics.not_available += 1
             if not options.pass_not_available:
-                sys.stderr.write("{}. Use the flag -a to pass silently next time.\nAttribute Unavailable: {}".format(nae, line))
+                write_error("{}. Use the flag -a to pass silently next time.\nAttribute Unavailable: ".format(nae), line)
             csv.append("NOT_AVAILABLE")
-    sys.stdout.write(options.delim.join(csv) + "\n")
+    row = options.delim.join(csv) + "\n"
+    if sys.version_info[0] == 3:
+        row = row.encode("utf-8")
+    return row
+
+
+def format_record(tweet_obj, line, options):
+    record = {}
+    for func in options.functions:
+        try:
+            record[func] = getattr(tweet_obj, func)
+        except NotAvailableError as nae:
+            if options.metrics is not None:
+                options.metrics.not_available += 1
+            if not options.pass_not_available:
+                write_error("{}. Use the flag -a to pass silently next time.\nAttribute Unavailable: ".format(nae), line)
+            record[func] = None
+    return record
+
+
+def parse_line(line, options):
+    """
+    Load a Tweet from one line of input, or return None (after reporting
+    the problem, unless asked to pass silently) if that's not possible
+    """
+    # load the JSON
+    try:
+        tweet_dict = json.loads(line)
+    except (JSONDecodeError, UnicodeDecodeError) as json_error:
+        if options.metrics is not None:
+            options.metrics.bad_json += 1
+        if not options.pass_bad_json:
+            write_error("{}. Use the flag '-j' to pass silently next time.\nBad JSON payload: ".format(json_error), line)
+        return None
+    # load a Tweet
+    try:
+        tweet_obj = Tweet(tweet_dict, do_format_validation=options.do_format_validation)
+    except (NotATweetError, TypeError) as nate:
+        # TypeError: JSON that isn't an object (null, 1, ...)
+        if options.metrics is not None:
+            options.metrics.non_tweets += 1
+        if not options.pass_non_tweet:
+            write_error("{}. Use the flag '-t' to pass silently next time.\nNon Tweet payload: ".format(nate), line)
+        return None
+    if options.metrics is not None:
+        options.metrics.count_tweet(tweet_obj)
+    return tweet_obj
+
+
+class TweetBatcher(object):
+    """
+    Collect parsed Tweets and add them to an aggregator a batch at a time
+    """
+    def __init__(self, aggregator, batch_size):
+        self.aggregator = aggregator
+        self.batch_size = batch_size
+        self.tweets = []
+
+    def add(self, tweet_obj):
+        self.tweets.append(tweet_obj)
+        if len(self.tweets) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.tweets:
+            self.aggregator.add_batch(self.tweets)
+            self.tweets = []
+
+
+def make_aggregator(options):
+    """
+    The aggregator for an aggregate output format, or None
+    """
+    if options.output_format == "heavy_hitters":
+        from tweet_parser.aggregation.heavy_hitters import HeavyHitters
+        return HeavyHitters(capacity=options.capacity)
+    if options.output_format == "distinct_counts":
+        from tweet_parser.aggregation.distinct_counts import DistinctCounts
+        return DistinctCounts(bucket=options.bucket or "hour", precision=options.precision)
+    if options.output_format == "histograms":
+        from tweet_parser.aggregation.histograms import EngagementHistograms
+        group_by = options.group_by or "lang"
+        return EngagementHistograms(bucket=options.bucket or "minute",
+                                    group_by=None if group_by == "none" else group_by)
+    if options.output_format == "quantiles":
+        from tweet_parser.aggregation.quantiles import QuantileSketches
+        group_by = options.group_by or "rule"
+        return QuantileSketches(bucket=options.bucket or "hour",
+                                group_by=None if group_by == "none" else group_by)
+    return None
+
+
+def load_state_file(options):
+    """
+    The aggregator saved in --state_file, or None if there is no file yet
+
+    Raises:
+        ValueError: if it can't be merged with this run's (e.g. it has a
+            different --bucket, --precision or --group_by)
+    """
+    if not os.path.exists(options.state_file):
+        return None
+    aggregator = make_aggregator(options)
+    with open(options.state_file, "r") as f:
+        try:
+            saved = type(aggregator).from_dict(json.loads(f.read()))
+        except (KeyError, TypeError, AttributeError):
+            raise ValueError("it isn't a saved {} summary".format(options.output_format))
+    # fails now, instead of after the whole input has been parsed
+    aggregator.merge(saved)
+    return saved
+
+
+def update_state_file(aggregator, saved, options):
+    """
+    Merge the aggregator loaded from --state_file (if any) into
+    `aggregator`, and atomically replace the file with the result
+    """
+    if saved is not None:
+        aggregator.merge(saved)
+    tmp_path = options.state_file + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(json.dumps(aggregator.to_dict()))
+    _replace(tmp_path, options.state_file)
+
+
+def write_aggregate(aggregator, out, options):
+    if options.output_format == "histograms":
+        if options.parquet:
+            aggregator.write_parquet(out)
+        else:
+            text = io.StringIO()
+            aggregator.write_csv(text)
+            out.write(text.getvalue().encode("utf-8"))
+        return
+    if options.output_format == "heavy_hitters":
+        report = aggregator.report(options.top)
+    else:
+        report = aggregator.report()
+    # a list of rows is written as JSON lines
+    rows = report if isinstance(report, list) else [report]
+    out.write("".join(json.dumps(row) + "\n" for row in rows).encode("utf-8"))
+
+
+def write_line(line, options, out, ndjson_writer, batcher=None):
+    if options.metrics is not None:
+        options.metrics.lines += 1
+        options.metrics.bytes += len(line)
+    if options.id_set is not None:
+        tweet_id = peek_tweet_id(line)
+        if tweet_id is not None and not options.id_set.add(tweet_id):
+            return
+    tweet_obj = parse_line(line, options)
+    if tweet_obj is not None and options.term_matcher is not None:
+        if not options.term_matcher.matches(tweet_obj.all_text):
+            return
+    if tweet_obj is not None:
+        # get the relevant fields
+        if batcher is not None:
+            batcher.add(tweet_obj)
+        elif ndjson_writer is not None:
+            ndjson_writer.write(format_record(tweet_obj, line, options))
+        else:
+            out.write(format_csv_row(tweet_obj, line, options))
+
+
+def make_ndjson_writer(out, options):
+    if options.output_format == "ndjson":
+        from tweet_parser.ndjson import NDJSONWriter
+        return NDJSONWriter(out, batch_size=options.batch_size,
+                            drop_none=options.drop_none)
+    return None
+
+
+def parse_range(options, filename, start, end):
+    """
+    Parse the lines in one byte range of a file (in a worker process)
+
+    Returns:
+        tuple: (number of lines read, output for those lines as bytes,
+        attribute profiling snapshot or None, metrics counts or None,
+        aggregator for those lines or None)
+    """
+    if options.metrics is not None:
+        options.metrics.reset()
+    if options.profile_attributes:
+        lazy_property.enable_profiling()
+        lazy_property.reset_profiling()
+    out = io.BytesIO()
+    ndjson_writer = make_ndjson_writer(out, options)
+    aggregator = make_aggregator(options)
+    batcher = TweetBatcher(aggregator, options.batch_size) if aggregator is not None else None
+    lines_read = 0
+    for line, _ in iter_byte_range(filename, start, end):
+        lines_read += 1
+        write_line(line, options, out, ndjson_writer, batcher)
+    if ndjson_writer is not None:
+        ndjson_writer.flush()
+    if batcher is not None:
+        batcher.flush()
+    profile = lazy_property.profiling_snapshot() if options.profile_attributes else None
+    counts = options.metrics.counts() if options.metrics is not None else None
+    return lines_read, out.getvalue(), profile, counts, aggregator
+
+
+def make_metrics_reporter(options):
+    """
+    Set up metrics collection (`options.metrics`) and reporting, if asked for
+    """
+    options.metrics = None
+    if options.metrics_format is None:
+        return None
+    from tweet_parser.metrics import (ParseMetrics, MetricsReporter, PrometheusTextfile,
+                                      JSONLinesFile, ProgressLine)
+    if options.metrics_format == "progress":
+        sink = ProgressLine(sys.stderr)
+    elif options.metrics_format == "jsonl":
+        sink = JSONLinesFile(options.metrics_file)
+    else:
+        sink = PrometheusTextfile(options.metrics_file)
+    options.metrics = ParseMetrics()
+    return MetricsReporter(options.metrics, [sink], interval=options.metrics_interval)
+
+
+def can_split(data_file, options):
+    return (options.processes > 1 and data_file != "-" and options.id_set is None and
+            not (options.compressed and data_file.endswith((".gz", ".bz2"))))
+
+
+def main():
+    options = parser.parse_args()
+    if options.checkpoint is not None and options.outfile == "-":
+        parser.error("--checkpoint requires --outfile")
+    if options.resume and options.checkpoint is None:
+        parser.error("--resume requires --checkpoint")
+    if options.metrics_format in ("jsonl", "prometheus") and options.metrics_file is None:
+        parser.error("--metrics {} requires --metrics_file".format(options.metrics_format))
+    aggregator = make_aggregator(options)
+    if aggregator is not None and options.checkpoint is not None:
+        parser.error("--checkpoint can't be used with --output_format {}".format(options.output_format))
+    if aggregator is None and options.state_file is not None:
+        parser.error("--state_file requires an aggregate --output_format")
+    saved_state = None
+    if options.state_file is not None:
+        try:
+            saved_state = load_state_file(options)
+        except (IOError, ValueError) as error:
+            parser.error("can't use --state_file: {}".format(error))
+    if options.parquet and options.output_format != "histograms":
+        parser.error("--parquet requires --output_format histograms")
+    if options.parquet:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("--parquet requires pyarrow (pip install pyarrow)")
+
+    if options.match_terms is not None:
+        from tweet_parser.matching.terms import TermMatcher
+        try:
+            options.term_matcher = TermMatcher.from_file(options.match_terms)
+        except IOError as error:
+            parser.error("can't read --match-terms file: {}".format(error))
+    else:
+        options.term_matcher = None
+
+    if options.dedup_file is not None and options.dedup is None:
+        parser.error("--dedup_file requires --dedup")
+    if options.dedup is not None:
+        from tweet_parser.dedup import open_id_set
+        kwargs = {}
+        if options.dedup == "bloom":
+            kwargs = {"capacity": options.dedup_capacity, "error_rate": options.dedup_error_rate}
+        try:
+            options.id_set = open_id_set(options.dedup_file, options.dedup, **kwargs)
+        except (IOError, ValueError) as error:
+            parser.error("can't use --dedup_file: {}".format(error))
+    else:
+        options.id_set = None
+    if options.dedup_file is not None:
+        def save_id_set():
+            options.id_set.save(options.dedup_file)
+    else:
+        save_id_set = None
+
+    # get the functions that we need to use:
+    options.functions = options.func_list.split(",")
+    if options.profile_attributes:
+        lazy_property.enable_profiling()
+    worker_profiles = []
+    reporter = make_metrics_reporter(options)
+
+    # find where to start
+    data_files = options.data_files
+    start_offset = 0
+    lines_read = 0
+    saved = Checkpoint.load(options.checkpoint) if options.resume else None
+    if saved is not None:
+        if saved.filename not in data_files:
+            parser.error("checkpoint file {} is not one of the input files".format(saved.filename))
+        # the output written up to the checkpoint must still be there
+        if (not os.path.exists(options.outfile) or
+                os.path.getsize(options.outfile) < saved.output_offset):
+            parser.error("--outfile {} is missing or shorter than when --checkpoint was saved; "
+                         "delete {} to start over".format(options.outfile, options.checkpoint))
+        data_files = data_files[data_files.index(saved.filename):]
+        start_offset = saved.offset
+        lines_read = saved.lines
+
+    # set up the output
+    stdout = getattr(sys.stdout, "buffer", sys.stdout)
+    if options.outfile == "-":
+        out = stdout
+    elif saved is not None:
+        out = open(options.outfile, "r+b")
+        out.seek(saved.output_offset)
+        out.truncate()
+    else:
+        out = open(options.outfile, "wb")
+    ndjson_writer = make_ndjson_writer(out, options)
+    batcher = TweetBatcher(aggregator, options.batch_size) if aggregator is not None else None
+    flush_output = ndjson_writer.flush if ndjson_writer is not None else out.flush
+    if options.checkpoint is not None:
+        checkpointer = Checkpointer(options.checkpoint, out,
+                                    every=options.checkpoint_every,
+                                    flush_output=flush_output,
+                                    on_save=save_id_set)
+    else:
+        checkpointer = None
+
+    # parse some tweets
+    offset = start_offset
+    for data_file in data_files:
+        if can_split(data_file, options):
+            # parse byte ranges of the file in parallel, writing them in order
+            flush_output()
+            size = os.path.getsize(data_file)
+            n_ranges = max(4 * options.processes, (size - start_offset) // options.range_size)
+            results = imap_byte_ranges(functools.partial(parse_range, options), data_file,
+                                       processes=options.processes, n_ranges=n_ranges,
+                                       start_offset=start_offset)
+            offset = start_offset
+            for (_, offset), (range_lines, range_output, profile, counts, range_aggregator) in results:
+                lines_read += range_lines
+                out.write(range_output)
+                if range_aggregator is not None:
+                    aggregator.merge(range_aggregator)
+                if profile is not None:
+                    worker_profiles.append(profile)
+                if reporter is not None:
+                    reporter.metrics.add(counts)
+                    reporter.maybe_report()
+                if checkpointer is not None:
+                    checkpointer.update(data_file, offset, lines_read)
+        else:
+            offset = start_offset
+            for line, offset in iter_lines(data_file, compressed=options.compressed,
+                                           start_offset=start_offset):
+                lines_read += 1
+                write_line(line, options, out, ndjson_writer, batcher)
+                if reporter is not None:
+                    reporter.tick()
+                if checkpointer is not None:
+                    checkpointer.update(data_file, offset, lines_read)
+        start_offset = 0
+    if batcher is not None:
+        batcher.flush()
+        if options.state_file is not None:
+            update_state_file(aggregator, saved_state, options)
+        write_aggregate(aggregator, out, options)
+    flush_output()
+    if checkpointer is not None and offset is not None:
+        checkpointer.save(data_file, offset, lines_read)
+    elif save_id_set is not None:
+        save_id_set()
+    if out is not stdout:
+        out.close()
+    if reporter is not None:
+        reporter.report()
+    if options.profile_attributes:
+        profile = lazy_property.merge_snapshots([lazy_property.profiling_snapshot()] + worker_profiles)
+        sys.stderr.write(lazy_property.format_profile_table(profile))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Distinct users, Tweets and URLs per hour or day, in bounded memory
+
+`HyperLogLog` estimates the number of distinct values added to it from
+``2 ** precision`` one-byte registers (16KB for the default precision of
+14), with a relative standard error of about ``1.04 / sqrt(2 ** precision)``
+(0.8% at precision 14) however many values it sees. Values are hashed with
+SHA-1, so sketches made in different processes, or in different runs, can
+be merged (`HyperLogLog.merge` keeps the larger of each pair of
+registers), and a Tweet id seen in two overlapping files is counted once.
+
+`DistinctCounts` keeps a `HyperLogLog` for the distinct user ids, Tweet ids
+and unrolled URLs of each time bucket, where a Tweet's bucket comes from
+its snowflake id (see `tweet_parser.aggregation.time_buckets`). It is fed
+Tweets or batches of payloads in one pass, merges with the
+`DistinctCounts` of other processes or files, and can be saved to a file
+and loaded again to add the next day's data, or rolled up into coarser
+buckets.
+"""
+import base64
+import collections
+import hashlib
+import json
+import math
+import os
+import struct
+import zlib
+
+from tweet_parser.aggregation.time_buckets import (bucket_seconds, bucket_starts,
+                                                   format_time, get_tweet_ids)
+from tweet_parser.getter_methods import batch
+from tweet_parser.getter_methods.tweet_links import get_most_unrolled_urls
+
+_unpack_hash = struct.Struct(">Q").unpack_from
+_header = struct.Struct(">BB")
+_FORMAT_VERSION = 1
+
+
+def _hash64(value):
+    if not isinstance(value, bytes):
+        # ints (e.g. ids) hash like their decimal strings
+        value = (value if hasattr(value, "encode") else str(value)).encode("utf-8")
+    return _unpack_hash(hashlib.sha1(value).digest())[0]
+
+
+class HyperLogLog(object):
+    """
+    An estimate of the number of distinct values in a stream
+
+    Args:
+        precision (int): 4 to 18; the sketch has ``2 ** precision``
+            registers, and a relative standard error of about
+            ``1.04 / sqrt(2 ** precision)``
+
+    Example:
+        >>> from tweet_parser.aggregation.distinct_counts import HyperLogLog
+        >>> users = HyperLogLog(precision=12)
+        >>> users.add_many(str(user_id) for user_id in range(1000))
+        >>> users.add_many(str(user_id) for user_id in range(500))
+        >>> abs(users.count() - 1000) < 30
+        True
+    """
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @property
+    def relative_error(self):
+        """
+        The relative standard error of `count`
+        """
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, value):
+        """
+        Add one value (str, bytes or int) to the sketch
+        """
+        self.add_many([value])
+
+    def add_many(self, values):
+        """
+        Add every value of an iterable to the sketch
+        """
+        registers = self.registers
+        shift = 64 - self.precision
+        mask = (1 << shift) - 1
+        for value in values:
+            hashed = _hash64(value)
+            # the register is picked by the first `precision` bits, and
+            # keeps the largest position of the first 1 in the others
+            index = hashed >> shift
+            rank = shift - (hashed & mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def count(self):
+        """
+        The estimated number of distinct values added
+
+        Returns:
+            int: the raw HyperLogLog estimate, or the linear counting
+            estimate for small counts
+        """
+        m = len(self.registers)
+        histogram = collections.Counter(self.registers)
+        if histogram[0] == m:
+            return 0
+        if m >= 128:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        estimate = alpha * m * m / sum(n * 2.0 ** -rank for rank, n in histogram.items())
+        if estimate <= 2.5 * m and histogram[0]:
+            estimate = m * math.log(float(m) / histogram[0])
+        return int(round(estimate))
+
+    def merge(self, other):
+        """
+        Add the values of another sketch (with the same precision) to this one
+        """
+        if other.precision != self.precision:
+            raise ValueError("can't merge HyperLogLogs with precisions {} and {}"
+                             .format(self.precision, other.precision))
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def to_bytes(self):
+        """
+        The sketch as bytes: a format version, the precision and the registers
+        """
+        return _header.pack(_FORMAT_VERSION, self.precision) + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Make a sketch from bytes returned by `to_bytes`
+        """
+        version, precision = _header.unpack_from(data)
+        if version != _FORMAT_VERSION:
+            raise ValueError("unknown HyperLogLog format version {}".format(version))
+        sketch = cls(precision)
+        registers = bytearray(data[_header.size:])
+        if len(registers) != len(sketch.registers):
+            raise ValueError("expected {} registers, got {}".format(len(sketch.registers),
+                                                                   len(registers)))
+        sketch.registers = registers
+        return sketch
+
+    def __getstate__(self):
+        return self.to_bytes()
+
+    def __setstate__(self, state):
+        self.__dict__.update(HyperLogLog.from_bytes(state).__dict__)
+
+
+class DistinctCounts(object):
+    """
+    Estimated numbers of distinct user ids, Tweet ids and unrolled URLs
+    per time bucket
+
+    Args:
+        bucket (str or int): "minute", "hour", "day" or a number of seconds;
+            buckets start at multiples of this many seconds since the epoch
+        precision (int): the precision of each `HyperLogLog`
+        dimensions (list): what to count, from `DIMENSIONS`; defaults to
+            all of them
+
+    Attributes:
+        bucket_seconds (int): the length of a bucket in seconds
+        sketches (dict): for each bucket start (in seconds since the epoch),
+            a dict of a `HyperLogLog` per dimension
+
+    Example:
+        >>> from tweet_parser.aggregation.distinct_counts import DistinctCounts
+        >>> payloads = [{"created_at": "Wed May 24 20:17:19 +0000 2017",
+        ...              "id_str": "867474613139156993",
+        ...              "user": {"id_str": "2382763597"}, "entities": {"urls": []}},
+        ...             {"created_at": "Wed May 24 20:17:19 +0000 2017",
+        ...              "id_str": "867474613139156993",
+        ...              "user": {"id_str": "2382763597"}, "entities": {"urls": []}}]
+        >>> distinct = DistinctCounts(bucket="hour")
+        >>> distinct.add_batch(payloads)
+        >>> distinct.counts()
+        {1495656000: {'user_ids': 1, 'tweet_ids': 1, 'urls': 0}}
+    """
+    DIMENSIONS = ["user_ids", "tweet_ids", "urls"]
+
+    def __init__(self, bucket="hour", precision=14, dimensions=None):
+        dimensions = list(self.DIMENSIONS if dimensions is None else dimensions)
+        for dimension in dimensions:
+            if dimension not in self.DIMENSIONS:
+                raise ValueError("unknown dimension: {}".format(dimension))
+        self.bucket_seconds = bucket_seconds(bucket)
+        self.precision = precision
+        self.dimensions = dimensions
+        self.sketches = {}
+
+    def _bucket(self, start):
+        sketches = self.sketches.get(start)
+        if sketches is None:
+            sketches = {dimension: HyperLogLog(self.precision) for dimension in self.dimensions}
+            self.sketches[start] = sketches
+        return sketches
+
+    def add(self, tweet):
+        """
+        Add one Tweet (or payload dict)
+        """
+        self.add_batch([tweet])
+
+    def add_batch(self, payloads, original_format=None):
+        """
+        Add a batch of Tweets or payload dicts
+
+        Args:
+            payloads (list): Tweet objects or dicts
+            original_format (bool): the format of all of the payloads, if
+                known (see `tweet_parser.getter_methods.batch`)
+        """
+        if not isinstance(payloads, list):
+            payloads = list(payloads)
+        tweet_ids = get_tweet_ids(payloads, original_format)
+        columns = {"tweet_ids": tweet_ids}
+        if "user_ids" in self.dimensions:
+            columns["user_ids"] = batch.get_user_id_batch(payloads, original_format)
+        if "urls" in self.dimensions:
+            columns["urls"] = batch.apply_getter(get_most_unrolled_urls, payloads,
+                                                 original_format)
+        # group the rows by bucket, then add each group to its sketches
+        rows = collections.defaultdict(list)
+        for row, start in enumerate(bucket_starts(tweet_ids, self.bucket_seconds)):
+            rows[start].append(row)
+        for start, bucket_rows in rows.items():
+            sketches = self._bucket(start)
+            for dimension in self.dimensions:
+                column = columns[dimension]
+                if dimension == "urls":
+                    sketches[dimension].add_many(url for row in bucket_rows for url in column[row])
+                else:
+                    sketches[dimension].add_many(column[row] for row in bucket_rows)
+
+    def merge(self, other):
+        """
+        Add the sketches of another `DistinctCounts` (with the same
+        buckets, precision and dimensions) to these
+        """
+        if (other.bucket_seconds, other.precision) != (self.bucket_seconds, self.precision):
+            raise ValueError("can't merge DistinctCounts with different buckets or precisions")
+        for start, other_sketches in other.sketches.items():
+            sketches = self._bucket(start)
+            for dimension in self.dimensions:
+                sketches[dimension].merge(other_sketches[dimension])
+
+    def rollup(self, bucket):
+        """
+        The same sketches merged into longer buckets (e.g. hours into days)
+
+        Args:
+            bucket (str or int): the new bucket, a multiple of this one
+
+        Returns:
+            DistinctCounts: a new `DistinctCounts`
+        """
+        rolled_up = DistinctCounts(bucket, self.precision, self.dimensions)
+        if rolled_up.bucket_seconds % self.bucket_seconds:
+            raise ValueError("{} seconds isn't a multiple of {} seconds"
+                             .format(rolled_up.bucket_seconds, self.bucket_seconds))
+        for start, sketches in self.sketches.items():
+            target = rolled_up._bucket(start - start % rolled_up.bucket_seconds)
+            for dimension in self.dimensions:
+                target[dimension].merge(sketches[dimension])
+        return rolled_up
+
+    def counts(self):
+        """
+        The estimated distinct counts of every bucket
+
+        Returns:
+            dict: for each bucket start, a dict of the count per dimension
+        """
+        return {start: {dimension: sketches[dimension].count() for dimension in self.dimensions}
+                for start, sketches in self.sketches.items()}
+
+    def total(self, dimension):
+        """
+        The estimated distinct count of one dimension over all buckets
+        """
+        sketch = HyperLogLog(self.precision)
+        for sketches in self.sketches.values():
+            sketch.merge(sketches[dimension])
+        return sketch.count()
+
+    def report(self):
+        """
+        The counts as rows, in time order
+
+        Returns:
+            list of dicts: one per bucket, with its start in seconds
+            (``bucket``) and as an ISO 8601 time (``time``) and the count of
+            each dimension
+        """
+        rows = []
+        for start, counts in sorted(self.counts().items()):
+            row = {"bucket": start, "time": format_time(start)}
+            row.update(counts)
+            rows.append(row)
+        return rows
+
+    def to_dict(self):
+        """
+        The sketches as a dict that can be written as JSON (the registers
+        are compressed and base64 encoded)
+        """
+        def encode(sketch):
+            return base64.b64encode(zlib.compress(sketch.to_bytes())).decode("ascii")
+        return {"bucket_seconds": self.bucket_seconds,
+                "precision": self.precision,
+                "dimensions": self.dimensions,
+                "sketches": {str(start): {dimension: encode(sketch)
+                                          for dimension, sketch in sketches.items()}
+                             for start, sketches in self.sketches.items()}}
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Make a `DistinctCounts` from a dict returned by `to_dict`
+        """
+        def decode(data):
+            return HyperLogLog.from_bytes(zlib.decompress(base64.b64decode(data)))
+        distinct = cls(state["bucket_seconds"], state["precision"], state["dimensions"])
+        distinct.sketches = {int(start): {dimension: decode(data)
+                                          for dimension, data in sketches.items()}
+                             for start, sketches in state["sketches"].items()}
+        return distinct
+
+    def save(self, path):
+        """
+        Atomically replace the file at `path` with these sketches (as JSON)
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load the sketches saved at `path` by `save`
+        """
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Top hashtags, mentions, URL domains and users of a stream, in bounded memory
+
+`SpaceSaving` keeps approximate counts of the most frequent items of a
+stream in a fixed number of counters (the Space-Saving algorithm of
+Metwally, Agrawal and El Abbadi). When a new item arrives and every
+counter is taken, the item replaces the item with the smallest count and
+takes over that count, which is remembered as its possible overcount. So
+a count is never too low, and is too high by at most the smallest count
+in the summary (at most ``total / capacity``): every item that occurred
+more than ``total / capacity`` times is in the summary.
+
+`HeavyHitters` keeps one `SpaceSaving` summary per kind of item (hashtags,
+@-mentioned screen names, domains of the unrolled URLs and the screen names
+of the Tweets' authors) and is fed Tweets or batches of payloads. Summaries
+made from different parts of a stream (e.g. by worker processes) are
+combined with `merge` (the merge of Agarwal et al., "Mergeable
+Summaries"), which keeps the same error bound for the combined stream.
+Both classes can be pickled, or turned into plain dicts (`to_dict`) to be
+written as JSON.
+"""
+import heapq
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+from tweet_parser.getter_methods import batch
+from tweet_parser.getter_methods.tweet_entities import get_user_mentions
+from tweet_parser.getter_methods.tweet_links import get_most_unrolled_urls
+
+
+class SpaceSaving(object):
+    """
+    Approximate counts of the most frequent items of a stream
+
+    Args:
+        capacity (int): the number of items to keep counts for
+
+    Attributes:
+        capacity (int): the number of items to keep counts for
+        total (int): the sum of the counts added so far
+
+    Example:
+        >>> from tweet_parser.aggregation.heavy_hitters import SpaceSaving
+        >>> summary = SpaceSaving(capacity=2)
+        >>> summary.update_many(["a", "b", "a", "c", "a"])
+        >>> summary.top()
+        [('a', 3), ('c', 2)]
+        >>> summary.error("c")
+        1
+    """
+    def __init__(self, capacity=1000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.total = 0
+        self.counts = {}
+        self.errors = {}
+        # (count, item) for every item in `counts`, where count is at most
+        # the item's current count; see `_pop_min`
+        self._heap = []
+
+    def update(self, item, count=1):
+        """
+        Count `count` more occurrences of `item`
+        """
+        self.total += count
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+            return
+        error = 0
+        if len(counts) >= self.capacity:
+            error = self._pop_min()
+        counts[item] = error + count
+        self.errors[item] = error
+        heapq.heappush(self._heap, (error + count, item))
+
+    def update_many(self, items):
+        """
+        Count one occurrence of each item of `items`
+        """
+        counts = self.counts
+        for item in items:
+            if item in counts:
+                counts[item] += 1
+                self.total += 1
+            else:
+                self.update(item)
+
+    def _pop_min(self):
+        """
+        Remove the item with the smallest count and return its count.
+
+        The heap isn't updated when a count goes up, so each heap entry
+        is a lower bound of its item's count. The first entry popped that
+        is exact belongs to an item with the smallest count; stale entries
+        are pushed back with the current count.
+        """
+        heap = self._heap
+        counts = self.counts
+        while True:
+            count, item = heapq.heappop(heap)
+            current = counts[item]
+            if current == count:
+                del counts[item]
+                del self.errors[item]
+                return count
+            heapq.heappush(heap, (current, item))
+
+    def min_count(self):
+        """
+        The smallest count, when every counter is taken (else 0); no item
+        outside of the summary occurred more often than this
+        """
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def error(self, item):
+        """
+        How much the count of `item` may be too high
+        """
+        if item in self.errors:
+            return self.errors[item]
+        return self.min_count()
+
+    def __getitem__(self, item):
+        return self.counts.get(item, 0)
+
+    def __contains__(self, item):
+        return item in self.counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    def top(self, k=None):
+        """
+        The `k` items (all of them if None) with the largest counts
+
+        Returns:
+            list of tuples: (item, count), largest count first (ties by item)
+        """
+        ranked = sorted(self.counts.items(), key=lambda pair: (-pair[1], pair[0]))
+        return ranked if k is None else ranked[:k]
+
+    def merge(self, other):
+        """
+        Add the counts of another summary (e.g. of another part of the
+        stream) to this one. An item missing from a full summary is given
+        that summary's `min_count`, then the `capacity` largest counts
+        are kept.
+
+        Args:
+            other (SpaceSaving): a summary with any capacity
+        """
+        floor, other_floor = self.min_count(), other.min_count()
+        counts, errors = {}, {}
+        for item in set(self.counts).union(other.counts):
+            counts[item] = (self.counts.get(item, floor) +
+                            other.counts.get(item, other_floor))
+            errors[item] = (self.errors.get(item, floor) +
+                            other.errors.get(item, other_floor))
+        kept = heapq.nlargest(self.capacity, counts.items(),
+                              key=lambda pair: (pair[1], pair[0]))
+        self.total += other.total
+        self._set_counts(kept, errors)
+
+    def _set_counts(self, pairs, errors):
+        self.counts = dict(pairs)
+        self.errors = {item: errors[item] for item in self.counts}
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def to_dict(self):
+        """
+        The summary as a dict of plain lists and numbers (e.g. for JSON)
+        """
+        return {"capacity": self.capacity,
+                "total": self.total,
+                "items": [[item, count, self.errors[item]] for item, count in self.top()]}
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Make a summary from a dict returned by `to_dict`
+        """
+        summary = cls(state["capacity"])
+        summary.total = state["total"]
+        summary._set_counts([(item, count) for item, count, _ in state["items"]],
+                            {item: error for item, _, error in state["items"]})
+        return summary
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.__dict__.update(SpaceSaving.from_dict(state).__dict__)
+
+
+def _hashtags(payloads, original_format):
+    return [tag.lower()
+            for tags in batch.get_hashtags_batch(payloads, original_format)
+            for tag in tags]
+
+
+def _mentions(payloads, original_format):
+    return [mention["screen_name"]
+            for mentions in batch.apply_getter(get_user_mentions, payloads, original_format)
+            for mention in mentions]
+
+
+def _url_domains(payloads, original_format):
+    domains = []
+    for urls in batch.apply_getter(get_most_unrolled_urls, payloads, original_format):
+        for url in urls:
+            domain = urlsplit(url).hostname
+            if domain:
+                domains.append(domain)
+    return domains
+
+
+def _screen_names(payloads, original_format):
+    return batch.get_screen_name_batch(payloads, original_format)
+
+
+class HeavyHitters(object):
+    """
+    The most frequent hashtags, @-mentioned users, URL domains and authors
+    of a stream of Tweets
+
+    Hashtags are counted in lower case (Twitter doesn't tell #Tweet from
+    #tweet), screen names as they appear in the payloads and URL domains
+    from the most unrolled version of each link (`get_most_unrolled_urls`).
+
+    Args:
+        capacity (int): the number of items to keep counts for, per kind
+        dimensions (list): the kinds of items to count, from `DIMENSIONS`;
+            defaults to all of them
+
+    Attributes:
+        summaries (dict): a `SpaceSaving` summary for each kind of item
+
+    Example:
+        >>> from tweet_parser.aggregation.heavy_hitters import HeavyHitters
+        >>> payloads = [{"created_at": "Wed May 24 20:17:19 +0000 2017",
+        ...              "user": {"screen_name": "RobotPrincessFi"},
+        ...              "entities": {"hashtags": [{"text": "Tweeting"}],
+        ...                           "user_mentions": [], "urls": []}},
+        ...             {"created_at": "Wed May 24 20:19:19 +0000 2017",
+        ...              "user": {"screen_name": "notFromShrek"},
+        ...              "entities": {"hashtags": [{"text": "tweeting"}],
+        ...                           "user_mentions": [{"screen_name": "RobotPrincessFi"}],
+        ...                           "urls": [{"expanded_url": "https://twitter.com/"}]}}]
+        >>> top = HeavyHitters(capacity=100)
+        >>> top.add_batch(payloads)
+        >>> top.top("hashtags")
+        [('tweeting', 2)]
+        >>> top.top("mentions"), top.top("url_domains")
+        ([('RobotPrincessFi', 1)], [('twitter.com', 1)])
+    """
+    DIMENSIONS = ["hashtags", "mentions", "url_domains", "screen_names"]
+    _EXTRACTORS = {"hashtags": _hashtags,
+                   "mentions": _mentions,
+                   "url_domains": _url_domains,
+                   "screen_names": _screen_names}
+
+    def __init__(self, capacity=1000, dimensions=None):
+        dimensions = list(self.DIMENSIONS if dimensions is None else dimensions)
+        for dimension in dimensions:
+            if dimension not in self._EXTRACTORS:
+                raise ValueError("unknown dimension: {}".format(dimension))
+        self.capacity = capacity
+        self.summaries = {dimension: SpaceSaving(capacity) for dimension in dimensions}
+
+    def add(self, tweet):
+        """
+        Count the items of one Tweet (or payload dict)
+        """
+        self.add_batch([tweet])
+
+    def add_batch(self, payloads, original_format=None):
+        """
+        Count the items of a batch of Tweets or payload dicts
+
+        Args:
+            payloads (list): Tweet objects or dicts
+            original_format (bool): the format of all of the payloads, if
+                known (see `tweet_parser.getter_methods.batch`)
+        """
+        if not isinstance(payloads, list):
+            payloads = list(payloads)
+        for dimension, summary in self.summaries.items():
+            summary.update_many(self._EXTRACTORS[dimension](payloads, original_format))
+
+    def top(self, dimension, k=10):
+        """
+        The `k` most frequent items of one kind, as (item, count) tuples
+        """
+        return self.summaries[dimension].top(k)
+
+    def merge(self, other):
+        """
+        Add the counts of another `HeavyHitters` (with the same dimensions)
+        """
+        for dimension, summary in self.summaries.items():
+            summary.merge(other.summaries[dimension])
+
+    def report(self, k=10):
+        """
+        The `k` most frequent items of every kind, with the bound on how
+        much each count may be too high
+
+        Returns:
+            dict: for each dimension, a list of ``{"item", "count", "error"}``
+            dicts, largest count first
+        """
+        return {dimension: [{"item": item, "count": count, "error": summary.error(item)}
+                            for item, count in summary.top(k)]
+                for dimension, summary in self.summaries.items()}
+
+    def to_dict(self):
+        """
+        The summaries as a dict of plain lists and numbers (e.g. for JSON)
+        """
+        return {"capacity": self.capacity,
+                "summaries": {dimension: summary.to_dict()
+                              for dimension, summary in self.summaries.items()}}
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Make a `HeavyHitters` from a dict returned by `to_dict`
+        """
+        heavy_hitters = cls(state["capacity"], dimensions=sorted(state["summaries"]))
+        heavy_hitters.summaries = {dimension: SpaceSaving.from_dict(summary)
+                                   for dimension, summary in state["summaries"].items()}
+        return heavy_hitters
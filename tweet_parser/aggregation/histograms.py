@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Tweet volume and engagement per time bucket and language or rule tag
+
+`EngagementHistograms` does the usual group-by-minute job on parsed Tweets
+in one pass, instead of extracting the attributes and aggregating them
+again: for each time bucket (from the snowflake ids, see
+`tweet_parser.aggregation.time_buckets`) and group (the Tweet's ``lang``,
+or each of its matching rule tags), it counts Tweets, Retweets, quote
+Tweets and replies, sums ``retweet_count`` and ``favorite_count``, and
+keeps a `LogHistogram` of the authors' ``follower_count`` for
+percentiles. It is fed batches of payloads: every column of a batch comes
+from one batch getter call (`tweet_parser.getter_methods.batch`), the
+rows are grouped by (bucket, group) once, and the sums are taken per
+group. The result is one row per (bucket, group), written as CSV or
+(with pyarrow installed) Parquet.
+"""
+import collections
+import csv
+import math
+
+from tweet_parser.aggregation.time_buckets import (bucket_seconds, bucket_starts,
+                                                   format_time, get_tweet_ids)
+from tweet_parser.getter_methods import batch
+
+
+class LogHistogram(object):
+    """
+    Counts of non-negative numbers in bins that grow geometrically, for
+    quantiles with a bounded relative error
+
+    A value ``v > 0`` goes into bin ``ceil(log(v) / log(gamma))``, where
+    ``gamma = (1 + relative_accuracy) / (1 - relative_accuracy)``, and
+    zeros (and negative values) are counted separately. Quantiles are
+    within `relative_accuracy` of a value of the right rank, and the
+    number of bins only grows with the log of the largest value (about
+    460 bins for values up to 10 million at 1%).
+
+    Args:
+        relative_accuracy (float): the relative error of the quantiles
+
+    Example:
+        >>> from tweet_parser.aggregation.histograms import LogHistogram
+        >>> followers = LogHistogram(relative_accuracy=0.01)
+        >>> followers.add_many([0, 10, 100, 1000, 10000])
+        >>> round(followers.quantile(0.5))
+        100
+    """
+    def __init__(self, relative_accuracy=0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.zeros = 0
+        self.count = 0
+        self.bins = {}
+
+    def add_many(self, values):
+        """
+        Count every value of an iterable
+        """
+        bins = self.bins
+        log = math.log
+        log_gamma = self._log_gamma
+        ceil = math.ceil
+        for value in values:
+            self.count += 1
+            if value <= 0:
+                self.zeros += 1
+                continue
+            index = int(ceil(log(value) / log_gamma))
+            bins[index] = bins.get(index, 0) + 1
+
+    def quantile(self, q):
+        """
+        The value at quantile `q` (0 to 1), or None if nothing was counted
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                # the value in the middle of the bin, relatively
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def merge(self, other):
+        """
+        Add the counts of another histogram with the same accuracy
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("can't merge LogHistograms with different accuracies")
+        self.zeros += other.zeros
+        self.count += other.count
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+
+    def to_dict(self):
+        return {"relative_accuracy": self.relative_accuracy,
+                "zeros": self.zeros,
+                "bins": sorted(self.bins.items())}
+
+    @classmethod
+    def from_dict(cls, state):
+        histogram = cls(state["relative_accuracy"])
+        histogram.zeros = state["zeros"]
+        histogram.bins = {index: count for index, count in state["bins"]}
+        histogram.count = histogram.zeros + sum(histogram.bins.values())
+        return histogram
+
+
+def _no_groups(payloads, original_format):
+    return [[""]] * len(payloads)
+
+
+def _lang_groups(payloads, original_format):
+    return [[lang or ""] for lang in batch.get_lang_batch(payloads, original_format)]
+
+
+def _rule_groups(payloads, original_format):
+    groups = []
+    for rules in batch.get_matching_rules_batch(payloads, original_format):
+        tags = sorted(set(rule.get("tag") or "" for rule in rules or []))
+        groups.append(tags or [""])
+    return groups
+
+
+_GROUPS = {"lang": _lang_groups, "rule": _rule_groups, None: _no_groups}
+
+
+def get_groups(payloads, group_by, original_format=None):
+    """
+    The groups of every payload of a batch: a list with the Tweet's
+    ``lang`` for "lang", the sorted tags of its matching rules for "rule",
+    or "" for None (a missing language or tag is "")
+
+    Example:
+        >>> from tweet_parser.aggregation.histograms import get_groups
+        >>> get_groups([{"postedTime": "2017-05-24T20:17:19.000Z",
+        ...              "twitter_lang": "en",
+        ...              "gnip": {"matching_rules": [{"tag": "b"}, {"tag": "a"}]}}],
+        ...            "rule")
+        [['a', 'b']]
+    """
+    if group_by not in _GROUPS:
+        raise ValueError("group_by must be 'lang', 'rule' or None")
+    return _GROUPS[group_by](payloads, original_format)
+
+
+class EngagementHistograms(object):
+    """
+    Counts and sums of Tweets per time bucket and group
+
+    Args:
+        bucket (str or int): "minute", "hour", "day" or a number of seconds
+        group_by (str): "lang" (the Tweet's language), "rule" (each of the
+            Tweet's matching rule tags, so a Tweet is counted once for each
+            of its rules) or None (one group, named "")
+        percentiles (list): the percentiles of ``follower_count`` to report
+        relative_accuracy (float): the accuracy of the percentiles (see
+            `LogHistogram`)
+
+    Attributes:
+        cells (dict): for each (bucket start, group), a list of the
+            `COUNTS` followed by a `LogHistogram` of ``follower_count``
+
+    Example:
+        >>> from tweet_parser.aggregation.histograms import EngagementHistograms
+        >>> payloads = [{"created_at": "Wed May 24 20:17:19 +0000 2017",
+        ...              "id_str": "867474613139156993", "lang": "en",
+        ...              "retweet_count": 3, "favorite_count": 5,
+        ...              "in_reply_to_status_id_str": None,
+        ...              "user": {"followers_count": 120}}]
+        >>> histograms = EngagementHistograms(bucket="minute", group_by="lang",
+        ...                                   percentiles=[50])
+        >>> histograms.add_batch(payloads)
+        >>> histograms.columns
+        ['bucket', 'time', 'group', 'tweets', 'retweets', 'quotes', 'replies', 'retweet_count', 'favorite_count', 'follower_count_p50']
+        >>> [row["follower_count_p50"] for row in histograms.rows()]
+        [120]
+    """
+    COUNTS = ["tweets", "retweets", "quotes", "replies", "retweet_count", "favorite_count"]
+
+    def __init__(self, bucket="minute", group_by="lang", percentiles=(50, 90, 99),
+                 relative_accuracy=0.01):
+        if group_by not in _GROUPS:
+            raise ValueError("group_by must be 'lang', 'rule' or None")
+        self.bucket_seconds = bucket_seconds(bucket)
+        self.group_by = group_by
+        self.percentiles = list(percentiles)
+        self.relative_accuracy = relative_accuracy
+        self.cells = {}
+
+    @property
+    def columns(self):
+        """
+        The names of the columns of `rows`
+        """
+        return (["bucket", "time", "group"] + self.COUNTS +
+                ["follower_count_p{}".format(percentile) for percentile in self.percentiles])
+
+    def _cell(self, key):
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = [0] * len(self.COUNTS) + [LogHistogram(self.relative_accuracy)]
+            self.cells[key] = cell
+        return cell
+
+    def add(self, tweet):
+        """
+        Add one Tweet (or payload dict)
+        """
+        self.add_batch([tweet])
+
+    def add_batch(self, payloads, original_format=None):
+        """
+        Add a batch of Tweets or payload dicts
+
+        Args:
+            payloads (list): Tweet objects or dicts
+            original_format (bool): the format of all of the payloads, if
+                known (see `tweet_parser.getter_methods.batch`)
+        """
+        if not isinstance(payloads, list):
+            payloads = list(payloads)
+        starts = bucket_starts(get_tweet_ids(payloads, original_format), self.bucket_seconds)
+        groups = get_groups(payloads, self.group_by, original_format)
+        tweet_types = batch.get_tweet_type_batch(payloads, original_format)
+        replies = batch.get_in_reply_to_status_id_batch(payloads, original_format)
+        retweet_counts = batch.get_retweet_count_batch(payloads, original_format)
+        favorite_counts = batch.get_favorite_count_batch(payloads, original_format)
+        follower_counts = batch.get_follower_count_batch(payloads, original_format)
+        rows = collections.defaultdict(list)
+        for row, (start, row_groups) in enumerate(zip(starts, groups)):
+            for group in row_groups:
+                rows[(start, group)].append(row)
+        for key, key_rows in rows.items():
+            cell = self._cell(key)
+            types = [tweet_types[row] for row in key_rows]
+            cell[0] += len(key_rows)
+            cell[1] += types.count("retweet")
+            cell[2] += types.count("quote")
+            cell[3] += sum(1 for row in key_rows if replies[row] is not None)
+            cell[4] += sum(retweet_counts[row] for row in key_rows)
+            cell[5] += sum(favorite_counts[row] for row in key_rows)
+            cell[6].add_many(follower_counts[row] for row in key_rows)
+
+    def merge(self, other):
+        """
+        Add the cells of another `EngagementHistograms` with the same
+        bucket, grouping and accuracy
+        """
+        if ((other.bucket_seconds, other.group_by, other.relative_accuracy) !=
+                (self.bucket_seconds, self.group_by, self.relative_accuracy)):
+            raise ValueError("can't merge EngagementHistograms with different "
+                             "buckets, groups or accuracies")
+        for key, other_cell in other.cells.items():
+            cell = self._cell(key)
+            for i in range(len(self.COUNTS)):
+                cell[i] += other_cell[i]
+            cell[-1].merge(other_cell[-1])
+
+    def rows(self):
+        """
+        One dict per (bucket, group), in time then group order, with the
+        bucket start in seconds (``bucket``) and as an ISO 8601 time
+        (``time``), the `COUNTS` and the ``follower_count`` percentiles
+        (rounded to whole followers)
+        """
+        rows = []
+        for (start, group), cell in sorted(self.cells.items(), key=lambda item: item[0]):
+            row = {"bucket": start, "time": format_time(start), "group": group}
+            row.update(zip(self.COUNTS, cell))
+            for percentile in self.percentiles:
+                value = cell[-1].quantile(percentile / 100.0)
+                row["follower_count_p{}".format(percentile)] = int(round(value))
+            rows.append(row)
+        return rows
+
+    def report(self):
+        return self.rows()
+
+    def write_csv(self, f, delimiter=","):
+        """
+        Write the `rows` as CSV, with a header line, to a text file
+        """
+        writer = csv.writer(f, delimiter=delimiter, lineterminator="\n")
+        columns = self.columns
+        writer.writerow(columns)
+        for row in self.rows():
+            writer.writerow([row[column] for column in columns])
+
+    def write_parquet(self, where):
+        """
+        Write the `rows` as a Parquet file (requires pyarrow)
+
+        Args:
+            where (str or file): a filename or a binary file
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("writing Parquet requires pyarrow (pip install pyarrow)")
+        rows = self.rows()
+        table = pyarrow.Table.from_pydict({column: [row[column] for row in rows]
+                                           for column in self.columns})
+        pyarrow.parquet.write_table(table, where)
+
+    def to_dict(self):
+        """
+        The cells as a dict of plain lists and numbers (e.g. for JSON)
+        """
+        return {"bucket_seconds": self.bucket_seconds,
+                "group_by": self.group_by,
+                "percentiles": self.percentiles,
+                "relative_accuracy": self.relative_accuracy,
+                "cells": [[start, group, cell[:-1], cell[-1].to_dict()]
+                          for (start, group), cell in sorted(self.cells.items())]}
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Make an `EngagementHistograms` from a dict returned by `to_dict`
+        """
+        histograms = cls(state["bucket_seconds"], state["group_by"], state["percentiles"],
+                         state["relative_accuracy"])
+        for start, group, counts, followers in state["cells"]:
+            histograms.cells[(start, group)] = counts + [LogHistogram.from_dict(followers)]
+        return histograms
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""The user to user network of Retweets, quotes and mentions
+
+`InteractionNetwork` turns each Tweet into weighted, typed edges from its
+author to the author of the Tweet it Retweets ("retweet"), the author of
+the Tweet it quotes ("quote") and each user it @-mentions ("mention"). A
+Retweet only gets its "retweet" edge: the mentions of a Retweet are those
+of the retweeted Tweet, led by its author.
+
+User ids are mapped to dense ids (0, 1, 2, ... in order of first
+appearance), and edges are appended to integer arrays. When the arrays
+hold `max_edges` edges, they are summed by (source, target, type), sorted
+and written to a temporary file (a "run"), and the arrays are emptied, so
+memory holds at most `max_edges` edges (plus the user id map) however long
+the stream. Every `max_runs` runs are merged into one. `edges` merges the
+runs and the arrays into the summed edges, in order, without loading the
+runs into memory, and `write_edge_list` and `csr` / `write_csr` export
+them.
+"""
+from array import array
+import heapq
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from tweet_parser.getter_methods import batch
+from tweet_parser.getter_methods.tweet_embeds import get_quoted_tweet, get_retweeted_tweet
+from tweet_parser.getter_methods.tweet_entities import get_user_mentions
+from tweet_parser.getter_methods.tweet_user import get_user_id
+
+EDGE_TYPES = ["retweet", "quote", "mention"]
+CSR_VERSION = 1
+_READ_EDGES = 65536
+
+
+def get_interactions(tweet, original_format=None):
+    """
+    The users a Tweet interacts with
+
+    Args:
+        tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
+
+    Returns:
+        list of tuples: (edge type index in `EDGE_TYPES`, user id) pairs
+
+    Example:
+        >>> from tweet_parser.aggregation.interaction_network import get_interactions
+        >>> get_interactions({"created_at": "Wed May 24 20:17:19 +0000 2017",
+        ...                   "entities": {"user_mentions": [{"id_str": "2382763597"}]}})
+        [(2, '2382763597')]
+    """
+    retweeted_tweet = get_retweeted_tweet(tweet, original_format)
+    if retweeted_tweet is not None:
+        return [(0, get_user_id(retweeted_tweet, original_format))]
+    interactions = []
+    quoted_tweet = get_quoted_tweet(tweet, original_format)
+    if quoted_tweet is not None:
+        interactions.append((1, get_user_id(quoted_tweet, original_format)))
+    for mention in get_user_mentions(tweet, original_format):
+        interactions.append((2, mention["id_str"]))
+    return interactions
+
+
+def _read_run(path, count):
+    """
+    The (source, target, type, weight) edges of a run, a chunk at a time
+    """
+    with open(path, "rb") as f:
+        while count:
+            n = min(count, _READ_EDGES)
+            values = array("q")
+            values.fromfile(f, 4 * n)
+            count -= n
+            for i in range(0, 4 * n, 4):
+                yield values[i], values[i + 1], values[i + 2], values[i + 3]
+
+
+def _sum_edges(edges):
+    """
+    Sum the weights of consecutive edges with the same (source, target, type)
+    """
+    last = None
+    weight = 0
+    for source, target, edge_type, edge_weight in edges:
+        key = (source, target, edge_type)
+        if key != last:
+            if last is not None:
+                yield last + (weight,)
+            last, weight = key, 0
+        weight += edge_weight
+    if last is not None:
+        yield last + (weight,)
+
+
+def read_csr(path):
+    """
+    Load the matrix written by `InteractionNetwork.write_csr`
+
+    Returns:
+        tuple of arrays: (user_ids, indptr, indices, weights), where the
+        edges of the user with id ``user_ids[i]`` go to the users
+        ``indices[indptr[i]:indptr[i + 1]]``, with the same weights
+    """
+    with open(path, "rb") as f:
+        header = json.loads(f.readline().decode("utf-8"))
+        if header.get("version") != CSR_VERSION:
+            raise ValueError("unknown CSR version {}".format(header.get("version")))
+        columns = []
+        for size in [header["users"], header["users"] + 1, header["edges"], header["edges"]]:
+            values = array("q")
+            values.fromfile(f, size)
+            if header["byteorder"] != sys.byteorder:
+                values.byteswap()
+            columns.append(values)
+    return tuple(columns)
+
+
+class InteractionNetwork(object):
+    """
+    Weighted Retweet, quote and mention edges between users
+
+    Args:
+        max_edges (int): the number of edges kept in memory before they are
+            summed and spilled to disk
+        max_runs (int): the number of runs on disk before they are merged
+            into one
+        spill_dir (str): where to make the directory of runs; defaults to
+            the system's temporary directory
+
+    Attributes:
+        user_ids (array): the user id of each dense id
+
+    Example:
+        >>> from tweet_parser.aggregation.interaction_network import InteractionNetwork
+        >>> payloads = [{"created_at": "Wed May 24 20:17:19 +0000 2017",
+        ...              "user": {"id_str": "10"},
+        ...              "entities": {"user_mentions": [{"id_str": "20"}, {"id_str": "30"}]}},
+        ...             {"created_at": "Wed May 24 20:17:20 +0000 2017",
+        ...              "user": {"id_str": "10"},
+        ...              "entities": {"user_mentions": [{"id_str": "20"}]}}]
+        >>> with InteractionNetwork() as network:
+        ...     network.add_batch(payloads)
+        ...     list(network.edges(user_ids=True))
+        [(10, 20, 'mention', 2), (10, 30, 'mention', 1)]
+    """
+    def __init__(self, max_edges=1000000, max_runs=16, spill_dir=None):
+        if max_edges < 1 or max_runs < 2:
+            raise ValueError("max_edges must be at least 1 and max_runs at least 2")
+        self.max_edges = max_edges
+        self.max_runs = max_runs
+        self.spill_dir = spill_dir
+        self.user_ids = array("q")
+        self._dense_ids = {}
+        self._sources = array("q")
+        self._targets = array("q")
+        self._types = array("b")
+        self._weights = array("q")
+        self._runs = []
+        self._run_dir = None
+        self._run_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Delete the runs from disk, and the edges in them; call this when
+        done with the network, or use it as a context manager
+        """
+        if self._run_dir is not None:
+            shutil.rmtree(self._run_dir, ignore_errors=True)
+            self._run_dir = None
+        self._runs = []
+
+    def _dense_id(self, user_id):
+        user_id = int(user_id)
+        dense_id = self._dense_ids.get(user_id)
+        if dense_id is None:
+            dense_id = self._dense_ids[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+        return dense_id
+
+    def add(self, tweet):
+        """
+        Add one Tweet (or payload dict)
+        """
+        self.add_batch([tweet])
+
+    def add_batch(self, payloads, original_format=None):
+        """
+        Add a batch of Tweets or payload dicts
+
+        Args:
+            payloads (list): Tweet objects or dicts
+            original_format (bool): the format of all of the payloads, if
+                known (see `tweet_parser.getter_methods.batch`)
+        """
+        if not isinstance(payloads, list):
+            payloads = list(payloads)
+        authors = batch.get_user_id_batch(payloads, original_format)
+        interactions = batch.apply_getter(get_interactions, payloads, original_format)
+        for author, tweet_interactions in zip(authors, interactions):
+            if tweet_interactions:
+                source = self._dense_id(author)
+                for edge_type, user_id in tweet_interactions:
+                    self._append(source, self._dense_id(user_id), edge_type, 1)
+
+    def _append(self, source, target, edge_type, weight):
+        self._sources.append(source)
+        self._targets.append(target)
+        self._types.append(edge_type)
+        self._weights.append(weight)
+        if len(self._sources) >= self.max_edges:
+            self._spill()
+
+    def merge(self, other):
+        """
+        Add the edges of another `InteractionNetwork` (e.g. from another
+        worker) to this one
+        """
+        dense_ids = [self._dense_id(user_id) for user_id in other.user_ids]
+        for source, target, edge_type, weight in other.edges():
+            self._append(dense_ids[source], dense_ids[target], edge_type, weight)
+
+    def _buffered_edges(self):
+        """
+        The edges in memory, summed and sorted
+        """
+        weights = {}
+        for key, weight in zip(zip(self._sources, self._targets, self._types), self._weights):
+            weights[key] = weights.get(key, 0) + weight
+        return [key + (weight,) for key, weight in sorted(weights.items())]
+
+    def _write_run(self, edges):
+        if self._run_dir is None:
+            self._run_dir = tempfile.mkdtemp(prefix="interactions", dir=self.spill_dir)
+        path = os.path.join(self._run_dir, "run{}".format(self._run_count))
+        self._run_count += 1
+        count = 0
+        with open(path, "wb") as f:
+            values = array("q")
+            for edge in edges:
+                values.extend(edge)
+                count += 1
+                if len(values) >= 4 * _READ_EDGES:
+                    values.tofile(f)
+                    values = array("q")
+            values.tofile(f)
+        return path, count
+
+    def _spill(self):
+        """
+        Write the edges in memory to a new run, merging the runs when there
+        are `max_runs` of them
+        """
+        self._runs.append(self._write_run(self._buffered_edges()))
+        for values in [self._sources, self._targets, self._types, self._weights]:
+            del values[:]
+        if len(self._runs) >= self.max_runs:
+            runs = self._runs
+            self._runs = [self._write_run(_sum_edges(
+                heapq.merge(*[_read_run(path, count) for path, count in runs])))]
+            for path, _ in runs:
+                os.remove(path)
+
+    def edges(self, user_ids=False):
+        """
+        Every edge, with the weights of the same (source, target, type) summed
+
+        Args:
+            user_ids (bool): give users as their user ids and edge types as
+                names, instead of as dense ids and type indices
+
+        Returns:
+            generator of tuples: (source, target, type, weight), in order of
+            source, target and type (dense ids and type indices)
+        """
+        edges = _sum_edges(heapq.merge(self._buffered_edges(),
+                                       *[_read_run(path, count) for path, count in self._runs]))
+        if not user_ids:
+            return edges
+        return ((self.user_ids[source], self.user_ids[target], EDGE_TYPES[edge_type], weight)
+                for source, target, edge_type, weight in edges)
+
+    def write_edge_list(self, f, delimiter=","):
+        """
+        Write the edges to a text file as CSV rows (after a header row) of
+        source user id, target user id, edge type and weight
+        """
+        f.write(delimiter.join(["source", "target", "type", "weight"]) + "\n")
+        for edge in self.edges(user_ids=True):
+            f.write(delimiter.join(map(str, edge)) + "\n")
+
+    def csr(self, edge_type=None):
+        """
+        The adjacency matrix of the network in CSR form
+
+        Args:
+            edge_type (str): only include the edges of one type from
+                `EDGE_TYPES`; by default the weights of all of the edges
+                between two users are summed
+
+        Returns:
+            tuple of arrays: (indptr, indices, weights), where the edges of
+            dense id ``i`` go to the dense ids ``indices[indptr[i]:indptr[i + 1]]``,
+            in order. The arrays are ``array("q")``, which
+            ``scipy.sparse.csr_matrix((weights, indices, indptr))`` can use.
+        """
+        if edge_type is not None and edge_type not in EDGE_TYPES:
+            raise ValueError("unknown edge type: {}".format(edge_type))
+        type_index = None if edge_type is None else EDGE_TYPES.index(edge_type)
+        edges = ((source, target, 0, weight)
+                 for source, target, edge_type, weight in self.edges()
+                 if type_index is None or edge_type == type_index)
+        indptr = array("q", [0]) * (len(self.user_ids) + 1)
+        indices = array("q")
+        weights = array("q")
+        for source, target, _, weight in _sum_edges(edges):
+            indptr[source + 1] += 1
+            indices.append(target)
+            weights.append(weight)
+        for i in range(len(self.user_ids)):
+            indptr[i + 1] += indptr[i]
+        return indptr, indices, weights
+
+    def write_csr(self, path, edge_type=None):
+        """
+        Atomically replace the file at `path` with `csr` and the user ids (a
+        JSON header line, then the arrays); `read_csr` loads it
+        """
+        indptr, indices, weights = self.csr(edge_type)
+        header = {"version": CSR_VERSION, "byteorder": sys.byteorder,
+                  "users": len(self.user_ids), "edges": len(indices), "edge_type": edge_type}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for values in [self.user_ids, indptr, indices, weights]:
+                values.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(tmp_path, path)
@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Reply conversations as a compact graph
+
+`ReplyGraph` collects one row per Tweet, (status id, id of the Tweet it
+replies to or -1, user id), into three integer arrays (``array("q")``, 8
+bytes per value, instead of a dict of lists of strings). The reply id is
+parsed once as the row is added; for activity streams that is the last
+part of the ``inReplyTo.link`` URL (`get_in_reply_to_status_id_batch`).
+
+Queries use an index of integer arrays, built from the rows the first
+time it's needed and extended with the rows appended since: the sorted
+distinct status ids (including Tweets that were replied to but aren't in
+the data), the parent, root and depth of each, the size and depth of the
+thread of each root, and the replies of each in CSR form (``indptr`` and
+``indices``: the replies of node ``i`` are
+``indices[indptr[i]:indptr[i + 1]]``). Node ``i`` is the ``i``-th smallest
+status id. A reply always has a larger snowflake id than the Tweet it
+replies to, so one pass over the sorted ids finds every Tweet's root and
+depth. Appended rows whose ids are all larger than the indexed ones (the
+usual case) only add nodes at the end; otherwise the new ids are merged
+in and the roots and depths found again, without sorting the old ids.
+"""
+from array import array
+import bisect
+import heapq
+import itertools
+import json
+import os
+import sys
+
+from tweet_parser.aggregation.time_buckets import get_tweet_ids
+from tweet_parser.getter_methods import batch
+
+GRAPH_VERSION = 1
+# the number of ids sorted at once as a list of Python ints
+_SORT_CHUNK = 1 << 16
+
+
+def _int_or_missing(value):
+    return -1 if value is None else int(value)
+
+
+def _sorted_distinct(values):
+    # the distinct values as a sorted array, sorting them in chunks
+    values = iter(values)
+    runs = []
+    while True:
+        run = sorted(set(itertools.islice(values, _SORT_CHUNK)))
+        if not run:
+            break
+        runs.append(array("q", run))
+    if len(runs) == 1:
+        return runs[0]
+    merged = array("q")
+    for value in heapq.merge(*runs):
+        if not merged or merged[-1] != value:
+            merged.append(value)
+    return merged
+
+
+def _is_node(node_ids, status_id):
+    node = bisect.bisect_left(node_ids, status_id)
+    return node < len(node_ids) and node_ids[node] == status_id
+
+
+def _merge_nodes(node_ids, parents, new_ids):
+    """
+    Merge sorted distinct ids into the node ids of an index
+
+    Returns:
+        tuple of arrays: the merged node ids, and the parents of the old
+        nodes under their new numbers (-1 for the new nodes)
+    """
+    merged = array("q")
+    renumbered = array("q", [0]) * len(node_ids)
+    old = 0
+    for value in heapq.merge(node_ids, new_ids):
+        if not merged or merged[-1] != value:
+            merged.append(value)
+        if old < len(node_ids) and node_ids[old] == value:
+            renumbered[old] = len(merged) - 1
+            old += 1
+    merged_parents = array("q", [-1]) * len(merged)
+    for node, parent in enumerate(parents):
+        if parent >= 0:
+            merged_parents[renumbered[node]] = renumbered[parent]
+    return merged, merged_parents
+
+
+class ReplyGraph(object):
+    """
+    Reply edges between Tweets, with thread queries
+
+    Attributes:
+        status_ids (array): the id of the Tweet of each row
+        in_reply_to_status_ids (array): the id of the Tweet it replies to,
+            or -1
+        user_ids (array): the id of its author, or -1
+
+    Example:
+        >>> from tweet_parser.aggregation.reply_graph import ReplyGraph
+        >>> graph = ReplyGraph()
+        >>> graph.append(100)
+        >>> graph.append(101, in_reply_to_status_id=100)
+        >>> graph.append(105, in_reply_to_status_id=101)
+        >>> graph.append(103, in_reply_to_status_id=100)
+        >>> graph.root(105), graph.depth(105), graph.thread_size(105), graph.thread_depth(100)
+        (100, 2, 4, 2)
+        >>> graph.replies(100)
+        [101, 103]
+    """
+    def __init__(self):
+        self.status_ids = array("q")
+        self.in_reply_to_status_ids = array("q")
+        self.user_ids = array("q")
+        self._index = None
+
+    def __len__(self):
+        return len(self.status_ids)
+
+    def append(self, status_id, in_reply_to_status_id=None, user_id=None):
+        """
+        Add one row (ids as ints or strings of digits)
+        """
+        self.status_ids.append(int(status_id))
+        self.in_reply_to_status_ids.append(_int_or_missing(in_reply_to_status_id))
+        self.user_ids.append(_int_or_missing(user_id))
+
+    def add(self, tweet):
+        """
+        Add one Tweet (or payload dict)
+        """
+        self.add_batch([tweet])
+
+    def add_batch(self, payloads, original_format=None):
+        """
+        Add a batch of Tweets or payload dicts
+
+        Args:
+            payloads (list): Tweet objects or dicts
+            original_format (bool): the format of all of the payloads, if
+                known (see `tweet_parser.getter_methods.batch`)
+        """
+        if not isinstance(payloads, list):
+            payloads = list(payloads)
+        self.status_ids.extend(map(int, get_tweet_ids(payloads, original_format)))
+        self.in_reply_to_status_ids.extend(
+            map(_int_or_missing, batch.get_in_reply_to_status_id_batch(payloads, original_format)))
+        self.user_ids.extend(
+            map(_int_or_missing, batch.get_user_id_batch(payloads, original_format)))
+
+    def merge(self, other):
+        """
+        Append the rows of another `ReplyGraph` (e.g. from another worker)
+        """
+        self.status_ids.extend(other.status_ids)
+        self.in_reply_to_status_ids.extend(other.in_reply_to_status_ids)
+        self.user_ids.extend(other.user_ids)
+
+    def _get_index(self):
+        index = self._index
+        if index is None:
+            index = self._index = {"rows": 0, "node_ids": array("q"), "parents": array("q"),
+                                   "roots": array("q"), "depths": array("q"),
+                                   "sizes": array("q"), "max_depths": array("q"), "csr": None}
+        if index["rows"] < len(self):
+            self._update(index)
+        return index
+
+    def _update(self, index):
+        """
+        Extend the index with the rows appended since it was last updated
+        """
+        start = index["rows"]
+        status_ids = self.status_ids[start:]
+        parent_ids = self.in_reply_to_status_ids[start:]
+        new_ids = _sorted_distinct(itertools.chain(
+            status_ids, (parent_id for parent_id in parent_ids if parent_id >= 0)))
+        node_ids = index["node_ids"]
+        extend = True
+        if node_ids:
+            # drop the ids that are already nodes (mostly replied to Tweets)
+            last = node_ids[-1]
+            new_ids = array("q", (new_id for new_id in new_ids
+                                  if new_id > last or not _is_node(node_ids, new_id)))
+            extend = (not new_ids or new_ids[0] > last) and not any(
+                status_id <= last for status_id, parent_id in zip(status_ids, parent_ids)
+                if parent_id >= 0)
+        if extend:
+            # only later ids (as usual for snowflakes), and no new parents for
+            # the old nodes: they keep their numbers, parents, roots and depths
+            first = len(node_ids)
+            node_ids.extend(new_ids)
+            parents = index["parents"]
+            parents.extend(array("q", [-1]) * len(new_ids))
+        else:
+            first = 0
+            node_ids, parents = _merge_nodes(node_ids, index["parents"], new_ids)
+        for status_id, parent_id in zip(status_ids, parent_ids):
+            if parent_id >= 0:
+                parents[bisect.bisect_left(node_ids, status_id, first)] = \
+                    bisect.bisect_left(node_ids, parent_id)
+        # parents come before their replies, so their roots and depths are known
+        n = len(node_ids)
+        if first:
+            roots, depths = index["roots"], index["depths"]
+            sizes, max_depths = index["sizes"], index["max_depths"]
+            for values in [roots, depths, sizes, max_depths]:
+                values.extend(array("q", [0]) * (n - first))
+        else:
+            roots, depths, sizes, max_depths = [array("q", [0]) * n for _ in range(4)]
+        for node in range(first, n):
+            parent = parents[node]
+            if parent < 0:
+                root, depth = node, 0
+            elif parent < node:
+                root, depth = roots[parent], depths[parent] + 1
+            else:
+                root, depth = self._walk_to_root(parents, node)
+            roots[node] = root
+            depths[node] = depth
+            sizes[root] += 1
+            if depth > max_depths[root]:
+                max_depths[root] = depth
+        index.update(rows=len(self), node_ids=node_ids, parents=parents, roots=roots,
+                     depths=depths, sizes=sizes, max_depths=max_depths, csr=None)
+
+    @staticmethod
+    def _walk_to_root(parents, node):
+        # for ids that don't follow snowflake order; stops at a cycle
+        depth = 0
+        seen = set()
+        while parents[node] >= 0 and node not in seen:
+            seen.add(node)
+            node = parents[node]
+            depth += 1
+        return node, depth
+
+    def _get_csr(self):
+        index = self._get_index()
+        if index["csr"] is None:
+            # count the replies of each node, then fill
+            parents = index["parents"]
+            n = len(parents)
+            indptr = array("q", [0]) * (n + 1)
+            for parent in parents:
+                if parent >= 0:
+                    indptr[parent + 1] += 1
+            for node in range(n):
+                indptr[node + 1] += indptr[node]
+            indices = array("q", [0]) * indptr[n]
+            filled = indptr[:n]
+            for node, parent in enumerate(parents):
+                if parent >= 0:
+                    indices[filled[parent]] = node
+                    filled[parent] += 1
+            index["csr"] = (indptr, indices)
+        return index["node_ids"], index["csr"][0], index["csr"][1]
+
+    def _node(self, status_id):
+        node_ids = self._get_index()["node_ids"]
+        status_id = int(status_id)
+        node = bisect.bisect_left(node_ids, status_id)
+        if node == len(node_ids) or node_ids[node] != status_id:
+            raise KeyError(status_id)
+        return node
+
+    def csr(self):
+        """
+        The replies of every Tweet in CSR form
+
+        Returns:
+            tuple of arrays: (node_ids, indptr, indices), where the replies of
+            the Tweet with id ``node_ids[i]`` are the nodes
+            ``indices[indptr[i]:indptr[i + 1]]``. The arrays are
+            ``array("q")``, which ``numpy.frombuffer(a, dtype=numpy.int64)``
+            or ``scipy.sparse.csr_matrix`` can use without copying.
+        """
+        return self._get_csr()
+
+    def replies(self, status_id):
+        """
+        The ids of the direct replies to a Tweet, in id order
+        """
+        node_ids, indptr, indices = self._get_csr()
+        node = self._node(status_id)
+        return [node_ids[reply] for reply in indices[indptr[node]:indptr[node + 1]]]
+
+    def root(self, status_id):
+        """
+        The id of the first Tweet of the thread of a Tweet
+        """
+        index = self._get_index()
+        return index["node_ids"][index["roots"][self._node(status_id)]]
+
+    def depth(self, status_id):
+        """
+        The number of replies between a Tweet and its root (0 for a root)
+        """
+        return self._get_index()["depths"][self._node(status_id)]
+
+    def thread_size(self, status_id):
+        """
+        The number of Tweets in the thread of a Tweet
+        """
+        index = self._get_index()
+        return index["sizes"][index["roots"][self._node(status_id)]]
+
+    def thread_depth(self, status_id):
+        """
+        The depth of the deepest reply in the thread of a Tweet
+        """
+        index = self._get_index()
+        return index["max_depths"][index["roots"][self._node(status_id)]]
+
+    def threads(self, min_size=1):
+        """
+        Iterate over the threads with at least `min_size` Tweets
+
+        Returns:
+            generator of tuples: (root status id, size, depth), in root id order
+        """
+        index = self._get_index()
+        node_ids, sizes, max_depths = index["node_ids"], index["sizes"], index["max_depths"]
+        for root, size in enumerate(sizes):
+            # only roots have a size
+            if size and size >= min_size:
+                yield node_ids[root], size, max_depths[root]
+
+    def save(self, path):
+        """
+        Atomically replace the file at `path` with these rows (a JSON header
+        line, then the three arrays)
+        """
+        header = {"version": GRAPH_VERSION, "byteorder": sys.byteorder, "rows": len(self)}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            self.status_ids.tofile(f)
+            self.in_reply_to_status_ids.tofile(f)
+            self.user_ids.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load the rows saved at `path` by `save`
+        """
+        graph = cls()
+        with open(path, "rb") as f:
+            header = json.loads(f.readline().decode("utf-8"))
+            if header.get("version") != GRAPH_VERSION:
+                raise ValueError("unknown ReplyGraph version {}".format(header.get("version")))
+            for values in [graph.status_ids, graph.in_reply_to_status_ids, graph.user_ids]:
+                values.fromfile(f, header["rows"])
+                if header["byteorder"] != sys.byteorder:
+                    values.byteswap()
+        return graph
+
+    def __getstate__(self):
+        return {"status_ids": self.status_ids,
+                "in_reply_to_status_ids": self.in_reply_to_status_ids,
+                "user_ids": self.user_ids}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._index = None
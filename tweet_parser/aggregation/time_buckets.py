@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Time buckets for the aggregations, from the Tweets' snowflake ids
+
+A Tweet's time is ``Tweet.created_at_seconds``, found from its id (see
+`tweet_parser.getter_methods.tweet_date.snowflake2utc`), and a bucket of
+``n`` seconds starts at a multiple of ``n`` seconds since the epoch.
+"""
+import time
+
+from tweet_parser.getter_methods import batch
+from tweet_parser.getter_methods.tweet_date import snowflake2utc
+
+BUCKETS = {"minute": 60, "hour": 3600, "day": 86400}
+
+
+def bucket_seconds(bucket):
+    """
+    The length in seconds of a bucket given as "minute", "hour", "day" or
+    a number of seconds
+
+    Example:
+        >>> from tweet_parser.aggregation.time_buckets import bucket_seconds
+        >>> bucket_seconds("hour"), bucket_seconds(900)
+        (3600, 900)
+    """
+    if bucket in BUCKETS:
+        return BUCKETS[bucket]
+    if int(bucket) < 1:
+        raise ValueError("bucket must be one of {} or a number of seconds".format(sorted(BUCKETS)))
+    return int(bucket)
+
+
+def _tweet_id(payload, original_format):
+    # as in Tweet.id
+    if original_format:
+        return payload["id_str"]
+    return payload["id"].split(":")[-1]
+
+
+def get_tweet_ids(payloads, original_format=None):
+    """
+    ``Tweet.id`` (as a string) of every payload of a batch of Tweets or dicts
+    """
+    return batch.apply_getter(_tweet_id, payloads, original_format)
+
+
+def bucket_starts(tweet_ids, seconds):
+    """
+    The start of the `seconds` long bucket of each Tweet id
+
+    Example:
+        >>> from tweet_parser.aggregation.time_buckets import bucket_starts
+        >>> bucket_starts(["867474613139156993"], 3600)
+        [1495656000]
+    """
+    starts = []
+    append = starts.append
+    for tweet_id in tweet_ids:
+        created_at = snowflake2utc(tweet_id)
+        append(created_at - created_at % seconds)
+    return starts
+
+
+def format_time(seconds):
+    """
+    Seconds since the epoch as an ISO 8601 UTC time
+    """
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds))
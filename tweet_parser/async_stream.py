@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Parse a live stream of Tweet payloads without blocking the asyncio event loop.
+
+`TweetStream` reads newline-delimited payloads from an `asyncio.StreamReader`
+(or anything with an async ``readline()``, like the body of an aiohttp
+response), skips the blank keep-alive lines that streaming endpoints send,
+and hands batches of lines to an executor, where they are decoded and
+loaded as `Tweet` objects. The event loop only moves bytes.
+
+Batches waiting to be consumed are held in a bounded queue. When it is
+full, the stream stops reading, so the reader's buffer fills and the
+transport stops reading from the socket, pushing back on the sender
+instead of buffering without limit.
+
+This module needs Python 3.5+ (`iter_tweets` needs 3.6+).
+"""
+import asyncio
+
+from tweet_parser.metrics import ParseMetrics
+from tweet_parser.thread_pool import parse_lines
+
+
+class TweetStream(object):
+    """
+    Async iterator over batches of Tweets parsed from a stream
+
+    Args:
+        reader (asyncio.StreamReader): the stream of newline-delimited
+            payloads. Its `limit` must be larger than the longest payload.
+        executor (concurrent.futures.Executor): where lines are decoded and
+            parsed, defaults to the event loop's default thread pool. With a
+            ProcessPoolExecutor, pass `attributes` so that only the
+            projected values (not whole Tweets) are sent back.
+        batch_size (int): maximum number of lines per batch
+        max_pending (int): maximum number of batches parsed or waiting to be
+            consumed before reading pauses
+        flush_interval (float): seconds to wait for more lines before sending
+            a partial batch, so that a slow stream isn't delayed
+        attributes (list): if given, yield dicts of these Tweet attributes
+            (None for attributes that aren't available) instead of Tweets
+        do_format_validation (bool): passed on to `Tweet`
+
+    Attributes:
+        metrics (ParseMetrics): counts of the lines, Tweets, bad JSON lines
+            and non-Tweet payloads in the batches consumed so far
+        keep_alives (int): number of blank lines skipped
+        lines_read (int): number of non-blank lines read from `reader`
+
+    Example:
+        >>> import asyncio
+        >>> from tweet_parser.async_stream import TweetStream
+        >>> async def consume(host, port): # doctest: +SKIP
+        ...     reader, writer = await asyncio.open_connection(host, port, limit=2 ** 20)
+        ...     async with TweetStream(reader) as stream:
+        ...         async for tweets in stream:
+        ...             for tweet in tweets:
+        ...                 print(tweet.id, tweet.all_text)
+    """
+    def __init__(self, reader, executor=None, batch_size=100, max_pending=4,
+                 flush_interval=0.5, attributes=None, do_format_validation=False):
+        self.reader = reader
+        self.executor = executor
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.attributes = list(attributes) if attributes is not None else None
+        self.do_format_validation = do_format_validation
+        self.metrics = ParseMetrics()
+        self.keep_alives = 0
+        self.lines_read = 0
+        self._queue = asyncio.Queue(maxsize=max(1, max_pending))
+        self._reading = None
+        self._done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._reading is None:
+            self._reading = asyncio.ensure_future(self._read())
+        while not self._done:
+            parsed = await self._queue.get()
+            if parsed is None:
+                self._done = True
+                # raise any error from reading the stream
+                await self._reading
+                break
+            results, counts = await parsed
+            self.metrics.add(counts)
+            if results:
+                return results
+        raise StopAsyncIteration
+
+    async def _submit(self, batch):
+        loop = asyncio.get_running_loop()
+        parsed = loop.run_in_executor(self.executor, parse_lines, batch,
+                                      self.attributes, self.do_format_validation)
+        # waits while max_pending batches are queued: this is the backpressure
+        await self._queue.put(parsed)
+
+    async def _read(self):
+        try:
+            await self._read_batches()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await self._queue.put(None)
+            raise
+        await self._queue.put(None)
+
+    async def _read_batches(self):
+        batch = []
+        while True:
+            try:
+                if batch:
+                    line = await asyncio.wait_for(self.reader.readline(),
+                                                  self.flush_interval)
+                else:
+                    line = await self.reader.readline()
+            except asyncio.TimeoutError:
+                await self._submit(batch)
+                batch = []
+                continue
+            if not line:
+                break
+            if not line.strip():
+                self.keep_alives += 1
+                continue
+            self.lines_read += 1
+            batch.append(line)
+            if len(batch) >= self.batch_size:
+                await self._submit(batch)
+                batch = []
+        if batch:
+            await self._submit(batch)
+
+    async def aclose(self):
+        """
+        Stop reading and drop any batches that haven't been consumed
+        """
+        self._done = True
+        if self._reading is not None and not self._reading.done():
+            self._reading.cancel()
+            try:
+                await self._reading
+            except asyncio.CancelledError:
+                pass
+        while not self._queue.empty():
+            parsed = self._queue.get_nowait()
+            if parsed is not None:
+                parsed.cancel()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+async def iter_tweets(reader, **kwargs):
+    """
+    Async generator over the Tweets in a stream, one at a time
+
+    Args:
+        reader (asyncio.StreamReader): the stream of newline-delimited payloads
+        **kwargs: passed on to `TweetStream`
+
+    Example:
+        >>> from tweet_parser.async_stream import iter_tweets
+        >>> async def consume(reader): # doctest: +SKIP
+        ...     async for tweet in iter_tweets(reader):
+        ...         print(tweet.id)
+    """
+    stream = TweetStream(reader, **kwargs)
+    try:
+        async for batch in stream:
+            for tweet in batch:
+                yield tweet
+    finally:
+        await stream.aclose()
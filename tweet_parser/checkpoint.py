@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Checkpoints that let a long parse resume where it stopped.
+
+A checkpoint records the input file, the byte offset just after the last
+input line whose output has been fully written, and the size of the output
+file at that moment. Output is flushed and synced to disk *before* the
+checkpoint file is replaced, and the checkpoint is replaced atomically
+(write to a temporary file, then rename), so a checkpoint never refers
+to output that could have been lost.
+"""
+import json
+import os
+
+
+class Checkpoint(object):
+    """
+    The position of a parse run
+
+    Args:
+        filename (str): the input file being read
+        offset (int): byte offset in `filename` to resume reading from
+        output_offset (int): size of the output file when the checkpoint
+            was taken
+        lines (int): number of input lines read so far (over all files)
+
+    Example:
+        >>> import os, tempfile
+        >>> from tweet_parser.checkpoint import Checkpoint
+        >>> path = os.path.join(tempfile.mkdtemp(), "run.checkpoint")
+        >>> Checkpoint("tweets.json", offset=1024, output_offset=96, lines=3).save(path)
+        >>> Checkpoint.load(path).offset
+        1024
+    """
+    def __init__(self, filename, offset=0, output_offset=0, lines=0):
+        self.filename = filename
+        self.offset = offset
+        self.output_offset = output_offset
+        self.lines = lines
+
+    def to_dict(self):
+        return {"file": self.filename,
+                "offset": self.offset,
+                "output_offset": self.output_offset,
+                "lines": self.lines}
+
+    def save(self, path):
+        """
+        Atomically replace the checkpoint at `path` with this one
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load the checkpoint saved at `path`
+
+        Returns:
+            Checkpoint: the saved checkpoint, or None if there isn't one
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            saved = json.load(f)
+        return cls(saved["file"], offset=saved["offset"],
+                   output_offset=saved["output_offset"], lines=saved["lines"])
+
+
+class Checkpointer(object):
+    """
+    Periodically take checkpoints while writing to an output file
+
+    Args:
+        path (str): where to save the checkpoint
+        output (file): the output file (must support `flush`, `fileno` and `tell`)
+        every (int): minimum number of input lines between checkpoints
+        flush_output (callable): called before each checkpoint to write
+            any output that is still buffered (e.g. `NDJSONWriter.flush`)
+        on_save (callable): called after each checkpoint is saved, to save
+            state that must not get ahead of the checkpoint (e.g. the ids
+            of a `tweet_parser.dedup` id set)
+    """
+    def __init__(self, path, output, every=100000, flush_output=None, on_save=None):
+        self.path = path
+        self.output = output
+        self.every = every
+        self.flush_output = flush_output
+        self.on_save = on_save
+        self._next = every
+
+    def update(self, filename, offset, lines):
+        """
+        Record that input has been processed up to `offset` in `filename`;
+        save a checkpoint if enough lines have been read since the last one
+        and `offset` is somewhere reading can resume from (not None)
+        """
+        if offset is not None and lines >= self._next:
+            self.save(filename, offset, lines)
+
+    def save(self, filename, offset, lines):
+        if self.flush_output is not None:
+            self.flush_output()
+        self.output.flush()
+        os.fsync(self.output.fileno())
+        Checkpoint(filename, offset=offset, output_offset=self.output.tell(),
+                   lines=lines).save(self.path)
+        if self.on_save is not None:
+            self.on_save()
+        self._next = lines + self.every
@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""A resident parse daemon that serves Tweet projections over a Unix socket.
+
+Short-lived producers can send payloads to a warm `ParseDaemon` instead of
+importing and starting up tweet_parser themselves. The protocol is plain
+newline-delimited JSON, so a client needs nothing but a socket:
+
+1. The client connects and sends a projection spec as one JSON line,
+   e.g. ``{"attributes": ["id", "screen_name", "all_text"]}``.
+2. The client then sends Tweet payloads, one per line. A blank line asks
+   the daemon to finish the current batch and send back all of its rows
+   before reading any more input (for request/response style clients).
+3. The daemon sends back one JSON line per payload line, in order: the
+   projected attributes (`NotAvailableError` attributes are null), or
+   ``{"error": "bad_json", "non_tweet" or "parse_error", "message": ...}``.
+4. When the client shuts down its side of the connection, the daemon
+   sends the remaining rows and closes the connection.
+
+Sending ``{"command": "stats"}`` as the spec instead returns one JSON line
+with the stats of the current and recent connections.
+
+Payloads are parsed in batches by a pool of worker processes shared by all
+connections. Each connection has at most `max_pending` batches in the pool;
+when that limit is reached the daemon stops reading from that connection
+until the oldest batch is done, so a client that sends faster than the
+pool can parse is slowed down by the socket's flow control (backpressure)
+instead of filling the daemon's memory.
+"""
+import collections
+import errno
+import json
+import os
+import socket
+import stat
+import threading
+import time
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+
+from tweet_parser.metrics import ParseMetrics
+
+_timer = getattr(time, "perf_counter", time.time)
+
+
+def _parse_batch(args):
+    """
+    Parse one batch of payload lines (in a worker process)
+
+    Returns:
+        tuple: (encoded rows as bytes, `ParseMetrics` counts for the batch)
+    """
+    attributes, lines = args
+    from tweet_parser.tweet import Tweet
+    from tweet_parser.tweet_parser_errors import NotATweetError, NotAvailableError
+    from tweet_parser.ndjson import encode
+    metrics = ParseMetrics()
+    rows = []
+    for line in lines:
+        metrics.lines += 1
+        metrics.bytes += len(line) + 1
+        try:
+            tweet = Tweet(json.loads(line.decode("utf-8")))
+        except (ValueError, UnicodeDecodeError) as error:
+            metrics.bad_json += 1
+            rows.append(encode({"error": "bad_json", "message": str(error)}))
+            continue
+        except (NotATweetError, TypeError) as error:
+            # TypeError: JSON that isn't an object (null, 1, ...)
+            metrics.non_tweets += 1
+            rows.append(encode({"error": "non_tweet", "message": str(error)}))
+            continue
+        metrics.count_tweet(tweet)
+        record = {}
+        try:
+            for attribute in attributes:
+                try:
+                    record[attribute] = getattr(tweet, attribute)
+                except NotAvailableError:
+                    metrics.not_available += 1
+                    record[attribute] = None
+        except Exception as error:
+            # one odd payload shouldn't end the client's connection
+            record = {"error": "parse_error", "message": "{}: {}".format(type(error).__name__, error)}
+        rows.append(encode(record))
+    rows.append(b"")
+    return b"\n".join(rows), metrics.counts()
+
+
+class ConnectionStats(object):
+    """
+    Stats for one client connection
+
+    Attributes:
+        connection_id (int): sequence number of the connection
+        attributes (list): the projection requested
+        metrics (ParseMetrics): lines, bytes, Tweets and errors so far
+        batches (int): number of batches parsed
+        bytes_sent (int): bytes of rows sent back
+        blocked_seconds (float): time spent waiting for the pool because
+            `max_pending` batches were already in progress
+        active (bool): False once the connection is closed
+    """
+    def __init__(self, connection_id, attributes):
+        self.connection_id = connection_id
+        self.attributes = attributes
+        self.metrics = ParseMetrics()
+        self.batches = 0
+        self.bytes_sent = 0
+        self.blocked_seconds = 0.0
+        self.active = True
+        self.start_time = _timer()
+        self.end_time = None
+
+    def to_dict(self):
+        stats = self.metrics.counts()
+        end_time = self.end_time if self.end_time is not None else _timer()
+        stats.update({"connection_id": self.connection_id,
+                      "attributes": self.attributes,
+                      "batches": self.batches,
+                      "bytes_sent": self.bytes_sent,
+                      "blocked_seconds": self.blocked_seconds,
+                      "elapsed_seconds": end_time - self.start_time,
+                      "active": self.active})
+        return stats
+
+
+class _ParseRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        daemon = self.server.parse_daemon
+        line = self.rfile.readline()
+        if not line:
+            # a client (or another daemon checking the socket) that sent nothing
+            return
+        try:
+            spec = json.loads(line.decode("utf-8"))
+            if spec.get("command") == "stats":
+                self.wfile.write(json.dumps(daemon.stats()).encode("utf-8") + b"\n")
+                return
+            attributes = [str(attribute) for attribute in spec["attributes"]]
+            unknown = [attribute for attribute in attributes if not daemon.is_attribute(attribute)]
+            if unknown:
+                raise ValueError("unknown Tweet attributes: {}".format(", ".join(unknown)))
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            self.wfile.write(json.dumps({"error": "bad_spec", "message": str(error)}).encode("utf-8") + b"\n")
+            return
+        stats = daemon.open_connection(attributes)
+        try:
+            self.parse(daemon, attributes, stats)
+        except (IOError, OSError):
+            # the client went away
+            pass
+        finally:
+            daemon.close_connection(stats)
+
+    def parse(self, daemon, attributes, stats):
+        pending = collections.deque()
+
+        def send(result):
+            rows, counts = result.get()
+            self.wfile.write(rows)
+            stats.metrics.add(counts)
+            stats.batches += 1
+            stats.bytes_sent += len(rows)
+
+        def submit(batch):
+            if len(pending) >= daemon.max_pending:
+                start = _timer()
+                send(pending.popleft())
+                stats.blocked_seconds += _timer() - start
+            pending.append(daemon.pool.apply_async(_parse_batch, ((attributes, batch),)))
+            # send whatever is already done without waiting
+            while pending and pending[0].ready():
+                send(pending.popleft())
+
+        batch = []
+        for line in self.rfile:
+            line = line.rstrip(b"\r\n")
+            if line.strip():
+                batch.append(line)
+                if len(batch) >= daemon.batch_size:
+                    submit(batch)
+                    batch = []
+            else:
+                # flush: answer everything received so far
+                if batch:
+                    submit(batch)
+                    batch = []
+                while pending:
+                    send(pending.popleft())
+        if batch:
+            submit(batch)
+        while pending:
+            send(pending.popleft())
+
+
+class _UnixStreamServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _remove_stale_socket(socket_path):
+    # remove a socket left behind by a daemon that didn't exit cleanly, but
+    # nothing else: not a file, and not the socket of a running daemon
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except OSError as error:
+        if error.errno == errno.ENOENT:
+            return
+        raise
+    if stat.S_ISSOCK(mode):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(socket_path)
+        except (IOError, OSError) as error:
+            if error.errno != errno.ECONNREFUSED:
+                raise
+            os.unlink(socket_path)
+            return
+        finally:
+            sock.close()
+        message = "a daemon is already listening on {}"
+    else:
+        message = "{} exists and is not a socket"
+    raise OSError(errno.EADDRINUSE, message.format(socket_path))
+
+
+class ParseDaemon(object):
+    """
+    A pool of Tweet parsing processes serving requests on a Unix socket
+
+    Args:
+        socket_path (str): path of the Unix socket to listen on (a stale
+            socket file there, that no daemon is listening on, is replaced)
+        processes (int): number of worker processes, defaults to the cpu count
+        batch_size (int): number of payload lines per batch sent to a worker
+        max_pending (int): maximum number of batches per connection in the
+            pool at once, before the daemon stops reading from that connection
+        keep_finished (int): number of closed connections to keep stats for
+
+    Raises:
+        OSError: (EADDRINUSE) if something other than a stale socket is at
+            `socket_path`, such as a regular file or a running daemon's socket
+
+    Example:
+        >>> from tweet_parser.daemon import ParseDaemon
+        >>> with ParseDaemon("/tmp/tweet_parser.sock") as daemon: # doctest: +SKIP
+        ...     daemon.serve_forever()
+    """
+    def __init__(self, socket_path, processes=None, batch_size=500, max_pending=4,
+                 keep_finished=100):
+        import multiprocessing
+        _remove_stale_socket(socket_path)
+        self.socket_path = socket_path
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(1, max_pending)
+        self.processes = processes or multiprocessing.cpu_count()
+        # start the workers before any server threads exist
+        self.pool = multiprocessing.Pool(self.processes)
+        self._lock = threading.Lock()
+        self._connections = collections.OrderedDict()
+        self._finished = collections.deque(maxlen=keep_finished)
+        self._next_id = 0
+        self.server = _UnixStreamServer(socket_path, _ParseRequestHandler)
+        self.server.parse_daemon = self
+
+    @staticmethod
+    def is_attribute(name):
+        from tweet_parser.tweet import Tweet
+        return not name.startswith("_") and hasattr(Tweet, name) and not hasattr(dict, name)
+
+    def open_connection(self, attributes):
+        with self._lock:
+            self._next_id += 1
+            stats = ConnectionStats(self._next_id, attributes)
+            self._connections[stats.connection_id] = stats
+        return stats
+
+    def close_connection(self, stats):
+        with self._lock:
+            stats.active = False
+            stats.end_time = _timer()
+            self._connections.pop(stats.connection_id, None)
+            self._finished.append(stats)
+
+    def stats(self):
+        """
+        Stats of the daemon and of its current and recently closed connections
+
+        Returns:
+            dict: "processes", "batch_size", "max_pending" and "connections",
+            a list of `ConnectionStats.to_dict` results (oldest first)
+        """
+        with self._lock:
+            connections = list(self._finished) + list(self._connections.values())
+            return {"processes": self.processes,
+                    "batch_size": self.batch_size,
+                    "max_pending": self.max_pending,
+                    "connections": [stats.to_dict() for stats in connections]}
+
+    def serve_forever(self, poll_interval=0.5):
+        self.server.serve_forever(poll_interval)
+
+    def shutdown(self):
+        """
+        Stop `serve_forever` (call from another thread)
+        """
+        self.server.shutdown()
+
+    def close(self):
+        self.server.server_close()
+        self.pool.terminate()
+        self.pool.join()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _connect(socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(socket_path)
+    return sock
+
+
+def parse_with_daemon(socket_path, lines, attributes):
+    """
+    Send payload lines to a `ParseDaemon` and iterate over the rows it returns
+
+    Payloads are sent from a background thread while rows are read, so any
+    number of lines can be streamed through one connection.
+
+    Args:
+        socket_path (str): the daemon's Unix socket
+        lines (iterable): Tweet payloads (bytes or str), one per item
+        attributes (list): names of the Tweet attributes to return
+
+    Returns:
+        generator of dict: one row per non-blank line, in order
+    """
+    sock = _connect(socket_path)
+    errors = []
+
+    def send():
+        try:
+            sock.sendall(json.dumps({"attributes": list(attributes)}).encode("utf-8") + b"\n")
+            chunk = []
+            for line in lines:
+                if not isinstance(line, bytes):
+                    line = line.encode("utf-8")
+                chunk.append(line.rstrip(b"\r\n"))
+                if len(chunk) >= 1000:
+                    chunk.append(b"")
+                    sock.sendall(b"\n".join(chunk))
+                    chunk = []
+            if chunk:
+                chunk.append(b"")
+                sock.sendall(b"\n".join(chunk))
+            sock.shutdown(socket.SHUT_WR)
+        except (IOError, OSError) as error:
+            errors.append(error)
+
+    sender = threading.Thread(target=send)
+    sender.daemon = True
+    sender.start()
+    row = None
+    finished = False
+    try:
+        with sock.makefile("rb") as rows:
+            try:
+                for line in rows:
+                    row = json.loads(line.decode("utf-8"))
+                    yield row
+            except (IOError, OSError):
+                # a daemon that hangs up on a bad spec can reset the
+                # connection while lines are still being sent
+                if not (isinstance(row, dict) and row.get("error") == "bad_spec"):
+                    raise
+        finished = True
+    finally:
+        if not finished:
+            # the caller stopped reading rows, so the daemon may have stopped
+            # reading lines: unblock the sender's sendall
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except (IOError, OSError):
+                pass
+        sender.join()
+        sock.close()
+    # the daemon hangs up early on a bad spec, which the last row explains
+    if errors and not (isinstance(row, dict) and row.get("error") == "bad_spec"):
+        raise errors[0]
+
+
+def daemon_stats(socket_path):
+    """
+    Ask a `ParseDaemon` for its stats (see `ParseDaemon.stats`)
+    """
+    sock = _connect(socket_path)
+    try:
+        sock.sendall(json.dumps({"command": "stats"}).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as response:
+            return json.loads(response.readline().decode("utf-8"))
+    finally:
+        sock.close()
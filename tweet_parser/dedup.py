@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Drop Tweets whose ids have been seen before, in bounded memory.
+
+Backfills and redelivered streams repeat Tweets across files. A Python set
+of ``Tweet.id`` strings takes over 100 bytes per Tweet; the sets of
+(integer snowflake) Tweet ids here take much less:
+
+- `ExactIdSet` keeps the ids in sorted runs of int64 (8 bytes an id), plus
+  a small set of the most recent ids. Full runs are merged so that there
+  are only about ``log2(n / buffer_size)`` of them to binary search, and
+  as Tweet ids mostly increase, a new run usually just extends the last.
+- `BloomIdSet` is a Bloom filter sized for an expected number of ids and a
+  false positive rate (about 1.8 bytes an id at a rate of 0.001), which
+  never misses a repeated id, but drops that fraction of new Tweets as if
+  they were repeats. The rate goes up if more ids than ``capacity`` are
+  added.
+
+Both can be saved to a file and loaded again (see `open_id_set`), to keep
+dropping repeats across runs over new files. `iter_lines` in
+`tweet_parser.readers` takes one to skip repeated lines.
+"""
+from array import array
+import bisect
+import heapq
+import json
+import math
+import os
+import sys
+
+from tweet_parser.aggregation.time_buckets import get_tweet_ids
+
+ID_SET_VERSION = 1
+MODES = ["exact", "bloom"]
+
+# runs up to this size are merged by sorting them together, which is
+# faster than heapq.merge but briefly needs a list of their ints
+_SORT_MERGE_SIZE = 1 << 22
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(value):
+    # the splitmix64 finalizer, to spread the bits of an id
+    value = (value ^ (value >> 30)) * 0xbf58476d1ce4e5b9 & _MASK64
+    value = (value ^ (value >> 27)) * 0x94d049bb133111eb & _MASK64
+    return value ^ (value >> 31)
+
+
+def _save(path, header, write):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.rename(tmp_path, path)
+
+
+class _BatchMixin(object):
+    # add_batch and filter for a class with an add(tweet_id) method that
+    # returns whether the id is new
+
+    def add_batch(self, payloads, original_format=None):
+        """
+        Add the ids of a batch of Tweets or dicts
+
+        Args:
+            payloads (list): Tweet objects or dicts
+            original_format (bool): the format of all of the payloads, if
+                known (see `tweet_parser.getter_methods.batch`)
+
+        Returns:
+            list of bool: whether each payload's id is new (a repeat within
+            the batch is not)
+        """
+        return [self.add(tweet_id) for tweet_id in get_tweet_ids(payloads, original_format)]
+
+    def filter(self, payloads, original_format=None):
+        """
+        The payloads of a batch whose ids are new, adding their ids
+        """
+        return [payload for payload, new in zip(payloads, self.add_batch(payloads, original_format))
+                if new]
+
+
+class ExactIdSet(_BatchMixin):
+    """
+    Exactly the Tweet ids that have been added
+
+    Args:
+        buffer_size (int): the number of ids kept in a set before they're
+            sorted into a run
+
+    Example:
+        >>> from tweet_parser.dedup import ExactIdSet
+        >>> seen = ExactIdSet()
+        >>> [seen.add(tweet_id) for tweet_id in [3, 1, "3", 2, 1]]
+        [True, True, False, True, False]
+        >>> len(seen), 2 in seen
+        (3, True)
+    """
+    def __init__(self, buffer_size=65536):
+        self.buffer_size = buffer_size
+        self._buffer = set()
+        # sorted int64 runs, the largest first
+        self._runs = []
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, tweet_id):
+        tweet_id = int(tweet_id)
+        if tweet_id in self._buffer:
+            return True
+        for run in self._runs:
+            if run[0] <= tweet_id <= run[-1]:
+                index = bisect.bisect_left(run, tweet_id)
+                if run[index] == tweet_id:
+                    return True
+        return False
+
+    def add(self, tweet_id):
+        """
+        Add a Tweet id (int or str)
+
+        Returns:
+            bool: True if the id is new, False if it has been added before
+        """
+        tweet_id = int(tweet_id)
+        if tweet_id in self:
+            return False
+        self._buffer.add(tweet_id)
+        self._count += 1
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+        return True
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        run = array("q", sorted(self._buffer))
+        self._buffer = set()
+        runs = self._runs
+        while runs and (len(runs[-1]) <= len(run) or runs[-1][-1] < run[0]):
+            last = runs.pop()
+            if last[-1] < run[0]:
+                # ids that all come after the last run's
+                last.extend(run)
+                run = last
+            elif len(last) + len(run) <= _SORT_MERGE_SIZE:
+                run = array("q", sorted(last + run))
+            else:
+                run = array("q", heapq.merge(last, run))
+        runs.append(run)
+
+    def save(self, path):
+        """
+        Atomically replace the file at `path` with these ids (a JSON header
+        line, then the sorted runs)
+        """
+        self._flush()
+        header = {"version": ID_SET_VERSION, "mode": "exact", "byteorder": sys.byteorder,
+                  "buffer_size": self.buffer_size, "runs": [len(run) for run in self._runs]}
+
+        def write(f):
+            for run in self._runs:
+                run.tofile(f)
+        _save(path, header, write)
+
+    @classmethod
+    def _load(cls, f, header):
+        ids = cls(buffer_size=header["buffer_size"])
+        for size in header["runs"]:
+            run = array("q")
+            run.fromfile(f, size)
+            if header["byteorder"] != sys.byteorder:
+                run.byteswap()
+            ids._runs.append(run)
+            ids._count += size
+        return ids
+
+
+class BloomIdSet(_BatchMixin):
+    """
+    A Bloom filter of Tweet ids: an id that has been added is always
+    found, and one that hasn't is found with a probability of about
+    `error_rate` (while there are at most `capacity` ids)
+
+    Args:
+        capacity (int): the number of ids expected
+        error_rate (float): the false positive rate at `capacity` ids; the
+            filter takes about ``-capacity * ln(error_rate) / ln(2) ** 2``
+            bits
+
+    Example:
+        >>> from tweet_parser.dedup import BloomIdSet
+        >>> seen = BloomIdSet(capacity=1000, error_rate=0.01)
+        >>> [seen.add(tweet_id) for tweet_id in [3, 1, "3", 2, 1]]
+        [True, True, False, True, False]
+        >>> seen.size_bytes()
+        1199
+    """
+    def __init__(self, capacity=100000000, error_rate=0.001):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive, and error_rate between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, int(round(self.bits / float(capacity) * math.log(2))))
+        self._filter = bytearray((self.bits + 7) // 8)
+        self._count = 0
+
+    def __len__(self):
+        """
+        The number of ids added that weren't found (so it misses the new
+        ids that were false positives)
+        """
+        return self._count
+
+    def size_bytes(self):
+        return len(self._filter)
+
+    def _positions(self, tweet_id):
+        # double hashing: the i-th position is h1 + i * h2 (mod bits)
+        first = _mix64(tweet_id & _MASK64)
+        second = _mix64(first) | 1
+        bits = self.bits
+        return [(first + i * second) % bits for i in range(self.hashes)]
+
+    def __contains__(self, tweet_id):
+        bloom = self._filter
+        return all(bloom[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(int(tweet_id)))
+
+    def add(self, tweet_id):
+        """
+        Add a Tweet id (int or str)
+
+        Returns:
+            bool: True if the id wasn't found, False if it was (it has been
+            added before, or is a false positive)
+        """
+        bloom = self._filter
+        new = False
+        for position in self._positions(int(tweet_id)):
+            byte, bit = position >> 3, 1 << (position & 7)
+            if not bloom[byte] & bit:
+                bloom[byte] |= bit
+                new = True
+        self._count += new
+        return new
+
+    def save(self, path):
+        """
+        Atomically replace the file at `path` with this filter (a JSON
+        header line, then the bits)
+        """
+        header = {"version": ID_SET_VERSION, "mode": "bloom", "capacity": self.capacity,
+                  "error_rate": self.error_rate, "count": self._count}
+        _save(path, header, lambda f: f.write(self._filter))
+
+    @classmethod
+    def _load(cls, f, header):
+        ids = cls(capacity=header["capacity"], error_rate=header["error_rate"])
+        ids._filter = bytearray(f.read())
+        if len(ids._filter) != (ids.bits + 7) // 8:
+            raise ValueError("truncated BloomIdSet file")
+        ids._count = header["count"]
+        return ids
+
+
+def load_id_set(path):
+    """
+    Load an `ExactIdSet` or a `BloomIdSet` saved at `path`
+    """
+    with open(path, "rb") as f:
+        header = json.loads(f.readline().decode("utf-8"))
+        if header.get("version") != ID_SET_VERSION:
+            raise ValueError("unknown id set version {}".format(header.get("version")))
+        if header["mode"] == "exact":
+            return ExactIdSet._load(f, header)
+        return BloomIdSet._load(f, header)
+
+
+def open_id_set(path=None, mode="exact", **kwargs):
+    """
+    The id set saved at `path` if there is one, or else a new one
+
+    Args:
+        path (str): a file saved by `ExactIdSet.save` or `BloomIdSet.save`,
+            or None
+        mode (str): "exact" or "bloom", for a new id set
+        kwargs: passed on to a new `ExactIdSet` or `BloomIdSet`
+
+    Returns:
+        ExactIdSet or BloomIdSet: the id set (a saved one is loaded as it
+        was saved, whatever `mode` is)
+
+    Example:
+        >>> import os, tempfile
+        >>> from tweet_parser.dedup import open_id_set
+        >>> path = os.path.join(tempfile.mkdtemp(), "seen.ids")
+        >>> seen = open_id_set(path)
+        >>> seen.add(867474613139156993)
+        True
+        >>> seen.save(path)
+        >>> open_id_set(path).add("867474613139156993")
+        False
+    """
+    if mode not in MODES:
+        raise ValueError("mode must be one of {}".format(MODES))
+    if path is not None and os.path.exists(path):
+        return load_id_set(path)
+    if mode == "exact":
+        return ExactIdSet(**kwargs)
+    return BloomIdSet(**kwargs)
@@ -1,7 +1,7 @@
 # https://stackoverflow.com/questions/2536307/decorators-in-the-python-standard-lib-deprecated-specifically
 
 import functools
-import inspect
+import types
 import warnings
 
 string_types = (type(b''), type(u''))
@@ -28,7 +28,7 @@ def deprecated(reason):
 
         def decorator(func1):
 
-            if inspect.isclass(func1):
+            if isinstance(func1, type):
                 fmt1 = "Call to deprecated class {name} ({reason})."
             else:
                 fmt1 = "Call to deprecated function {name} ({reason})."
@@ -48,7 +48,7 @@ def deprecated(reason):
 
         return decorator
 
-    elif inspect.isclass(reason) or inspect.isfunction(reason):
+    elif isinstance(reason, (type, types.FunctionType)):
 
         # The @deprecated is used without any 'reason'.
         #
@@ -60,7 +60,7 @@ def deprecated(reason):
 
         func2 = reason
 
-        if inspect.isclass(func2):
+        if isinstance(func2, type):
             fmt2 = "Call to deprecated class {name}."
         else:
             fmt2 = "Call to deprecated function {name}."
@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Batch versions of the getters, for lists of Tweet payloads
+
+Each ``get_<property>_batch(payloads, original_format=None)`` returns a
+list with the value of the getter ``get_<property>`` for every payload
+(a Tweet or a plain dict), in order. The payloads are split by format
+once, and each group goes through a list comprehension written for that
+format, instead of checking the format on every call. Pass
+``original_format`` if all of the payloads are known to be in one format.
+Batches that mix the two formats still need one check per payload and a
+merge, so they gain little over calling the scalar getters; batch by
+source file (a file holds one format) where possible.
+
+Like the scalar getters, a batch getter raises the first error that any
+payload raises (e.g. `NotAvailableError` from `get_quote_count_batch` if
+any payload is in activity-streams format). The count getters can return
+NumPy arrays instead of lists with ``as_array=True`` (NumPy is only
+imported then, and isn't a requirement of tweet_parser).
+`apply_getter` runs any other getter over a batch with the format found
+once per payload.
+"""
+from itertools import compress
+from operator import not_
+
+from tweet_parser.tweet_parser_errors import NotATweetError
+from tweet_parser.getter_methods.tweet_entities import get_hashtags
+
+
+def original_format_flags(payloads):
+    """
+    The format of every payload (see `tweet_checking.is_original_format`)
+
+    Args:
+        payloads (list): Tweet objects or dicts
+
+    Returns:
+        list of bool: True for original format, False for activity streams
+
+    Raises:
+        NotATweetError: if a payload has neither "created_at" nor "postedTime"
+
+    Example:
+        >>> from tweet_parser.getter_methods.batch import original_format_flags
+        >>> original_format_flags([{"created_at": "Wed May 24 20:17:19 +0000 2017"},
+        ...                        {"postedTime": "2017-05-24T20:17:19.000Z"}])
+        [True, False]
+    """
+    flags = ["created_at" in payload for payload in payloads]
+    if not all(flags):
+        _check_activity_streams(compress(payloads, map(not_, flags)))
+    return flags
+
+
+def _check_activity_streams(payloads):
+    for payload in payloads:
+        if "postedTime" not in payload:
+            raise NotATweetError("This dict has neither 'created_at' or 'postedTime' as keys")
+
+
+def _batch(payloads, original_format, original_format_values, activity_streams_values):
+    """
+    Run `original_format_values` over the original format payloads and
+    `activity_streams_values` over the others (each takes a list of
+    payloads and returns a list of values), and merge the results back
+    into the order of `payloads`
+    """
+    if not isinstance(payloads, list):
+        payloads = list(payloads)
+    if original_format is not None:
+        if original_format:
+            return original_format_values(payloads)
+        return activity_streams_values(payloads)
+    flags = ["created_at" in payload for payload in payloads]
+    if all(flags):
+        return original_format_values(payloads)
+    if not any(flags):
+        _check_activity_streams(payloads)
+        return activity_streams_values(payloads)
+    activity_streams = list(compress(payloads, map(not_, flags)))
+    _check_activity_streams(activity_streams)
+    # the split and the merge are done by itertools and map, not a Python loop
+    values = [iter(activity_streams_values(activity_streams)),
+              iter(original_format_values(list(compress(payloads, flags))))]
+    return list(map(next, map(values.__getitem__, flags)))
+
+
+def _to_array(values, as_array):
+    if not as_array:
+        return values
+    import numpy
+    return numpy.array(values, dtype=numpy.int64)
+
+
+def apply_getter(getter, payloads, original_format=None):
+    """
+    Run any getter over a batch of payloads, finding the format of each
+    payload once (or not at all, if `original_format` is given) and passing
+    it on to the getter
+
+    Args:
+        getter (function): a function from `tweet_parser.getter_methods`
+        payloads (list): Tweet objects or dicts
+        original_format (bool): the format of all of the payloads, if known
+
+    Returns:
+        list: ``getter(payload)`` for every payload
+
+    Example:
+        >>> from tweet_parser.getter_methods.batch import apply_getter
+        >>> from tweet_parser.getter_methods.tweet_text import get_all_text
+        >>> apply_getter(get_all_text, [
+        ...     {"created_at": "Wed May 24 20:17:19 +0000 2017",
+        ...      "truncated": False, "text": "some tweet text"},
+        ...     {"postedTime": "2017-05-24T20:17:19.000Z", "verb": "post",
+        ...      "body": "some other tweet text"}])
+        ['some tweet text', 'some other tweet text']
+    """
+    return _batch(payloads, original_format,
+                  lambda group: [getter(p, original_format=True) for p in group],
+                  lambda group: [getter(p, original_format=False) for p in group])
+
+
+def get_user_id_batch(payloads, original_format=None):
+    """
+    `tweet_user.get_user_id` for every payload
+
+    Example:
+        >>> from tweet_parser.getter_methods.batch import get_user_id_batch
+        >>> get_user_id_batch([
+        ...     {"created_at": "Wed May 24 20:17:19 +0000 2017",
+        ...      "user": {"id_str": "815279070241955840"}},
+        ...     {"postedTime": "2017-05-24T20:17:19.000Z",
+        ...      "actor": {"id": "id:twitter.com:815279070241955840"}}])
+        ['815279070241955840', '815279070241955840']
+    """
+    return _batch(payloads, original_format,
+                  lambda group: [p["user"]["id_str"] for p in group],
+                  lambda group: [p["actor"]["id"].split(":")[-1] for p in group])
+
+
+def get_screen_name_batch(payloads, original_format=None):
+    """
+    `tweet_user.get_screen_name` for every payload
+    """
+    return _batch(payloads, original_format,
+                  lambda group: [p["user"]["screen_name"] for p in group],
+                  lambda group: [p["actor"]["preferredUsername"] for p in group])
+
+
+def get_name_batch(payloads, original_format=None):
+    """
+    `tweet_user.get_name` for every payload
+    """
+    return _batch(payloads, original_format,
+                  lambda group: [p["user"]["name"] for p in group],
+                  lambda group: [p["actor"]["displayName"] for p in group])
+
+
+def get_bio_batch(payloads, original_format=None):
+    """
+    `tweet_user.get_bio` for every payload
+    """
+    def bios(group, user_key, bio_key):
+        bios = [p[user_key].get(bio_key, "") for p in group]
+        return ["" if bio is None else bio for bio in bios]
+    return _batch(payloads, original_format,
+                  lambda group: bios(group, "user", "description"),
+                  lambda group: bios(group, "actor", "summary"))
+
+
+def get_follower_count_batch(payloads, original_format=None, as_array=False):
+    """
+    `tweet_user.get_follower_count` for every payload (as a NumPy int64
+    array if `as_array`)
+    """
+    return _to_array(_batch(payloads, original_format,
+                            lambda group: [p["user"]["followers_count"] for p in group],
+                            lambda group: [p["actor"]["followersCount"] for p in group]),
+                     as_array)
+
+
+def get_following_count_batch(payloads, original_format=None, as_array=False):
+    """
+    `tweet_user.get_following_count` for every payload (as a NumPy int64
+    array if `as_array`)
+    """
+    return _to_array(_batch(payloads, original_format,
+                            lambda group: [p["user"]["friends_count"] for p in group],
+                            lambda group: [p["actor"]["friendsCount"] for p in group]),
+                     as_array)
+
+
+def get_retweet_count_batch(payloads, original_format=None, as_array=False):
+    """
+    `tweet_counts.get_retweet_count` for every payload (as a NumPy int64
+    array if `as_array`)
+
+    Example:
+        >>> from tweet_parser.getter_methods.batch import get_retweet_count_batch
+        >>> get_retweet_count_batch([
+        ...     {"created_at": "Wed May 24 20:17:19 +0000 2017", "retweet_count": 2},
+        ...     {"postedTime": "2017-05-24T20:17:19.000Z", "retweetCount": 3},
+        ...     {"created_at": "Wed May 24 20:17:19 +0000 2017"}])
+        [2, 3, 0]
+    """
+    return _to_array(_batch(payloads, original_format,
+                            lambda group: [p.get("retweet_count", 0) for p in group],
+                            lambda group: [p.get("retweetCount", 0) for p in group]),
+                     as_array)
+
+
+def get_favorite_count_batch(payloads, original_format=None, as_array=False):
+    """
+    `tweet_counts.get_favorite_count` for every payload (as a NumPy int64
+    array if `as_array`)
+    """
+    return _to_array(_batch(payloads, original_format,
+                            lambda group: [p.get("favorite_count", 0) for p in group],
+                            lambda group: [p.get("favoritesCount", 0) for p in group]),
+                     as_array)
+
+
+def get_quote_count_batch(payloads, original_format=None, as_array=False):
+    """
+    `tweet_counts.get_quote_count` for every payload (as a NumPy int64
+    array if `as_array`)
+
+    Raises:
+        NotAvailableError: if any payload is in activity-streams format
+    """
+    from tweet_parser.getter_methods.tweet_counts import get_quote_count
+
+    def activity_streams_counts(group):
+        # raises NotAvailableError, like the scalar getter
+        return [get_quote_count(p, False) for p in group]
+    return _to_array(_batch(payloads, original_format,
+                            lambda group: [p.get("quote_count", 0) for p in group],
+                            activity_streams_counts),
+                     as_array)
+
+
+def get_text_batch(payloads, original_format=None):
+    """
+    `tweet_text.get_text` for every payload
+    """
+    return _batch(payloads, original_format,
+                  lambda group: [p["text"] for p in group],
+                  lambda group: [p["body"] for p in group])
+
+
+def get_full_text_batch(payloads, original_format=None):
+    """
+    `tweet_text.get_full_text` for every payload
+    """
+    return _batch(payloads, original_format,
+                  lambda group: [p["extended_tweet"]["full_text"] if p["truncated"] else p["text"]
+                                 for p in group],
+                  lambda group: [p["long_object"]["body"] if "long_object" in p else p["body"]
+                                 for p in group])
+
+
+def get_tweet_type_batch(payloads, original_format=None):
+    """
+    `tweet_text.get_tweet_type` for every payload
+    """
+    return _batch(payloads, original_format,
+                  lambda group: ["retweet" if "retweeted_status" in p else
+                                 "quote" if "quoted_status" in p else
+                                 "tweet" for p in group],
+                  lambda group: ["retweet" if p["verb"] == "share" else
+                                 "quote" if "twitter_quoted_status" in p else
+                                 "tweet" for p in group])
+
+
+def get_lang_batch(payloads, original_format=None):
+    """
+    `tweet_text.get_lang` for every payload
+
+    Example:
+        >>> from tweet_parser.getter_methods.batch import get_lang_batch
+        >>> get_lang_batch([{"created_at": "Wed May 24 20:17:19 +0000 2017", "lang": "en"},
+        ...                 {"postedTime": "2017-05-24T20:17:19.000Z", "twitter_lang": "und"}])
+        ['en', None]
+    """
+    def langs(group, lang_key):
+        langs = [p[lang_key] for p in group]
+        return [None if lang is None or lang == "und" else lang for lang in langs]
+    return _batch(payloads, original_format,
+                  lambda group: langs(group, "lang"),
+                  lambda group: langs(group, "twitter_lang"))
+
+
+def get_in_reply_to_status_id_batch(payloads, original_format=None):
+    """
+    `tweet_reply.get_in_reply_to_status_id` for every payload
+    """
+    def activity_streams_ids(group):
+        replies = [p.get("inReplyTo", None) for p in group]
+        return [None if reply is None else reply["link"].split("/")[-1] for reply in replies]
+    return _batch(payloads, original_format,
+                  lambda group: [p["in_reply_to_status_id_str"] for p in group],
+                  activity_streams_ids)
+
+
+def get_in_reply_to_screen_name_batch(payloads, original_format=None):
+    """
+    `tweet_reply.get_in_reply_to_screen_name` for every payload
+    """
+    def activity_streams_names(group):
+        replies = [p.get("inReplyTo", None) for p in group]
+        return [None if reply is None else reply["link"].split("/")[-3] for reply in replies]
+    return _batch(payloads, original_format,
+                  lambda group: [p["in_reply_to_screen_name"] for p in group],
+                  activity_streams_names)
+
+
+def get_hashtags_batch(payloads, original_format=None):
+    """
+    `tweet_entities.get_hashtags` for every payload
+    """
+    def hashtags(group, entities_key, original_format):
+        values = []
+        append = values.append
+        for p in group:
+            # Retweets take their entities from the retweeted Tweet
+            if ("retweeted_status" in p) if original_format else (p["verb"] == "share"):
+                append(get_hashtags(p, original_format))
+                continue
+            tags = p.get(entities_key, []).get("hashtags")
+            append([tag["text"] for tag in tags] if tags else [])
+        return values
+    return _batch(payloads, original_format,
+                  lambda group: hashtags(group, "entities", True),
+                  lambda group: hashtags(group, "twitter_entities", False))
+
+
+def get_matching_rules_batch(payloads, original_format=None):
+    """
+    `gnip_fields.get_matching_rules` for every payload
+    """
+    def activity_streams_rules(group):
+        gnips = [p.get("gnip") for p in group]
+        return [gnip.get("matching_rules") if gnip else None for gnip in gnips]
+    return _batch(payloads, original_format,
+                  lambda group: [p.get("matching_rules") for p in group],
+                  activity_streams_rules)
@@ -4,12 +4,14 @@
 from tweet_parser.tweet_checking import is_original_format
 
 
-def get_matching_rules(tweet):
+def get_matching_rules(tweet, original_format=None):
     """
     Retrieves the matching rules for a tweet with a gnip field enrichment.
 
     Args:
         tweet (Tweet): the tweet
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         list: potential ``[{"tag": "user_tag", "value": "rule_value"}]`` 
@@ -19,7 +21,9 @@ def get_matching_rules(tweet):
         http://support.gnip.com/enrichments/matching_rules.html
 
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         rules = tweet.get("matching_rules")
     else:
         gnip = tweet.get("gnip")
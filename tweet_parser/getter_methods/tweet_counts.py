@@ -11,12 +11,14 @@ retweets, favs, and quotes. It is unlikely to be extended.
 from tweet_parser.tweet_checking import is_original_format
 from tweet_parser.tweet_parser_errors import NotAvailableError
 
-def get_retweet_count(tweet):
+def get_retweet_count(tweet, original_format=None):
     """
     Gets the retweet count for this tweet.
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         int: The number of times the Tweet has been retweeted
@@ -34,18 +36,22 @@ def get_retweet_count(tweet):
         >>> get_retweet_count(activity_streams_tweet)
         3
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         return tweet.get("retweet_count", 0)
     else:
         return tweet.get("retweetCount", 0)
 
 
-def get_favorite_count(tweet):
+def get_favorite_count(tweet, original_format=None):
     """
     Gets the favorite count for this tweet.
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         int: The number of times the Tweet has been favorited
@@ -63,19 +69,23 @@ def get_favorite_count(tweet):
         >>> get_favorite_count(activity_streams_tweet)
         3
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         return tweet.get("favorite_count", 0)
     else:
         return tweet.get("favoritesCount", 0)
 
 
-def get_quote_count(tweet):
+def get_quote_count(tweet, original_format=None):
     """
     Gets the quote count for this tweet. \n 
     Note that this is unavailable in activity-streams format
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         int: The number of times the Tweet has been quoted
@@ -89,7 +99,9 @@ def get_quote_count(tweet):
         >>> get_quote_count(tweet)
         2
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         return tweet.get("quote_count", 0)
     else:
         raise NotAvailableError("Quote counts are only available in original format")
@@ -5,13 +5,15 @@ from tweet_parser.tweet_checking import is_original_format
 from tweet_parser.getter_methods.tweet_text import get_tweet_type
 
 
-def get_quoted_tweet(tweet):
+def get_quoted_tweet(tweet, original_format=None):
     """
     Get the quoted Tweet and return it as a dictionary
     If the Tweet is not a quote Tweet, return None
 
     Args:
         tweet (Tweet or dict): A Tweet object or a dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         dict: A dictionary representing the quoted status
@@ -19,8 +21,10 @@ def get_quoted_tweet(tweet):
         - For original format, this is the value of "quoted_status" \n
         - For activity streams, this is the value of "twitter_quoted_status"
     """
-    if get_tweet_type(tweet) == "quote":
-        if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if get_tweet_type(tweet, original_format) == "quote":
+        if original_format:
             return tweet["quoted_status"]
         else:
             return tweet["twitter_quoted_status"]
@@ -29,13 +33,15 @@ def get_quoted_tweet(tweet):
         return None
 
 
-def get_retweeted_tweet(tweet):
+def get_retweeted_tweet(tweet, original_format=None):
     """
     Get the retweeted Tweet and return it as a dictionary
     If the Tweet is not a Retweet, return None
 
     Args:
         tweet (Tweet or dict): A Tweet object or a dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         dict: A dictionary representing the retweeted status
@@ -43,8 +49,10 @@ def get_retweeted_tweet(tweet):
         - For original format, this is the value of "retweeted_status" \n
         - For activity streams, If the Tweet is a Retweet this is the value of the key "object"
     """
-    if get_tweet_type(tweet) == "retweet":
-        if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if get_tweet_type(tweet, original_format) == "retweet":
+        if original_format:
             return tweet["retweeted_status"]
         else:
             return tweet["object"]
@@ -52,20 +60,22 @@ def get_retweeted_tweet(tweet):
         return None
 
 
-def get_embedded_tweet(tweet):
+def get_embedded_tweet(tweet, original_format=None):
     """
     Get the retweeted Tweet OR the quoted Tweet and return it as a dictionary
 
     Args:
-        tweet (Tweet): A Tweet object (not simply a dict)
+        tweet (Tweet or dict): A Tweet object or a dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         dict (or None, if the Tweet is neither a quote tweet or a Retweet):
         a dictionary representing the quote Tweet or the Retweet
     """
-    if tweet.retweeted_tweet is not None:
-        return tweet.retweeted_tweet
-    elif tweet.quoted_tweet is not None:
-        return tweet.quoted_tweet
-    else:
-        return None
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    retweeted_tweet = get_retweeted_tweet(tweet, original_format)
+    if retweeted_tweet is not None:
+        return retweeted_tweet
+    return get_quoted_tweet(tweet, original_format)
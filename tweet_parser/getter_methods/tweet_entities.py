@@ -5,7 +5,7 @@ from tweet_parser.tweet_checking import is_original_format
 from tweet_parser.getter_methods.tweet_embeds import get_retweeted_tweet
 from tweet_parser.getter_methods.tweet_text import get_tweet_type
 
-def get_entities(tweet):
+def get_entities(tweet, original_format=None):
     """
     Helper function to simply grabbing the entities. \n
     Caveat: In the case of Retweets, a Retweet is stored as
@@ -18,6 +18,8 @@ def get_entities(tweet):
 
     Args:
         tweet (Tweet or dict): Tweet in question
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         dict: dictionary of potential entities.
@@ -37,11 +39,12 @@ def get_entities(tweet):
         >>> get_entities(original)
         {'user_mentions': [{'indices': [14, 26], 'id_str': '2382763597', 'screen_name': 'notFromShrek', 'name': 'Fiona', 'id': 2382763597}]}
         """
-
-    entity_key = "entities" if is_original_format(tweet) else "twitter_entities"
-    if get_tweet_type(tweet) == "retweet":
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    entity_key = "entities" if original_format else "twitter_entities"
+    if get_tweet_type(tweet, original_format) == "retweet":
         retweet_entities = tweet.get(entity_key, [])
-        all_entities = get_retweeted_tweet(tweet).get(entity_key,[]).copy()
+        all_entities = get_retweeted_tweet(tweet, original_format).get(entity_key,[]).copy()
         # the only thing that the Retweet will have that the Retweeted Tweet
         # won't have is the @-mention of the RTd user at the front ("RT @someone:")
         # I'm going to add that in, so the the Retweet's entities are a superset
@@ -53,7 +56,7 @@ def get_entities(tweet):
         return tweet.get(entity_key, [])
 
 
-def get_media_entities(tweet):
+def get_media_entities(tweet, original_format=None):
     """
     Grabs all the media entities from a tweet, which are contained in the
     "extended_entities" or "twitter_extended_entities" field depending on the
@@ -64,6 +67,8 @@ def get_media_entities(tweet):
 
     Args:
         tweet (Tweet or dict): the tweet in question
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         list or None: the list of dicts containing each media's metadata in the
@@ -107,19 +112,22 @@ def get_media_entities(tweet):
         >>> get_media_entities(tweet)
         [{'display_url': 'pic.twitter.com/something', 'expanded_url': 'https://twitter.com/something', 'id': 4242, 'id_str': '4242', 'indices': [88, 111], 'media_url': 'http://pbs.twimg.com/media/something.jpg', 'media_url_https': 'https://pbs.twimg.com/media/something.jpg', 'sizes': {'large': {'h': 1065, 'resize': 'fit', 'w': 1600}, 'medium': {'h': 799, 'resize': 'fit', 'w': 1200}, 'small': {'h': 453, 'resize': 'fit', 'w': 680}, 'thumb': {'h': 150, 'resize': 'crop', 'w': 150}}, 'type': 'photo', 'url': 'https://t.co/something'}, {'display_url': 'pic.twitter.com/something_else', 'expanded_url': 'https://twitter.com/user/status/something/photo/1', 'id': 4243, 'id_str': '4243', 'indices': [88, 111], 'media_url': 'http://pbs.twimg.com/media/something_else.jpg', 'media_url_https': 'https://pbs.twimg.com/media/something_else.jpg', 'sizes': {'large': {'h': 1065, 'resize': 'fit', 'w': 1600}, 'medium': {'h': 799, 'resize': 'fit', 'w': 1200}, 'small': {'h': 453, 'resize': 'fit', 'w': 680}, 'thumb': {'h': 150, 'resize': 'crop', 'w': 150}}, 'type': 'photo', 'url': 'https://t.co/something_else'}]
     """
-
-    ext_ents_key = "extended_entities" if is_original_format(tweet) else "twitter_extended_entities"
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    ext_ents_key = "extended_entities" if original_format else "twitter_extended_entities"
     ext_ents = tweet.get(ext_ents_key)
     media = ext_ents.get("media", []) if ext_ents else []
     return media
 
 
-def get_media_urls(tweet):
+def get_media_urls(tweet, original_format=None):
     """
     Gets the https links to each media entity in the tweet.
 
     Args:
         tweet (Tweet or dict): tweet
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         list: list of urls. Will be an empty list if there are no urls present.
@@ -163,13 +171,13 @@ def get_media_urls(tweet):
         ['https://pbs.twimg.com/media/something.jpg', 'https://pbs.twimg.com/media/something_else.jpg']
     """
 
-    media = get_media_entities(tweet)
+    media = get_media_entities(tweet, original_format)
     urls = [m.get("media_url_https") for m in media] if media else []
     return urls
 
 
 
-def get_user_mentions(tweet):
+def get_user_mentions(tweet, original_format=None):
     """
     Get the @-mentions in the Tweet as dictionaries.
     Note that in the case of a quote-tweet, this does not return the users
@@ -180,6 +188,8 @@ def get_user_mentions(tweet):
 
     Args:
         tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         list (list of dicts): 1 item per @ mention. Note that the fields here
@@ -207,12 +217,12 @@ def get_user_mentions(tweet):
         >>> get_user_mentions(original)
         [{'indices': [2, 12], 'id_str': '2382763597', 'screen_name': 'notFromShrek', 'name': 'Fiona', 'id': 2382763597}]
     """
-    entities = get_entities(tweet)
+    entities = get_entities(tweet, original_format)
     user_mentions = entities.get("user_mentions") if entities else None
     return user_mentions if user_mentions else []
 
 
-def get_hashtags(tweet):
+def get_hashtags(tweet, original_format=None):
     """
     Get a list of hashtags in the Tweet
     Note that in the case of a quote-tweet, this does not return the
@@ -220,6 +230,8 @@ def get_hashtags(tweet):
 
     Args:
         tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         list (a list of strings): list of all of the hashtags in the Tweet
@@ -239,7 +251,7 @@ def get_hashtags(tweet):
         >>> get_hashtags(activity)
         ['1hashtag', 'moreHashtags']
     """
-    entities = get_entities(tweet)
+    entities = get_entities(tweet, original_format)
     hashtags = entities.get("hashtags")
     hashtags = [tag["text"] for tag in hashtags] if hashtags else []
     return hashtags
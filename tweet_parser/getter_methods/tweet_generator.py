@@ -3,30 +3,51 @@
 # https://opensource.org/licenses/MIT
 from tweet_parser.tweet_checking import is_original_format
 import sys
-if sys.version_info[0] == 3:
-    from html.parser import HTMLParser
-elif sys.version_info[0] == 2:
-    from HTMLParser import HTMLParser
 
-class GeneratorHTMLParser(HTMLParser):
-    """
-    HTML parser class to handle HTML tags in the original format source field
-    """
-    def handle_starttag(self, tag, attrs):
-        for attr in attrs:
-            if attr[0] == "href":
-                self.generator_link = attr[1]
+_generator_html_parser = None
+
+
+def _get_generator_html_parser():
+    # html.parser is slow to import and only needed for original format
+    # `source` fields, so the parser class is created on first use
+    global _generator_html_parser
+    if _generator_html_parser is None:
+        if sys.version_info[0] == 3:
+            from html.parser import HTMLParser
+        elif sys.version_info[0] == 2:
+            from HTMLParser import HTMLParser
+
+        class GeneratorHTMLParser(HTMLParser):
+            """
+            HTML parser class to handle HTML tags in the original format source field
+            """
+            def handle_starttag(self, tag, attrs):
+                for attr in attrs:
+                    if attr[0] == "href":
+                        self.generator_link = attr[1]
+
+            def handle_data(self, data):
+                self.generator_name = data
+
+        _generator_html_parser = GeneratorHTMLParser
+    return _generator_html_parser
+
 
-    def handle_data(self, data):
-        self.generator_name = data
+def __getattr__(name):
+    # keep `tweet_generator.GeneratorHTMLParser` working (Python 3.7+)
+    if name == "GeneratorHTMLParser":
+        return _get_generator_html_parser()
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
 
-def get_generator(tweet):
+def get_generator(tweet, original_format=None):
     """
     Get information about the application that generated the Tweet
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         dict: keys are 'link' and 'name', the web link and the name
@@ -50,7 +71,10 @@ def get_generator(tweet):
         >>> get_generator(activity_streams_format_dict)
         {'link': 'http://twitter.com', 'name': 'Twitter Web Client'}
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
+        GeneratorHTMLParser = _get_generator_html_parser()
         if sys.version_info[0] == 3 and sys.version_info[1] >= 4:
             parser = GeneratorHTMLParser(convert_charrefs=True)
         else:
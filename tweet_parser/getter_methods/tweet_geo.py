@@ -4,13 +4,15 @@
 from tweet_parser.tweet_checking import is_original_format
 
 
-def get_geo_coordinates(tweet):
+def get_geo_coordinates(tweet, original_format=None):
     """
     Get the user's geo coordinates, if they are included in the payload
     (otherwise return None)
 
     Args:
         tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): not used, "geo" is the same in both formats
+            (accepted like in the other getters)
 
     Returns:
         dict: dictionary with the keys "latitude" and "longitude"
@@ -33,13 +35,15 @@ def get_geo_coordinates(tweet):
     return None
 
 
-def get_profile_location(tweet):
+def get_profile_location(tweet, original_format=None):
     """
     Get user's derived location data from the profile location enrichment
     If unavailable, returns None.
 
     Args:
         tweet (Tweet or dict): Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         dict: more information on the profile locations enrichment here:
@@ -61,7 +65,9 @@ def get_profile_location(tweet):
         I'm honestly not sure what circumstances would result in a list that
         is more than one element long.
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         try:
             return tweet["user"]["derived"]["locations"][0]
         except KeyError:
@@ -2,9 +2,10 @@
 # Licensed under the MIT License
 # https://opensource.org/licenses/MIT
 from tweet_parser.tweet_checking import is_original_format
+from tweet_parser.getter_methods.tweet_embeds import get_quoted_tweet, get_retweeted_tweet
 
 
-def get_tweet_links(tweet):
+def get_tweet_links(tweet, original_format=None):
     """
     Get the links that are included in the Tweet as "urls"
     (if there are no links in the Tweet, this returns an empty list)
@@ -12,7 +13,9 @@ def get_tweet_links(tweet):
     Returns unrolled or expanded_url information if it is available
 
     Args:
-        tweet (Tweet): A Tweet object (must be a Tweet obj, not a dict)
+        tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         list (list of dicts): A list of dictionaries containing information
@@ -43,31 +46,27 @@ def get_tweet_links(tweet):
         ...   # the url that tweet directs to, often t.co
         ...   'url': "t.co/1234"}]
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         # get the urls from the Tweet
+        # (copy the list: the payload must not be changed, since the Tweet
+        # may be shared, e.g. between threads)
         try:
-            tweet_urls = tweet["entities"]["urls"]
+            tweet_urls = list(tweet["entities"]["urls"])
         except KeyError:
             tweet_urls = []
-        # get the urls from the quote-tweet
-        if tweet.quoted_tweet is not None:
-            tweet_urls += tweet.quoted_tweet.tweet_links
-        # get the urls from the retweet
-        if tweet.retweeted_tweet is not None:
-            tweet_urls += tweet.retweeted_tweet.tweet_links
+        # get the urls from the quote-tweet and from the retweet
+        tweet_urls += _get_embedded_links(tweet, original_format)
         return tweet_urls
     else:
         # try to get normal urls
         try:
-            tweet_urls = tweet["twitter_entities"]["urls"]
+            tweet_urls = list(tweet["twitter_entities"]["urls"])
         except KeyError:
             tweet_urls = []
-        # get the urls from the quote-tweet
-        if tweet.quoted_tweet is not None:
-            tweet_urls += tweet.quoted_tweet.tweet_links
-        # get the urls from the retweet
-        if tweet.retweeted_tweet is not None:
-            tweet_urls += tweet.retweeted_tweet.tweet_links
+        # get the urls from the quote-tweet and from the retweet
+        tweet_urls += _get_embedded_links(tweet, original_format)
         # otherwise, we're now going to combine the urls to try to
         # to get the same format as the og format urls, try to get enriched urls
         try:
@@ -81,16 +80,30 @@ def get_tweet_links(tweet):
                         "expanded_url_description": "description"}
         tweet_urls_expanded = []
         for url in tweet_urls:
-            expanded_url = url
+            # add "unwound" to a copy of the url dict, not to the payload's
+            expanded_url = dict(url)
             if url["url"] in gnip_tweet_urls:
                 expanded_url["unwound"] = {key_mappings[key]: value for key, value in gnip_tweet_urls[url["url"]].items() if key != "url"}
             elif url.get("expanded_url", "UNAVAILABLE") in gnip_tweet_exp_urls:
-                expanded_url["unwound"] = {key_mappings[key]: value for key, value in gnip_tweet_urls[url["expanded_url"]].items() if key != "url"}
+                expanded_url["unwound"] = {key_mappings[key]: value for key, value in gnip_tweet_exp_urls[url["expanded_url"]].items() if key != "url"}
             tweet_urls_expanded.append(expanded_url)
         return tweet_urls_expanded
 
 
-def get_most_unrolled_urls(tweet):
+def _get_embedded_links(tweet, original_format):
+    # the links of the quoted and retweeted Tweets (which are always in the
+    # same format as the Tweet that embeds them)
+    links = []
+    quoted_tweet = get_quoted_tweet(tweet, original_format)
+    if quoted_tweet is not None:
+        links += get_tweet_links(quoted_tweet, original_format)
+    retweeted_tweet = get_retweeted_tweet(tweet, original_format)
+    if retweeted_tweet is not None:
+        links += get_tweet_links(retweeted_tweet, original_format)
+    return links
+
+
+def get_most_unrolled_urls(tweet, original_format=None):
     """
     For each url included in the Tweet "urls", get the most unrolled
     version available. Only return 1 url string per url in tweet.tweet_links
@@ -102,12 +115,14 @@ def get_most_unrolled_urls(tweet):
 
     Args:
         tweet (Tweet): A Tweet object or dict
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         list (list of strings): a list of the most unrolled url available
     """
     unrolled_urls = []
-    for url in get_tweet_links(tweet):
+    for url in get_tweet_links(tweet, original_format):
         if url.get("unwound", {"url": None}).get("url", None) is not None:
             unrolled_urls.append(url["unwound"]["url"])
         elif url.get("expanded_url", None) is not None:
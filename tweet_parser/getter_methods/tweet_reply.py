@@ -5,13 +5,15 @@ from tweet_parser.tweet_checking import is_original_format
 from tweet_parser.tweet_parser_errors import NotAvailableError
 
 
-def get_in_reply_to_screen_name(tweet):
+def get_in_reply_to_screen_name(tweet, original_format=None):
     """
     Get the screen name of the user whose Tweet is being replied to, None
     if this Tweet is not a reply
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: the screen name of the user whose Tweet is being replied to
@@ -34,8 +36,9 @@ def get_in_reply_to_screen_name(tweet):
         >>> get_in_reply_to_screen_name(activity_streams_format_dict)
         'notFromShrek'
     """
-
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         return tweet["in_reply_to_screen_name"]
     else:
         if tweet.get("inReplyTo", None) is not None:
@@ -44,7 +47,7 @@ def get_in_reply_to_screen_name(tweet):
             return None
 
 
-def get_in_reply_to_user_id(tweet):
+def get_in_reply_to_user_id(tweet, original_format=None):
     """
     Get the user id of the uesr whose Tweet is being replied to, and None
     if this Tweet is not a reply. \n
@@ -52,6 +55,8 @@ def get_in_reply_to_user_id(tweet):
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: the user id of the user whose Tweet is being replied to, None
@@ -66,21 +71,24 @@ def get_in_reply_to_user_id(tweet):
         >>> get_in_reply_to_user_id(original_format_dict)
         '2382763597'
     """
-
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         return tweet["in_reply_to_user_id_str"]
     else:
         raise NotAvailableError("Gnip activity-streams format does not" +
                                 " return the replied to user's id")
 
 
-def get_in_reply_to_status_id(tweet):
+def get_in_reply_to_status_id(tweet, original_format=None):
     """
     Get the tweet id of the Tweet being replied to, None
     if this Tweet is not a reply
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: the tweet id of the Tweet being replied to
@@ -103,7 +111,9 @@ def get_in_reply_to_status_id(tweet):
         >>> get_in_reply_to_status_id(activity_streams_format_dict)
         '863566329168711681'
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         return tweet["in_reply_to_status_id_str"]
     else:
         if tweet.get("inReplyTo", None) is not None:
@@ -3,13 +3,15 @@ from tweet_parser.tweet_parser_errors import NotAvailableError
 import re
 
 
-def get_full_text(tweet):
+def get_full_text(tweet, original_format=None):
     """
     Get the full text of a tweet dict.
     Includes @-mention replies and long links.
 
     Args:
         tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: the untruncated text of a Tweet
@@ -54,7 +56,9 @@ def get_full_text(tweet):
         >>> get_full_text(activity_truncated)
         'some tweet text, lorem ipsum dolor sit amet'
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         if tweet["truncated"]:
             return tweet["extended_tweet"]["full_text"]
         else:
@@ -66,13 +70,15 @@ def get_full_text(tweet):
             return tweet["body"]
 
 
-def get_text(tweet):
+def get_text(tweet, original_format=None):
     """
     Get the contents of "text" (original format)
     or "body" (activity streams format)
 
     Args:
         tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: the contents of "text" key (original format)
@@ -91,18 +97,22 @@ def get_text(tweet):
         >>> get_text(activity)
         'some tweet text'
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         return tweet["text"]
     else:
         return tweet["body"]
 
 
-def get_tweet_type(tweet):
+def get_tweet_type(tweet, original_format=None):
     """
     Get the type of Tweet this is (3 options: tweet, quote, and retweet)
 
     Args:
         tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: (one of 3 strings)
@@ -116,7 +126,9 @@ def get_tweet_type(tweet):
         no longer has the key "quoted_status" or "twitter_quoted_status",
         and that tweet (A) would be labeled as a "tweet" (not a "quote").
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         if "retweeted_status" in tweet:
             return "retweet"
         elif "quoted_status" in tweet:
@@ -133,12 +145,14 @@ def get_tweet_type(tweet):
                 return "tweet"
 
 
-def get_lang(tweet):
+def get_lang(tweet, original_format=None):
     """
     Get the language that the Tweet is written in.
 
     Args:
         tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: 2-letter BCP 47 language code (or None if undefined)
@@ -155,7 +169,9 @@ def get_lang(tweet):
         >>> get_lang(activity)
         'en'
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         lang_field = "lang"
     else:
         lang_field = "twitter_lang"
@@ -165,7 +181,7 @@ def get_lang(tweet):
         return None
 
 
-def get_poll_options(tweet):
+def get_poll_options(tweet, original_format=None):
     """
     Get the text in the options of a poll as a list
     - If there is no poll in the Tweet, return an empty list
@@ -173,6 +189,8 @@ def get_poll_options(tweet):
 
     Args:
         tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         list: list of strings, or, in the case where there is no poll,
@@ -200,7 +218,9 @@ def get_poll_options(tweet):
         ...
         NotAvailableError: Gnip activity-streams format does not return poll options
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         try:
             poll_options_text = []
             for p in tweet["entities"]["polls"]:
@@ -215,7 +235,7 @@ def get_poll_options(tweet):
                                 " return poll options")
 
 
-def get_quote_or_rt_text(tweet):
+def get_quote_or_rt_text(tweet, original_format=None):
     """
     Get the quoted or retweeted text in a Tweet
     (this is not the text entered by the posting user)
@@ -225,6 +245,8 @@ def get_quote_or_rt_text(tweet):
 
     Args:
         tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: text of the retweeted-tweet or the quoted-tweet
@@ -246,40 +268,96 @@ def get_quote_or_rt_text(tweet):
         >>> get_quote_or_rt_text(quote)
         'an interesting Tweet'
     """
-    tweet_type = get_tweet_type(tweet)
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    tweet_type = get_tweet_type(tweet, original_format)
     if tweet_type == "tweet":
         return ""
     if tweet_type == "quote":
-        if is_original_format(tweet):
-            return get_full_text(tweet["quoted_status"])
+        if original_format:
+            return get_full_text(tweet["quoted_status"], original_format)
         else:
-            return get_full_text(tweet["twitter_quoted_status"])
+            return get_full_text(tweet["twitter_quoted_status"], original_format)
     if tweet_type == "retweet":
-        if is_original_format(tweet):
-            return get_full_text(tweet["retweeted_status"])
+        if original_format:
+            return get_full_text(tweet["retweeted_status"], original_format)
         else:
-            return get_full_text(tweet["object"])
+            return get_full_text(tweet["object"], original_format)
 
 
-def get_all_text(tweet):
+def get_user_entered_text(tweet, original_format=None):
+    """
+    Get the text that the posting user entered
+    - tweet: untruncated text of an original Tweet (includes @-mention
+      replies and long links)
+    - quote: untruncated poster-added content in a quote-tweet
+    - retweet: empty string
+
+    Args:
+        tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
+
+    Returns:
+        str: an empty string for a Retweet, else the value of
+        `get_full_text`
+
+    Example:
+        >>> from tweet_parser.getter_methods.tweet_text import get_user_entered_text
+        >>> retweet = {"created_at": "Wed May 24 20:17:19 +0000 2017",
+        ...            "text": "RT @someone: an interesting Tweet",
+        ...            "truncated": False,
+        ...            "retweeted_status": {
+        ...                 "created_at": "Mon May 01 05:00:05 +0000 2017",
+        ...                 "truncated": False,
+        ...                 "text": "an interesting Tweet"
+        ...                }
+        ...           }
+        >>> get_user_entered_text(retweet)
+        ''
+    """
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if get_tweet_type(tweet, original_format) == "retweet":
+        return ""
+    return get_full_text(tweet, original_format)
+
+
+def get_all_text(tweet, original_format=None):
     """
     Get all of the text of the tweet. This includes @ mentions, long links,
     quote-tweet contents (separated by a newline), RT contents & poll options
 
     Args:
-        tweet (Tweet): A Tweet object (must be a Tweet object)
+        tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
-        str: text from tweet.user_entered_text, tweet.quote_or_rt_text and
-        tweet.poll_options (if in original format), separated by newlines
+        str: text from `get_user_entered_text`, `get_quote_or_rt_text` and
+        `get_poll_options` (if in original format), separated by newlines
+
+    Example:
+        >>> from tweet_parser.getter_methods.tweet_text import get_all_text
+        >>> quote = {"created_at": "Wed May 24 20:17:19 +0000 2017",
+        ...          "text": "adding my own commentary",
+        ...          "truncated": False,
+        ...          "quoted_status": {
+        ...                 "created_at": "Mon May 01 05:00:05 +0000 2017",
+        ...                 "truncated": False,
+        ...                 "text": "an interesting Tweet"
+        ...                }
+        ...         }
+        >>> get_all_text(quote)
+        'adding my own commentary\\nan interesting Tweet'
     """
-    if is_original_format(tweet):
-        return "\n".join(filter(None, [tweet.user_entered_text,
-                                       tweet.quote_or_rt_text,
-                                       "\n".join(tweet.poll_options)]))
-    else:
-        return "\n".join(filter(None, [tweet.user_entered_text,
-                                       tweet.quote_or_rt_text]))
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    texts = [get_user_entered_text(tweet, original_format),
+             get_quote_or_rt_text(tweet, original_format)]
+    if original_format:
+        texts.append("\n".join(get_poll_options(tweet, original_format)))
+    return "\n".join(filter(None, texts))
 
 
 def remove_links(text):
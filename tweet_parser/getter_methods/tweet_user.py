@@ -6,12 +6,14 @@
 from tweet_parser.tweet_checking import is_original_format
 from tweet_parser.deprecator import deprecated
 
-def get_user_id(tweet):
+def get_user_id(tweet, original_format=None):
     """
     Get the Twitter ID of the user who posted the Tweet
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: the Twitter ID of the user who posted the Tweet
@@ -34,19 +36,22 @@ def get_user_id(tweet):
         >>> get_user_id(activity_streams_format_dict)
         '815279070241955840'
     """
-
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         return tweet["user"]["id_str"]
     else:
         return tweet["actor"]["id"].split(":")[-1]
 
 
-def get_screen_name(tweet):
+def get_screen_name(tweet, original_format=None):
     """
     Get the screen name (@ handle) of the user who posted the Tweet
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: the @ handle of the user who posted the Tweet
@@ -69,19 +74,22 @@ def get_screen_name(tweet):
         >>> get_screen_name(activity_streams_format_dict)
         'RobotPrincessFi'
     """
-
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         return tweet["user"]["screen_name"]
     else:
         return tweet["actor"]["preferredUsername"]
 
 
-def get_name(tweet):
+def get_name(tweet, original_format=None):
     """
     Get the display name of the user who posted the Tweet
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: the @ handle of the user who posted the Tweet
@@ -104,19 +112,22 @@ def get_name(tweet):
         >>> get_name(activity_streams_format_dict)
         'jk no'
     """
-
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         return tweet["user"]["name"]
     else:
         return tweet["actor"]["displayName"]
 
 
-def get_bio(tweet):
+def get_bio(tweet, original_format=None):
     """
     Get the bio text of the user who posted the Tweet
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: the bio text of the user who posted the Tweet
@@ -142,8 +153,9 @@ def get_bio(tweet):
         >>> get_bio(activity_streams_format_dict)
         'Niche millenial content aggregator'
     """
-
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         bio_or_none = tweet["user"].get("description", "")
     else:
         bio_or_none = tweet["actor"].get("summary", "")
@@ -153,12 +165,14 @@ def get_bio(tweet):
         return bio_or_none
 
 
-def get_follower_count(tweet):
+def get_follower_count(tweet, original_format=None):
     """
     Get the number of followers that the user has
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         int: the number of followers that the user has
@@ -181,18 +195,22 @@ def get_follower_count(tweet):
         >>> get_follower_count(activity_streams_format_dict)
         2    
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         return tweet["user"]["followers_count"]
     else:
         return tweet["actor"]["followersCount"]
 
 
-def get_following_count(tweet):
+def get_following_count(tweet, original_format=None):
     """
     Get the number of accounts that the user is following
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         int: the number of accounts that the user is following
@@ -215,14 +233,16 @@ def get_following_count(tweet):
         >>> get_following_count(activity_streams_format_dict)
         2    
     """
-    if is_original_format(tweet):
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    if original_format:
         return tweet["user"]["friends_count"]
     else:
         return tweet["actor"]["friendsCount"]
 
 
 @deprecated("See: https://developer.twitter.com/en/docs/tweets/enrichments/overview/klout")
-def get_klout_score(tweet):
+def get_klout_score(tweet, original_format=None):
     """
     Warning: Klout is deprecated and is being removed from Tweet payloads May 2018. \n
     See https://developer.twitter.com/en/docs/tweets/enrichments/overview/klout \n
@@ -231,6 +251,8 @@ def get_klout_score(tweet):
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         int: the Klout score (if it exists) of the user who posted the Tweet
@@ -252,8 +274,10 @@ def get_klout_score(tweet):
         >>> get_klout_score(activity_streams_format_dict)
         12345
     """
+    if original_format is None:
+        original_format = is_original_format(tweet)
     try:
-        if is_original_format(tweet):
+        if original_format:
             score = tweet['user']['derived']['klout']['score']
         else:
             score = tweet['gnip']['klout_score']
@@ -263,7 +287,7 @@ def get_klout_score(tweet):
 
 
 @deprecated("See: https://developer.twitter.com/en/docs/tweets/enrichments/overview/klout")
-def get_klout_profile(tweet):
+def get_klout_profile(tweet, original_format=None):
     """
     Warning: Klout is deprecated and is being removed from Tweet payloads May 2018. \n
     See https://developer.twitter.com/en/docs/tweets/enrichments/overview/klout \n
@@ -272,6 +296,8 @@ def get_klout_profile(tweet):
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: the user's Klout profile URL (if it exists), else return None
@@ -298,8 +324,10 @@ def get_klout_profile(tweet):
         >>> get_klout_profile(activity_streams_format_dict)
         'http://klout.com/topic/id/10000000000000016635'
     """
+    if original_format is None:
+        original_format = is_original_format(tweet)
     try:
-        if is_original_format(tweet):
+        if original_format:
             profile = tweet['user']['derived']['klout']['profile_url']
         else:
             profile = tweet['gnip']['klout_profile']['link']
@@ -309,7 +337,7 @@ def get_klout_profile(tweet):
 
 
 @deprecated("See: https://developer.twitter.com/en/docs/tweets/enrichments/overview/klout")
-def get_klout_id(tweet):
+def get_klout_id(tweet, original_format=None):
     """
     Warning: Klout is deprecated and is being removed from Tweet payloads May 2018. \n
     See https://developer.twitter.com/en/docs/tweets/enrichments/overview/klout \n
@@ -318,6 +346,8 @@ def get_klout_id(tweet):
 
     Args:
         tweet (Tweet): A Tweet object (or a dictionary)
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         str: the user's Klout ID (if it exists), else return None
@@ -342,8 +372,10 @@ def get_klout_id(tweet):
         >>> get_klout_id(activity_streams_format_dict)
         '1234567890'
     """
+    if original_format is None:
+        original_format = is_original_format(tweet)
     try:
-        if is_original_format(tweet):
+        if original_format:
             klout_id = tweet['user']['derived']['klout']['user_id']
         else:
             klout_id = tweet['gnip']['klout_profile']['klout_user_id']
@@ -353,7 +385,7 @@ def get_klout_id(tweet):
 
 
 @deprecated("See: https://developer.twitter.com/en/docs/tweets/enrichments/overview/klout")
-def get_klout_topics(tweet, topic_type='influence'):
+def get_klout_topics(tweet, topic_type='influence', original_format=None):
     """
     Warning: Klout is deprecated and is being removed from Tweet payloads May 2018. \n
     See https://developer.twitter.com/en/docs/tweets/enrichments/overview/klout \n
@@ -366,6 +398,8 @@ def get_klout_topics(tweet, topic_type='influence'):
         tweet (Tweet): A Tweet object
         topic_type (str): Which type of Klout topic to return.
                           Options are limited to 'influence' and 'interest'
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
 
     Returns:
         list: A list of dicts representing Klout topics, or if Klout topics \
@@ -390,9 +424,11 @@ def get_klout_topics(tweet, topic_type='influence'):
         ... "name": "Vegetables"
         ... }]
     """
+    if original_format is None:
+        original_format = is_original_format(tweet)
     try:
         # check that the dict paths exist
-        if is_original_format(tweet):
+        if original_format:
             topics = tweet['user']['derived']['klout']['{}_topics'.format(topic_type)]
         else:
             topics = tweet['gnip']['klout_profile']['topics']
@@ -400,7 +436,7 @@ def get_klout_topics(tweet, topic_type='influence'):
         return None
     # since we have topics, collect the right pieces
     topics_list = []
-    if is_original_format(tweet):
+    if original_format:
         for topic in topics:
             # note: this is the same as the current structure of OF
             # payloads, but is written out for consistency w/ AS payloads
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Deferred module imports, to keep the import of `tweet_parser.tweet`
+(and so the startup of short command-line runs) fast.
+
+A `LazyModule` stands in for a module at module level. The first time
+one of its attributes is used it imports the module and rebinds the name
+in the namespace it was defined in to the real module, so later lookups
+cost exactly the same as with a normal import.
+"""
+import importlib
+
+
+class LazyModule(object):
+    """
+    Placeholder for a module that is imported on first attribute access
+
+    Args:
+        name (str): the full dotted name of the module
+        namespace (dict): the globals of the module the placeholder is
+            bound in, under the last part of `name`
+
+    Example:
+        >>> from tweet_parser.lazy_import import LazyModule
+        >>> tweet_date = LazyModule("tweet_parser.getter_methods.tweet_date", globals())
+        >>> tweet_date.snowflake2utc(867474613139156993)
+        1495657039
+        >>> type(tweet_date).__name__
+        'module'
+    """
+    def __init__(self, name, namespace):
+        self._name = name
+        self._namespace = namespace
+
+    def _load(self):
+        module = importlib.import_module(self._name)
+        binding = self._name.rsplit(".", 1)[-1]
+        if self._namespace.get(binding) is self:
+            self._namespace[binding] = module
+        return module
+
+    def __getattr__(self, attribute):
+        if attribute.startswith("__"):
+            raise AttributeError(attribute)
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        return "<lazily imported module {!r}>".format(self._name)
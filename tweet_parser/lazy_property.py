@@ -7,8 +7,26 @@ attributes to be generated dynamically and cached after creation.
 Original idea found via
 http://stevenloria.com/lazy-evaluated-properties-in-python/
 and lightly modified to preserve underlying docstrings.
+Lazy properties can also be profiled and locked (see `enable_profiling`
+and `enable_thread_safety`).
 """
 from functools import wraps
+import threading
+import time
+
+_timer = getattr(time, "perf_counter", time.time)
+
+# every lazy property: the property object -> the decorated function
+_LAZY_PROPERTIES = {}
+# (class, attribute name) -> the plain property, for the profiled attributes
+_PROFILED = {}
+# (class, attribute name) -> the plain property, for the locked attributes
+_LOCKED = {}
+# attribute name -> AttributeStats
+_STATS = {}
+# name of the per-object lock in the object's __dict__ (see `picklable_state`)
+LOCK_ATTRIBUTE = "__lazy_property_lock"
+
 
 def lazy_property(fn):
     """
@@ -26,7 +44,310 @@ def lazy_property(fn):
     @property
     @wraps(fn)
     def _lazy_property(self):
-        if not hasattr(self, attr_name):
-            setattr(self, attr_name, fn(self))
-        return getattr(self, attr_name)
+        cache = self.__dict__
+        try:
+            return cache[attr_name]
+        except KeyError:
+            # if another thread stored a value meanwhile, use that one
+            return cache.setdefault(attr_name, fn(self))
+    _LAZY_PROPERTIES[_lazy_property] = fn
+    return _lazy_property
+
+
+def _object_lock(cache):
+    lock = cache.get(LOCK_ATTRIBUTE)
+    if lock is None:
+        lock = cache.setdefault(LOCK_ATTRIBUTE, threading.RLock())
+    return lock
+
+
+def picklable_state(obj):
+    """
+    The ``__dict__`` of an object with lazy properties, without its lock
+    (locks can't be pickled or copied), for use in ``__getstate__``
+    """
+    state = dict(obj.__dict__)
+    state.pop(LOCK_ATTRIBUTE, None)
+    return state
+
+
+class AttributeStats(object):
+    """
+    Counters for one profiled attribute
+
+    Attributes:
+        calls (int): number of times the value was computed
+        hits (int): number of times the cached value was returned
+        total_time (float): seconds spent computing the value (including the
+            time spent in any other lazy properties it uses)
+        max_time (float): longest single computation, in seconds
+        exceptions (dict): number of exceptions raised, by exception class name
+    """
+    __slots__ = ["calls", "hits", "total_time", "max_time", "exceptions"]
+
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.exceptions = {}
+
+    def to_dict(self):
+        return {"calls": self.calls,
+                "hits": self.hits,
+                "total_time": self.total_time,
+                "max_time": self.max_time,
+                "exceptions": dict(self.exceptions)}
+
+
+def _instrumented_property(fn, stats=None, locked=False):
+    """
+    A lazy property that is profiled (if `stats` is given) and/or computed
+    under the object's lock (if `locked`)
+    """
+    attr_name = '_lazy_' + fn.__name__
+
+    def compute(self):
+        if stats is None:
+            return fn(self)
+        start = _timer()
+        try:
+            return fn(self)
+        except Exception as exception:
+            name = type(exception).__name__
+            stats.exceptions[name] = stats.exceptions.get(name, 0) + 1
+            raise
+        finally:
+            elapsed = _timer() - start
+            stats.calls += 1
+            stats.total_time += elapsed
+            if elapsed > stats.max_time:
+                stats.max_time = elapsed
+
+    @property
+    @wraps(fn)
+    def _lazy_property(self):
+        cache = self.__dict__
+        if attr_name not in cache:
+            if not locked:
+                return cache.setdefault(attr_name, compute(self))
+            with _object_lock(cache):
+                # another thread may have computed it while we waited
+                if attr_name not in cache:
+                    value = compute(self)
+                    cache[attr_name] = value
+                    return value
+        if stats is not None:
+            stats.hits += 1
+        return cache[attr_name]
     return _lazy_property
+
+
+def _install(klass, name, plain_property):
+    """
+    Set a class attribute to the version of a lazy property for the modes
+    (profiling, thread safety) that are on for it
+    """
+    profiled = (klass, name) in _PROFILED
+    locked = (klass, name) in _LOCKED
+    if not profiled and not locked:
+        setattr(klass, name, plain_property)
+        return
+    fn = _LAZY_PROPERTIES[plain_property]
+    stats = _STATS.setdefault(name, AttributeStats()) if profiled else None
+    setattr(klass, name, _instrumented_property(fn, stats, locked))
+
+
+def _lazy_properties(classes):
+    """
+    (class, attribute name, plain property) for every lazy property of
+    `classes`, including the inherited ones
+    """
+    for cls in classes or _default_classes():
+        for klass in cls.__mro__:
+            for name, value in list(vars(klass).items()):
+                plain_property = (_PROFILED.get((klass, name)) or
+                                  _LOCKED.get((klass, name)) or value)
+                if plain_property in _LAZY_PROPERTIES:
+                    yield klass, name, plain_property
+
+
+def _default_classes():
+    from tweet_parser.tweet import Tweet
+    return [Tweet]
+
+
+def enable_profiling(classes=None):
+    """
+    Start profiling the lazy properties of some classes
+
+    The lazy properties are replaced on the class (so existing objects are
+    profiled too) with instrumented versions that count calls, cache hits
+    and exceptions and time each computation; `disable_profiling` puts the
+    plain versions back, so profiling costs nothing while it's off. The
+    counters aren't locked, so they are approximate when threads are used.
+
+    Args:
+        classes (list): classes whose lazy properties (including inherited
+            ones) are profiled, defaults to [tweet_parser.tweet.Tweet]
+
+    Example:
+        >>> from tweet_parser.lazy_property import (enable_profiling,
+        ...     disable_profiling, profiling_snapshot)
+        >>> from tweet_parser.tweet import Tweet
+        >>> enable_profiling()
+        >>> tweet = Tweet({"id": 867474613139156993,
+        ...                "id_str": "867474613139156993",
+        ...                "created_at": "Wed May 24 20:17:19 +0000 2017",
+        ...                "text": "Some Tweet text",
+        ...                "user": {"screen_name": "RobotPrincessFi",
+        ...                         "id_str": "815279070241955840"}})
+        >>> tweet.created_at_seconds, tweet.created_at_seconds
+        (1495657039, 1495657039)
+        >>> disable_profiling()
+        >>> stats = profiling_snapshot()["created_at_seconds"]
+        >>> stats["calls"], stats["hits"]
+        (1, 1)
+    """
+    for klass, name, plain_property in _lazy_properties(classes):
+        if (klass, name) not in _PROFILED:
+            _PROFILED[(klass, name)] = plain_property
+            _install(klass, name, plain_property)
+
+
+def disable_profiling():
+    """
+    Stop profiling (the counters are kept until `reset_profiling`)
+    """
+    for (klass, name), plain_property in list(_PROFILED.items()):
+        del _PROFILED[(klass, name)]
+        _install(klass, name, plain_property)
+
+
+def profiling_enabled():
+    return bool(_PROFILED)
+
+
+def enable_thread_safety(classes=None):
+    """
+    Compute each lazy property of an object at most once, even when the
+    object is used by several threads at the same time
+
+    Without it, a value is stored with a single ``dict.setdefault`` on the
+    object's ``__dict__``, so threads reading the same attribute at once
+    all get the same value object, but the function may run in more than
+    one of them (harmless for the Tweet getters, which don't change the
+    payload). With it, each object gets a reentrant lock the first time
+    one of its lazy properties is computed. The lock is held while the
+    value is computed, so other threads reading any lazy property of the
+    same object wait for it (a property may use other properties of its
+    object, and of the Tweets embedded in it, while it is held). Cached
+    values are read without locking. The lock costs a little on every
+    first access, so it is off by default.
+
+    Args:
+        classes (list): classes whose lazy properties (including inherited
+            ones) are locked, defaults to [tweet_parser.tweet.Tweet]
+
+    Example:
+        >>> from tweet_parser.lazy_property import (enable_thread_safety,
+        ...     disable_thread_safety, thread_safety_enabled)
+        >>> enable_thread_safety()
+        >>> thread_safety_enabled()
+        True
+        >>> disable_thread_safety()
+        >>> thread_safety_enabled()
+        False
+    """
+    for klass, name, plain_property in _lazy_properties(classes):
+        if (klass, name) not in _LOCKED:
+            _LOCKED[(klass, name)] = plain_property
+            _install(klass, name, plain_property)
+
+
+def disable_thread_safety():
+    """
+    Go back to unlocked lazy properties (the default)
+    """
+    for (klass, name), plain_property in list(_LOCKED.items()):
+        del _LOCKED[(klass, name)]
+        _install(klass, name, plain_property)
+
+
+def thread_safety_enabled():
+    return bool(_LOCKED)
+
+
+def reset_profiling():
+    """
+    Set all of the profiling counters back to zero
+    """
+    for name in _STATS:
+        _STATS[name].__init__()
+
+
+def profiling_snapshot():
+    """
+    The profiling counters so far
+
+    Returns:
+        dict: attribute name -> dict of "calls", "hits", "total_time",
+        "max_time" (both in seconds) and "exceptions" (counts by exception
+        class name), for every attribute that has been used
+    """
+    return {name: stats.to_dict() for name, stats in _STATS.items()
+            if stats.calls or stats.hits}
+
+
+def merge_snapshots(snapshots):
+    """
+    Add up profiling snapshots (e.g. from several processes)
+
+    Args:
+        snapshots (iterable): dicts returned by `profiling_snapshot`
+
+    Returns:
+        dict: the combined snapshot
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for name, stats in snapshot.items():
+            total = merged.setdefault(name, AttributeStats().to_dict())
+            total["calls"] += stats["calls"]
+            total["hits"] += stats["hits"]
+            total["total_time"] += stats["total_time"]
+            total["max_time"] = max(total["max_time"], stats["max_time"])
+            for exception, count in stats["exceptions"].items():
+                total["exceptions"][exception] = total["exceptions"].get(exception, 0) + count
+    return merged
+
+
+def format_profile_table(snapshot):
+    """
+    Format a profiling snapshot as a text table, most expensive attribute first
+
+    Args:
+        snapshot (dict): a dict returned by `profiling_snapshot`
+
+    Returns:
+        str: the table
+    """
+    header = ("attribute", "calls", "hits", "total ms", "mean us", "max us", "exceptions")
+    rows = []
+    for name, stats in sorted(snapshot.items(), key=lambda item: -item[1]["total_time"]):
+        mean = stats["total_time"] / stats["calls"] if stats["calls"] else 0.0
+        exceptions = ", ".join("{}: {}".format(exception, count)
+                               for exception, count in sorted(stats["exceptions"].items()))
+        rows.append((name, str(stats["calls"]), str(stats["hits"]),
+                     "{:.1f}".format(stats["total_time"] * 1e3),
+                     "{:.1f}".format(mean * 1e6),
+                     "{:.1f}".format(stats["max_time"] * 1e6),
+                     exceptions))
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    lines = []
+    for row in [header] + rows:
+        cells = [row[0].ljust(widths[0])]
+        cells += [cell.rjust(width) for cell, width in zip(row[1:-1], widths[1:-1])]
+        cells.append(row[-1])
+        lines.append("  ".join(cells).rstrip())
+    return "\n".join(lines) + "\n"
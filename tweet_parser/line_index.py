@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Random access to files of newline-delimited Tweet payloads.
+
+An `IndexedTweetFile` memory-maps a data file and keeps a side index of
+the byte offset of every line, plus the snowflake id and posting time of
+either every Tweet or a sample of them (every Nth line). The index is
+saved next to the data file and is rebuilt automatically when the data
+file's size or modification time changes, so repeated lookups by line
+number, Tweet id or time range become seeks instead of full scans.
+"""
+from array import array
+import bisect
+import json
+import mmap
+import os
+import sys
+
+from tweet_parser.readers import peek_tweet_id, first_true
+from tweet_parser.getter_methods.tweet_date import snowflake2utc
+
+INDEX_VERSION = 1
+
+ASCENDING = "ascending"
+DESCENDING = "descending"
+UNSORTED = "unsorted"
+
+
+def _file_signature(filename):
+    stat = os.stat(filename)
+    mtime = getattr(stat, "st_mtime_ns", None)
+    if mtime is None:
+        mtime = int(stat.st_mtime * 1e9)
+    return stat.st_size, mtime
+
+
+class LineIndex(object):
+    """
+    Line offsets and sampled Tweet ids and times for one data file
+
+    Args:
+        offsets (array): byte offset of the start of each line, followed by
+            the size of the file
+        sample_lines (array): line numbers of the sampled Tweets
+        sample_ids (array): snowflake ids of the sampled Tweets
+        sample_times (array): posting times of the sampled Tweets in seconds
+            since the Unix epoch (computed from `sample_ids` if not given)
+        sample_every (int): 1 if every Tweet is in the sample, else the number
+            of lines per sample. A sample is the first Tweet in each block of
+            `sample_every` lines (lines that aren't Tweets are never sampled).
+        size (int): size of the data file when it was indexed
+        mtime (int): modification time (in ns) of the data file when indexed
+        order (str): ASCENDING, DESCENDING or UNSORTED, the order of the
+            sampled ids (found from `sample_ids` if not given)
+    """
+    def __init__(self, offsets, sample_lines, sample_ids, sample_times=None,
+                 sample_every=1, size=0, mtime=0, order=None):
+        self.offsets = offsets
+        self.sample_lines = sample_lines
+        self.sample_ids = sample_ids
+        if sample_times is None:
+            sample_times = array("q", (snowflake2utc(i) for i in sample_ids))
+        self.sample_times = sample_times
+        self.sample_every = sample_every
+        self.size = size
+        self.mtime = mtime
+        self.order = order or self._find_order()
+        self._by_id = None
+
+    def _find_order(self):
+        ids = self.sample_ids
+        if all(a <= b for a, b in zip(ids, ids[1:])):
+            return ASCENDING
+        if all(a >= b for a, b in zip(ids, ids[1:])):
+            return DESCENDING
+        return UNSORTED
+
+    def ids_in_order(self):
+        """
+        The sampled ids in ascending order and the line number of each
+        (sorted once, for binary searches of an unsorted index)
+
+        Returns:
+            tuple: (array of ids, array of line numbers)
+        """
+        if self._by_id is None:
+            pairs = sorted(zip(self.sample_ids, self.sample_lines))
+            self._by_id = (array("q", (tweet_id for tweet_id, _ in pairs)),
+                           array("q", (line_number for _, line_number in pairs)))
+        return self._by_id
+
+    @property
+    def complete(self):
+        """
+        True if every Tweet in the file has its id in the index
+        """
+        return self.sample_every == 1
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @classmethod
+    def build(cls, filename, sample_every=1):
+        """
+        Scan a data file and index it
+
+        Args:
+            filename (str): name of an uncompressed newline-delimited file
+            sample_every (int): index the id of every Tweet (1), or of the
+                first Tweet in every block of `sample_every` lines
+
+        Returns:
+            LineIndex: the index of the file
+        """
+        size, mtime = _file_signature(filename)
+        offsets = array("q")
+        sample_lines = array("q")
+        sample_ids = array("q")
+        if size > 0:
+            with open(filename, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    find = mapped.find
+                    pos = 0
+                    line_number = 0
+                    next_sample = 0
+                    while pos < size:
+                        offsets.append(pos)
+                        newline = find(b"\n", pos)
+                        next_pos = size if newline == -1 else newline + 1
+                        if line_number >= next_sample:
+                            tweet_id = peek_tweet_id(mapped[pos:next_pos])
+                            if tweet_id is not None:
+                                sample_lines.append(line_number)
+                                sample_ids.append(tweet_id)
+                                next_sample = (line_number // sample_every + 1) * sample_every
+                        pos = next_pos
+                        line_number += 1
+                finally:
+                    mapped.close()
+        offsets.append(size)
+        return cls(offsets, sample_lines, sample_ids, sample_every=sample_every,
+                   size=size, mtime=mtime)
+
+    def save(self, index_filename):
+        """
+        Write the index to a file (atomically replacing any older index)
+        """
+        header = {"version": INDEX_VERSION,
+                  "byteorder": sys.byteorder,
+                  "size": self.size,
+                  "mtime": self.mtime,
+                  "sample_every": self.sample_every,
+                  "order": self.order,
+                  "n_offsets": len(self.offsets),
+                  "n_samples": len(self.sample_ids)}
+        tmp_filename = index_filename + ".tmp"
+        with open(tmp_filename, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            self.offsets.tofile(f)
+            self.sample_lines.tofile(f)
+            self.sample_ids.tofile(f)
+            self.sample_times.tofile(f)
+        os.rename(tmp_filename, index_filename)
+
+    @classmethod
+    def load(cls, index_filename):
+        """
+        Read an index written by `LineIndex.save`
+
+        Returns:
+            LineIndex: the saved index, or None if it is missing or unreadable
+        """
+        try:
+            with open(index_filename, "rb") as f:
+                header = json.loads(f.readline().decode("utf-8"))
+                if header.get("version") != INDEX_VERSION:
+                    return None
+                arrays = []
+                for n_items in [header["n_offsets"], header["n_samples"],
+                                header["n_samples"], header["n_samples"]]:
+                    values = array("q")
+                    values.fromfile(f, n_items)
+                    if header["byteorder"] != sys.byteorder:
+                        values.byteswap()
+                    arrays.append(values)
+        except (IOError, OSError, ValueError, KeyError, EOFError):
+            return None
+        offsets, sample_lines, sample_ids, sample_times = arrays
+        return cls(offsets, sample_lines, sample_ids, sample_times,
+                   sample_every=header["sample_every"],
+                   size=header["size"], mtime=header["mtime"],
+                   order=header["order"])
+
+    def is_current(self, filename):
+        """
+        True if the data file is unchanged since it was indexed
+        """
+        return (self.size, self.mtime) == _file_signature(filename)
+
+
+class IndexedTweetFile(object):
+    """
+    A memory-mapped file of newline-delimited Tweet payloads with
+    random access by line number, Tweet id or time range
+
+    Args:
+        filename (str): name of an uncompressed newline-delimited file
+        sample_every (int): index the id and time of every Tweet (1, the
+            default) or only of the first Tweet in each block of this many lines.
+            Sampled indexes are smaller; lookups then scan at most one block
+            when the file is sorted by id.
+        index_filename (str): where the index is saved, defaults to
+            `filename` + ".idx"
+
+    Example:
+        >>> from tweet_parser.line_index import IndexedTweetFile
+        >>> with IndexedTweetFile("tweets.json") as tweets: # doctest: +SKIP
+        ...     first_line = tweets[0]
+        ...     line = tweets.get_by_id(867474613139156993)
+        ...     hour = list(tweets.time_range(1495656000, 1495659600))
+    """
+    def __init__(self, filename, sample_every=1, index_filename=None):
+        self.filename = filename
+        self.index_filename = index_filename or filename + ".idx"
+        index = LineIndex.load(self.index_filename)
+        if (index is None or index.sample_every != sample_every or
+                not index.is_current(filename)):
+            index = LineIndex.build(filename, sample_every=sample_every)
+            index.save(self.index_filename)
+        self.index = index
+        self._file = open(filename, "rb")
+        if index.size > 0:
+            self._mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._mapped = b""
+
+    def close(self):
+        if not isinstance(self._mapped, bytes):
+            self._mapped.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, line_number):
+        """
+        The line (bytes, including the newline) at `line_number`
+        """
+        if line_number < 0:
+            line_number += len(self)
+        if not 0 <= line_number < len(self):
+            raise IndexError("line number out of range")
+        offsets = self.index.offsets
+        return self._mapped[offsets[line_number]:offsets[line_number + 1]]
+
+    def iter_lines(self, start=0, stop=None):
+        """
+        Iterate over lines `start` to `stop` (exclusive)
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        for line_number in range(start, stop):
+            yield self[line_number]
+
+    def _line_id(self, line_number):
+        return peek_tweet_id(self[line_number])
+
+    def find_id(self, tweet_id):
+        """
+        Find the line number of the Tweet with id `tweet_id`
+
+        Args:
+            tweet_id (int or str): a Tweet snowflake id
+
+        Returns:
+            int: the line number, or None if the Tweet isn't in the file
+        """
+        tweet_id = int(tweet_id)
+        index = self.index
+        ids = index.sample_ids
+        if index.complete and index.order == UNSORTED:
+            ids, line_numbers = index.ids_in_order()
+            j = bisect.bisect_left(ids, tweet_id)
+            return line_numbers[j] if j < len(ids) and ids[j] == tweet_id else None
+        if index.order == UNSORTED:
+            # ids are only sampled, so look at every line
+            for line_number in range(len(self)):
+                if self._line_id(line_number) == tweet_id:
+                    return line_number
+            return None
+        if index.order == ASCENDING:
+            j = first_true(0, len(ids), lambda j: ids[j] > tweet_id)
+        else:
+            j = first_true(0, len(ids), lambda j: ids[j] < tweet_id)
+        # the Tweet is in the block of the last sample before j
+        if j == 0:
+            return None
+        if index.complete:
+            return index.sample_lines[j - 1] if ids[j - 1] == tweet_id else None
+        start = index.sample_lines[j - 1]
+        stop = index.sample_lines[j] if j < len(ids) else len(self)
+        for line_number in range(start, stop):
+            if self._line_id(line_number) == tweet_id:
+                return line_number
+        return None
+
+    def get_by_id(self, tweet_id):
+        """
+        The line with the Tweet with id `tweet_id`, or None if there isn't one
+        """
+        line_number = self.find_id(tweet_id)
+        return None if line_number is None else self[line_number]
+
+    def _time_range_lines(self, start_seconds, end_seconds):
+        index = self.index
+        times = index.sample_times
+        n_samples = len(times)
+        if index.order == UNSORTED:
+            return 0, len(self)
+        if index.order == ASCENDING:
+            first = first_true(0, n_samples, lambda j: times[j] >= start_seconds)
+            last = first_true(0, n_samples, lambda j: times[j] >= end_seconds)
+        else:
+            first = first_true(0, n_samples, lambda j: times[j] < end_seconds)
+            last = first_true(0, n_samples, lambda j: times[j] < start_seconds)
+        start = index.sample_lines[first - 1] if first > 0 else 0
+        stop = index.sample_lines[last] if last < n_samples else len(self)
+        return start, stop
+
+    def time_range(self, start_seconds, end_seconds):
+        """
+        Iterate over the Tweets posted in [start_seconds, end_seconds)
+
+        Args:
+            start_seconds (int): start time, in seconds since the Unix epoch
+            end_seconds (int): end time (exclusive)
+
+        Returns:
+            generator of bytes: the lines of the Tweets in the time range, in file
+            order. Files sorted by id (in either direction) are only read
+            between the matching positions of the index.
+        """
+        start, stop = self._time_range_lines(start_seconds, end_seconds)
+        index = self.index
+        if index.complete:
+            sample_lines = index.sample_lines
+            times = index.sample_times
+            j = first_true(0, len(sample_lines), lambda j: sample_lines[j] >= start)
+            while j < len(sample_lines) and sample_lines[j] < stop:
+                if start_seconds <= times[j] < end_seconds:
+                    yield self[sample_lines[j]]
+                j += 1
+        else:
+            for line_number in range(start, stop):
+                line = self[line_number]
+                tweet_id = peek_tweet_id(line)
+                if tweet_id is not None and start_seconds <= snowflake2utc(tweet_id) < end_seconds:
+                    yield line
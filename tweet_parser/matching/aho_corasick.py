@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Find many strings in a text in one pass
+
+An Aho-Corasick automaton is a trie of the patterns with a "failure" link
+from each node to the node of the longest proper suffix of its string that
+is also in the trie. Scanning a text follows one trie edge per character
+(and failure links when there is no edge), so the time taken grows with
+the length of the text and the number of matches, not with the number of
+patterns.
+"""
+import collections
+
+
+def is_word_char(char):
+    """
+    Whether a character is part of a word (a letter, a digit or "_"), for
+    checking that a match is a whole word
+    """
+    return char.isalnum() or char == "_"
+
+
+class Automaton(object):
+    """
+    A set of patterns, each with a value, to find in texts
+
+    Patterns can be added at any time; the failure links are (re)built on
+    the first search after an `add`.
+
+    Example:
+        >>> from tweet_parser.matching.aho_corasick import Automaton
+        >>> automaton = Automaton()
+        >>> for pattern in ["he", "she", "his", "hers"]:
+        ...     automaton.add(pattern)
+        >>> list(automaton.iter_matches("ushers"))
+        [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')]
+    """
+    def __init__(self):
+        # per node: a dict of edges, a failure link, the (length, value) of
+        # the patterns that end there, and those of every pattern that ends
+        # there or at a node down its failure links
+        self._edges = [{}]
+        self._fail = [0]
+        self._patterns_ending = [[]]
+        self._outputs = [[]]
+        self._built = True
+        self._patterns = 0
+
+    def __len__(self):
+        return self._patterns
+
+    def add(self, pattern, value=None):
+        """
+        Add a pattern
+
+        Args:
+            pattern (str): a non-empty string
+            value: what `iter_matches` gives for a match of the pattern;
+                defaults to the pattern
+        """
+        if not pattern:
+            raise ValueError("can't add an empty pattern")
+        node = 0
+        for char in pattern:
+            next_node = self._edges[node].get(char)
+            if next_node is None:
+                next_node = len(self._edges)
+                self._edges[node][char] = next_node
+                self._edges.append({})
+                self._fail.append(0)
+                self._patterns_ending.append([])
+            node = next_node
+        self._patterns_ending[node].append((len(pattern), pattern if value is None else value))
+        self._patterns += 1
+        self._built = False
+
+    def _build(self):
+        """
+        Set the failure links breadth first, and give each node the outputs
+        of the node its failure link points to
+        """
+        edges, fail = self._edges, self._fail
+        outputs = [list(patterns) for patterns in self._patterns_ending]
+        queue = collections.deque()
+        for node in edges[0].values():
+            fail[node] = 0
+            queue.append(node)
+        while queue:
+            node = queue.popleft()
+            for char, child in edges[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and char not in edges[state]:
+                    state = fail[state]
+                fail[child] = edges[state].get(char, 0)
+                outputs[child].extend(outputs[fail[child]])
+        self._outputs = outputs
+        self._built = True
+
+    def iter_matches(self, text):
+        """
+        Find every occurrence of every pattern in a text
+
+        Args:
+            text (str): the text to search
+
+        Returns:
+            generator of tuples: (start, end, value) for each match of a
+            pattern at ``text[start:end]``, in order of `end` (and of the
+            longest pattern first for matches that end at the same place)
+        """
+        if not self._built:
+            self._build()
+        edges, fail, outputs = self._edges, self._fail, self._outputs
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in edges[node]:
+                node = fail[node]
+            node = edges[node].get(char, 0)
+            for length, value in outputs[node]:
+                yield end - length, end, value
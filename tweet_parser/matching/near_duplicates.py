@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Find Tweets whose text is nearly the same as an earlier Tweet's
+
+The text of a Tweet is what its user entered (`get_user_entered_text`,
+so Retweets have none) with its links cut out at the indices of its url
+and media entities, case folded, and split into words; the @-mentions are
+dropped too by default, so that copies of a text sent as replies to
+different users still look the same. The shingles of the text are its
+runs of ``shingle_size`` words.
+
+`MinHasher` turns the shingles into a MinHash signature: for each of
+``num_perm`` random hash functions, the smallest hash of any shingle. The
+fraction of the places where two signatures agree estimates the Jaccard
+similarity of the two sets of shingles. `MinHasher.signatures` hashes a
+batch of texts, hashing each distinct shingle of the batch once.
+
+`NearDuplicateDetector` is the streaming part (locality sensitive
+hashing): each signature is cut into ``bands`` bands, and Tweets with the
+same values in any band are candidates, which are kept if their estimated
+similarity is at least ``threshold``. A Tweet joins the cluster of the
+first such candidate, so each Tweet is checked against at most
+``bands * bucket_size`` earlier Tweets however many it has seen. Only the
+Tweets of the last ``window`` (from their snowflake ids, in a heap so that
+Tweets that arrive out of order expire on time too) and at most
+``max_entries`` Tweets are kept, and the users of a cluster are counted
+exactly up to ``max_users`` and then with a small `HyperLogLog`, so its
+memory is bounded.
+"""
+import array
+import collections
+import hashlib
+import heapq
+import itertools
+import operator
+import re
+import struct
+
+from tweet_parser.aggregation.distinct_counts import HyperLogLog
+from tweet_parser.aggregation.time_buckets import bucket_seconds, get_tweet_ids
+from tweet_parser.getter_methods import batch
+from tweet_parser.getter_methods.tweet_date import snowflake2utc
+from tweet_parser.getter_methods.tweet_text import get_user_entered_text
+from tweet_parser.matching.terms import fold_case
+from tweet_parser.tweet_checking import is_original_format
+
+# each SHA-512 digest of a shingle gives 16 of its 32 bit hashes
+_HASHES_PER_DIGEST = 16
+_WORD = re.compile(r"\w+", re.UNICODE)
+_MENTION = re.compile(r"(?<!\w)@\w+", re.UNICODE)
+# the precision of the user count sketch of a cluster with many users
+# (1KB, with an error of about 3%)
+_USERS_PRECISION = 10
+
+
+def _link_entities(tweet, original_format):
+    # the entities whose indices are into the text of get_full_text
+    if original_format:
+        if tweet["truncated"]:
+            return tweet["extended_tweet"].get("entities", {})
+        return tweet.get("entities", {})
+    if "long_object" in tweet:
+        return tweet["long_object"].get("twitter_entities", {})
+    return tweet.get("twitter_entities", {})
+
+
+def get_text_without_links(tweet, original_format=None):
+    """
+    The text that the posting user entered (see `get_user_entered_text`),
+    with the links of its url and media entities replaced by spaces
+
+    The links are cut out at their entities' indices; a link whose indices
+    don't point at it is replaced wherever it appears in the text.
+
+    Args:
+        tweet (Tweet or dict): A Tweet object or dictionary
+        original_format (bool): True for original format, False for
+            activity streams; if None, it is found from the keys of `tweet`
+
+    Returns:
+        str: the text, or an empty string for a Retweet
+
+    Example:
+        >>> from tweet_parser.matching.near_duplicates import get_text_without_links
+        >>> tweet = {"created_at": "Wed May 24 20:17:19 +0000 2017",
+        ...          "truncated": False,
+        ...          "text": "Free pie https://t.co/abc today",
+        ...          "entities": {"urls": [{"url": "https://t.co/abc",
+        ...                                 "indices": [9, 25]}]}}
+        >>> get_text_without_links(tweet)
+        'Free pie   today'
+    """
+    if original_format is None:
+        original_format = is_original_format(tweet)
+    text = get_user_entered_text(tweet, original_format)
+    if not text:
+        return text
+    entities = _link_entities(tweet, original_format)
+    links = (entities.get("urls") or []) + (entities.get("media") or [])
+    pieces = []
+    end = 0
+    misplaced = []
+    for link in sorted(links, key=lambda link: link["indices"][0]):
+        start, stop = link["indices"][:2]
+        if start >= end and text[start:stop] == link["url"]:
+            pieces.append(text[end:start])
+            end = stop
+        else:
+            misplaced.append(link["url"])
+    pieces.append(text[end:])
+    text = " ".join(pieces)
+    for url in misplaced:
+        text = text.replace(url, " ")
+    return text
+
+
+class MinHasher(object):
+    """
+    MinHash signatures of the word shingles of texts
+
+    Args:
+        num_perm (int): the number of hash functions, and so the length
+            of a signature; the error of a similarity estimate is about
+            ``1 / sqrt(num_perm)``
+        shingle_size (int): the number of words in a shingle (a text of
+            fewer words is one shingle)
+        strip_mentions (bool): leave @-mentions out of the shingles
+        seed (int): the seed of the hash functions; only signatures made
+            with the same seed and `num_perm` can be compared
+
+    Example:
+        >>> from tweet_parser.matching.near_duplicates import MinHasher
+        >>> hasher = MinHasher()
+        >>> first, second, other = hasher.signatures([
+        ...     "@shrek Win a free trip to Far Far Away, just follow and RT!",
+        ...     "@fiona win a FREE trip to Far Far Away... just follow and RT",
+        ...     "Ogres are like onions, they have layers"])
+        >>> hasher.similarity(first, second)
+        1.0
+        >>> hasher.similarity(first, other)
+        0.0
+    """
+    def __init__(self, num_perm=128, shingle_size=3, strip_mentions=True, seed=1):
+        if num_perm < 1 or shingle_size < 1:
+            raise ValueError("num_perm and shingle_size must be at least 1")
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.strip_mentions = strip_mentions
+        self.seed = seed
+        digests = -(-num_perm // _HASHES_PER_DIGEST)
+        # a SHA-512 already fed a different salt for each digest
+        self._digests = [hashlib.sha512(struct.pack(">QI", seed, digest))
+                         for digest in range(digests)]
+        self._unpack = struct.Struct(">{}I".format(digests * _HASHES_PER_DIGEST)).unpack
+
+    def shingles(self, text):
+        """
+        The set of shingles (str) of a text
+        """
+        text = fold_case(text)
+        if self.strip_mentions:
+            text = _MENTION.sub(" ", text)
+        words = _WORD.findall(text)
+        if not words:
+            return set()
+        size = min(self.shingle_size, len(words))
+        return set(" ".join(words[start:start + size])
+                   for start in range(len(words) - size + 1))
+
+    def _hashes(self, shingle):
+        shingle = shingle.encode("utf-8")
+        digests = []
+        for digest in self._digests:
+            digest = digest.copy()
+            digest.update(shingle)
+            digests.append(digest.digest())
+        return self._unpack(b"".join(digests))[:self.num_perm]
+
+    def signature(self, text):
+        """
+        The MinHash signature of a text
+
+        Returns:
+            array.array or None: `num_perm` ints, or None if the text has
+            no words
+        """
+        return self.signatures([text])[0]
+
+    def signatures(self, texts):
+        """
+        The MinHash signatures of a batch of texts, hashing each distinct
+        shingle once
+
+        Returns:
+            list: an `array.array` of `num_perm` ints, or None, for each text
+        """
+        hashes = {}
+        signatures = []
+        for text in texts:
+            columns = []
+            for shingle in self.shingles(text) if text else ():
+                values = hashes.get(shingle)
+                if values is None:
+                    values = hashes[shingle] = self._hashes(shingle)
+                columns.append(values)
+            signatures.append(array.array("I", map(min, zip(*columns))) if columns else None)
+        return signatures
+
+    @staticmethod
+    def similarity(first, second):
+        """
+        The estimated Jaccard similarity of the texts of two signatures
+        (the fraction of their values that are equal)
+        """
+        return sum(map(operator.eq, first, second)) / float(len(first))
+
+
+class NearDuplicateDetector(object):
+    """
+    Clusters of Tweets with nearly the same text, from a stream of Tweets
+
+    Args:
+        threshold (float): the estimated Jaccard similarity of shingles at
+            which a Tweet is a near duplicate of an earlier one
+        num_perm (int): the length of the signatures (see `MinHasher`)
+        bands (int): the number of bands the signatures are cut into;
+            it must divide `num_perm`. Pairs of similarity ``s`` are
+            candidates with probability ``1 - (1 - s ** rows) ** bands``
+            (``rows = num_perm / bands``), so more bands find pairs of
+            lower similarity, at the cost of more candidates to check
+        shingle_size (int): the number of words in a shingle
+        window ("minute", "hour", "day" or int seconds): Tweets older
+            than this, by their snowflake ids, than the newest Tweet seen
+            are forgotten
+        max_entries (int): the most Tweets kept (the oldest are forgotten
+            first); a Tweet takes about ``4 * num_perm`` bytes and its
+            share of the buckets
+        bucket_size (int): the most recent Tweets kept for each band value
+        max_users (int): the most user ids kept for a cluster; the users
+            of a cluster with more are estimated with a `HyperLogLog`
+        seed (int): the seed of the hash functions
+
+    Example:
+        >>> from tweet_parser.matching.near_duplicates import NearDuplicateDetector
+        >>> detector = NearDuplicateDetector(threshold=0.7)
+        >>> spam = "win a free trip to far far away, just follow and rt"
+        >>> detector.add_text(1, spam)
+        >>> detector.add_text(2, "@fiona " + spam + "!!")
+        1
+        >>> detector.add_text(3, "ogres are like onions")
+        >>> [cluster["size"] for cluster in detector.clusters()]
+        [2]
+    """
+    def __init__(self, threshold=0.8, num_perm=128, bands=16, shingle_size=3, window="hour",
+                 max_entries=100000, bucket_size=8, max_users=64, seed=1):
+        if num_perm % bands:
+            raise ValueError("bands ({}) must divide num_perm ({})".format(bands, num_perm))
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.window = bucket_seconds(window)
+        self.max_entries = max_entries
+        self.bucket_size = bucket_size
+        self.max_users = max_users
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size, seed=seed)
+        # id -> (seconds, signature, cluster id)
+        self._entries = {}
+        # (seconds, arrival, id) of every entry, the oldest first
+        self._times = []
+        self._arrivals = itertools.count()
+        self._buckets = [{} for _ in range(bands)]
+        # cluster id -> [size, entries kept, first seconds, last seconds,
+        # set of user ids or HyperLogLog]
+        self._clusters = {}
+        self._newest = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [hash(tuple(signature[start:start + rows]))
+                for start in range(0, len(signature), rows)]
+
+    def _evict(self):
+        entries = self._entries
+        times = self._times
+        oldest = self._newest - self.window
+        while times and (times[0][0] < oldest or len(entries) > self.max_entries):
+            tweet_id = heapq.heappop(times)[2]
+            _, signature, cluster_id = entries.pop(tweet_id)
+            for buckets, key in zip(self._buckets, self._band_keys(signature)):
+                bucket = buckets.get(key)
+                if bucket is not None and tweet_id in bucket:
+                    bucket.remove(tweet_id)
+                    if not bucket:
+                        del buckets[key]
+            cluster = self._clusters[cluster_id]
+            cluster[1] -= 1
+            if not cluster[1]:
+                del self._clusters[cluster_id]
+
+    def _insert(self, tweet_id, signature, seconds, user_id):
+        entries = self._entries
+        if tweet_id in entries:
+            cluster_id = entries[tweet_id][2]
+            return cluster_id if cluster_id != tweet_id else None
+        if self._newest is None or seconds > self._newest:
+            self._newest = seconds
+        self._evict()
+        keys = self._band_keys(signature)
+        match = None
+        checked = set()
+        for buckets, key in zip(self._buckets, keys):
+            # the most recent first
+            for candidate in reversed(buckets.get(key, ())):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if self.hasher.similarity(signature, entries[candidate][1]) >= self.threshold:
+                    match = entries[candidate][2]
+                    break
+            if match is not None:
+                break
+        cluster_id = tweet_id if match is None else match
+        entries[tweet_id] = (seconds, signature, cluster_id)
+        heapq.heappush(self._times, (seconds, next(self._arrivals), tweet_id))
+        for buckets, key in zip(self._buckets, keys):
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = collections.deque(maxlen=self.bucket_size)
+            bucket.append(tweet_id)
+        cluster = self._clusters.get(cluster_id)
+        if cluster is None:
+            cluster = self._clusters[cluster_id] = [0, 0, seconds, seconds, set()]
+        cluster[0] += 1
+        cluster[1] += 1
+        cluster[2] = min(cluster[2], seconds)
+        cluster[3] = max(cluster[3], seconds)
+        if user_id is not None:
+            users = cluster[4]
+            users.add(user_id)
+            if isinstance(users, set) and len(users) > self.max_users:
+                cluster[4] = HyperLogLog(precision=_USERS_PRECISION)
+                cluster[4].add_many(users)
+        # a Tweet older than the window is forgotten right away
+        self._evict()
+        return match
+
+    def add_text(self, tweet_id, text, seconds=None, user_id=None):
+        """
+        Add the text of a Tweet, or of anything else with an id
+
+        Args:
+            tweet_id (int or str): the Tweet's id
+            text (str): the text, without links (see `get_text_without_links`)
+            seconds (int): the time of the Tweet; its snowflake time by default
+            user_id (str): the Tweet's user, to count the users of a cluster
+
+        Returns:
+            int or None: the id of the first Tweet of the cluster that the
+            Tweet is a near duplicate of, or None
+        """
+        tweet_id = int(tweet_id)
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return None
+        if seconds is None:
+            seconds = snowflake2utc(tweet_id)
+        return self._insert(tweet_id, signature, seconds, user_id)
+
+    def add(self, tweet, original_format=None):
+        """
+        Add a Tweet (see `add_batch`)
+        """
+        return self.add_batch([tweet], original_format)[0]
+
+    def add_batch(self, payloads, original_format=None):
+        """
+        Add a batch of Tweets or dicts, in the order they were posted
+
+        Args:
+            payloads (list): Tweet objects or dicts
+            original_format (bool): the format of all of the payloads, if
+                known (see `tweet_parser.getter_methods.batch`)
+
+        Returns:
+            list: for each payload, the id (int) of the first Tweet of the
+            cluster it is a near duplicate of, or None (as for a Tweet
+            without text, like a Retweet)
+        """
+        texts = batch.apply_getter(get_text_without_links, payloads, original_format)
+        tweet_ids = get_tweet_ids(payloads, original_format)
+        user_ids = batch.get_user_id_batch(payloads, original_format)
+        results = []
+        for tweet_id, signature, user_id in zip(tweet_ids, self.hasher.signatures(texts),
+                                                user_ids):
+            if signature is None:
+                results.append(None)
+                continue
+            tweet_id = int(tweet_id)
+            results.append(self._insert(tweet_id, signature, snowflake2utc(tweet_id), user_id))
+        return results
+
+    def clusters(self, min_size=2):
+        """
+        The clusters that still have Tweets in the window, largest first
+
+        Args:
+            min_size (int): the fewest Tweets a cluster reported has had
+
+        Returns:
+            list of dicts: "id" (the id of the cluster's first Tweet),
+            "size" (the Tweets added to it, including those forgotten
+            since), "users" (the number of distinct users, estimated for
+            clusters of more than `max_users`), and "first"
+            and "last" (the times of its first and last Tweets)
+        """
+        clusters = [{"id": cluster_id, "size": size,
+                     "users": len(users) if isinstance(users, set) else users.count(),
+                     "first": first, "last": last}
+                    for cluster_id, (size, _, first, last, users) in self._clusters.items()
+                    if size >= min_size]
+        clusters.sort(key=lambda cluster: (-cluster["size"], cluster["id"]))
+        return clusters
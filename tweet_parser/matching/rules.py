@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Match Tweets against PowerTrack-style rules locally
+
+`RuleSet` compiles a list of rules, in the syntax of PowerTrack rule
+values, and gives the rules that each Tweet matches in the shape of
+`gnip_fields.get_matching_rules` (``[{"tag": ..., "value": ...}]``), e.g.
+to replay an archive against a new set of rules. A rule is made of:
+
+- keywords (``apple``) and quoted phrases (``"apple pie"``), matched case
+  insensitively against whole words of `get_all_text`
+- ``#hashtag`` and ``@screen_name``, matched against the hashtag and
+  mention entities
+- ``from:`` a user id or screen name, and ``lang:`` a language code
+- ``has:links``, ``has:media``, ``has:hashtags``, ``has:mentions``,
+  ``is:retweet``, ``is:quote`` and ``is:reply``
+- ``-`` before any of those, or before a group in parentheses, to negate
+  it; terms next to each other must all match, and ``OR`` between them
+  means either may match (AND binds more tightly than OR)
+
+All of the rules share the structures they are matched with: one
+Aho-Corasick automaton holds every keyword and phrase of every rule, and
+dicts map each user, language, hashtag and mention to the terms that use
+them. A Tweet is scanned once to find its true terms, and only the rules
+that use one of those terms (not negated) are evaluated. A rule that
+could match without any of its terms (e.g. ``-apple``) is rejected, as
+PowerTrack does.
+"""
+import re
+
+from tweet_parser.getter_methods import batch
+from tweet_parser.getter_methods.tweet_entities import get_media_entities, get_user_mentions
+from tweet_parser.getter_methods.tweet_links import get_tweet_links
+from tweet_parser.getter_methods.tweet_text import get_all_text
+from tweet_parser.matching.aho_corasick import Automaton, is_word_char
+
+_TOKENS = re.compile(r'\s*(-?)("(?:[^"\\]|\\.)*"|\(|\)|[^\s()"]+)', re.UNICODE)
+
+# the column of each flag term, and whether it's true for a column value
+FLAGS = {"has:links": ("links", bool),
+         "has:media": ("media", bool),
+         "has:hashtags": ("hashtags", bool),
+         "has:mentions": ("mentions", bool),
+         "is:retweet": ("tweet_type", lambda tweet_type: tweet_type == "retweet"),
+         "is:quote": ("tweet_type", lambda tweet_type: tweet_type == "quote"),
+         "is:reply": ("in_reply_to", lambda status_id: status_id is not None)}
+
+
+def _lower_all(values):
+    return [value.lower() if value else value for value in values]
+
+
+# how to get each column of a batch
+_COLUMNS = {
+    "text": lambda payloads, original_format: _lower_all(
+        batch.apply_getter(get_all_text, payloads, original_format)),
+    "user_id": batch.get_user_id_batch,
+    "screen_name": lambda payloads, original_format: _lower_all(
+        batch.get_screen_name_batch(payloads, original_format)),
+    "lang": batch.get_lang_batch,
+    "tweet_type": batch.get_tweet_type_batch,
+    "in_reply_to": batch.get_in_reply_to_status_id_batch,
+    "links": lambda payloads, original_format: batch.apply_getter(
+        get_tweet_links, payloads, original_format),
+    "media": lambda payloads, original_format: batch.apply_getter(
+        get_media_entities, payloads, original_format),
+    "hashtags": lambda payloads, original_format: [
+        _lower_all(hashtags) for hashtags in batch.get_hashtags_batch(payloads, original_format)],
+    "mentions": lambda payloads, original_format: [
+        [mention.get("screen_name", "").lower() for mention in mentions]
+        for mentions in batch.apply_getter(get_user_mentions, payloads, original_format)],
+}
+
+
+def parse_rule(value):
+    """
+    Parse a rule value into a tree of terms
+
+    Args:
+        value (str): a PowerTrack-style rule
+
+    Returns:
+        tuple: ``("or", [children])``, ``("and", [children])``,
+        ``("not", term)`` or a term, where a term is a (kind, argument) pair
+        with kind "text", "hashtag", "mention", "from", "lang" or "flag".
+        Negations are pushed down to the terms.
+
+    Raises:
+        ValueError: if the rule can't be parsed
+
+    Example:
+        >>> from tweet_parser.matching.rules import parse_rule
+        >>> parse_rule('Apple -(pie OR "apple tart") lang:en')
+        ('and', [('text', 'apple'), ('and', [('not', ('text', 'pie')), ('not', ('text', 'apple tart'))]), ('lang', 'en')])
+    """
+    tokens = []
+    position = 0
+    value = value.strip()
+    while position < len(value):
+        match = _TOKENS.match(value, position)
+        if match is None:
+            raise ValueError("can't parse rule {!r} at {!r}".format(value, value[position:]))
+        tokens.append((bool(match.group(1)), match.group(2)))
+        position = match.end()
+    if not tokens:
+        raise ValueError("empty rule")
+    tree, position = _parse_or(tokens, 0, value)
+    if position != len(tokens):
+        raise ValueError("unexpected ')' in rule {!r}".format(value))
+    return tree
+
+
+def _parse_or(tokens, position, value):
+    children = []
+    while True:
+        child, position = _parse_and(tokens, position, value)
+        children.append(child)
+        if position < len(tokens) and tokens[position] == (False, "OR"):
+            position += 1
+        else:
+            break
+    return (children[0] if len(children) == 1 else ("or", children)), position
+
+
+def _parse_and(tokens, position, value):
+    children = []
+    while position < len(tokens) and tokens[position] not in [(False, "OR"), (False, ")")]:
+        negated, token = tokens[position]
+        position += 1
+        if token == "(":
+            child, position = _parse_or(tokens, position, value)
+            if position == len(tokens) or tokens[position] != (False, ")"):
+                raise ValueError("missing ')' in rule {!r}".format(value))
+            position += 1
+        else:
+            child = _parse_term(token, value)
+        children.append(_negate(child) if negated else child)
+    if not children:
+        raise ValueError("missing term in rule {!r}".format(value))
+    return (children[0] if len(children) == 1 else ("and", children)), position
+
+
+def _parse_term(token, value):
+    if token.startswith('"'):
+        phrase = re.sub(r'\\(.)', r'\1', token[1:-1]).lower()
+        if not phrase.strip():
+            raise ValueError("empty phrase in rule {!r}".format(value))
+        return ("text", phrase)
+    if token in FLAGS:
+        return ("flag", token)
+    operator, colon, argument = token.partition(":")
+    if colon and operator in ["has", "is"]:
+        raise ValueError("unknown operator {!r} in rule {!r}".format(token, value))
+    if operator in ["from", "lang"] and argument:
+        return (operator, argument.lstrip("@").lower() if operator == "from" else argument)
+    if token.startswith("#") and len(token) > 1:
+        return ("hashtag", token[1:].lower())
+    if token.startswith("@") and len(token) > 1:
+        return ("mention", token[1:].lower())
+    return ("text", token.lower())
+
+
+def _negate(tree):
+    if tree[0] == "not":
+        return tree[1]
+    if tree[0] in ["and", "or"]:
+        return ("or" if tree[0] == "and" else "and", [_negate(child) for child in tree[1]])
+    return ("not", tree)
+
+
+def _evaluator(tree):
+    """
+    A function of the set of true term ids that evaluates a compiled tree,
+    with the terms of each "and" and "or" tested as sets
+    """
+    if isinstance(tree, int):
+        return lambda true_terms: tree in true_terms
+    if tree[0] == "not":
+        return lambda true_terms: tree[1] not in true_terms
+    positive = frozenset(child for child in tree[1] if isinstance(child, int))
+    negations = [child for child in tree[1] if not isinstance(child, int) and child[0] == "not"]
+    negative = frozenset(term_id for _, term_id in negations)
+    children = [_evaluator(child) for child in tree[1]
+                if not isinstance(child, int) and child[0] != "not"]
+    if tree[0] == "and":
+        return lambda true_terms: (positive.issubset(true_terms) and
+                                   negative.isdisjoint(true_terms) and
+                                   all(child(true_terms) for child in children))
+    return lambda true_terms: (not positive.isdisjoint(true_terms) or
+                               not negative.issubset(true_terms) or
+                               any(child(true_terms) for child in children))
+
+
+class RuleSet(object):
+    """
+    Rules compiled to match Tweets in one pass
+
+    Args:
+        rules (list): rule values (str), or dicts with a "value" and a "tag"
+            (and any other keys, e.g. "id"), as in the PowerTrack rules API
+
+    Raises:
+        ValueError: if a rule can't be parsed, or could match a Tweet
+            without any of its terms
+
+    Example:
+        >>> from tweet_parser.matching.rules import RuleSet
+        >>> rules = RuleSet([{"value": "pie -apple", "tag": "pies"},
+        ...                  {"value": '"apple pie" OR from:RobotPrincessFi', "tag": "apple"}])
+        >>> rules.match({"created_at": "Wed May 24 20:17:19 +0000 2017", "truncated": False,
+        ...              "text": "Apple pie!",
+        ...              "user": {"id_str": "2382763597", "screen_name": "notFromShrek"}})
+        [{'value': '"apple pie" OR from:RobotPrincessFi', 'tag': 'apple'}]
+    """
+    def __init__(self, rules):
+        self.rules = []
+        self._evaluators = []
+        self._terms = {}
+        self._rules_by_term = []
+        self._automaton = Automaton()
+        # the terms of each column value, e.g. {"lang": {"en": [3]}}
+        self._index = {}
+        self._flags = []
+        for rule in rules:
+            if not isinstance(rule, dict):
+                rule = {"value": rule, "tag": None}
+            tree = self._compile(parse_rule(rule["value"]))
+            evaluator = _evaluator(tree)
+            if evaluator(frozenset()):
+                raise ValueError("rule {!r} matches Tweets without any of its terms"
+                                 .format(rule["value"]))
+            for term_id in self._positive_terms(tree):
+                self._rules_by_term[term_id].add(len(self.rules))
+            self.rules.append(rule)
+            self._evaluators.append(evaluator)
+        self._columns = set(self._index)
+        if len(self._automaton):
+            self._columns.add("text")
+        self._columns.update(FLAGS[flag][0] for flag, _ in self._flags)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _term_id(self, term):
+        term_id = self._terms.get(term)
+        if term_id is not None:
+            return term_id
+        term_id = self._terms[term] = len(self._terms)
+        self._rules_by_term.append(set())
+        kind, argument = term
+        if kind == "text":
+            self._automaton.add(argument, (term_id, is_word_char(argument[0]),
+                                           is_word_char(argument[-1])))
+        elif kind == "flag":
+            self._flags.append((argument, term_id))
+        else:
+            column = {"from": "user", "lang": "lang", "hashtag": "hashtags",
+                      "mention": "mentions"}[kind]
+            self._index.setdefault(column, {}).setdefault(argument, []).append(term_id)
+        return term_id
+
+    def _compile(self, tree):
+        """
+        The tree with each term replaced by its id
+        """
+        if tree[0] in ["and", "or"]:
+            return (tree[0], [self._compile(child) for child in tree[1]])
+        if tree[0] == "not":
+            return ("not", self._term_id(tree[1]))
+        return self._term_id(tree)
+
+    def _positive_terms(self, tree):
+        if isinstance(tree, int):
+            return [tree]
+        if tree[0] == "not":
+            return []
+        return [term_id for child in tree[1] for term_id in self._positive_terms(child)]
+
+    def _true_terms(self, row):
+        true_terms = set()
+        text = row.get("text")
+        if text:
+            for start, end, (term_id, word_start, word_end) in \
+                    self._automaton.iter_matches(text):
+                # keywords and phrases match whole words
+                if (word_start and start > 0 and is_word_char(text[start - 1])) or \
+                        (word_end and end < len(text) and is_word_char(text[end])):
+                    continue
+                true_terms.add(term_id)
+        for column, term_ids in self._index.items():
+            if column in ["hashtags", "mentions"]:
+                values = row[column]
+            elif column == "user":
+                values = [row["user_id"], row["screen_name"]]
+            else:
+                values = [row[column]]
+            for value in values:
+                true_terms.update(term_ids.get(value, ()))
+        for flag, term_id in self._flags:
+            column, test = FLAGS[flag]
+            if test(row[column]):
+                true_terms.add(term_id)
+        return true_terms
+
+    def _match_row(self, row):
+        true_terms = self._true_terms(row)
+        candidates = set()
+        for term_id in true_terms:
+            candidates.update(self._rules_by_term[term_id])
+        return [self.rules[index] for index in sorted(candidates)
+                if self._evaluators[index](true_terms)]
+
+    def match(self, tweet, original_format=None):
+        """
+        The rules that a Tweet matches
+
+        Args:
+            tweet (Tweet or dict): A Tweet object or dictionary
+            original_format (bool): True for original format, False for
+                activity streams; if None, it is found from the keys of `tweet`
+
+        Returns:
+            list of dicts: the matching rules, in the order they were given
+        """
+        return self.match_batch([tweet], original_format)[0]
+
+    def match_batch(self, payloads, original_format=None):
+        """
+        The rules that each of a batch of Tweets matches
+
+        Args:
+            payloads (list): Tweet objects or dicts
+            original_format (bool): the format of all of the payloads, if
+                known (see `tweet_parser.getter_methods.batch`)
+
+        Returns:
+            list of lists of dicts: the matching rules of each payload
+        """
+        if not isinstance(payloads, list):
+            payloads = list(payloads)
+        names = set(self._columns)
+        if "user" in names:
+            names.discard("user")
+            names.update(["user_id", "screen_name"])
+        columns = [(name, _COLUMNS[name](payloads, original_format)) for name in names]
+        return [self._match_row(dict((name, values[row]) for name, values in columns))
+                for row in range(len(payloads))]
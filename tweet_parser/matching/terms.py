@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Find which of many terms appear in the text of Tweets
+
+`TermMatcher` puts every term into one Aho-Corasick automaton (see
+`tweet_parser.matching.aho_corasick`), so finding all of the terms in a
+Tweet's `get_all_text` takes time that grows with the length of the text,
+not with the number of terms, unlike a loop of ``term in text`` checks.
+
+Terms are matched without regard to case by default (both the terms and
+the text are case folded), and as whole words: ``apple`` doesn't match
+"pineapple" or "apples". A term that starts with "#" or "@" only matches
+that hashtag or mention (``#pie`` matches "#pie" but not "#pies" or
+"a#pie"). A plain term also matches a hashtag or mention of the same word
+("apple" in "#apple") unless ``match_entities=False``.
+"""
+import io
+
+from tweet_parser.getter_methods import batch
+from tweet_parser.getter_methods.tweet_text import get_all_text
+from tweet_parser.matching.aho_corasick import Automaton, is_word_char
+
+_ENTITY_PREFIXES = "#@"
+
+
+def fold_case(text):
+    """
+    The case folded text (``str.casefold`` where there is one, or
+    ``lower``), for matching text without regard to case
+    """
+    casefold = getattr(text, "casefold", None)
+    return casefold() if casefold is not None else text.lower()
+
+
+class TermMatcher(object):
+    """
+    A compiled set of terms to find in texts and Tweets
+
+    Args:
+        terms (list): the terms (str) to find
+        case_sensitive (bool): match the case of the terms exactly
+        whole_words (bool): only match terms that start and end at word
+            boundaries (a term that starts or ends with a character that
+            isn't part of a word, like "c++", can match next to anything
+            on that side)
+        match_entities (bool): whether a plain term also matches a hashtag
+            or a mention of the same text
+
+    Example:
+        >>> from tweet_parser.matching.terms import TermMatcher
+        >>> matcher = TermMatcher(["apple", "#pie", "Apple Pie"])
+        >>> matcher.matches("APPLE PIE with pineapple #pie")
+        ['apple', '#pie', 'Apple Pie']
+        >>> matcher.matches("#applepie and #pies")
+        []
+    """
+    def __init__(self, terms, case_sensitive=False, whole_words=True, match_entities=True):
+        self.case_sensitive = case_sensitive
+        self.whole_words = whole_words
+        self.match_entities = match_entities
+        self.terms = []
+        self._automaton = Automaton()
+        for term in terms:
+            self.add(term)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, term):
+        """
+        Add a term to find
+        """
+        if not term:
+            raise ValueError("can't match an empty term")
+        pattern = term if self.case_sensitive else fold_case(term)
+        # whether the characters before and after a match need checking
+        entity = pattern[0] in _ENTITY_PREFIXES
+        check_start = self.whole_words and (entity or is_word_char(pattern[0]))
+        check_end = self.whole_words and is_word_char(pattern[-1])
+        self._automaton.add(pattern, (len(self.terms), entity, check_start, check_end))
+        self.terms.append(term)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """
+        Make a `TermMatcher` from a UTF-8 text file with a term per line
+        (blank lines are skipped, and the other keyword arguments are
+        passed on)
+        """
+        with io.open(path, "r", encoding="utf-8") as f:
+            terms = [line.strip() for line in f]
+        return cls([term for term in terms if term], **kwargs)
+
+    def matches(self, text):
+        """
+        The terms that appear in a text
+
+        Args:
+            text (str): the text to search
+
+        Returns:
+            list of str: the terms found, in the order they were added
+        """
+        if not text:
+            return []
+        if not self.case_sensitive:
+            text = fold_case(text)
+        found = set()
+        for start, end, (index, entity, check_start, check_end) in \
+                self._automaton.iter_matches(text):
+            if index in found:
+                continue
+            before = text[start - 1] if start > 0 else ""
+            if check_start and before and (is_word_char(before) or
+                                           (entity and before in _ENTITY_PREFIXES)):
+                continue
+            if check_end and end < len(text) and is_word_char(text[end]):
+                continue
+            if not self.match_entities and not entity and before and \
+                    before in _ENTITY_PREFIXES:
+                continue
+            found.add(index)
+        return [self.terms[index] for index in sorted(found)]
+
+    def match(self, tweet, original_format=None):
+        """
+        The terms that appear in the text of a Tweet (`get_all_text`)
+
+        Args:
+            tweet (Tweet or dict): A Tweet object or dictionary
+            original_format (bool): True for original format, False for
+                activity streams; if None, it is found from the keys of `tweet`
+
+        Returns:
+            list of str: the terms found, in the order they were added
+        """
+        return self.matches(get_all_text(tweet, original_format))
+
+    def match_batch(self, payloads, original_format=None):
+        """
+        The terms that appear in the text of each of a batch of Tweets
+
+        Args:
+            payloads (list): Tweet objects or dicts
+            original_format (bool): the format of all of the payloads, if
+                known (see `tweet_parser.getter_methods.batch`)
+
+        Returns:
+            list of lists of str: the terms found in each payload
+        """
+        return [self.matches(text)
+                for text in batch.apply_getter(get_all_text, payloads, original_format)]
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Throughput and error metrics for long parse jobs.
+
+`ParseMetrics` holds plain counters that the parse loop increments.
+A `MetricsReporter` periodically turns them into a snapshot (counts plus
+line, Tweet and byte rates over the last interval) and hands it to one or
+more sinks: a Prometheus textfile (for the node_exporter textfile
+collector), a file of JSON lines, or a progress line on stderr. The
+reporter only looks at the clock every `check_every` lines, so the cost
+in the parse loop is one counter decrement per line.
+"""
+import json
+import os
+import sys
+import time
+
+_timer = getattr(time, "perf_counter", time.time)
+
+
+class ParseMetrics(object):
+    """
+    Counters for a parse run
+
+    Attributes:
+        lines (int): input lines read
+        bytes (int): input bytes read
+        tweets (int): lines that were loaded as Tweets
+        original_format (int): Tweets in original format
+        activity_streams (int): Tweets in activity-streams format
+        bad_json (int): lines that weren't valid JSON
+        non_tweets (int): JSON payloads that weren't Tweets
+        not_available (int): attributes that raised `NotAvailableError`
+    """
+    FIELDS = ["lines", "bytes", "tweets", "original_format", "activity_streams",
+              "bad_json", "non_tweets", "not_available"]
+    __slots__ = FIELDS
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+
+    def count_tweet(self, tweet):
+        self.tweets += 1
+        if tweet.original_format:
+            self.original_format += 1
+        else:
+            self.activity_streams += 1
+
+    def counts(self):
+        """
+        The counters as a dict
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def add(self, counts):
+        """
+        Add counts (e.g. from a worker process) to these counters
+
+        Args:
+            counts (dict): a dict returned by `ParseMetrics.counts`
+        """
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field) + counts.get(field, 0))
+
+    def __getstate__(self):
+        return self.counts()
+
+    def __setstate__(self, state):
+        self.reset()
+        self.add(state)
+
+
+class MetricsReporter(object):
+    """
+    Periodically report a run's metrics to some sinks
+
+    Args:
+        metrics (ParseMetrics): the counters to report
+        sinks (list): objects with a `write(snapshot)` method, e.g.
+            `PrometheusTextfile`, `JSONLinesFile` or `ProgressLine`
+        interval (float): minimum number of seconds between reports
+        check_every (int): number of `tick` calls between looks at the clock
+
+    Example:
+        >>> import io
+        >>> from tweet_parser.metrics import ParseMetrics, MetricsReporter, JSONLinesFile
+        >>> metrics = ParseMetrics()
+        >>> out = io.StringIO()
+        >>> reporter = MetricsReporter(metrics, [JSONLinesFile(out)])
+        >>> metrics.lines += 3
+        >>> metrics.bad_json += 1
+        >>> snapshot = reporter.report()
+        >>> snapshot["lines"], snapshot["bad_json"]
+        (3, 1)
+    """
+    def __init__(self, metrics, sinks, interval=10.0, check_every=1000):
+        self.metrics = metrics
+        self.sinks = sinks
+        self.interval = interval
+        self.check_every = max(1, check_every)
+        self._countdown = self.check_every
+        self.start_time = _timer()
+        self._last_time = self.start_time
+        self._last_counts = metrics.counts()
+
+    def tick(self):
+        """
+        Call once per line; reports when the interval has passed
+        """
+        self._countdown -= 1
+        if self._countdown <= 0:
+            self._countdown = self.check_every
+            self.maybe_report()
+
+    def maybe_report(self):
+        """
+        Report if at least `interval` seconds have passed since the last report
+        """
+        if _timer() - self._last_time >= self.interval:
+            self.report()
+
+    def snapshot(self):
+        """
+        The current counts, and rates since the last report
+
+        Returns:
+            dict: the `ParseMetrics` counters, "timestamp" (Unix time),
+            "elapsed_seconds" (since the start of the run) and
+            "lines_per_second", "tweets_per_second" and "bytes_per_second"
+            (over the interval since the last report)
+        """
+        now = _timer()
+        counts = self.metrics.counts()
+        seconds = max(now - self._last_time, 1e-9)
+        snapshot = dict(counts)
+        snapshot["timestamp"] = time.time()
+        snapshot["elapsed_seconds"] = now - self.start_time
+        for field in ["lines", "tweets", "bytes"]:
+            snapshot[field + "_per_second"] = (counts[field] - self._last_counts[field]) / seconds
+        self._last_time = now
+        self._last_counts = counts
+        return snapshot
+
+    def report(self):
+        """
+        Write a snapshot to every sink now
+
+        Returns:
+            dict: the snapshot
+        """
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            sink.write(snapshot)
+        return snapshot
+
+
+class PrometheusTextfile(object):
+    """
+    Write snapshots in the Prometheus text format, replacing the file
+    atomically each time (for the node_exporter textfile collector)
+
+    Args:
+        path (str): the file to write, should end in ".prom"
+        prefix (str): prefix of the metric names
+    """
+    def __init__(self, path, prefix="tweet_parser"):
+        self.path = path
+        self.prefix = prefix
+
+    def format(self, snapshot):
+        p = self.prefix
+        lines = []
+
+        def metric(name, metric_type, help_text, samples):
+            lines.append("# HELP {}_{} {}".format(p, name, help_text))
+            lines.append("# TYPE {}_{} {}".format(p, name, metric_type))
+            for labels, value in samples:
+                lines.append("{}_{}{} {}".format(p, name, labels, value))
+
+        metric("lines_total", "counter", "Input lines read.", [("", snapshot["lines"])])
+        metric("bytes_total", "counter", "Input bytes read.", [("", snapshot["bytes"])])
+        metric("tweets_total", "counter", "Tweets parsed, by payload format.",
+               [('{format="original_format"}', snapshot["original_format"]),
+                ('{format="activity_streams"}', snapshot["activity_streams"])])
+        metric("errors_total", "counter", "Lines or attributes that could not be parsed, by error.",
+               [('{error="bad_json"}', snapshot["bad_json"]),
+                ('{error="non_tweet"}', snapshot["non_tweets"]),
+                ('{error="not_available"}', snapshot["not_available"])])
+        for field in ["lines", "tweets", "bytes"]:
+            metric(field + "_per_second", "gauge",
+                   "{} per second over the last reporting interval.".format(field.capitalize()),
+                   [("", "{:.3f}".format(snapshot[field + "_per_second"]))])
+        metric("elapsed_seconds", "gauge", "Seconds since the run started.",
+               [("", "{:.3f}".format(snapshot["elapsed_seconds"]))])
+        metric("last_report_timestamp_seconds", "gauge", "Unix time of the last report.",
+               [("", "{:.3f}".format(snapshot["timestamp"]))])
+        return "\n".join(lines) + "\n"
+
+    def write(self, snapshot):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.format(snapshot))
+        os.rename(tmp_path, self.path)
+
+
+class JSONLinesFile(object):
+    """
+    Append each snapshot to a file as one JSON object per line
+
+    Args:
+        output (str or file): a file name (opened for appending) or a
+            text file-like object
+    """
+    def __init__(self, output):
+        if isinstance(output, str):
+            output = open(output, "a")
+        self.output = output
+
+    def write(self, snapshot):
+        self.output.write(json.dumps(snapshot, sort_keys=True) + "\n")
+        self.output.flush()
+
+
+class ProgressLine(object):
+    """
+    Write each snapshot as a short human-readable line
+
+    Args:
+        stream (file): a text stream, defaults to stderr
+    """
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def write(self, snapshot):
+        stream = self.stream or sys.stderr
+        stream.write("[{:.0f}s] {} lines ({:.0f}/s), {} Tweets ({:.0f}/s), {:.1f} MB ({:.2f} MB/s); "
+                     "original format {}, activity streams {}; bad JSON {}, non-Tweets {}, "
+                     "not available {}\n".format(
+                         snapshot["elapsed_seconds"], snapshot["lines"], snapshot["lines_per_second"],
+                         snapshot["tweets"], snapshot["tweets_per_second"],
+                         snapshot["bytes"] / 1e6, snapshot["bytes_per_second"] / 1e6,
+                         snapshot["original_format"], snapshot["activity_streams"],
+                         snapshot["bad_json"], snapshot["non_tweets"], snapshot["not_available"]))
+        stream.flush()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Write projected Tweet attributes as newline-delimited JSON (NDJSON).
+
+The JSON encoder is picked once, at import time, from the fastest library
+that is installed: ``orjson``, then ``ujson``, then the standard library
+``json`` module. Every encoder here returns UTF-8 encoded bytes, so output
+streams should be opened in binary mode.
+"""
+import datetime
+
+try:
+    import orjson
+
+    ENCODER_NAME = "orjson"
+
+    def _encode(obj):
+        return orjson.dumps(obj, default=_default)
+except ImportError:
+    try:
+        import ujson
+
+        ENCODER_NAME = "ujson"
+
+        def _encode(obj):
+            return ujson.dumps(obj, ensure_ascii=False,
+                               default=_default).encode("utf-8")
+    except ImportError:
+        import json
+
+        ENCODER_NAME = "json"
+
+        def _encode(obj):
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":"),
+                              default=_default).encode("utf-8")
+
+
+def _default(obj):
+    # the only non-JSON value a Tweet attribute returns is
+    # `created_at_datetime`; orjson already writes datetimes this way
+    if isinstance(obj, datetime.datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def encode(obj):
+    """
+    Encode a JSON-serializable object with the fastest available encoder
+
+    Args:
+        obj: any JSON-serializable object (datetimes are written
+             in ISO 8601 format)
+
+    Returns:
+        bytes: the UTF-8 encoded JSON document, without a trailing newline
+
+    Example:
+        >>> from tweet_parser.ndjson import encode
+        >>> encode({"hashtags": ["1hashtag"], "lang": None})
+        b'{"hashtags":["1hashtag"],"lang":null}'
+    """
+    return _encode(obj)
+
+
+class NDJSONWriter(object):
+    """
+    Buffer encoded records and write them to a binary stream in batches
+
+    Args:
+        stream (file): a file-like object opened in binary mode
+        batch_size (int): number of records to encode before each write
+        drop_none (bool): if True, omit keys whose value is `None`
+
+    Example:
+        >>> import io
+        >>> from tweet_parser.ndjson import NDJSONWriter
+        >>> out = io.BytesIO()
+        >>> writer = NDJSONWriter(out, drop_none=True)
+        >>> writer.write({"id": "867474613139156993", "lang": None})
+        >>> writer.flush()
+        >>> out.getvalue()
+        b'{"id":"867474613139156993"}\\n'
+    """
+    def __init__(self, stream, batch_size=1000, drop_none=False):
+        self.stream = stream
+        self.batch_size = max(1, batch_size)
+        self.drop_none = drop_none
+        self._batch = []
+
+    def write(self, record):
+        """
+        Encode one record (a dict) and buffer it for writing
+        """
+        if self.drop_none:
+            record = {k: v for k, v in record.items() if v is not None}
+        self._batch.append(_encode(record))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all of the buffered records to the stream and flush it
+        """
+        if self._batch:
+            self._batch.append(b"")
+            self.stream.write(b"\n".join(self._batch))
+            self._batch = []
+        self.stream.flush()
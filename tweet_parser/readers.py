@@ -0,0 +1,442 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Readers for files of newline-delimited Tweet payloads.
+
+Unlike `fileinput`, these readers report where in the file each line ends,
+so that a long parse can record its position and later resume from it.
+Lines are returned as bytes (`json.loads` accepts bytes directly).
+
+Large uncompressed files can also be split into byte ranges that start
+and end on line boundaries, so that several processes can each parse
+part of one file, and files sorted by Tweet id can be binary searched
+for a time range without reading the rest of the file. Lines repeated
+within or across files can be skipped by their Tweet ids (see
+`tweet_parser.dedup`).
+"""
+import mmap
+import os
+import re
+import sys
+import zlib
+
+from tweet_parser.getter_methods.tweet_date import snowflake2utc
+
+_CHUNK_SIZE = 1 << 16
+
+# a JSON string, and a top-level "id" key candidate with its (snowflake) value:
+# 867474613139156993 (original format) or
+# "tag:search.twitter.com,2005:867474613139156993" (activity streams)
+_JSON_STRING_REGEX = re.compile(br'"[^"\\]*(?:\\.[^"\\]*)*"')
+_ID_KEY_REGEX = re.compile(br'"id"\s*:\s*"?(?:tag:search\.twitter\.com,2005:)?(\d+)')
+
+
+def _open_stdin():
+    return getattr(sys.stdin, "buffer", sys.stdin)
+
+
+def _iter_plain_lines(fileobj, start_offset):
+    if start_offset:
+        fileobj.seek(start_offset)
+    offset = start_offset
+    for line in fileobj:
+        offset += len(line)
+        yield line, offset
+
+
+def _iter_gzip_lines(fileobj, start_offset):
+    """
+    Decompress a (possibly multi-member) gzip file one member at a time,
+    keeping track of the compressed offset where each member starts.
+    A line can only be resumed from when it is the last line of a member,
+    so the offset for every other line is None. Raises EOFError (like
+    `gzip.GzipFile`) after the complete lines of a member that was cut off.
+    """
+    fileobj.seek(start_offset)
+    raw = b""
+    member_end = start_offset
+    pending = b""
+    held = None
+    while True:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        member_started = member_done = False
+        while not member_done:
+            if not raw:
+                raw = fileobj.read(_CHUNK_SIZE)
+                if not raw:
+                    break
+            member_started = True
+            data = decompressor.decompress(raw)
+            if decompressor.eof:
+                unused = decompressor.unused_data
+                member_end += len(raw) - len(unused)
+                raw = unused
+                member_done = True
+            else:
+                member_end += len(raw)
+                raw = b""
+            parts = (pending + data).split(b"\n")
+            pending = parts.pop()
+            for part in parts:
+                if held is not None:
+                    yield held, None
+                held = part + b"\n"
+        if not member_done:
+            if member_started:
+                # the file ends inside a member, e.g. one a crash cut off
+                if held is not None:
+                    yield held, None
+                raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+            # an empty file, or resuming at its end
+            return
+        if held is not None:
+            # a line that continues into the next member is not a boundary
+            yield held, None if pending else member_end
+            held = None
+        if not raw:
+            raw = fileobj.read(_CHUNK_SIZE)
+            if not raw:
+                if pending:
+                    yield pending, member_end
+                return
+
+
+def peek_tweet_id(line):
+    """
+    Get the snowflake id of the Tweet payload in one line of JSON
+    without decoding it
+
+    Nested objects (the user, a quoted or retweeted Tweet, ...) have "id"
+    keys of their own and the order of keys is not fixed, so candidate
+    "id" keys are checked to find the one at the top level of the payload.
+
+    Args:
+        line (bytes): one JSON encoded Tweet payload (either format)
+
+    Returns:
+        int: the Tweet id, or None if the line has no top-level numeric id
+
+    Example:
+        >>> from tweet_parser.readers import peek_tweet_id
+        >>> peek_tweet_id(b'{"user": {"id": 2382763597}, "id": 867474613139156993}')
+        867474613139156993
+        >>> peek_tweet_id(b'{"id": "tag:search.twitter.com,2005:867474613139156993"}')
+        867474613139156993
+        >>> peek_tweet_id(b'{"limit": {"track": 3}}') is None
+        True
+    """
+    depth = 0
+    pos = 0
+    for candidate in _ID_KEY_REGEX.finditer(line):
+        # count the brackets before this key, ignoring any in strings
+        skeleton = _JSON_STRING_REGEX.sub(b"", line[pos:candidate.start()])
+        depth += (skeleton.count(b"{") + skeleton.count(b"[") -
+                  skeleton.count(b"}") - skeleton.count(b"]"))
+        if depth == 1:
+            return int(candidate.group(1))
+        pos = candidate.start()
+    return None
+
+
+def first_true(lo, hi, predicate):
+    """
+    Binary search for the first integer `i` in [lo, hi) where `predicate(i)`
+    is True, given that the predicate is False and then True over the range
+
+    Returns:
+        int: the first `i` where `predicate(i)` is True, or `hi` if there is none
+
+    Example:
+        >>> from tweet_parser.readers import first_true
+        >>> first_true(0, 10, lambda i: i * i >= 20)
+        5
+    """
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if predicate(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def _next_line_start(mapped, offset):
+    if offset == 0:
+        return 0
+    newline = mapped.find(b"\n", offset - 1)
+    return len(mapped) if newline == -1 else newline + 1
+
+
+def _next_tweet_time(mapped, pos):
+    """
+    The time of the first Tweet at or after the line starting at `pos`,
+    or None if there are no more Tweets in the file
+    """
+    size = len(mapped)
+    while pos < size:
+        newline = mapped.find(b"\n", pos)
+        next_pos = size if newline == -1 else newline + 1
+        tweet_id = peek_tweet_id(mapped[pos:next_pos])
+        if tweet_id is not None:
+            return snowflake2utc(tweet_id)
+        pos = next_pos
+    return None
+
+
+def iter_time_range(filename, start_seconds, end_seconds):
+    """
+    Iterate over the Tweets posted in [start_seconds, end_seconds) in a file
+    that is sorted by Tweet id (oldest first, or newest first)
+
+    The file is binary searched by byte offset: at each probe only the id of
+    the next Tweet is read (with `peek_tweet_id`) and converted to a time with
+    `tweet_date.snowflake2utc`, so finding the start of the range reads a few
+    dozen lines however big the file is. Lines are then streamed until the
+    first Tweet outside of the range.
+
+    Args:
+        filename (str): name of an uncompressed newline-delimited file
+        start_seconds (int): start time, in seconds since the Unix epoch
+        end_seconds (int): end time (exclusive)
+
+    Returns:
+        generator of (bytes, int) tuples: each Tweet line in the time range and
+        the offset just after it, in the same form as `iter_lines`.
+        Lines without a Tweet id are skipped.
+    """
+    if os.path.getsize(filename) == 0 or end_seconds <= start_seconds:
+        return
+    with open(filename, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            size = len(mapped)
+            first_time = _next_tweet_time(mapped, 0)
+            last_start = mapped.rfind(b"\n", 0, size - 1) + 1
+            last_time = _next_tweet_time(mapped, last_start)
+            while last_time is None and last_start > 0:
+                last_start = mapped.rfind(b"\n", 0, last_start - 1) + 1
+                last_time = _next_tweet_time(mapped, last_start)
+            if first_time is None:
+                return
+            newest_first = last_time < first_time
+            if newest_first:
+                def before_range(t):
+                    return t >= end_seconds
+
+                def after_range(t):
+                    return t < start_seconds
+            else:
+                def before_range(t):
+                    return t < start_seconds
+
+                def after_range(t):
+                    return t >= end_seconds
+
+            def past_start(offset):
+                t = _next_tweet_time(mapped, _next_line_start(mapped, offset))
+                return t is None or not before_range(t)
+
+            pos = _next_line_start(mapped, first_true(0, size, past_start))
+            while pos < size:
+                newline = mapped.find(b"\n", pos)
+                next_pos = size if newline == -1 else newline + 1
+                line = mapped[pos:next_pos]
+                tweet_id = peek_tweet_id(line)
+                if tweet_id is not None:
+                    t = snowflake2utc(tweet_id)
+                    if after_range(t):
+                        break
+                    if not before_range(t):
+                        yield line, next_pos
+                pos = next_pos
+        finally:
+            mapped.close()
+
+
+def split_byte_ranges(filename, n_ranges, start_offset=0):
+    """
+    Divide a file into (at most) `n_ranges` contiguous byte ranges of
+    about the same size, each starting at the beginning of a line
+
+    Args:
+        filename (str): name of an uncompressed newline-delimited file
+        n_ranges (int): number of ranges to split the file into
+        start_offset (int): offset of a line start to split the file from
+            (e.g. a resumed position), defaults to the start of the file
+
+    Returns:
+        list of (int, int) tuples: [start, end) byte offsets of each range.
+        Ranges cover the whole file and there are fewer than `n_ranges`
+        of them if the file has fewer lines (or is empty).
+
+    Example:
+        >>> import os, tempfile
+        >>> from tweet_parser.readers import split_byte_ranges
+        >>> fd, path = tempfile.mkstemp()
+        >>> _ = os.write(fd, b'{"a": 1}\\n{"b": 22}\\n{"c": 333}\\n'); os.close(fd)
+        >>> split_byte_ranges(path, 2)
+        [(0, 19), (19, 30)]
+        >>> os.remove(path)
+    """
+    size = os.path.getsize(filename)
+    if size <= start_offset:
+        return []
+    boundaries = [start_offset]
+    with open(filename, "rb") as f:
+        for i in range(1, n_ranges):
+            target = max(start_offset + (size - start_offset) * i // n_ranges,
+                         boundaries[-1])
+            if target >= size:
+                break
+            if target <= boundaries[-1]:
+                # a file with fewer bytes than ranges
+                continue
+            # move the boundary forward to the start of the next line
+            f.seek(target - 1)
+            f.readline()
+            boundary = f.tell()
+            if boundary > boundaries[-1] and boundary < size:
+                boundaries.append(boundary)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def iter_byte_range(filename, start, end):
+    """
+    Iterate over the lines that start in the byte range [start, end) of a file,
+    using a memory map of the file (so no read buffers are copied around)
+
+    Args:
+        filename (str): name of an uncompressed newline-delimited file
+        start (int): offset of the start of a line (e.g. from `split_byte_ranges`)
+        end (int): offset to stop at
+
+    Returns:
+        generator of (bytes, int) tuples: each line and the offset just after it,
+        in the same form as `iter_lines`
+    """
+    if end <= start:
+        return
+    with open(filename, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        try:
+            end = min(end, len(mapped))
+            pos = start
+            find = mapped.find
+            while pos < end:
+                newline = find(b"\n", pos)
+                next_pos = len(mapped) if newline == -1 else newline + 1
+                yield view[pos:next_pos].tobytes(), next_pos
+                pos = next_pos
+        finally:
+            view.release()
+            mapped.close()
+
+
+def imap_byte_ranges(func, filename, processes=None, n_ranges=None, start_offset=0):
+    """
+    Apply `func(filename, start, end)` to byte ranges of a file in a pool
+    of worker processes, yielding the results in file order
+
+    Args:
+        func (function): a module-level (picklable) function, typically one
+            that calls `iter_byte_range(filename, start, end)`
+        filename (str): name of an uncompressed newline-delimited file
+        processes (int): number of worker processes, defaults to the cpu count
+        n_ranges (int): number of ranges to split the file into, defaults to
+            4 ranges per process. More ranges bound the memory used by the
+            results waiting to be consumed.
+        start_offset (int): offset of a line start to begin from
+
+    Returns:
+        generator of ((int, int), result) tuples: each range and its result
+    """
+    import multiprocessing
+    processes = processes or multiprocessing.cpu_count()
+    ranges = split_byte_ranges(filename, n_ranges or 4 * processes, start_offset)
+    pool = multiprocessing.Pool(processes)
+    try:
+        results = pool.imap(_apply_to_range,
+                            [(func, filename, start, end) for start, end in ranges])
+        for byte_range, result in zip(ranges, results):
+            yield byte_range, result
+        pool.close()
+    finally:
+        pool.terminate()
+
+
+def _apply_to_range(args):
+    func, filename, start, end = args
+    return func(filename, start, end)
+
+
+def iter_lines(filename, compressed=False, start_offset=0, end_offset=None, dedup=None):
+    """
+    Iterate over the lines of a file, along with the byte offset
+    where reading could resume after each line
+
+    Args:
+        filename (str): name of the file to read, "-" for stdin
+        compressed (bool): if True, decompress files ending in
+            ".gz" or ".bz2" (as `fileinput.hook_compressed` does)
+        start_offset (int): byte offset to start reading from, as
+            returned by a previous call. For gzip files this is an
+            offset into the compressed file, at a gzip member boundary.
+        end_offset (int): for uncompressed files only, stop after the line
+            that contains this offset - 1 (see `split_byte_ranges`)
+        dedup (ExactIdSet or BloomIdSet): skip the lines whose Tweet id
+            (see `peek_tweet_id`) is already in this set, and add the ids
+            of the others (see `tweet_parser.dedup`). Lines without an id
+            are kept.
+
+    Returns:
+        generator of (bytes, int) tuples: each line (including its newline)
+        and the offset just after it, or None if reading cannot resume
+        from there (stdin, bz2 files and lines within a gzip member)
+
+    Example:
+        >>> import os, tempfile
+        >>> from tweet_parser.readers import iter_lines
+        >>> fd, path = tempfile.mkstemp()
+        >>> _ = os.write(fd, b'{"a": 1}\\n{"b": 2}\\n'); os.close(fd)
+        >>> list(iter_lines(path))
+        [(b'{"a": 1}\\n', 9), (b'{"b": 2}\\n', 18)]
+        >>> list(iter_lines(path, start_offset=9))
+        [(b'{"b": 2}\\n', 18)]
+        >>> os.remove(path)
+    """
+    if dedup is not None:
+        for line, offset in iter_lines(filename, compressed, start_offset, end_offset):
+            tweet_id = peek_tweet_id(line)
+            if tweet_id is None or dedup.add(tweet_id):
+                yield line, offset
+        return
+    if end_offset is not None:
+        if filename == "-" or (compressed and filename.endswith((".gz", ".bz2"))):
+            raise ValueError("Only uncompressed files can be read by byte range")
+        for line, offset in iter_byte_range(filename, start_offset, end_offset):
+            yield line, offset
+        return
+    if filename == "-":
+        if start_offset:
+            raise ValueError("Cannot resume reading from stdin")
+        for line in _open_stdin():
+            yield line, None
+        return
+    if compressed and filename.endswith(".gz"):
+        with open(filename, "rb") as fileobj:
+            for line, offset in _iter_gzip_lines(fileobj, start_offset):
+                yield line, offset
+    elif compressed and filename.endswith(".bz2"):
+        if start_offset:
+            raise ValueError("Cannot resume reading a bz2 file")
+        import bz2
+        with bz2.BZ2File(filename, "rb") as fileobj:
+            for line in fileobj:
+                yield line, None
+    else:
+        with open(filename, "rb") as fileobj:
+            for line, offset in _iter_plain_lines(fileobj, start_offset):
+                yield line, offset
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 Twitter, Inc.
+# Licensed under the MIT License
+# https://opensource.org/licenses/MIT
+"""Parse batches of Tweet payloads in a pool of threads.
+
+`ThreadPoolParser` decodes and loads payload lines with a
+`concurrent.futures.ThreadPoolExecutor`, in batches, and yields the
+results in input order. On a standard CPython build, threads mostly help
+when the lines come from (or the results go to) slow I/O; on a
+free-threaded build the parsing itself runs in parallel.
+
+What is safe to share between threads:
+
+- Getting attributes of a `Tweet` never changes its payload, so one Tweet
+  (and the Tweets embedded in it) can be read by several threads at once.
+  Every thread gets the same value for an attribute (see
+  `tweet_parser.lazy_property`); call
+  `tweet_parser.lazy_property.enable_thread_safety()` if each value must
+  also be computed only once per Tweet.
+- The lists and dicts returned by Tweet attributes are shared by every
+  caller, so don't change them in place.
+- A `ThreadPoolParser` should only be used from one thread at a time.
+"""
+import collections
+import json
+
+from tweet_parser.metrics import ParseMetrics
+
+
+def parse_lines(lines, attributes=None, do_format_validation=False):
+    """
+    Decode and load a batch of payload lines
+
+    Blank lines are skipped, and so are lines that aren't JSON and JSON
+    values that aren't Tweets (which are counted in the metrics).
+
+    Args:
+        lines (list): Tweet payloads as bytes, one per item
+        attributes (list): if given, return dicts of these Tweet attributes
+            (None for attributes that aren't available) instead of Tweets
+        do_format_validation (bool): passed on to `Tweet`
+
+    Returns:
+        tuple: (list of Tweets, or of dicts of attributes if `attributes`
+        is given, `ParseMetrics` counts for the batch)
+    """
+    from tweet_parser.tweet import Tweet
+    from tweet_parser.tweet_parser_errors import NotATweetError, NotAvailableError
+    metrics = ParseMetrics()
+    results = []
+    for line in lines:
+        if not line.strip():
+            continue
+        metrics.lines += 1
+        metrics.bytes += len(line)
+        try:
+            tweet = Tweet(json.loads(line.decode("utf-8")),
+                          do_format_validation=do_format_validation)
+        except (ValueError, UnicodeDecodeError):
+            metrics.bad_json += 1
+            continue
+        except (NotATweetError, TypeError):
+            # TypeError: JSON that isn't an object (null, 1, ...)
+            metrics.non_tweets += 1
+            continue
+        metrics.count_tweet(tweet)
+        if attributes is None:
+            results.append(tweet)
+            continue
+        record = {}
+        for attribute in attributes:
+            try:
+                record[attribute] = getattr(tweet, attribute)
+            except NotAvailableError:
+                metrics.not_available += 1
+                record[attribute] = None
+        results.append(record)
+    return results, metrics.counts()
+
+
+class ThreadPoolParser(object):
+    """
+    Parse payload lines in batches, in a pool of threads
+
+    Args:
+        max_workers (int): number of threads, defaults to the cpu count
+        batch_size (int): number of lines per batch given to a thread
+        max_pending (int): maximum number of batches being parsed or waiting
+            to be consumed, before `parse` stops reading lines, defaults to
+            twice `max_workers`
+        attributes (list): if given, yield dicts of these Tweet attributes
+            (None for attributes that aren't available) instead of Tweets
+        do_format_validation (bool): passed on to `Tweet`
+
+    Attributes:
+        metrics (ParseMetrics): counts of the lines, Tweets, bad JSON lines
+            and non-Tweet payloads in the batches consumed so far
+
+    Example:
+        >>> from tweet_parser.thread_pool import ThreadPoolParser
+        >>> lines = [b'{"id": 867474613139156993, "id_str": "867474613139156993",'
+        ...          b' "created_at": "Wed May 24 20:17:19 +0000 2017",'
+        ...          b' "text": "Some Tweet text", "user": {"screen_name": "RobotPrincessFi"}}',
+        ...          b'{not json']
+        >>> with ThreadPoolParser(max_workers=2, attributes=["id", "screen_name"]) as parser:
+        ...     list(parser.parse(lines))
+        [{'id': '867474613139156993', 'screen_name': 'RobotPrincessFi'}]
+        >>> parser.metrics.bad_json
+        1
+    """
+    def __init__(self, max_workers=None, batch_size=100, max_pending=None,
+                 attributes=None, do_format_validation=False):
+        import multiprocessing
+        from concurrent.futures import ThreadPoolExecutor
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(1, max_pending or 2 * self.max_workers)
+        self.attributes = list(attributes) if attributes is not None else None
+        self.do_format_validation = do_format_validation
+        self.metrics = ParseMetrics()
+        self.executor = ThreadPoolExecutor(self.max_workers)
+
+    def _submit(self, batch):
+        return self.executor.submit(parse_lines, batch, self.attributes,
+                                    self.do_format_validation)
+
+    def parse_batches(self, lines):
+        """
+        Iterate over the parsed batches of `lines`, in order
+
+        Args:
+            lines (iterable): Tweet payloads (bytes or str), one per item;
+                blank lines are skipped
+
+        Returns:
+            generator of list: the Tweets (or dicts of attributes) of each
+            batch, for the batches with at least one Tweet
+        """
+        pending = collections.deque()
+
+        def consume():
+            results, counts = pending.popleft().result()
+            self.metrics.add(counts)
+            return results
+
+        batch = []
+        for line in lines:
+            if not isinstance(line, bytes):
+                line = line.encode("utf-8")
+            if not line.strip():
+                continue
+            batch.append(line)
+            if len(batch) >= self.batch_size:
+                if len(pending) >= self.max_pending:
+                    results = consume()
+                    if results:
+                        yield results
+                pending.append(self._submit(batch))
+                batch = []
+        if batch:
+            pending.append(self._submit(batch))
+        while pending:
+            results = consume()
+            if results:
+                yield results
+
+    def parse(self, lines):
+        """
+        Iterate over the Tweets (or dicts of attributes) parsed from
+        `lines`, in order (see `parse_batches`)
+        """
+        for batch in self.parse_batches(lines):
+            for result in batch:
+                yield result
+
+    def close(self):
+        """
+        Shut down the threads, after the batches already submitted
+        """
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -4,13 +4,23 @@
 # https://opensource.org/licenses/MIT
 import datetime
 
-from tweet_parser.lazy_property import lazy_property
+from tweet_parser.lazy_property import lazy_property, picklable_state
+from tweet_parser.lazy_import import LazyModule
 from tweet_parser.tweet_parser_errors import NotATweetError
 from tweet_parser import tweet_checking
-from tweet_parser.getter_methods import tweet_date, tweet_user, tweet_counts
-from tweet_parser.getter_methods import tweet_text, tweet_geo, tweet_links
-from tweet_parser.getter_methods import tweet_entities, tweet_embeds
-from tweet_parser.getter_methods import gnip_fields, tweet_generator, tweet_reply
+
+# the getter modules are only imported when a Tweet attribute first needs them
+tweet_date = LazyModule("tweet_parser.getter_methods.tweet_date", globals())
+tweet_user = LazyModule("tweet_parser.getter_methods.tweet_user", globals())
+tweet_counts = LazyModule("tweet_parser.getter_methods.tweet_counts", globals())
+tweet_text = LazyModule("tweet_parser.getter_methods.tweet_text", globals())
+tweet_geo = LazyModule("tweet_parser.getter_methods.tweet_geo", globals())
+tweet_links = LazyModule("tweet_parser.getter_methods.tweet_links", globals())
+tweet_entities = LazyModule("tweet_parser.getter_methods.tweet_entities", globals())
+tweet_embeds = LazyModule("tweet_parser.getter_methods.tweet_embeds", globals())
+gnip_fields = LazyModule("tweet_parser.getter_methods.gnip_fields", globals())
+tweet_generator = LazyModule("tweet_parser.getter_methods.tweet_generator", globals())
+tweet_reply = LazyModule("tweet_parser.getter_methods.tweet_reply", globals())
 
 
 class Tweet(dict):
@@ -68,6 +78,11 @@ class Tweet(dict):
         # make sure that this obj has all of the keys that our dict had
         self.update(tweet_dict)
 
+    def __getstate__(self):
+        # keep the cached attribute values when pickling, but not the lock
+        # added by `lazy_property.enable_thread_safety`
+        return picklable_state(self)
+
     @lazy_property
     def id(self):
         """
@@ -145,7 +160,7 @@ class Tweet(dict):
         Returns:
             str: value returned by calling `tweet_user.get_user_id` on `self`
         """
-        return tweet_user.get_user_id(self)
+        return tweet_user.get_user_id(self, self.original_format)
 
     @lazy_property
     def screen_name(self):
@@ -155,7 +170,7 @@ class Tweet(dict):
         Returns:
             str: value returned by calling `tweet_user.get_screen_name` on `self`
         """
-        return tweet_user.get_screen_name(self)
+        return tweet_user.get_screen_name(self, self.original_format)
 
     @lazy_property
     def name(self):
@@ -165,7 +180,7 @@ class Tweet(dict):
         Returns:
             str: value returned by calling `tweet_user.get_name` on `self`
         """
-        return tweet_user.get_name(self)
+        return tweet_user.get_name(self, self.original_format)
 
     @lazy_property
     def bio(self):
@@ -176,7 +191,7 @@ class Tweet(dict):
             str: the user's bio text.
             value returned by calling `tweet_user.get_bio` on `self`
         """
-        return tweet_user.get_bio(self)
+        return tweet_user.get_bio(self, self.original_format)
 
     @lazy_property
     def follower_count(self):
@@ -187,7 +202,7 @@ class Tweet(dict):
             int: the number of followers.
             value returned by calling `get_follower_count` on `self`
         """
-        return tweet_user.get_follower_count(self)
+        return tweet_user.get_follower_count(self, self.original_format)
 
     @lazy_property
     def following_count(self):
@@ -198,7 +213,7 @@ class Tweet(dict):
             int: the number of accounts that the author of the Tweet is following,
             value returned by calling `get_following_count` on `self`
         """
-        return tweet_user.get_following_count(self)
+        return tweet_user.get_following_count(self, self.original_format)
 
     @lazy_property
     def klout_score(self):
@@ -210,7 +225,7 @@ class Tweet(dict):
             int: value returned by calling `tweet_user.get_klout_score` on `self`
             (if no Klout is present, this returns a None)
         """
-        return tweet_user.get_klout_score(self)
+        return tweet_user.get_klout_score(self, self.original_format)
 
     @lazy_property
     def klout_profile(self):
@@ -222,7 +237,7 @@ class Tweet(dict):
             str: value returned by calling `tweet_user.get_klout_profile` on `self`
             (if no Klout is present, this returns a `None`)
         """
-        return tweet_user.get_klout_profile(self)
+        return tweet_user.get_klout_profile(self, self.original_format)
 
     @lazy_property
     def klout_id(self):
@@ -234,7 +249,7 @@ class Tweet(dict):
             str: value returned by calling `tweet_user.get_klout_id` on `self`
             (if no Klout is present, this returns a `None`)
         """
-        return tweet_user.get_klout_id(self)
+        return tweet_user.get_klout_id(self, self.original_format)
 
     @lazy_property
     def klout_influence_topics(self):
@@ -248,7 +263,8 @@ class Tweet(dict):
             `tweet_user.get_klout_topics(self, topic_type = 'influence')`
             (if no Klout is present, this returns a `None`)
         """
-        return tweet_user.get_klout_topics(self, topic_type='influence')
+        return tweet_user.get_klout_topics(self, topic_type='influence',
+                                           original_format=self.original_format)
 
     @lazy_property
     def klout_interest_topics(self):
@@ -262,7 +278,8 @@ class Tweet(dict):
             `tweet_user.get_klout_topics(self, topic_type = 'interest')`
             (if no Klout is present, this returns a `None`)
         """
-        return tweet_user.get_klout_topics(self, topic_type='interest')
+        return tweet_user.get_klout_topics(self, topic_type='interest',
+                                           original_format=self.original_format)
 
     @lazy_property
     def text(self):
@@ -273,7 +290,7 @@ class Tweet(dict):
         Returns:
             str: value returned by calling `tweet_text.get_text` on `self`
         """
-        return tweet_text.get_text(self)
+        return tweet_text.get_text(self, self.original_format)
 
     @lazy_property
     def tweet_type(self):
@@ -284,7 +301,7 @@ class Tweet(dict):
             str: ("tweet","quote" or "retweet" only)
             value returned by calling `tweet_text.get_tweet_type` on `self`
         """
-        return tweet_text.get_tweet_type(self)
+        return tweet_text.get_tweet_type(self, self.original_format)
 
     @lazy_property
     def user_entered_text(self):
@@ -296,12 +313,10 @@ class Tweet(dict):
         *retweet*: empty string
 
         Returns:
-            str: if `tweet.tweet_type == "retweet"`, returns an empty string
-            else, returns the value of `tweet_text.get_full_text(self)`
+            str: value returned by calling
+            `tweet_text.get_user_entered_text` on `self`
         """
-        if self.tweet_type == "retweet":
-            return ""
-        return tweet_text.get_full_text(self)
+        return tweet_text.get_user_entered_text(self, self.original_format)
 
     @lazy_property
     def lang(self):
@@ -312,7 +327,7 @@ class Tweet(dict):
             str: 2-letter BCP 47 language code (or None if undefined)
             Value returned by calling `tweet_text.get_lang` on `self`
         """
-        return tweet_text.get_lang(self)
+        return tweet_text.get_lang(self, self.original_format)
 
     @lazy_property
     def poll_options(self):
@@ -325,7 +340,7 @@ class Tweet(dict):
             list (list of strings): value returned by calling
             `tweet_text.get_poll_options` on `self`
         """
-        return tweet_text.get_poll_options(self)
+        return tweet_text.get_poll_options(self, self.original_format)
 
     @lazy_property
     def quote_or_rt_text(self):
@@ -340,7 +355,7 @@ class Tweet(dict):
             str: value returned by calling
             tweet_text.get_quote_or_rt_text on `self`
         """
-        return tweet_text.get_quote_or_rt_text(self)
+        return tweet_text.get_quote_or_rt_text(self, self.original_format)
 
     @lazy_property
     def all_text(self):
@@ -352,7 +367,7 @@ class Tweet(dict):
         Returns:
             str: value returned by calling `tweet_text.get_all_text` on `self`
         """
-        return tweet_text.get_all_text(self)
+        return tweet_text.get_all_text(self, self.original_format)
 
     @lazy_property
     def geo_coordinates(self):
@@ -364,7 +379,7 @@ class Tweet(dict):
         Returns:
             dict: value returned by calling `tweet_geo.get_geo_coordinates` on `self`
         """
-        return tweet_geo.get_geo_coordinates(self)
+        return tweet_geo.get_geo_coordinates(self, self.original_format)
 
     @lazy_property
     def profile_location(self):
@@ -386,7 +401,7 @@ class Tweet(dict):
             ...                                     # who created the Tweet is from
             ... }
         """
-        return tweet_geo.get_profile_location(self)
+        return tweet_geo.get_profile_location(self, self.original_format)
 
     @lazy_property
     def tweet_links(self):
@@ -423,7 +438,7 @@ class Tweet(dict):
             ...   # the url that tweet directs to, often t.co
             ...   'url': "t.co/1234"}]
         """
-        return tweet_links.get_tweet_links(self)
+        return tweet_links.get_tweet_links(self, self.original_format)
 
     @lazy_property
     def most_unrolled_urls(self):
@@ -440,7 +455,7 @@ class Tweet(dict):
             list (a list of strings): list of urls
             value returned by calling tweet_links.get_most_unrolled_urls on `self`
         """
-        return tweet_links.get_most_unrolled_urls(self)
+        return tweet_links.get_most_unrolled_urls(self, self.original_format)
 
     @lazy_property
     def user_mentions(self):
@@ -473,7 +488,7 @@ class Tweet(dict):
             ... }
 
         """
-        return tweet_entities.get_user_mentions(self)
+        return tweet_entities.get_user_mentions(self, self.original_format)
 
     @lazy_property
     def hashtags(self):
@@ -487,7 +502,7 @@ class Tweet(dict):
             list (a list of strings): list of all of the hashtags in the Tweet
             value returned by calling `tweet_entities.get_hashtags` on `self`
         """
-        return tweet_entities.get_hashtags(self)
+        return tweet_entities.get_hashtags(self, self.original_format)
 
     @lazy_property
     def media_urls(self):
@@ -499,7 +514,7 @@ class Tweet(dict):
             list (a list of strings): list of all of the media urls in the Tweet
             value returned by calling `tweet_entities.get_media_urls` on `self`
         """
-        return tweet_entities.get_media_urls(self)
+        return tweet_entities.get_media_urls(self, self.original_format)
 
     @lazy_property
     def quoted_tweet(self):
@@ -516,7 +531,7 @@ class Tweet(dict):
         Raises:
             NotATweetError: if quoted tweet is malformed
         """
-        quote_tweet = tweet_embeds.get_quoted_tweet(self)
+        quote_tweet = tweet_embeds.get_quoted_tweet(self, self.original_format)
         if quote_tweet is not None:
             try:
                 return Tweet(quote_tweet)
@@ -541,7 +556,7 @@ class Tweet(dict):
         Raises:
             NotATweetError: if retweeted tweet is malformed
         """
-        retweet = tweet_embeds.get_retweeted_tweet(self)
+        retweet = tweet_embeds.get_retweeted_tweet(self, self.original_format)
         if retweet is not None:
             try:
                 return Tweet(retweet)
@@ -564,7 +579,7 @@ class Tweet(dict):
         Raises:
             NotATweetError: if embedded tweet is malformed
         """
-        embedded_tweet = tweet_embeds.get_embedded_tweet(self)
+        embedded_tweet = tweet_embeds.get_embedded_tweet(self, self.original_format)
         if embedded_tweet is not None:
             try:
                 return Tweet(embedded_tweet)
@@ -584,7 +599,7 @@ class Tweet(dict):
             are defined.
 
         """
-        return gnip_fields.get_matching_rules(self)
+        return gnip_fields.get_matching_rules(self, self.original_format)
 
     @lazy_property
     def generator(self):
@@ -596,7 +611,7 @@ class Tweet(dict):
             that generated the Tweet.
             value returned by calling `tweet_generator.get_generator` on `self`
         """
-        return tweet_generator.get_generator(self)
+        return tweet_generator.get_generator(self, self.original_format)
 
     @lazy_property
     def in_reply_to_screen_name(self):
@@ -606,7 +621,7 @@ class Tweet(dict):
         Returns:
             str: value returned by calling `tweet_reply.get_in_reply_to_screen_name` on `self`
         """
-        return tweet_reply.get_in_reply_to_screen_name(self)
+        return tweet_reply.get_in_reply_to_screen_name(self, self.original_format)
 
     @lazy_property
     def in_reply_to_user_id(self):
@@ -617,7 +632,7 @@ class Tweet(dict):
         Returns:
             str: value returned by calling `tweet_reply.get_in_reply_to_user_id` on `self`
         """
-        return tweet_reply.get_in_reply_to_user_id(self)
+        return tweet_reply.get_in_reply_to_user_id(self, self.original_format)
 
     @lazy_property
     def in_reply_to_status_id(self):
@@ -627,7 +642,7 @@ class Tweet(dict):
         Returns:
             str: value returned by calling `tweet_reply.get_in_reply_to_status_id` on `self`
         """
-        return tweet_reply.get_in_reply_to_status_id(self)
+        return tweet_reply.get_in_reply_to_status_id(self, self.original_format)
 
     @lazy_property
     def favorite_count(self):
@@ -639,7 +654,7 @@ class Tweet(dict):
         Returns:
             int: value returned by calling `tweet_counts.get_favorite_count` on `self`
         """
-        return tweet_counts.get_favorite_count(self)
+        return tweet_counts.get_favorite_count(self, self.original_format)
 
     @lazy_property
     def quote_count(self):
@@ -653,7 +668,7 @@ class Tweet(dict):
             int: value returned by calling `tweet_counts.get_quote_count` on `self` 
             or raises NotAvailableError
         """
-        return tweet_counts.get_quote_count(self)
+        return tweet_counts.get_quote_count(self, self.original_format)
 
     @lazy_property
     def retweet_count(self):
@@ -665,4 +680,4 @@ class Tweet(dict):
         Returns:
             int: value returned by calling `tweet_counts.get_retweet_count` on `self` 
         """
-        return tweet_counts.get_retweet_count(self)
+        return tweet_counts.get_retweet_count(self, self.original_format)
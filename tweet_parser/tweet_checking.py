@@ -9,9 +9,6 @@ used for other validation code as well.
 """
 
 from tweet_parser.tweet_parser_errors import NotATweetError, UnexpectedFormatError
-from tweet_parser.tweet_keys import original_format_minimum_set_keys
-from tweet_parser.tweet_keys import activity_streams_minimum_set_keys
-from tweet_parser.tweet_keys import original_format_superset_keys, activity_streams_superset_keys
 
 
 def is_original_format(tweet):
@@ -109,6 +106,9 @@ def _check_original_format_tweet(tweet, validation_checking=False):
             raise NotATweetError("This dict has no '{}' key".format(key))
     # check for changing keys
     if validation_checking:
+        # the key sets are large, so they are only loaded when validating
+        from tweet_parser.tweet_keys import original_format_superset_keys
+        from tweet_parser.tweet_keys import original_format_minimum_set_keys
         _ = key_validation_check(get_all_keys(tweet),
                                  original_format_superset_keys,
                                  original_format_minimum_set_keys)
@@ -120,6 +120,8 @@ def _check_activity_streams_tweet(tweet, validation_checking=False):
             raise NotATweetError("This dict has no '{}' key".format(key))
     # check for changing keys
     if validation_checking:
+        from tweet_parser.tweet_keys import activity_streams_superset_keys
+        from tweet_parser.tweet_keys import activity_streams_minimum_set_keys
         _ = key_validation_check(get_all_keys(tweet),
                                  activity_streams_superset_keys,
                                  activity_streams_minimum_set_keys)